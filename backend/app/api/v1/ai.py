@@ -24,9 +24,9 @@ from app.core.config import settings
 router = APIRouter(prefix="/ai", tags=["AI Services"])
 logger = logging.getLogger(__name__)
 
-# Initialize AI service only if API key is available
+# Initialize AI service only if API key is available (or running simulated)
 ai_service = None
-if settings.GROQ_API_KEY:
+if settings.GROQ_API_KEY or settings.AI_PROVIDER == "simulated":
     try:
         ai_service = GroqAIService()
         logger.info("AI service initialized successfully")
@@ -20,6 +20,8 @@ from app.api.v1.audit import router as audit_router
 from app.api.v1.notifications import router as notifications_router
 from app.api.v1.team import router as team_router
 from app.api.v1.integrations import router as integrations_router
+from app.api.v1.bulk import router as bulk_router
+from app.api.v1.jobs import router as jobs_router
 
 # Create main API router
 api_router = APIRouter()
@@ -40,3 +42,5 @@ api_router.include_router(audit_router)
 api_router.include_router(notifications_router)
 api_router.include_router(team_router)
 api_router.include_router(integrations_router)
+api_router.include_router(bulk_router)
+api_router.include_router(jobs_router)
@@ -3,9 +3,12 @@ Audit Trail API endpoints
 Provides comprehensive audit logging and activity tracking
 """
 
+import os
+import time
 from datetime import datetime, timedelta
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 from sqlalchemy import func, or_, desc
@@ -16,10 +19,18 @@ from app.infrastructure.database.models import (
     User,
     Company,
     AuditLog,
+    BulkJob,
     AuditAction,
     AuditResourceType,
     AuditRiskLevel
 )
+from app.schemas.bulk import BulkOperationStatus
+from app.services.audit_export_service import (
+    AuditExportError,
+    audit_export_data,
+    audit_export_service,
+    export_media_type,
+)
 from app.services.audit_service import AuditService
 
 router = APIRouter(prefix="/audit", tags=["Audit Trail"])
@@ -83,7 +94,12 @@ class AuditExportRequest(BaseModel):
     """Audit export request"""
 
     filters: Optional[AuditEntryFilter] = None
-    format: str = Field(default="JSON", description="Export format: JSON, CSV, PDF")
+    format: str = Field(
+        default="JSON", description="Export format: JSON, JSONL, CSV, PARQUET"
+    )
+    compression: Optional[str] = Field(
+        default=None, description="Compress the export file: gzip or zstd"
+    )
     include_metadata: bool = Field(default=True)
 
 
@@ -398,93 +414,77 @@ async def export_audit_entries(
     """
     Export audit entries with specified filters and format
 
-    Returns a download URL or file data based on the format requested.
+    The export file is written in the background; poll the export for its
+    progress and download it from download_url once it has completed.
     """
+    started = time.perf_counter()
     try:
-        # Build query based on filters
-        query = db.query(AuditLog)
-
-        # Apply company-scoped access control
-        if current_user.role.value != "admin":
-            query = query.join(User, AuditLog.user_id == User.id).filter(
-                User.company_id == current_user.company_id
+        filters = export_request.filters
+        try:
+            job = audit_export_service.start(
+                db,
+                current_user,
+                filters=filters.model_dump(mode="json") if filters else None,
+                # Admins export every company's entries
+                all_companies=current_user.role.value == "admin",
+                export_format=export_request.format,
+                compression=export_request.compression,
+                include_metadata=export_request.include_metadata,
             )
+        except AuditExportError as e:
+            return {"success": False, "message": str(e), "data": None}
 
-        # Apply filters if provided
-        if export_request.filters:
-            filters = export_request.filters
-
-            if filters.user_id:
-                query = query.filter(AuditLog.user_id == filters.user_id)
-
-            if filters.action:
-                try:
-                    action_enum = AuditAction(filters.action.upper())
-                    query = query.filter(AuditLog.action == action_enum)
-                except ValueError:
-                    pass
-
-            if filters.resource_type:
-                try:
-                    resource_type_enum = AuditResourceType(filters.resource_type.upper())
-                    query = query.filter(AuditLog.resource_type == resource_type_enum)
-                except ValueError:
-                    pass
-
-            if filters.risk_level:
-                try:
-                    risk_level_enum = AuditRiskLevel(filters.risk_level.upper())
-                    query = query.filter(AuditLog.risk_level == risk_level_enum)
-                except ValueError:
-                    pass
-
-            if filters.compliance_flag is not None:
-                query = query.filter(AuditLog.compliance_flag == filters.compliance_flag)
-
-            if filters.date_from:
-                query = query.filter(AuditLog.timestamp >= filters.date_from)
-
-            if filters.date_to:
-                query = query.filter(AuditLog.timestamp <= filters.date_to)
-
-            if filters.search:
-                search_term = f"%{filters.search.lower()}%"
-                query = query.filter(
-                    or_(
-                        func.lower(AuditLog.user_name).like(search_term),
-                        func.lower(AuditLog.resource_name).like(search_term),
-                        func.lower(AuditLog.details).like(search_term)
-                    )
-                )
-
-        # Get total count
-        total_records = query.count()
-
-        # TODO: Implement actual file generation and storage
-        # For now, return a placeholder response indicating the export would be generated
-
-        import uuid
-        export_id = str(uuid.uuid4())
-
-        # Estimate file size based on record count (approximate)
-        estimated_size_bytes = total_records * 1024  # rough estimate of 1KB per record
-
-        return {
-            "success": True,
-            "data": {
-                "export_id": export_id,
-                "format": export_request.format,
-                "total_records": total_records,
-                "file_size_bytes": estimated_size_bytes,
-                "download_url": f"/api/v1/files/exports/audit_export_{export_id}.{export_request.format.lower()}",
-                "expires_at": datetime.now() + timedelta(hours=24),
-                "processing_time_ms": 100,
-                "status": "pending",  # In a real implementation, this would track export progress
-                "include_metadata": export_request.include_metadata
-            },
-        }
+        data = audit_export_data(job)
+        data["processing_time_ms"] = round((time.perf_counter() - started) * 1000)
+        return {"success": True, "data": data}
 
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Failed to export audit entries: {str(e)}"
         )
+
+
+def _get_export(db: Session, export_id: str, current_user: User) -> BulkJob:
+    job = audit_export_service.get_job(db, export_id)
+    if not job or job.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Export not found")
+    return job
+
+
+@router.get("/exports/{export_id}")
+async def get_audit_export(
+    export_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Get the status and progress of an audit export"""
+    job = _get_export(db, export_id, current_user)
+    return {"success": True, "data": audit_export_data(job)}
+
+
+@router.get("/exports/{export_id}/download")
+async def download_audit_export(
+    export_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Download a completed audit export. Range requests are supported, so
+    interrupted downloads can resume.
+    """
+    job = _get_export(db, export_id, current_user)
+    if job.status == BulkOperationStatus.FAILED.value:
+        raise HTTPException(
+            status_code=410, detail=job.error_message or "Export failed"
+        )
+    if job.status != BulkOperationStatus.COMPLETED.value:
+        progress = audit_export_data(job)["progress_percent"]
+        raise HTTPException(
+            status_code=409,
+            detail=f"Export is still running ({progress}% done)",
+        )
+    return FileResponse(
+        job.file_path,
+        media_type=export_media_type(job),
+        filename=os.path.basename(job.file_path),
+    )
@@ -0,0 +1,261 @@
+"""
+Bulk operation endpoints for Pactoria MVP
+Bulk contract operations run as jobs, streamed contract imports, bulk
+contract exports and their downloads
+"""
+
+import json
+import os
+from uuid import UUID
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Form,
+    HTTPException,
+    Query,
+    UploadFile,
+    status,
+)
+from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from app.core.auth import get_current_user
+from app.core.database import get_db
+from app.infrastructure.database.models import User
+from app.infrastructure.database.models import BulkJob
+from app.schemas.bulk import (
+    BulkContractOperation,
+    BulkExportRequest,
+    BulkExportResponse,
+    BulkImportRequest,
+    BulkImportResponse,
+    BulkJobItemsResponse,
+    BulkJobResponse,
+    BulkOperationStatus,
+)
+from app.services.bulk_export_service import (
+    archive_filename,
+    bulk_export_response,
+    bulk_export_service,
+)
+from app.services.bulk_import_service import error_report_path
+from app.services.bulk_job_service import bulk_job_response, bulk_job_service
+from app.services.bulk_operations_service import BulkOperationsService
+
+router = APIRouter(prefix="/bulk", tags=["Bulk Operations"])
+
+
+def _get_export(db: Session, export_id: str, current_user: User) -> BulkJob:
+    job = bulk_export_service.get_job(db, export_id)
+    if not job or job.company_id != current_user.company_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Export not found"
+        )
+    return job
+
+
+def _require_company(current_user: User):
+    if not current_user.company_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User must belong to a company to run bulk operations",
+        )
+
+
+def _get_job(db: Session, job_id: str, current_user: User) -> BulkJob:
+    # Without a company the lookup below wouldn't be scoped
+    _require_company(current_user)
+    job = bulk_job_service.get_job(db, job_id, current_user.company_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Bulk job not found"
+        )
+    return job
+
+
+@router.post(
+    "/contracts/operations",
+    response_model=BulkJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def start_contract_operation(
+    operation: BulkContractOperation,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Archive, restore, update or delete contracts in bulk. The operation runs
+    as a background job; poll the job, page through its item results or
+    subscribe to its events for progress.
+    """
+    _require_company(current_user)
+    job = BulkOperationsService(db).start_bulk_contract_operation(
+        operation, current_user
+    )
+    return bulk_job_response(job)
+
+
+@router.get("/jobs/{job_id}", response_model=BulkJobResponse)
+async def get_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Get the status and progress of a bulk job"""
+    return bulk_job_response(_get_job(db, job_id, current_user))
+
+
+@router.get("/jobs/{job_id}/items", response_model=BulkJobItemsResponse)
+async def get_job_items(
+    job_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    failed_only: bool = Query(False, description="Only items that failed"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Page through the per-item results of a bulk job, in request order"""
+    _get_job(db, job_id, current_user)
+    items, total = bulk_job_service.get_items(
+        db, job_id, offset=offset, limit=limit, failed_only=failed_only
+    )
+    return BulkJobItemsResponse(
+        job_id=job_id, items=items, offset=offset, limit=limit, total=total
+    )
+
+
+@router.get("/jobs/{job_id}/events")
+async def follow_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Subscribe to a bulk job as server-sent events: a progress event whenever
+    the job's status changes, ending once the job has finished
+    """
+    _get_job(db, job_id, current_user)
+
+    async def events():
+        async for job in bulk_job_service.follow(job_id):
+            yield f"event: progress\ndata: {job.model_dump_json()}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+@router.post("/contracts/import", response_model=BulkImportResponse)
+async def import_contracts(
+    file: UploadFile = File(...),
+    file_format: str = Form(..., description="csv or json (an array of records)"),
+    mapping: str = Form(
+        ..., description="JSON object mapping contract fields to file columns"
+    ),
+    skip_validation: bool = Form(False),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Import contracts from a CSV or JSON file. The upload is parsed as a
+    stream and inserted in batches; rejected rows are listed in a report
+    at error_report_url.
+    """
+    _require_company(current_user)
+    try:
+        import_request = BulkImportRequest(
+            file_format=file_format,
+            mapping=json.loads(mapping),
+            skip_validation=skip_validation,
+        )
+    except (ValueError, ValidationError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)
+        )
+    return await BulkOperationsService(db).import_contracts(
+        import_request, file.file, current_user
+    )
+
+
+@router.get("/imports/{import_id}/errors")
+async def download_import_errors(
+    import_id: UUID,
+    current_user: User = Depends(get_current_user),
+):
+    """Download the rows an import rejected, one JSON object per line"""
+    path = error_report_path(current_user.company_id or "", str(import_id))
+    if not current_user.company_id or not os.path.exists(path):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Error report not found"
+        )
+    return FileResponse(
+        path,
+        media_type="application/x-ndjson",
+        filename=f"import_{str(import_id)[:8]}_errors.jsonl",
+    )
+
+
+@router.post("/contracts/export", response_model=BulkExportResponse)
+async def export_contracts(
+    export_request: BulkExportRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Export the company's contracts as a ZIP archive: one table for csv, one
+    file per contract for json, pdf and docx. The archive is built in the
+    background; poll the export or start downloading it straight away.
+    """
+    if not current_user.company_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User must belong to a company to export contracts",
+        )
+    return await BulkOperationsService(db).export_contracts(
+        export_request, current_user
+    )
+
+
+@router.get("/exports/{export_id}", response_model=BulkExportResponse)
+async def get_export(
+    export_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Get the progress of a bulk export"""
+    job = _get_export(db, export_id, current_user)
+    return bulk_export_response(job, f"Export {job.status}")
+
+
+@router.get("/exports/{export_id}/download")
+async def download_export(
+    export_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Download a bulk export. A finished archive supports Range requests, so
+    interrupted downloads can resume; an archive still being written is
+    streamed as it grows.
+    """
+    job = _get_export(db, export_id, current_user)
+    filename = archive_filename(job)
+    if job.status == BulkOperationStatus.FAILED.value:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail=job.error_message or "Export failed",
+        )
+    if job.status == BulkOperationStatus.COMPLETED.value:
+        return FileResponse(
+            job.file_path, media_type="application/zip", filename=filename
+        )
+    return StreamingResponse(
+        bulk_export_service.follow(job.id),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
@@ -3,49 +3,46 @@ Contract management endpoints for Pactoria MVP
 CRUD operations, AI generation, and compliance analysis
 """
 
-from app.services.ai_service import (
-    ai_service,
-    ContractGenerationRequest,
-    ComplianceAnalysisRequest,
-)
+from app.services.ai_service import ai_service
 from app.services.analytics_cache_service import invalidate_company_analytics_cache
+from app.services.document_render_service import (
+    MEDIA_TYPES,
+    PYTHON_DOCX_AVAILABLE,
+    REPORTLAB_AVAILABLE,
+    document_render_service,
+    export_filename,
+)
+from app.services.compliance_analysis_service import (
+    ANALYSIS_VERSIONS,
+    compliance_analysis_service,
+)
+from app.services.job_queue_service import background_job_response, job_queue_service
+from app.services.portfolio_rescan_service import PORTFOLIO_RESCAN_JOB
+from app.services.speculative_generation_service import (
+    speculative_generation_service,
+    build_generation_request,
+)
 from app.core.datetime_utils import get_current_utc
-from app.domain.services.uk_compliance_engine import uk_compliance_engine
+from app.domain.services.incremental_compliance import (
+    incremental_compliance_validator,
+)
 from app.domain.entities.company import Company as DomainCompany, CompanyId, BusinessAddress, CompanyType as DomainCompanyType, IndustryType as DomainIndustryType, CompanySize as DomainCompanySize
-from app.domain.value_objects import ContractType as DomainContractType, Email, Money
+from app.domain.value_objects import Email, Money
 from decimal import Decimal
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from fastapi.responses import Response
+from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import or_
 import asyncio
 from functools import lru_cache
-from io import BytesIO
-import html
-
-# Import ReportLab dependencies for PDF generation
-try:
-    from reportlab.lib.pagesizes import A4
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.units import inch
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
-    from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_JUSTIFY
-    REPORTLAB_AVAILABLE = True
-except ImportError:
-    REPORTLAB_AVAILABLE = False
-
-# Import python-docx for DOCX generation
-try:
-    from docx import Document
-    from docx.shared import Inches
-    from docx.enum.text import WD_ALIGN_PARAGRAPH
-    PYTHON_DOCX_AVAILABLE = True
-except ImportError:
-    PYTHON_DOCX_AVAILABLE = False
 
 from app.core.database import get_db
-from app.core.auth import get_current_user, require_company_access
+from app.core.auth import (
+    get_admin_role_user,
+    get_current_user,
+    require_company_access,
+)
 from app.core.exceptions import APIExceptionFactory
 from app.core.validation import ResourceValidator
 from app.infrastructure.database.models import (
@@ -60,7 +57,9 @@ from app.infrastructure.database.models import (
     AuditLog,
     AuditAction,
     AuditResourceType,
+    BackgroundJob,
 )
+from app.schemas.jobs import BackgroundJobResponse, JobStatus
 from app.schemas.contracts import (
     ContractCreate,
     ContractUpdate,
@@ -71,6 +70,7 @@ from app.schemas.contracts import (
     ComplianceScoreResponse,
     ContractVersionResponse,
     ContractAnalysisRequest,
+    PortfolioRescanRequest,
     TemplateResponse,
 )
 from app.schemas.common import (
@@ -255,6 +255,9 @@ async def create_contract(
     db.add(audit_log)
     db.commit()
 
+    # Users almost always generate right after creating a draft
+    speculative_generation_service.schedule(db, contract)
+
     # Invalidate analytics cache for the company since new contract was created
     await invalidate_company_analytics_cache(current_user.company_id)
 
@@ -447,6 +450,86 @@ async def list_templates(
     return [TemplateResponse.model_validate(t) for t in filtered_templates]
 
 
+@router.post(
+    "/rescan",
+    response_model=BackgroundJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def start_portfolio_rescan(
+    rescan_request: PortfolioRescanRequest,
+    current_user: User = Depends(get_admin_role_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Re-score a company's contracts with the current compliance rules.
+    Queued as a background job; poll or follow the returned job for
+    progress. A rescan already queued or running for the same scope is
+    returned instead, and a failed attempt resumes from its last committed
+    batch when retried.
+    """
+    if rescan_request.all_companies:
+        if not current_user.is_admin:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="System admin privileges required to rescan all companies",
+            )
+        company_id = None
+    else:
+        company_id = rescan_request.company_id or current_user.company_id
+        if not company_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="User is not associated with a company",
+            )
+        require_company_access(current_user, company_id)
+
+    job = (
+        db.query(BackgroundJob)
+        .filter(
+            BackgroundJob.job_type == PORTFOLIO_RESCAN_JOB,
+            # IS NULL for a rescan of every company
+            BackgroundJob.company_id == company_id,
+            BackgroundJob.status.in_(
+                [JobStatus.QUEUED.value, JobStatus.RUNNING.value]
+            ),
+        )
+        .first()
+    )
+    if job is None:
+        job = job_queue_service.enqueue(
+            db,
+            PORTFOLIO_RESCAN_JOB,
+            payload={
+                "company_id": company_id,
+                "resume_after": rescan_request.resume_after,
+            },
+            company_id=company_id,
+            user_id=current_user.id,
+        )
+    return background_job_response(job)
+
+
+@router.get("/rescan/{job_id}", response_model=BackgroundJobResponse)
+async def get_portfolio_rescan(
+    job_id: str,
+    current_user: User = Depends(get_admin_role_user),
+    db: Session = Depends(get_db),
+):
+    """Progress of a portfolio rescan"""
+    job = job_queue_service.get_job(db, job_id)
+    if (
+        not job
+        or job.job_type != PORTFOLIO_RESCAN_JOB
+        or (job.company_id is None and not current_user.is_admin)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Rescan not found"
+        )
+    if job.company_id is not None:
+        require_company_access(current_user, job.company_id)
+    return background_job_response(job)
+
+
 @router.get(
     "/{contract_id}",
     response_model=ContractResponse,
@@ -616,6 +699,9 @@ async def update_contract(
     db.add(audit_log)
     db.commit()
 
+    # Restart speculative generation if the generation inputs changed
+    speculative_generation_service.schedule(db, contract)
+
     return ContractResponse.model_validate(contract)
 
 
@@ -641,6 +727,8 @@ async def delete_contract(
     contract.updated_at = get_current_utc()
 
     db.commit()
+    incremental_compliance_validator.forget(contract.id)
+    document_render_service.forget(contract.id)
 
     # Create audit log
     audit_log = AuditLog(
@@ -685,44 +773,39 @@ async def generate_contract_content(
             return AIGenerationResponse.model_validate(existing_generation)
 
     # Prepare AI generation request
-    ai_request = ContractGenerationRequest(
-        plain_english_input=contract.plain_english_input,
-        contract_type=contract.contract_type.value,
-        client_name=contract.client_name,
-        supplier_name=contract.supplier_name,
-        contract_value=contract.contract_value,
-        currency=contract.currency,
-        start_date=contract.start_date.isoformat() if contract.start_date else None,
-        end_date=contract.end_date.isoformat() if contract.end_date else None,
-    )
+    ai_request = build_generation_request(contract)
 
     try:
-        # Check if AI service is available
-        if ai_service is None:
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail="AI service is not available. Please configure GROQ_API_KEY to enable AI features.",
+        # Reuse a speculative generation started when the draft was saved
+        ai_generation = await speculative_generation_service.claim(db, contract)
+
+        if ai_generation is None:
+            # Check if AI service is available
+            if ai_service is None:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="AI service is not available. Please configure GROQ_API_KEY to enable AI features.",
+                )
+
+            # Generate content using AI service
+            ai_response = await ai_service.generate_contract(ai_request)
+
+            # Create AI generation record
+            ai_generation = AIGeneration(
+                model_name=ai_response.model_name,
+                model_version=ai_response.model_version,
+                input_prompt=f"Contract generation for {contract.contract_type.value}: {contract.plain_english_input}",
+                generated_content=ai_response.content,
+                processing_time_ms=ai_response.processing_time_ms,
+                token_usage=ai_response.token_usage,
+                confidence_score=ai_response.confidence_score,
             )
-        
-        # Generate content using AI service
-        ai_response = await ai_service.generate_contract(ai_request)
-
-        # Create AI generation record
-        ai_generation = AIGeneration(
-            model_name=ai_response.model_name,
-            model_version=ai_response.model_version,
-            input_prompt=f"Contract generation for {contract.contract_type.value}: {contract.plain_english_input}",
-            generated_content=ai_response.content,
-            processing_time_ms=ai_response.processing_time_ms,
-            token_usage=ai_response.token_usage,
-            confidence_score=ai_response.confidence_score,
-        )
 
-        db.add(ai_generation)
-        db.flush()
+            db.add(ai_generation)
+            db.flush()
 
         # Update contract with generated content
-        contract.generated_content = ai_response.content
+        contract.generated_content = ai_generation.generated_content
         contract.ai_generation_id = ai_generation.id
         contract.updated_at = get_current_utc()
 
@@ -737,7 +820,7 @@ async def generate_contract_content(
             user_id=current_user.id,
             new_values={
                 "ai_generation_id": ai_generation.id,
-                "model_name": ai_response.model_name,
+                "model_name": ai_generation.model_name,
             },
             contract_id=contract.id,
         )
@@ -805,127 +888,52 @@ async def analyze_contract_compliance(
         )
 
         if existing_score:
-            return ComplianceScoreResponse.model_validate(existing_score)
+            return ComplianceScoreResponse.model_validate(existing_score).model_copy(
+                update={
+                    "is_provisional": existing_score.analysis_version
+                    == ANALYSIS_VERSIONS["uk_engine"]
+                    and compliance_analysis_service.is_pending(contract_id)
+                }
+            )
 
-    # Prepare compliance analysis request
-    compliance_request = ComplianceAnalysisRequest(
-        contract_content=content_to_analyze,
-        contract_type=contract.contract_type.value,
-        jurisdiction="UK",
+    # Create a basic company domain entity for compliance analysis
+    # Using defaults since we don't have detailed company domain mapping yet
+    domain_company = DomainCompany(
+        company_id=CompanyId(current_user.company_id),
+        name="Default Company",  # Will improve with proper company domain integration
+        company_type=DomainCompanyType.PRIVATE_LIMITED,
+        industry=DomainIndustryType.TECHNOLOGY,
+        address=BusinessAddress(
+            line1="Business Address",
+            city="London",
+            postcode="SW1A 1AA"
+        ),
+        primary_contact_email=Email(current_user.email),
+        created_by_user_id=current_user.id,
+        company_size=DomainCompanySize.SMALL
     )
 
+    # Convert contract value to Money object if available
+    contract_value = None
+    if contract.contract_value:
+        contract_value = Money(Decimal(str(contract.contract_value)), contract.currency or "GBP")
+
     try:
-        compliance_response = None
-        analysis_method = "ai"
-        
-        # Try AI service first if available
-        if ai_service is not None:
-            try:
-                compliance_response = await ai_service.analyze_compliance(compliance_request)
-                analysis_method = "ai"
-            except Exception as ai_error:
-                print(f"AI service failed: {ai_error}, falling back to UK compliance engine")
-                compliance_response = None
-        
-        # Fallback to UK compliance engine if AI service failed or unavailable
-        if compliance_response is None:
-            print("Using UK compliance engine for analysis")
-            analysis_method = "uk_engine"
-            
-            # Create a basic company domain entity for compliance analysis
-            # Using defaults since we don't have detailed company domain mapping yet
-            domain_company = DomainCompany(
-                company_id=CompanyId(current_user.company_id),
-                name="Default Company",  # Will improve with proper company domain integration
-                company_type=DomainCompanyType.PRIVATE_LIMITED,
-                industry=DomainIndustryType.TECHNOLOGY,  
-                address=BusinessAddress(
-                    line1="Business Address",
-                    city="London",
-                    postcode="SW1A 1AA"
-                ),
-                primary_contact_email=Email(current_user.email),
-                created_by_user_id=current_user.id,
-                company_size=DomainCompanySize.SMALL
-            )
-            
-            # Convert contract type to domain enum
-            domain_contract_type = DomainContractType(contract.contract_type.value)
-            
-            # Convert contract value to Money object if available
-            contract_value = None
-            if contract.contract_value:
-                contract_value = Money(Decimal(str(contract.contract_value)), contract.currency or "GBP")
-            
-            # Run UK compliance engine analysis
-            uk_assessment = uk_compliance_engine.validate_contract(
-                contract_content=content_to_analyze,
-                company=domain_company,
-                contract_type=domain_contract_type,
-                contract_value=contract_value
-            )
-            
-            # Convert UK assessment to compliance response format
-            class LocalComplianceResponse:
-                def __init__(self, assessment):
-                    self.overall_score = float(assessment.overall_score)
-                    self.gdpr_compliance = float(assessment.framework_scores.get("gdpr", 75.0))
-                    self.employment_law_compliance = float(assessment.framework_scores.get("employment_law", 75.0))
-                    self.consumer_rights_compliance = float(assessment.framework_scores.get("consumer_rights", 75.0))
-                    self.commercial_terms_compliance = float(assessment.framework_scores.get("commercial_law", 75.0))
-                    
-                    # Map risk level to numeric score (1-10 scale)
-                    risk_mapping = {
-                        "low": 2,
-                        "medium": 5,
-                        "high": 8,
-                        "critical": 10
-                    }
-                    self.risk_score = risk_mapping.get(assessment.risk_level.value.lower(), 5)
-                    
-                    # Extract risk factors and recommendations
-                    self.risk_factors = [v.description for v in assessment.violations[:5]]  # Top 5
-                    self.recommendations = assessment.recommendations
-                    self.analysis_raw = f"UK Compliance Engine Analysis: {assessment.overall_level.value}"
-            
-            compliance_response = LocalComplianceResponse(uk_assessment)
-
-        # Create compliance score record
-        compliance_score = ComplianceScore(
-            contract_id=contract_id,
-            overall_score=compliance_response.overall_score,
-            gdpr_compliance=compliance_response.gdpr_compliance,
-            employment_law_compliance=compliance_response.employment_law_compliance,
-            consumer_rights_compliance=compliance_response.consumer_rights_compliance,
-            commercial_terms_compliance=compliance_response.commercial_terms_compliance,
-            risk_score=compliance_response.risk_score,
-            risk_factors=compliance_response.risk_factors,
-            recommendations=compliance_response.recommendations,
-            analysis_version=f"1.0-{analysis_method}",
-            analysis_raw=compliance_response.analysis_raw,
+        # The UK compliance engine runs alongside the AI analysis; when it
+        # answers first its score is returned as provisional and the AI
+        # score follows over the WebSocket
+        result = await compliance_analysis_service.analyze(
+            db,
+            contract,
+            content_to_analyze,
+            domain_company,
+            contract_value,
+            current_user.id,
         )
 
-        db.add(compliance_score)
-        db.commit()
-        db.refresh(compliance_score)
-
-        # Create audit log
-        audit_log = AuditLog(
-            action=AuditAction.EDIT,
-            resource_type=AuditResourceType.CONTRACT,
-            resource_id=contract.id,
-            user_id=current_user.id,
-            new_values={
-                "overall_score": compliance_response.overall_score,
-                "risk_score": compliance_response.risk_score,
-                "analysis_method": analysis_method,
-            },
-            contract_id=contract.id,
+        return ComplianceScoreResponse.model_validate(result.score).model_copy(
+            update={"is_provisional": result.is_provisional}
         )
-        db.add(audit_log)
-        db.commit()
-
-        return ComplianceScoreResponse.model_validate(compliance_score)
 
     except Exception as e:
         db.rollback()
@@ -994,80 +1002,9 @@ async def export_contract_pdf(
         )
 
     try:
-        # Create PDF buffer
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(
-            buffer,
-            pagesize=A4,
-            rightMargin=1*inch,
-            leftMargin=1*inch,
-            topMargin=1*inch,
-            bottomMargin=1*inch
-        )
-
-        # Create styles
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=18,
-            spaceAfter=30,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold'
-        )
-        
-        body_style = ParagraphStyle(
-            'CustomBody',
-            parent=styles['Normal'],
-            fontSize=11,
-            spaceAfter=12,
-            alignment=TA_JUSTIFY,
-            fontName='Helvetica',
-            leading=14
-        )
-
-        # Create content
-        story = []
-        
-        # Title
-        safe_title = html.escape(contract.title or "Contract")
-        story.append(Paragraph(safe_title, title_style))
-        story.append(Spacer(1, 20))
-        
-        # Contract metadata
-        if contract.client_name or contract.supplier_name:
-            story.append(Paragraph("<b>Contract Details:</b>", styles['Heading2']))
-            
-            if contract.client_name:
-                story.append(Paragraph(f"<b>Client:</b> {html.escape(contract.client_name)}", body_style))
-            if contract.supplier_name:
-                story.append(Paragraph(f"<b>Supplier:</b> {html.escape(contract.supplier_name)}", body_style))
-            if contract.contract_value:
-                value_str = f"{contract.currency or 'GBP'} {contract.contract_value:,.2f}"
-                story.append(Paragraph(f"<b>Contract Value:</b> {value_str}", body_style))
-            if contract.start_date:
-                story.append(Paragraph(f"<b>Start Date:</b> {contract.start_date.strftime('%d %B %Y')}", body_style))
-            if contract.end_date:
-                story.append(Paragraph(f"<b>End Date:</b> {contract.end_date.strftime('%d %B %Y')}", body_style))
-            
-            story.append(Spacer(1, 20))
-        
-        # Contract content
-        story.append(Paragraph("<b>Contract Terms:</b>", styles['Heading2']))
-        story.append(Spacer(1, 12))
-        
-        # Clean and format content
-        content_lines = content.split('\n')
-        for line in content_lines:
-            clean_line = html.escape(line.strip())
-            if clean_line:
-                story.append(Paragraph(clean_line, body_style))
-            else:
-                story.append(Spacer(1, 6))
-
-        # Build PDF
-        doc.build(story)
-        buffer.seek(0)
+        # Rendered in a worker process, or served from the render cache
+        # when the contract hasn't changed since its last export
+        path = await document_render_service.render(contract, "pdf")
 
         # Create audit log
         audit_log = AuditLog(
@@ -1081,11 +1018,11 @@ async def export_contract_pdf(
         db.add(audit_log)
         db.commit()
 
-        # Return PDF response
-        filename = f"{contract.title.replace(' ', '_') if contract.title else 'contract'}_{contract_id[:8]}.pdf"
-        return Response(
-            content=buffer.getvalue(),
-            media_type="application/pdf",
+        # Stream the rendered file
+        filename = export_filename(contract.title, contract_id, "pdf")
+        return FileResponse(
+            path,
+            media_type=MEDIA_TYPES["pdf"],
             headers={"Content-Disposition": f"attachment; filename={filename}"}
         )
 
@@ -1128,65 +1065,9 @@ async def export_contract_docx(
         )
 
     try:
-        # Create Word document
-        doc = Document()
-        
-        # Set margins
-        sections = doc.sections
-        for section in sections:
-            section.top_margin = Inches(1)
-            section.bottom_margin = Inches(1)
-            section.left_margin = Inches(1)
-            section.right_margin = Inches(1)
-
-        # Title
-        title = doc.add_heading(contract.title or "Contract", level=0)
-        title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-
-        # Contract metadata
-        if contract.client_name or contract.supplier_name or contract.contract_value:
-            doc.add_heading('Contract Details', level=1)
-            
-            if contract.client_name:
-                p = doc.add_paragraph()
-                p.add_run('Client: ').bold = True
-                p.add_run(contract.client_name)
-            
-            if contract.supplier_name:
-                p = doc.add_paragraph()
-                p.add_run('Supplier: ').bold = True
-                p.add_run(contract.supplier_name)
-            
-            if contract.contract_value:
-                p = doc.add_paragraph()
-                p.add_run('Contract Value: ').bold = True
-                value_str = f"{contract.currency or 'GBP'} {contract.contract_value:,.2f}"
-                p.add_run(value_str)
-            
-            if contract.start_date:
-                p = doc.add_paragraph()
-                p.add_run('Start Date: ').bold = True
-                p.add_run(contract.start_date.strftime('%d %B %Y'))
-            
-            if contract.end_date:
-                p = doc.add_paragraph()
-                p.add_run('End Date: ').bold = True
-                p.add_run(contract.end_date.strftime('%d %B %Y'))
-
-        # Contract content
-        doc.add_heading('Contract Terms', level=1)
-        
-        # Add content paragraphs
-        content_lines = content.split('\n')
-        for line in content_lines:
-            clean_line = line.strip()
-            if clean_line:
-                doc.add_paragraph(clean_line)
-
-        # Save to buffer
-        buffer = BytesIO()
-        doc.save(buffer)
-        buffer.seek(0)
+        # Rendered in a worker process, or served from the render cache
+        # when the contract hasn't changed since its last export
+        path = await document_render_service.render(contract, "docx")
 
         # Create audit log
         audit_log = AuditLog(
@@ -1200,11 +1081,11 @@ async def export_contract_docx(
         db.add(audit_log)
         db.commit()
 
-        # Return Word document response
-        filename = f"{contract.title.replace(' ', '_') if contract.title else 'contract'}_{contract_id[:8]}.docx"
-        return Response(
-            content=buffer.getvalue(),
-            media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        # Stream the rendered file
+        filename = export_filename(contract.title, contract_id, "docx")
+        return FileResponse(
+            path,
+            media_type=MEDIA_TYPES["docx"],
             headers={"Content-Disposition": f"attachment; filename={filename}"}
         )
 
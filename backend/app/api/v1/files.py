@@ -3,26 +3,50 @@ File management endpoints for Pactoria MVP
 File upload, storage, and retrieval for contracts and documents
 """
 
+import logging
 import os
 import uuid
 from pathlib import Path
 
-try:
-    import magic
-
-    HAS_MAGIC = True
-except ImportError:
-    HAS_MAGIC = False
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from fastapi.responses import FileResponse
+from typing import List, Optional, Tuple
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Form,
+    HTTPException,
+    Query,
+    Request,
+    UploadFile,
+    status,
+)
+from fastapi.responses import Response
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 from app.core.auth import get_current_user
 from app.core.config import settings
 from app.core.exceptions import APIExceptionFactory
-from app.infrastructure.database.models import User, AuditLog
+from app.core.security import verify_download_signature
+from app.infrastructure.database.models import (
+    AuditAction,
+    AuditLog,
+    AuditResourceType,
+    Contract,
+    StoredFile,
+    User,
+)
+from app.services.audit_service import AuditService
+from app.services.file_download_service import (
+    file_download_response,
+    signed_download_url,
+)
+from app.services.file_store_service import file_store_service
+from app.services.file_upload_service import (
+    UploadTooLargeError,
+    sniff_mime_type,
+    stream_upload,
+)
 from app.schemas.common import (
     ErrorResponse,
     ValidationError,
@@ -35,12 +59,14 @@ from fastapi.security import HTTPBearer
 # Security scheme for OpenAPI documentation
 security = HTTPBearer()
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/files", tags=["Files"])
 
 # Configure upload settings
 UPLOAD_DIR = Path(settings.UPLOAD_DIR if hasattr(settings, "UPLOAD_DIR") else "uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
-MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+MAX_FILE_SIZE = settings.MAX_FILE_SIZE_MB * 1024 * 1024
 ALLOWED_EXTENSIONS = {
     ".pdf",
     ".doc",
@@ -77,11 +103,19 @@ class FileUploadResponse(BaseModel):
     filename: str
     original_filename: str
     file_size: int
+    sha256: Optional[str] = None
     mime_type: str
     upload_url: str
     created_at: str
 
 
+class SignedDownloadResponse(BaseModel):
+    """Signed download URL response"""
+
+    url: str
+    expires_at: str
+
+
 class FileListResponse(BaseModel):
     """File list response"""
 
@@ -130,6 +164,66 @@ def get_safe_filename(filename: str) -> str:
     return safe_name
 
 
+def _stored_file(
+    db: Session, file_id: str, company_id: Optional[str] = None
+) -> Tuple[StoredFile, Path]:
+    """File record and content path, checked to be on disk and in place"""
+    record = file_store_service.get(db, file_id, company_id)
+    if not record:
+        raise APIExceptionFactory.not_found("File", file_id)
+
+    file_path = file_store_service.path(record)
+    if not file_path.exists():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="File not found on disk"
+        )
+
+    # Validate file is within upload directory (security check)
+    try:
+        file_path.resolve().relative_to(UPLOAD_DIR.resolve())
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="File access denied"
+        )
+    return record, file_path
+
+
+def _download_response(record: StoredFile, file_path: Path) -> Response:
+    # Blobs are named by their content hash, which makes a strong ETag
+    return file_download_response(
+        file_path,
+        UPLOAD_DIR,
+        filename=record.original_filename,
+        media_type=record.mime_type,
+        etag=record.sha256,
+    )
+
+
+def _file_response(record: StoredFile) -> FileUploadResponse:
+    return FileUploadResponse(
+        file_id=record.id,
+        filename=record.filename,
+        original_filename=record.original_filename,
+        file_size=record.file_size,
+        sha256=record.sha256,
+        mime_type=record.mime_type,
+        upload_url=f"/api/v1/files/{record.id}",
+        created_at=record.created_at.isoformat(),
+    )
+
+
+def _file_values(record: StoredFile) -> dict:
+    return {
+        "filename": record.filename,
+        "original_filename": record.original_filename,
+        "file_size": record.file_size,
+        "sha256": record.sha256,
+        "mime_type": record.mime_type,
+        "description": record.description,
+        "contract_id": record.contract_id,
+    }
+
+
 @router.post(
     "/upload",
     response_model=FileUploadResponse,
@@ -149,7 +243,8 @@ def get_safe_filename(filename: str) -> str:
 
     **Security Features:**
     - Virus scanning (if configured)
-    - Safe file storage with UUID names
+    - Safe file storage under content hashes
+    - Identical uploads within a company are stored once
     - Audit trail for all uploads
 
     **Use Cases:**
@@ -180,80 +275,83 @@ async def upload_file(
     # Validate file
     validate_file(file)
 
+    if contract_id:
+        contract = (
+            db.query(Contract.id)
+            .filter(
+                Contract.id == contract_id,
+                Contract.company_id == current_user.company_id,
+            )
+            .first()
+        )
+        if not contract:
+            raise APIExceptionFactory.not_found("Contract", contract_id)
+
+    safe_filename = get_safe_filename(file.filename or "uploaded_file")
+
+    # Stream to a temporary file in the company's directory, in chunks; the
+    # upload is only moved into the store once it has passed every check
+    company_dir = UPLOAD_DIR / current_user.company_id
     try:
-        # Generate unique file ID and safe filename
-        file_id = str(uuid.uuid4())
-        safe_filename = get_safe_filename(file.filename or "uploaded_file")
-        stored_filename = f"{file_id}_{safe_filename}"
-
-        # Create company-specific upload directory
-        company_dir = UPLOAD_DIR / current_user.company_id
-        company_dir.mkdir(exist_ok=True)
-
-        file_path = company_dir / stored_filename
-
-        # Save file
-        content = await file.read()
-        with open(file_path, "wb") as f:
-            f.write(content)
-
-        # Detect MIME type from file content for better validation
-        if HAS_MAGIC:
-            detected_mime_type = magic.from_buffer(content, mime=True)
-            if detected_mime_type not in ALLOWED_MIME_TYPES:
-                # Clean up the file
-                os.unlink(file_path)
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"File content type not allowed: {detected_mime_type}",
-                )
-        else:
-            # Fallback to uploaded MIME type if magic is not available
-            detected_mime_type = file.content_type or "application/octet-stream"
-
-        # Create file record in database (you might want to create a File model)
-        # For now, we'll use audit logs to track uploads
+        upload = await stream_upload(file, company_dir, MAX_FILE_SIZE)
+    except UploadTooLargeError:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File too large. Maximum size is {settings.MAX_FILE_SIZE_MB}MB",
+        )
+    except OSError as e:
+        logger.error(f"Failed to store upload of {safe_filename}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to upload file: {str(e)}",
+        )
+
+    record = None
+    try:
+        # Detect MIME type from the start of the content for better validation
+        detected_mime_type = sniff_mime_type(upload.head, file.content_type)
+        if detected_mime_type not in ALLOWED_MIME_TYPES:
+            upload.discard()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"File content type not allowed: {detected_mime_type}",
+            )
+
+        record = file_store_service.store(
+            db,
+            upload,
+            company_id=current_user.company_id,
+            filename=safe_filename,
+            original_filename=file.filename or "unknown",
+            mime_type=detected_mime_type,
+            uploaded_by=current_user.id,
+            contract_id=contract_id,
+            description=description,
+        )
 
         # Create audit log
         audit_log = AuditLog(
-            event_type="file_uploaded",
-            resource_type="file",
-            resource_id=file_id,
+            action=AuditAction.CREATE,
+            resource_type=AuditResourceType.FILE,
+            resource_id=record.id,
+            resource_name=record.original_filename,
             user_id=current_user.id,
-            new_values={
-                "filename": safe_filename,
-                "original_filename": file.filename,
-                "file_size": len(content),
-                "mime_type": detected_mime_type,
-                "description": description,
-                "contract_id": contract_id,
-                "file_path": str(file_path),
-            },
+            new_values=_file_values(record),
+            contract_id=contract_id,
         )
         db.add(audit_log)
         db.commit()
 
-        return FileUploadResponse(
-            file_id=file_id,
-            filename=stored_filename,
-            original_filename=file.filename or "unknown",
-            file_size=len(content),
-            mime_type=detected_mime_type,
-            upload_url=f"/api/v1/files/{file_id}",
-            created_at=audit_log.timestamp.isoformat(),
-        )
+        return _file_response(record)
 
     except HTTPException:
         # Re-raise HTTP exceptions
         raise
     except Exception as e:
-        # Clean up file if it was created
-        try:
-            if "file_path" in locals() and file_path.exists():
-                os.unlink(file_path)
-        except Exception as e:
-            logger.warning(f"Failed to delete temporary file {file_path}: {e}")
-
+        logger.error(f"Failed to upload {safe_filename}: {e}")
+        if record is None:
+            # Clean up the temporary file if the store did not take it
+            upload.discard()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to upload file: {str(e)}",
@@ -266,6 +364,11 @@ async def upload_file(
     description="""
     Download a file by its ID.
 
+    **Transfer:**
+    - Range requests (206 Partial Content) for resumable and seeking clients
+    - ETag/Last-Modified with If-None-Match/If-Modified-Since (304)
+    - Served by the front-end server or with zero-copy sends where available
+
     **Access Control:**
     - Users can only download files from their company
     - File access is logged for audit purposes
@@ -293,58 +396,115 @@ async def download_file(
     db: Session = Depends(get_db),
 ):
     """Download file by ID"""
+    record, file_path = _stored_file(db, file_id, current_user.company_id)
 
-    # Find file upload record in audit logs
-    upload_log = (
-        db.query(AuditLog)
-        .filter(
-            AuditLog.event_type == "file_uploaded",
-            AuditLog.resource_id == file_id,
-            AuditLog.user.has(User.company_id == current_user.company_id),
-        )
-        .first()
+    # Create download audit log
+    download_log = AuditLog(
+        action=AuditAction.VIEW,
+        resource_type=AuditResourceType.FILE,
+        resource_id=file_id,
+        resource_name=record.original_filename,
+        user_id=current_user.id,
+        contract_id=record.contract_id,
+        additional_metadata={"file_size": record.file_size},
     )
+    db.add(download_log)
+    db.commit()
 
-    if not upload_log or not upload_log.new_values:
-        raise APIExceptionFactory.not_found("File", file_id)
+    return _download_response(record, file_path)
 
-    # Get file information
-    file_info = upload_log.new_values
-    file_path = Path(file_info.get("file_path"))
 
-    if not file_path.exists():
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="File not found on disk"
-        )
+@router.post(
+    "/{file_id}/signed-url",
+    response_model=SignedDownloadResponse,
+    summary="Create Signed Download URL",
+    description=f"""
+    Create a short-lived URL that downloads a file without authentication,
+    e.g. for a browser download link or an external viewer.
 
-    # Validate file is within upload directory (security check)
-    try:
-        file_path.resolve().relative_to(UPLOAD_DIR.resolve())
-    except ValueError:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN, detail="File access denied"
-        )
+    **Security:**
+    - Only for files of the user's company
+    - The URL expires after {settings.FILE_SIGNED_URL_TTL_SECONDS} seconds
+    - Issuing the URL and every download through it are logged for audit
 
-    # Create download audit log
-    download_log = AuditLog(
-        event_type="file_downloaded",
-        resource_type="file",
+    **Requires Authentication:** JWT Bearer token
+    """,
+    responses={
+        401: {"description": "Authentication required", "model": UnauthorizedError},
+        404: {"description": "File not found", "model": NotFoundError},
+    },
+    dependencies=[Depends(security)],
+)
+async def create_signed_download_url(
+    file_id: str,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Create a signed download URL for a file"""
+    record, _ = _stored_file(db, file_id, current_user.company_id)
+    url, expires_at = signed_download_url(file_id, current_user.id)
+
+    AuditService.create_audit_log(
+        db,
+        action=AuditAction.VIEW,
+        resource_type=AuditResourceType.FILE,
         resource_id=file_id,
+        resource_name=record.original_filename,
         user_id=current_user.id,
-        additional_data={
-            "original_filename": file_info.get("original_filename"),
-            "file_size": file_info.get("file_size"),
-        },
+        details="Signed download URL issued",
+        metadata={"signed_url_expires_at": expires_at.isoformat()},
+        request=request,
     )
-    db.add(download_log)
-    db.commit()
+    return SignedDownloadResponse(url=url, expires_at=expires_at.isoformat())
 
-    # Return file
-    return FileResponse(
-        path=str(file_path),
-        filename=file_info.get("original_filename", "download"),
-        media_type=file_info.get("mime_type", "application/octet-stream"),
+
+@router.get(
+    "/signed/{file_id}",
+    summary="Download File by Signed URL",
+    description="""
+    Download a file with a URL from the signed-url endpoint. Needs no
+    Authorization header; the signature and expiry in the query string
+    stand in for it. Each download is logged for audit as the issuing
+    user's.
+    """,
+    responses={
+        200: {
+            "description": "File downloaded successfully",
+            "content": {"application/octet-stream": {}},
+        },
+        403: {"description": "Invalid or expired link", "model": ErrorResponse},
+        404: {"description": "File not found", "model": NotFoundError},
+    },
+)
+async def download_signed_file(
+    file_id: str,
+    request: Request,
+    issued_by: str = Query(...),
+    expires: int = Query(...),
+    signature: str = Query(...),
+    db: Session = Depends(get_db),
+):
+    """Download file by signed URL"""
+    if not verify_download_signature(file_id, issued_by, expires, signature):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid or expired download link",
+        )
+    record, file_path = _stored_file(db, file_id)
+
+    AuditService.create_audit_log(
+        db,
+        action=AuditAction.VIEW,
+        resource_type=AuditResourceType.FILE,
+        resource_id=file_id,
+        resource_name=record.original_filename,
+        user_id=issued_by,
+        details="File downloaded through a signed URL",
+        metadata={"file_size": record.file_size, "signed_url_expires": expires},
+        request=request,
     )
+    return _download_response(record, file_path)
 
 
 @router.get(
@@ -376,50 +536,20 @@ async def list_files(
     db: Session = Depends(get_db),
 ):
     """List uploaded files for user's company"""
-
-    # Build query for file uploads
-    query = (
-        db.query(AuditLog)
-        .filter(AuditLog.event_type == "file_uploaded")
-        .join(User, AuditLog.user_id == User.id)
-        .filter(User.company_id == current_user.company_id)
+    files, total = file_store_service.list(
+        db,
+        current_user.company_id,
+        contract_id=contract_id,
+        offset=(page - 1) * size,
+        limit=size,
     )
-
-    # Filter by contract if specified
-    if contract_id:
-        query = query.filter(AuditLog.new_values["contract_id"].astext == contract_id)
-
-    # Count total
-    total = query.count()
-
-    # Apply pagination
-    offset = (page - 1) * size
-    upload_logs = (
-        query.order_by(AuditLog.timestamp.desc()).offset(offset).limit(size).all()
+    return FileListResponse(
+        files=[_file_response(record) for record in files],
+        total=total,
+        page=page,
+        size=size,
     )
 
-    # Convert to response format
-    files = []
-    for log in upload_logs:
-        if log.new_values:
-            files.append(
-                FileUploadResponse(
-                    file_id=log.resource_id,
-                    filename=log.new_values.get("filename", "unknown"),
-                    original_filename=log.new_values.get(
-                        "original_filename", "unknown"
-                    ),
-                    file_size=log.new_values.get("file_size", 0),
-                    mime_type=log.new_values.get(
-                        "mime_type", "application/octet-stream"
-                    ),
-                    upload_url=f"/api/v1/files/{log.resource_id}",
-                    created_at=log.timestamp.isoformat(),
-                )
-            )
-
-    return FileListResponse(files=files, total=total, page=page, size=size)
-
 
 @router.delete(
     "/{file_id}",
@@ -430,7 +560,7 @@ async def list_files(
 
     **Security:**
     - Users can only delete files from their company
-    - File is removed from disk and database
+    - The file record is removed; its content goes once no other file shares it
     - Deletion is logged for audit purposes
 
     **Requires Authentication:** JWT Bearer token
@@ -448,42 +578,32 @@ async def delete_file(
     db: Session = Depends(get_db),
 ):
     """Delete file by ID"""
-
-    # Find file upload record
-    upload_log = (
-        db.query(AuditLog)
-        .filter(
-            AuditLog.event_type == "file_uploaded",
-            AuditLog.resource_id == file_id,
-            AuditLog.user.has(User.company_id == current_user.company_id),
-        )
-        .first()
-    )
-
-    if not upload_log or not upload_log.new_values:
+    record = file_store_service.get(db, file_id, current_user.company_id)
+    if not record:
         raise APIExceptionFactory.not_found("File", file_id)
 
-    # Get file path and delete from disk
-    file_info = upload_log.new_values
-    file_path = Path(file_info.get("file_path"))
+    old_values = _file_values(record)
+    uploaded_at = record.created_at
 
-    if file_path.exists():
-        try:
-            os.unlink(file_path)
-        except OSError as e:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to delete file from disk: {str(e)}",
-            )
+    # The content is removed from disk with the last file referencing it
+    try:
+        file_store_service.delete(db, record)
+    except OSError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to delete file from disk: {str(e)}",
+        )
 
     # Create deletion audit log
     delete_log = AuditLog(
-        event_type="file_deleted",
-        resource_type="file",
+        action=AuditAction.DELETE,
+        resource_type=AuditResourceType.FILE,
         resource_id=file_id,
+        resource_name=old_values["original_filename"],
         user_id=current_user.id,
-        old_values=file_info,
-        additional_data={"original_upload_time": upload_log.timestamp.isoformat()},
+        old_values=old_values,
+        additional_metadata={"original_upload_time": uploaded_at.isoformat()},
     )
     db.add(delete_log)
     db.commit()
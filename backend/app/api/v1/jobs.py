@@ -0,0 +1,104 @@
+"""
+Background job endpoints for Pactoria MVP
+Status, progress events and cancellation of a company's background jobs
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.core.auth import get_current_user
+from app.core.database import get_db
+from app.infrastructure.database.models import BackgroundJob, User
+from app.schemas.jobs import (
+    BackgroundJobListResponse,
+    BackgroundJobResponse,
+    JobStatus,
+)
+from app.services.job_queue_service import background_job_response, job_queue_service
+
+router = APIRouter(prefix="/jobs", tags=["Background Jobs"])
+
+
+def _get_job(db: Session, job_id: str, current_user: User) -> BackgroundJob:
+    job = (
+        job_queue_service.get_job(db, job_id, current_user.company_id)
+        if current_user.company_id
+        else None
+    )
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Job not found"
+        )
+    return job
+
+
+@router.get("", response_model=BackgroundJobListResponse)
+async def list_jobs(
+    job_status: Optional[JobStatus] = Query(None, alias="status"),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """The company's background jobs, newest first"""
+    if not current_user.company_id:
+        return BackgroundJobListResponse(jobs=[], offset=offset, limit=limit, total=0)
+    jobs, total = job_queue_service.list_jobs(
+        db, current_user.company_id, job_status, offset=offset, limit=limit
+    )
+    return BackgroundJobListResponse(
+        jobs=[background_job_response(job) for job in jobs],
+        offset=offset,
+        limit=limit,
+        total=total,
+    )
+
+
+@router.get("/{job_id}", response_model=BackgroundJobResponse)
+async def get_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Status and progress of a background job"""
+    return background_job_response(_get_job(db, job_id, current_user))
+
+
+@router.post("/{job_id}/cancel", response_model=BackgroundJobResponse)
+async def cancel_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Cancel a background job. A queued job is cancelled at once; a running
+    one stops at its next progress update.
+    """
+    job = _get_job(db, job_id, current_user)
+    return background_job_response(job_queue_service.cancel(db, job))
+
+
+@router.get("/{job_id}/events")
+async def follow_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Subscribe to a background job as server-sent events: a progress event
+    whenever the job changes, ending once the job has finished
+    """
+    _get_job(db, job_id, current_user)
+
+    async def events():
+        async for job in job_queue_service.follow(job_id):
+            yield f"event: progress\ndata: {job.model_dump_json()}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
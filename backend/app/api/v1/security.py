@@ -31,8 +31,20 @@ from app.schemas.security import (
     AuditLogResponse,
     SecurityConfigResponse,
     ThreatIntelligenceResponse,
+    ComplianceRuleSetResponse,
+    ComplianceRulesReloadRequest,
+    ComplianceRulesReloadResponse,
 )
 from app.services.security_service import security_monitor
+from app.domain.exceptions import DomainValidationError
+from app.domain.services.rule_bundle import (
+    parse_rule_definitions,
+    write_rule_definitions,
+)
+from app.domain.services.uk_compliance_engine import (
+    VALIDATOR_KEYWORDS,
+    uk_compliance_engine,
+)
 
 router = APIRouter(prefix="/security", tags=["Security & Compliance"])
 
@@ -255,6 +267,55 @@ async def check_compliance(
     )
 
 
+@router.get("/compliance/rules", response_model=ComplianceRuleSetResponse)
+async def get_compliance_rules(current_user: User = Depends(get_admin_user)):
+    """Get the loaded compliance rule set (admin only)"""
+
+    return ComplianceRuleSetResponse(**uk_compliance_engine.bundle.summary())
+
+
+@router.post("/compliance/rules/reload", response_model=ComplianceRulesReloadResponse)
+async def reload_compliance_rules(
+    reload_request: ComplianceRulesReloadRequest,
+    current_user: User = Depends(get_admin_user),
+):
+    """
+    Load a new compliance rule set without a restart (admin only).
+    New definitions are written to COMPLIANCE_RULES_PATH when configured, so
+    other worker processes (and portfolio rescans) reload them from the file;
+    otherwise they only apply to request handling in this process. Without
+    definitions the rule file is re-read.
+    """
+
+    previous = uk_compliance_engine.bundle
+    definitions = reload_request.definitions
+    persisted = False
+    try:
+        if definitions is not None and settings.COMPLIANCE_RULES_PATH:
+            # Validate before replacing the file other workers watch
+            parse_rule_definitions(definitions, frozenset(VALIDATOR_KEYWORDS))
+            write_rule_definitions(definitions, settings.COMPLIANCE_RULES_PATH)
+            persisted = True
+            definitions = None
+        bundle = uk_compliance_engine.reload_rules(definitions)
+    except DomainValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)
+        )
+    except OSError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Could not read or write the rule file: {e}",
+        )
+
+    return ComplianceRulesReloadResponse(
+        **bundle.summary(),
+        **bundle.changes_from(previous),
+        previous_rule_set_version=previous.rule_set_version,
+        persisted=persisted,
+    )
+
+
 @router.post("/gdpr/data-request", response_model=GDPRDataResponse)
 async def create_gdpr_data_request(
     gdpr_request: GDPRDataRequest,
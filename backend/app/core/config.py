@@ -4,6 +4,7 @@ Following the MVP Plan specifications
 """
 
 import os
+import tempfile
 from pydantic_settings import BaseSettings
 from typing import List, Optional
 from functools import lru_cache
@@ -35,6 +36,34 @@ class Settings(BaseSettings):
     GROQ_API_KEY: str = os.getenv("GROQ_API_KEY", "")
     GROQ_MODEL: str = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
 
+    # Long contracts are analysed as clause-aligned chunks (map-reduce)
+    AI_CHUNK_MAX_TOKENS: int = int(os.getenv("AI_CHUNK_MAX_TOKENS", "6000"))
+    AI_MAX_PARALLEL_CHUNKS: int = int(os.getenv("AI_MAX_PARALLEL_CHUNKS", "4"))
+
+    # Speculative generation: start generating when a draft is saved (opt-in)
+    AI_SPECULATIVE_GENERATION: bool = (
+        os.getenv("AI_SPECULATIVE_GENERATION", "false").lower() == "true"
+    )
+    AI_SPECULATIVE_MIN_INPUT_CHARS: int = int(
+        os.getenv("AI_SPECULATIVE_MIN_INPUT_CHARS", "80")
+    )
+    AI_SPECULATIVE_DAILY_TOKEN_BUDGET: int = int(
+        os.getenv("AI_SPECULATIVE_DAILY_TOKEN_BUDGET", "100000")
+    )
+
+    # AI provider: "groq", or "simulated" for offline load testing
+    AI_PROVIDER: str = os.getenv("AI_PROVIDER", "groq")
+    AI_SIMULATED_LATENCY_MS: float = float(os.getenv("AI_SIMULATED_LATENCY_MS", "800"))
+    AI_SIMULATED_LATENCY_SIGMA: float = float(
+        os.getenv("AI_SIMULATED_LATENCY_SIGMA", "0.3")
+    )
+    AI_SIMULATED_MS_PER_OUTPUT_TOKEN: float = float(
+        os.getenv("AI_SIMULATED_MS_PER_OUTPUT_TOKEN", "0")
+    )
+    AI_SIMULATED_OUTPUT_TOKENS: int = int(os.getenv("AI_SIMULATED_OUTPUT_TOKENS", "1200"))
+    AI_SIMULATED_ERROR_RATE: float = float(os.getenv("AI_SIMULATED_ERROR_RATE", "0"))
+    AI_SIMULATED_SEED: int = int(os.getenv("AI_SIMULATED_SEED", "0"))
+
     # CORS - Dynamic for Azure Static Web Apps (set in __init__)
     # Allow-all CORS (development only). Set via env CORS_ALLOW_ALL=true
     CORS_ALLOW_ALL: bool = False
@@ -176,6 +205,19 @@ class Settings(BaseSettings):
     # File Upload - Azure optimized
     MAX_FILE_SIZE_MB: int = int(os.getenv("MAX_FILE_SIZE_MB", "10"))
     UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", os.path.join(os.getcwd(), "uploads"))
+    # Uploads are copied to disk in chunks of this size
+    UPLOAD_CHUNK_SIZE_KB: int = int(os.getenv("UPLOAD_CHUNK_SIZE_KB", "1024"))
+    # Downloads: lifetime of signed download URLs, and optionally a header
+    # (X-Accel-Redirect for nginx, X-Sendfile for Apache) handing the file
+    # to the front-end server, which then serves the bytes itself from the
+    # internal location FILE_ACCEL_REDIRECT_PREFIX mapped to UPLOAD_DIR
+    FILE_SIGNED_URL_TTL_SECONDS: int = int(
+        os.getenv("FILE_SIGNED_URL_TTL_SECONDS", "300")
+    )
+    FILE_ACCEL_REDIRECT_HEADER: str = os.getenv("FILE_ACCEL_REDIRECT_HEADER", "")
+    FILE_ACCEL_REDIRECT_PREFIX: str = os.getenv(
+        "FILE_ACCEL_REDIRECT_PREFIX", "/protected-uploads/"
+    )
 
     # Azure Storage (optional for persistent file storage)
     AZURE_STORAGE_ACCOUNT_NAME: Optional[str] = os.getenv("AZURE_STORAGE_ACCOUNT_NAME")
@@ -201,6 +243,76 @@ class Settings(BaseSettings):
     MIN_COMPLIANCE_SCORE: float = float(
         os.getenv("MIN_COMPLIANCE_SCORE", "0.95")
     )  # 95%+ UK legal compliance accuracy
+    # Wall-clock budget per rule-engine assessment; rules not reached in
+    # time are skipped and the assessment is stored as partial
+    COMPLIANCE_TIME_BUDGET_MS: float = float(
+        os.getenv("COMPLIANCE_TIME_BUDGET_MS", "2000")
+    )
+    # Memoised compliance/risk assessments; set a path to persist them
+    ASSESSMENT_CACHE_SIZE: int = int(os.getenv("ASSESSMENT_CACHE_SIZE", "512"))
+    ASSESSMENT_CACHE_PATH: Optional[str] = os.getenv("ASSESSMENT_CACHE_PATH")
+    # Compliance rule data file (default: the bundled rule set), a directory
+    # for compiled rule bundles, and how often engines check the file for a
+    # new version (0 disables hot reload)
+    COMPLIANCE_RULES_PATH: Optional[str] = os.getenv("COMPLIANCE_RULES_PATH")
+    RULE_BUNDLE_CACHE_DIR: Optional[str] = os.getenv("RULE_BUNDLE_CACHE_DIR")
+    COMPLIANCE_RULES_RELOAD_SECONDS: float = float(
+        os.getenv("COMPLIANCE_RULES_RELOAD_SECONDS", "30")
+    )
+    # Portfolio rescans: worker processes (0 = one per CPU) and contracts
+    # scored and written back per batch
+    RESCAN_WORKERS: int = int(os.getenv("RESCAN_WORKERS", "0"))
+    RESCAN_BATCH_SIZE: int = int(os.getenv("RESCAN_BATCH_SIZE", "500"))
+    # PDF/DOCX export rendering: worker processes (0 = one per CPU) and the
+    # directory rendered documents are cached in
+    RENDER_WORKERS: int = int(os.getenv("RENDER_WORKERS", "0"))
+    RENDER_CACHE_DIR: str = os.getenv(
+        "RENDER_CACHE_DIR",
+        os.path.join(tempfile.gettempdir(), "pactoria-render-cache"),
+    )
+    # Bulk contract exports: where job workers write archives (shared with
+    # the API processes), contracts read from the database per batch, and
+    # how long archives stay downloadable
+    BULK_EXPORT_DIR: str = os.getenv(
+        "BULK_EXPORT_DIR", os.path.join(tempfile.gettempdir(), "pactoria-exports")
+    )
+    BULK_EXPORT_BATCH_SIZE: int = int(os.getenv("BULK_EXPORT_BATCH_SIZE", "200"))
+    BULK_EXPORT_TTL_HOURS: int = int(os.getenv("BULK_EXPORT_TTL_HOURS", "24"))
+    # Audit log exports: where job workers write export files (shared with
+    # the API processes), audit entries read from the database per chunk,
+    # and how long files stay downloadable
+    AUDIT_EXPORT_DIR: str = os.getenv(
+        "AUDIT_EXPORT_DIR",
+        os.path.join(tempfile.gettempdir(), "pactoria-audit-exports"),
+    )
+    AUDIT_EXPORT_CHUNK_SIZE: int = int(os.getenv("AUDIT_EXPORT_CHUNK_SIZE", "5000"))
+    AUDIT_EXPORT_TTL_HOURS: int = int(os.getenv("AUDIT_EXPORT_TTL_HOURS", "24"))
+    # Bulk contract operations: contracts per UPDATE/DELETE statement and
+    # commit
+    BULK_OPERATION_CHUNK_SIZE: int = int(os.getenv("BULK_OPERATION_CHUNK_SIZE", "1000"))
+    # How long finished bulk jobs and their item results are kept
+    BULK_JOB_TTL_HOURS: int = int(os.getenv("BULK_JOB_TTL_HOURS", "24"))
+    # Bulk contract imports: rows inserted per executemany and commit, and
+    # where reports of rejected rows are written
+    BULK_IMPORT_BATCH_SIZE: int = int(os.getenv("BULK_IMPORT_BATCH_SIZE", "2000"))
+    BULK_IMPORT_DIR: str = os.getenv(
+        "BULK_IMPORT_DIR", os.path.join(tempfile.gettempdir(), "pactoria-imports")
+    )
+    # Background jobs: run a worker inside the API process (development) or
+    # only in scripts/run_job_worker.py (production), jobs run at once per
+    # worker and per company, worker lease length, retry backoff and how
+    # long finished jobs are kept
+    JOB_WORKER_IN_PROCESS: bool = (
+        os.getenv("JOB_WORKER_IN_PROCESS", "true").lower() == "true"
+    )
+    JOB_WORKER_CONCURRENCY: int = int(os.getenv("JOB_WORKER_CONCURRENCY", "4"))
+    JOB_TENANT_CONCURRENCY: int = int(os.getenv("JOB_TENANT_CONCURRENCY", "2"))
+    JOB_POLL_SECONDS: float = float(os.getenv("JOB_POLL_SECONDS", "1.0"))
+    JOB_LEASE_SECONDS: int = int(os.getenv("JOB_LEASE_SECONDS", "60"))
+    JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    JOB_RETRY_BASE_SECONDS: float = float(os.getenv("JOB_RETRY_BASE_SECONDS", "10"))
+    JOB_RETRY_MAX_SECONDS: float = float(os.getenv("JOB_RETRY_MAX_SECONDS", "900"))
+    JOB_RETENTION_HOURS: int = int(os.getenv("JOB_RETENTION_HOURS", "168"))
 
     # Azure-specific settings
     PORT: int = int(os.getenv("PORT", "8000"))
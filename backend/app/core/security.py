@@ -1,8 +1,11 @@
 """
 Security utilities for Pactoria MVP
-JWT token management and password hashing
+JWT token management, password hashing and signed download URLs
 """
 
+import base64
+import hashlib
+import hmac
 from datetime import timedelta
 from typing import Optional, Union
 from jose import JWTError, jwt
@@ -93,3 +96,24 @@ def generate_secure_token(length: int = 32) -> str:
 
     alphabet = string.ascii_letters + string.digits
     return "".join(secrets.choice(alphabet) for _ in range(length))
+
+
+def create_download_signature(resource_id: str, issued_by: str, expires: int) -> str:
+    """
+    Signature letting whoever holds it download resource_id until expires,
+    on behalf of the user issued_by
+    """
+    message = f"download:{resource_id}:{issued_by}:{expires}".encode()
+    digest = hmac.new(SECRET_KEY.encode(), message, hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+def verify_download_signature(
+    resource_id: str, issued_by: str, expires: int, signature: str
+) -> bool:
+    """Check a download signature and that it hasn't expired"""
+    if expires < get_current_utc().timestamp():
+        return False
+    return hmac.compare_digest(
+        create_download_signature(resource_id, issued_by, expires), signature
+    )
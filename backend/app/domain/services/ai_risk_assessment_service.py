@@ -8,7 +8,6 @@ from dataclasses import dataclass, field
 from typing import Dict, List, Optional
 from datetime import datetime, timezone
 from enum import Enum
-import re
 from decimal import Decimal
 
 from app.domain.entities.company import Company, IndustryType, CompanySize
@@ -18,6 +17,21 @@ from app.domain.services.uk_compliance_engine import (
     ComplianceAssessment,
     RiskLevel,
 )
+from app.domain.services.contract_document import (
+    ContractContent,
+    ContractDocument,
+    get_contract_document,
+)
+from app.domain.services.assessment_cache import (
+    AssessmentCache,
+    assessment_cache,
+    assessment_key,
+)
+from app.domain.services.safe_patterns import TimeBudget
+
+# Bump when risk scoring logic changes; combined with the compliance
+# engine's rule-set version to key cached risk assessments
+RISK_MODEL_VERSION = "1"
 
 
 class RiskCategory(str, Enum):
@@ -71,6 +85,10 @@ class ContractRiskAssessment:
     assessed_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
     assessment_duration_ms: float = 0.0
 
+    # Set when the time budget ran out before every check was run
+    is_partial: bool = False
+    skipped_checks: List[str] = field(default_factory=list)
+
     def get_high_risk_factors(self) -> List[RiskFactor]:
         """Get factors with high or critical risk"""
         return [
@@ -107,8 +125,9 @@ class AIRiskAssessmentService:
     Integrates with UK compliance engine and provides business-focused risk analysis
     """
 
-    def __init__(self):
+    def __init__(self, cache: Optional[AssessmentCache] = None):
         self.compliance_engine = uk_compliance_engine
+        self.cache = cache
 
         # Risk assessment rules and patterns
         self._initialize_risk_patterns()
@@ -121,62 +140,100 @@ class AIRiskAssessmentService:
 
     def assess_contract_risk(
         self,
-        contract_content: str,
+        contract_content: ContractContent,
         company: Company,
         contract_type: ContractType,
         contract_value: Optional[Money] = None,
+        time_budget_ms: Optional[float] = None,
     ) -> ContractRiskAssessment:
         """
         Perform comprehensive risk assessment of contract
         Returns risk score on 1-10 scale with detailed analysis
+        With a time budget, checks not reached in time are skipped and the
+        assessment is marked partial
         """
         start_time = datetime.now(timezone.utc)
+        budget = TimeBudget(time_budget_ms)
+
+        # Preprocess once; the compliance engine and every risk check share it
+        document = get_contract_document(contract_content)
+
+        cache_key = None
+        if self.cache is not None:
+            cache_key = assessment_key(
+                "risk",
+                document.content_hash,
+                company,
+                contract_type,
+                contract_value,
+                f"{RISK_MODEL_VERSION}:{self.compliance_engine.rule_set_version}",
+            )
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
 
-        # Get compliance assessment first
+        # Get compliance assessment first; it shares the budget
         compliance_assessment = self.compliance_engine.validate_contract(
-            contract_content, company, contract_type, contract_value
+            document,
+            company,
+            contract_type,
+            contract_value,
+            time_budget_ms=budget.remaining_ms(),
         )
 
+        # Risk checks in priority order
+        checks = [
+            # 1. Legal Compliance Risks
+            (
+                "legal_compliance",
+                lambda: self._assess_legal_compliance_risks(
+                    compliance_assessment, company
+                ),
+            ),
+            # 2. Financial Exposure Risks
+            (
+                "financial_exposure",
+                lambda: self._assess_financial_risks(
+                    document, contract_value, company
+                ),
+            ),
+            # 3. Operational Impact Risks
+            (
+                "operational_impact",
+                lambda: self._assess_operational_risks(
+                    document, contract_type, company
+                ),
+            ),
+            # 4. Termination and Performance Risks
+            (
+                "termination",
+                lambda: self._assess_termination_risks(document, contract_type),
+            ),
+            # 5. Reputational Risks
+            (
+                "reputational",
+                lambda: self._assess_reputational_risks(document, company),
+            ),
+            # 6. Confidentiality and IP Risks
+            (
+                "confidentiality",
+                lambda: self._assess_confidentiality_risks(document, company),
+            ),
+            # 7. Dispute Resolution Risks
+            (
+                "dispute_resolution",
+                lambda: self._assess_dispute_resolution_risks(document, company),
+            ),
+        ]
+
         # Analyze risk factors
         risk_factors = []
-
-        # 1. Legal Compliance Risks
-        legal_risks = self._assess_legal_compliance_risks(
-            compliance_assessment, company
-        )
-        risk_factors.extend(legal_risks)
-
-        # 2. Financial Exposure Risks
-        financial_risks = self._assess_financial_risks(
-            contract_content, contract_value, company
-        )
-        risk_factors.extend(financial_risks)
-
-        # 3. Operational Impact Risks
-        operational_risks = self._assess_operational_risks(
-            contract_content, contract_type, company
-        )
-        risk_factors.extend(operational_risks)
-
-        # 4. Termination and Performance Risks
-        termination_risks = self._assess_termination_risks(
-            contract_content, contract_type
-        )
-        risk_factors.extend(termination_risks)
-
-        # 5. Reputational Risks
-        reputation_risks = self._assess_reputational_risks(contract_content, company)
-        risk_factors.extend(reputation_risks)
-
-        # 6. Confidentiality and IP Risks
-        confidentiality_risks = self._assess_confidentiality_risks(
-            contract_content, company
-        )
-        risk_factors.extend(confidentiality_risks)
-
-        # 7. Dispute Resolution Risks
-        dispute_risks = self._assess_dispute_resolution_risks(contract_content, company)
-        risk_factors.extend(dispute_risks)
+        skipped_checks = []
+        for name, check in checks:
+            if budget.expired:
+                skipped_checks.append(name)
+                continue
+            risk_factors.extend(check())
 
         # Calculate overall risk score and assessment
         overall_score = self._calculate_overall_risk_score(
@@ -204,7 +261,7 @@ class AIRiskAssessmentService:
         end_time = datetime.now(timezone.utc)
         duration_ms = (end_time - start_time).total_seconds() * 1000
 
-        return ContractRiskAssessment(
+        assessment = ContractRiskAssessment(
             overall_score=overall_score,
             risk_level=risk_level,
             risk_factors=risk_factors,
@@ -216,8 +273,15 @@ class AIRiskAssessmentService:
             sme_specific_risks=sme_specific_risks,
             industry_specific_risks=industry_specific_risks,
             assessment_duration_ms=duration_ms,
+            is_partial=bool(skipped_checks) or compliance_assessment.is_partial,
+            skipped_checks=skipped_checks,
         )
 
+        # Partial results depend on timing, so only complete ones are kept
+        if cache_key is not None and not assessment.is_partial:
+            self.cache.put(cache_key, assessment)
+        return assessment
+
     def _assess_legal_compliance_risks(
         self, compliance_assessment: ComplianceAssessment, company: Company
     ) -> List[RiskFactor]:
@@ -280,11 +344,13 @@ class AIRiskAssessmentService:
         return risks
 
     def _assess_financial_risks(
-        self, content: str, contract_value: Optional[Money], company: Company
+        self,
+        document: ContractDocument,
+        contract_value: Optional[Money],
+        company: Company,
     ) -> List[RiskFactor]:
         """Assess financial exposure risks"""
         risks = []
-        content_lower = content.lower()
 
         # Contract value risk assessment
         if contract_value and contract_value.amount > 0:
@@ -309,54 +375,50 @@ class AIRiskAssessmentService:
                 )
 
         # Payment terms risks
-        payment_risk = self._assess_payment_terms(content_lower)
+        payment_risk = self._assess_payment_terms(document)
         if payment_risk:
             risks.append(payment_risk)
 
         # Penalty and liability risks
-        penalty_risk = self._assess_penalty_clauses(content_lower)
+        penalty_risk = self._assess_penalty_clauses(document)
         if penalty_risk:
             risks.append(penalty_risk)
 
         # Indemnity risks
-        indemnity_risk = self._assess_indemnity_clauses(content_lower)
+        indemnity_risk = self._assess_indemnity_clauses(document)
         if indemnity_risk:
             risks.append(indemnity_risk)
 
         return risks
 
     def _assess_operational_risks(
-        self, content: str, contract_type: ContractType, company: Company
+        self, document: ContractDocument, contract_type: ContractType, company: Company
     ) -> List[RiskFactor]:
         """Assess operational impact risks"""
         risks = []
-        content_lower = content.lower()
 
         # Performance obligations risk
-        performance_risk = self._assess_performance_obligations(
-            content_lower, contract_type
-        )
+        performance_risk = self._assess_performance_obligations(document, contract_type)
         if performance_risk:
             risks.append(performance_risk)
 
         # Resource allocation risk
-        resource_risk = self._assess_resource_requirements(content_lower, company)
+        resource_risk = self._assess_resource_requirements(document, company)
         if resource_risk:
             risks.append(resource_risk)
 
         # Timeline and delivery risks
-        timeline_risk = self._assess_timeline_pressures(content_lower)
+        timeline_risk = self._assess_timeline_pressures(document)
         if timeline_risk:
             risks.append(timeline_risk)
 
         return risks
 
     def _assess_termination_risks(
-        self, content: str, contract_type: ContractType
+        self, document: ContractDocument, contract_type: ContractType
     ) -> List[RiskFactor]:
         """Assess termination and exit risks"""
         risks = []
-        content_lower = content.lower()
 
         # Termination clause analysis
         termination_patterns = [
@@ -370,7 +432,7 @@ class AIRiskAssessmentService:
         detected_patterns = []
 
         for pattern in termination_patterns:
-            if re.search(pattern, content_lower):
+            if document.search(pattern):
                 termination_score += 1.5
                 detected_patterns.append(pattern)
 
@@ -394,11 +456,10 @@ class AIRiskAssessmentService:
         return risks
 
     def _assess_reputational_risks(
-        self, content: str, company: Company
+        self, document: ContractDocument, company: Company
     ) -> List[RiskFactor]:
         """Assess reputational risks"""
         risks = []
-        content_lower = content.lower()
 
         # Public disclosure risks
         disclosure_patterns = [
@@ -410,7 +471,7 @@ class AIRiskAssessmentService:
 
         disclosure_score = 2.0
         for pattern in disclosure_patterns:
-            if re.search(pattern, content_lower):
+            if document.search(pattern):
                 disclosure_score += 2.0
 
         if disclosure_score > 4.0:
@@ -430,14 +491,13 @@ class AIRiskAssessmentService:
         return risks
 
     def _assess_confidentiality_risks(
-        self, content: str, company: Company
+        self, document: ContractDocument, company: Company
     ) -> List[RiskFactor]:
         """Assess confidentiality and IP risks"""
         risks = []
-        content_lower = content.lower()
 
         # Confidentiality adequacy
-        if "confidential" not in content_lower:
+        if not document.contains("confidential"):
             risks.append(
                 RiskFactor(
                     category=RiskCategory.CONFIDENTIALITY_RISK,
@@ -459,7 +519,7 @@ class AIRiskAssessmentService:
             r"copyright.*ownership",
         ]
 
-        ip_mentioned = any(re.search(pattern, content_lower) for pattern in ip_patterns)
+        ip_mentioned = any(document.search(pattern) for pattern in ip_patterns)
         if not ip_mentioned and company.industry in [
             IndustryType.TECHNOLOGY,
             IndustryType.CREATIVE,
@@ -480,11 +540,10 @@ class AIRiskAssessmentService:
         return risks
 
     def _assess_dispute_resolution_risks(
-        self, content: str, company: Company
+        self, document: ContractDocument, company: Company
     ) -> List[RiskFactor]:
         """Assess dispute resolution risks"""
         risks = []
-        content_lower = content.lower()
 
         # Check for dispute resolution mechanisms
         dispute_mechanisms = [
@@ -493,7 +552,7 @@ class AIRiskAssessmentService:
             "dispute resolution",
             "governing law",
         ]
-        mechanisms_found = [m for m in dispute_mechanisms if m in content_lower]
+        mechanisms_found = [m for m in dispute_mechanisms if document.contains(m)]
 
         if not mechanisms_found:
             risks.append(
@@ -510,11 +569,11 @@ class AIRiskAssessmentService:
             )
 
         # Check for unfavorable jurisdiction
-        if "jurisdiction" in content_lower:
+        if document.contains("jurisdiction"):
             # Look for non-UK jurisdictions that could be expensive for SME
             foreign_jurisdictions = ["new york", "delaware", "california", "singapore"]
             for jurisdiction in foreign_jurisdictions:
-                if jurisdiction in content_lower:
+                if document.contains(jurisdiction):
                     risks.append(
                         RiskFactor(
                             category=RiskCategory.DISPUTE_RESOLUTION,
@@ -558,7 +617,9 @@ class AIRiskAssessmentService:
         else:  # >20% of revenue
             return 9.5
 
-    def _assess_payment_terms(self, content_lower: str) -> Optional[RiskFactor]:
+    def _assess_payment_terms(
+        self, document: ContractDocument
+    ) -> Optional[RiskFactor]:
         """Assess payment terms risks"""
         risky_payment_patterns = [
             r"payment.*180.*days",
@@ -568,7 +629,7 @@ class AIRiskAssessmentService:
         ]
 
         for pattern in risky_payment_patterns:
-            if re.search(pattern, content_lower):
+            if document.search(pattern):
                 return RiskFactor(
                     category=RiskCategory.FINANCIAL_EXPOSURE,
                     factor_name="Unfavorable Payment Terms",
@@ -582,7 +643,9 @@ class AIRiskAssessmentService:
 
         return None
 
-    def _assess_penalty_clauses(self, content_lower: str) -> Optional[RiskFactor]:
+    def _assess_penalty_clauses(
+        self, document: ContractDocument
+    ) -> Optional[RiskFactor]:
         """Assess penalty and liquidated damages clauses"""
         penalty_patterns = [
             r"penalty.*\£.*\d+",
@@ -595,7 +658,7 @@ class AIRiskAssessmentService:
         detected_penalties = []
 
         for pattern in penalty_patterns:
-            if re.search(pattern, content_lower):
+            if document.search(pattern):
                 penalty_score += 2.0
                 detected_penalties.append(pattern)
 
@@ -614,7 +677,9 @@ class AIRiskAssessmentService:
 
         return None
 
-    def _assess_indemnity_clauses(self, content_lower: str) -> Optional[RiskFactor]:
+    def _assess_indemnity_clauses(
+        self, document: ContractDocument
+    ) -> Optional[RiskFactor]:
         """Assess indemnity clause risks"""
         broad_indemnity_patterns = [
             r"indemnify.*all.*claims",
@@ -624,7 +689,7 @@ class AIRiskAssessmentService:
         ]
 
         for pattern in broad_indemnity_patterns:
-            if re.search(pattern, content_lower):
+            if document.search(pattern):
                 return RiskFactor(
                     category=RiskCategory.FINANCIAL_EXPOSURE,
                     factor_name="Broad Indemnity Obligations",
@@ -639,7 +704,7 @@ class AIRiskAssessmentService:
         return None
 
     def _assess_performance_obligations(
-        self, content_lower: str, contract_type: ContractType
+        self, document: ContractDocument, contract_type: ContractType
     ) -> Optional[RiskFactor]:
         """Assess performance obligation complexity"""
         complex_performance_indicators = [
@@ -652,7 +717,7 @@ class AIRiskAssessmentService:
 
         complexity_score = 3.0
         for pattern in complex_performance_indicators:
-            if re.search(pattern, content_lower):
+            if document.search(pattern):
                 complexity_score += 1.5
 
         if complexity_score > 6.0:
@@ -670,7 +735,7 @@ class AIRiskAssessmentService:
         return None
 
     def _assess_resource_requirements(
-        self, content_lower: str, company: Company
+        self, document: ContractDocument, company: Company
     ) -> Optional[RiskFactor]:
         """Assess resource allocation risks"""
         resource_intensive_patterns = [
@@ -681,7 +746,7 @@ class AIRiskAssessmentService:
         ]
 
         for pattern in resource_intensive_patterns:
-            if re.search(pattern, content_lower):
+            if document.search(pattern):
                 # Higher risk for smaller companies
                 risk_score = 7.0 if company.company_size == CompanySize.MICRO else 5.5
 
@@ -698,7 +763,9 @@ class AIRiskAssessmentService:
 
         return None
 
-    def _assess_timeline_pressures(self, content_lower: str) -> Optional[RiskFactor]:
+    def _assess_timeline_pressures(
+        self, document: ContractDocument
+    ) -> Optional[RiskFactor]:
         """Assess timeline and delivery pressure risks"""
         urgent_timeline_patterns = [
             r"immediate.*delivery",
@@ -708,7 +775,7 @@ class AIRiskAssessmentService:
         ]
 
         for pattern in urgent_timeline_patterns:
-            if re.search(pattern, content_lower):
+            if document.search(pattern):
                 return RiskFactor(
                     category=RiskCategory.PERFORMANCE_RISK,
                     factor_name="Aggressive Timeline Requirements",
@@ -986,4 +1053,4 @@ class AIRiskAssessmentService:
 
 
 # Singleton instance for application use
-ai_risk_assessment_service = AIRiskAssessmentService()
+ai_risk_assessment_service = AIRiskAssessmentService(cache=assessment_cache)
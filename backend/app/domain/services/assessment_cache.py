@@ -0,0 +1,179 @@
+"""
+Memoised compliance and risk assessments
+Results are keyed by content hash, contract type, the company profile fields
+the engines read and the rule-set version, so unchanged contracts are not
+re-assessed and rule changes invalidate entries automatically
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from app.domain.entities.company import Company
+from app.domain.value_objects import ContractType, Money
+
+logger = logging.getLogger(__name__)
+
+# Persisted snapshots are rewritten after this many new entries
+PERSIST_EVERY = 16
+
+
+@dataclass(frozen=True)
+class AssessmentKey:
+    """Everything an assessment result depends on"""
+
+    kind: str  # "compliance" or "risk"
+    content_hash: str
+    contract_type: str
+    company_fingerprint: str
+    rule_set_version: str
+    contract_value: Optional[str] = None
+
+
+def company_fingerprint(company: Company) -> str:
+    """Hash of the company profile fields the engines read"""
+    profile = "|".join(
+        str(value)
+        for value in (
+            company.name,
+            company.company_type.value,
+            company.industry.value,
+            company.company_size.value,
+            company.is_vat_registered,
+        )
+    )
+    return hashlib.sha256(profile.encode("utf-8")).hexdigest()[:16]
+
+
+def assessment_key(
+    kind: str,
+    content_hash: str,
+    company: Company,
+    contract_type: ContractType,
+    contract_value: Optional[Money],
+    rule_set_version: str,
+) -> AssessmentKey:
+    return AssessmentKey(
+        kind=kind,
+        content_hash=content_hash,
+        contract_type=contract_type.value,
+        company_fingerprint=company_fingerprint(company),
+        rule_set_version=rule_set_version,
+        contract_value=str(contract_value) if contract_value is not None else None,
+    )
+
+
+class AssessmentCache:
+    """
+    Thread-safe LRU of assessment results.
+
+    With a persist_path the cache is loaded from a pickle snapshot on start
+    and the snapshot is rewritten (atomically) every PERSIST_EVERY new
+    entries and on save(). Entries for an older rule-set version never
+    match again and age out of the LRU.
+    """
+
+    def __init__(self, max_size: int = 512, persist_path: Optional[str] = None):
+        self.max_size = max_size
+        self.persist_path = persist_path
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[AssessmentKey, Any]" = OrderedDict()
+        self._unsaved = 0
+        self._lock = threading.Lock()
+        if persist_path:
+            self._load()
+
+    def configure(self, max_size: int, persist_path: Optional[str] = None):
+        """Resize the cache and load the snapshot at persist_path, if any"""
+        with self._lock:
+            self.max_size = max_size
+            self.persist_path = persist_path
+            while len(self._entries) > max_size:
+                self._entries.popitem(last=False)
+        if persist_path:
+            self._load()
+
+    def get(self, key: AssessmentKey) -> Optional[Any]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: AssessmentKey, value: Any):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            self._unsaved += 1
+            should_save = self.persist_path and self._unsaved >= PERSIST_EVERY
+        if should_save:
+            self.save()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._unsaved = 0
+
+    def save(self):
+        """Write a snapshot to persist_path, if configured"""
+        if not self.persist_path:
+            return
+        with self._lock:
+            entries = list(self._entries.items())
+            self._unsaved = 0
+        tmp_path = None
+        try:
+            # A temp file of its own, so processes saving at once never write
+            # to or rename each other's snapshots
+            fd, tmp_path = tempfile.mkstemp(
+                dir=os.path.dirname(self.persist_path) or ".", suffix=".tmp"
+            )
+            with os.fdopen(fd, "wb") as snapshot:
+                pickle.dump(entries, snapshot, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.persist_path)
+        except OSError as e:
+            logger.warning(f"Could not persist assessment cache: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _load(self):
+        if not os.path.exists(self.persist_path):
+            return
+        try:
+            with open(self.persist_path, "rb") as snapshot:
+                entries = pickle.load(snapshot)
+        except Exception as e:
+            # A stale or corrupt snapshot only costs a cold cache
+            logger.warning(f"Ignoring unreadable assessment cache snapshot: {e}")
+            return
+        for key, value in entries[-self.max_size :]:
+            self._entries[key] = value
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "persistent": bool(self.persist_path),
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Global cache shared by the compliance engine and risk service singletons;
+# sized and made persistent by the application at startup
+assessment_cache = AssessmentCache()
@@ -0,0 +1,107 @@
+"""
+Compiled term matcher for compliance rules
+Rule patterns, clause patterns and keyword lists are compiled once into a
+matcher; scanning a contract returns the set of matched term keys
+"""
+
+import re
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple, Union
+
+from app.domain.services.contract_document import (
+    ContractContent,
+    get_contract_document,
+)
+from app.domain.services.safe_patterns import SafePattern, compile_safe
+
+# Hit key namespaces
+RULE_KEY = "rule:"
+CLAUSE_KEY = "clause:"
+KEYWORD_KEY = "kw:"
+
+# A term is either a literal (lowercase substring) or a compiled pattern
+Term = Union[str, SafePattern]
+
+
+def rule_key(rule_id: str) -> str:
+    return f"{RULE_KEY}{rule_id}"
+
+
+def clause_key(clause_identifier: str) -> str:
+    return f"{CLAUSE_KEY}{clause_identifier}"
+
+
+def keyword_key(keyword: str) -> str:
+    return f"{KEYWORD_KEY}{keyword.lower()}"
+
+
+def compile_term(pattern: str) -> SafePattern:
+    """
+    Compile a case-insensitive pattern for matching against lowercased text.
+
+    Patterns without uppercase characters are compiled case-sensitively: on
+    lowercased text they match the same spans, and without IGNORECASE the
+    regex engine can skip ahead on the pattern's first characters, which is
+    several times faster on long documents. Patterns are compiled for
+    linear-time matching (see safe_patterns).
+    """
+    if pattern.startswith("(?i)"):
+        pattern = pattern[4:]
+    if any(char.isupper() for char in pattern):
+        return compile_safe(pattern, re.IGNORECASE | re.MULTILINE)
+    return compile_safe(pattern, re.MULTILINE)
+
+
+class TermMatcher:
+    """
+    Matches a compiled bundle of terms against a contract.
+
+    Terms are evaluated against the document's lowercased text: literal
+    keywords with substring search and patterns with precompiled regexes.
+    Results are memoised on the document, so each term is evaluated at most
+    once however many rules or engines share it, and only the keys asked
+    for are evaluated.
+    """
+
+    def __init__(self, terms: Iterable[Tuple[str, str]], literals: Iterable[str] = ()):
+        """
+        terms: (hit key, regex) pairs; a key may have several patterns
+        literals: keywords matched as case-insensitive substrings
+        """
+        self._terms: Dict[str, List[Term]] = {}
+        for key, pattern in terms:
+            self._terms.setdefault(key, []).append(compile_term(pattern))
+        for keyword in literals:
+            self._terms.setdefault(keyword_key(keyword), []).append(keyword.lower())
+
+    @property
+    def keys(self) -> FrozenSet[str]:
+        return frozenset(self._terms)
+
+    def scan(
+        self, content: ContractContent, keys: Optional[Iterable[str]] = None
+    ) -> FrozenSet[str]:
+        """Return the keys (all, or those given) whose terms occur in the content"""
+        document = get_contract_document(content)
+        hits = set()
+        for key in self._terms if keys is None else keys:
+            for term in self._terms.get(key, ()):
+                if isinstance(term, str):
+                    found = document.contains(term)
+                else:
+                    found = document.search(term) is not None
+                if found:
+                    hits.add(key)
+                    break
+        return frozenset(hits)
+
+
+def build_term_list(
+    rule_patterns: Dict[str, str], clause_patterns: Dict[str, str]
+) -> List[Tuple[str, str]]:
+    """Collect the regex terms for a rule set into (key, pattern) pairs"""
+    terms = [(rule_key(rule_id), pattern) for rule_id, pattern in rule_patterns.items()]
+    terms += [
+        (clause_key(identifier), pattern)
+        for identifier, pattern in clause_patterns.items()
+    ]
+    return terms
@@ -0,0 +1,336 @@
+"""
+Preprocessed contract document shared by the compliance and risk engines
+Built once per content hash and cached, so both engines read the same
+lowercased text, clause segmentation and memoised searches instead of
+re-scanning the raw contract
+"""
+
+import bisect
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+from functools import cached_property, lru_cache
+from typing import Dict, FrozenSet, List, Optional, Tuple, Union
+
+from app.domain.services.safe_patterns import SafePattern, compile_safe
+
+# Number of preprocessed documents kept in memory
+DOCUMENT_CACHE_SIZE = 64
+
+CLAUSE_HEADING_PATTERN = re.compile(
+    r"^[ \t]*(\d+(?:\.\d+)*)[.)]?[ \t]+(\S[^\n]*)$", re.MULTILINE
+)
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:['-][a-z0-9]+)*")
+NUMBER_PATTERN = re.compile(r"\d[\d,]*(?:\.\d+)?")
+# Matched at the end / start of an extracted number, so extraction stays linear
+DURATION_UNIT_PATTERN = re.compile(
+    r"\s*(?:working\s+|business\s+|calendar\s+)?(day|week|month|year)s?\b"
+)
+CURRENCY_PREFIX_PATTERN = re.compile(r"(£|\$|€|gbp|usd|eur)\s?$")
+CURRENCY_SUFFIX_PATTERN = re.compile(r"\s?(gbp|usd|eur|pounds)\b")
+CURRENCY_CODES = {
+    "£": "GBP",
+    "gbp": "GBP",
+    "pounds": "GBP",
+    "$": "USD",
+    "usd": "USD",
+    "€": "EUR",
+    "eur": "EUR",
+}
+REGEX_METACHARACTERS = set(".^$*+?{}[]\\|()")
+
+
+@dataclass(frozen=True)
+class ClauseSegment:
+    """A numbered clause (or the preamble before the first one)"""
+
+    number: Optional[str]
+    heading: str
+    start: int
+    end: int
+
+    @property
+    def label(self) -> str:
+        return f"Clause {self.number}" if self.number else "Preamble"
+
+
+@dataclass(frozen=True)
+class ExtractedNumber:
+    value: Decimal
+    start: int
+    end: int
+
+
+@dataclass(frozen=True)
+class Duration:
+    value: Decimal
+    unit: str  # day, week, month or year
+    start: int
+
+
+@dataclass(frozen=True)
+class MonetaryAmount:
+    amount: Decimal
+    currency: str
+    start: int
+
+
+def compute_content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _to_decimal(text: str) -> Optional[Decimal]:
+    try:
+        return Decimal(text.replace(",", ""))
+    except InvalidOperation:
+        return None
+
+
+def parse_clauses(
+    content: str, start: int = 0, end: Optional[int] = None
+) -> List[ClauseSegment]:
+    """
+    Split content[start:end] into clauses at numbered headings.
+    Text before the first heading is the preamble. Headings are matched a
+    line at a time, so a range starting at a heading (or at 0) splits the
+    same way as the whole content.
+    """
+    end = len(content) if end is None else end
+    headings = list(CLAUSE_HEADING_PATTERN.finditer(content, start, end))
+    segments = []
+    if not headings or headings[0].start() > start:
+        segments.append(
+            ClauseSegment(None, "", start, headings[0].start() if headings else end)
+        )
+    for index, heading in enumerate(headings):
+        segments.append(
+            ClauseSegment(
+                number=heading.group(1),
+                heading=heading.group(2).strip()[:80],
+                start=heading.start(),
+                end=(
+                    headings[index + 1].start() if index + 1 < len(headings) else end
+                ),
+            )
+        )
+    return segments
+
+
+@lru_cache(maxsize=512)
+def required_literals(pattern: str, flags: int = 0) -> Tuple[str, ...]:
+    """
+    Literal substrings every match of the pattern must contain.
+
+    Only simple "a.*b" style patterns are understood; anything with
+    alternation, groups or classes returns no literals. Used to skip regex
+    searches that cannot match.
+    """
+    if any(char in pattern for char in "|()[]{}?"):
+        return ()
+    literals = []
+    for piece in pattern.split(".*"):
+        if piece and not REGEX_METACHARACTERS.intersection(piece):
+            literals.append(piece.lower() if flags & re.IGNORECASE else piece)
+    return tuple(literals)
+
+
+class ContractDocument:
+    """
+    Contract content preprocessed for rule evaluation.
+
+    `text` is the lowercased content with the original offsets preserved, so
+    positions found in it map straight back to `content`. Searches and
+    keyword lookups are memoised per document; the heavier features
+    (clauses, tokens, numbers) are computed on first use.
+    """
+
+    def __init__(self, content: str, content_hash: Optional[str] = None):
+        self.content = content
+        self.content_hash = content_hash or compute_content_hash(content)
+        self.text = content.lower()
+        self._contains: Dict[str, bool] = {}
+        self._positions: Dict[str, Tuple[int, ...]] = {}
+        self._searches: Dict[SafePattern, Optional[re.Match]] = {}
+
+    def contains(self, keyword: str) -> bool:
+        """Case-insensitive substring test"""
+        keyword = keyword.lower()
+        found = self._contains.get(keyword)
+        if found is None:
+            found = self._contains[keyword] = keyword in self.text
+        return found
+
+    def positions(self, keyword: str) -> Tuple[int, ...]:
+        """Offsets of every (case-insensitive) occurrence of a keyword"""
+        keyword = keyword.lower()
+        cached = self._positions.get(keyword)
+        if cached is not None:
+            return cached
+
+        offsets = []
+        if keyword and self.contains(keyword):
+            index = self.text.find(keyword)
+            while index != -1:
+                offsets.append(index)
+                index = self.text.find(keyword, index + 1)
+        self._positions[keyword] = tuple(offsets)
+        return self._positions[keyword]
+
+    def search(self, pattern: Union[str, SafePattern]) -> Optional[re.Match]:
+        """
+        First match of a pattern in the lowercased text.
+        String patterns are compiled without flags, matching the engines'
+        previous re.search(pattern, content.lower()) calls, and evaluated in
+        linear time (see safe_patterns).
+        """
+        if isinstance(pattern, str):
+            pattern = compile_safe(pattern)
+        if pattern in self._searches:
+            return self._searches[pattern]
+
+        match = None
+        if all(
+            self.contains(literal)
+            for literal in required_literals(pattern.pattern, pattern.flags)
+        ):
+            match = pattern.search(self.text)
+        self._searches[pattern] = match
+        return match
+
+    @cached_property
+    def clauses(self) -> List[ClauseSegment]:
+        """Numbered clauses with offsets; text before the first is the preamble"""
+        return parse_clauses(self.content)
+
+    @cached_property
+    def _clause_starts(self) -> List[int]:
+        return [clause.start for clause in self.clauses]
+
+    def clause_at(self, offset: int) -> Optional[ClauseSegment]:
+        """Clause containing an offset"""
+        index = bisect.bisect_right(self._clause_starts, offset) - 1
+        return self.clauses[index] if index >= 0 else None
+
+    def location_of(self, offset: int) -> Optional[str]:
+        """Human-readable location for an offset"""
+        clause = self.clause_at(offset)
+        if clause is None:
+            return None
+        return f"{clause.label}: {clause.heading}" if clause.heading else clause.label
+
+    @cached_property
+    def tokens(self) -> List[str]:
+        return TOKEN_PATTERN.findall(self.text)
+
+    @cached_property
+    def token_set(self) -> FrozenSet[str]:
+        return frozenset(self.tokens)
+
+    @cached_property
+    def bigrams(self) -> FrozenSet[str]:
+        tokens = self.tokens
+        return frozenset(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+
+    def has_phrase(self, phrase: str) -> bool:
+        """Whole-word test for a one or two word phrase"""
+        words = phrase.lower().split()
+        if len(words) == 1:
+            return words[0] in self.token_set
+        if len(words) == 2:
+            return " ".join(words) in self.bigrams
+        raise ValueError("Phrases longer than two words are not indexed")
+
+    @cached_property
+    def numbers(self) -> List[ExtractedNumber]:
+        numbers = []
+        for match in NUMBER_PATTERN.finditer(self.text):
+            value = _to_decimal(match.group())
+            if value is not None:
+                numbers.append(ExtractedNumber(value, match.start(), match.end()))
+        return numbers
+
+    @cached_property
+    def durations(self) -> List[Duration]:
+        return self.durations_in(0, len(self.text))
+
+    def durations_in(self, start: int, end: int) -> List[Duration]:
+        """
+        Durations whose number lies within text[start:end].
+        Scans only that span, so callers checking a few lines don't pay
+        for extracting every number in the document.
+        """
+        durations = []
+        for match in NUMBER_PATTERN.finditer(self.text, start, end):
+            unit = DURATION_UNIT_PATTERN.match(self.text, match.end())
+            if unit:
+                value = _to_decimal(match.group())
+                if value is not None:
+                    durations.append(Duration(value, unit.group(1), match.start()))
+        return durations
+
+    @cached_property
+    def currencies(self) -> List[MonetaryAmount]:
+        amounts = []
+        for number in self.numbers:
+            prefix = CURRENCY_PREFIX_PATTERN.search(
+                self.text, max(number.start - 4, 0), number.start
+            )
+            if prefix:
+                currency, start = CURRENCY_CODES[prefix.group(1)], prefix.start()
+            else:
+                suffix = CURRENCY_SUFFIX_PATTERN.match(self.text, number.end)
+                if not suffix:
+                    continue
+                currency, start = CURRENCY_CODES[suffix.group(1)], number.start
+            amounts.append(MonetaryAmount(number.value, currency, start))
+        return amounts
+
+
+# Engines accept raw content or an already preprocessed document
+ContractContent = Union[str, ContractDocument]
+
+
+class ContractDocumentCache:
+    """Thread-safe LRU of preprocessed documents keyed by content hash"""
+
+    def __init__(self, max_size: int = DOCUMENT_CACHE_SIZE):
+        self.max_size = max_size
+        self._documents: "OrderedDict[str, ContractDocument]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, content: ContractContent) -> ContractDocument:
+        if isinstance(content, ContractDocument):
+            return content
+
+        content_hash = compute_content_hash(content)
+        with self._lock:
+            document = self._documents.get(content_hash)
+            if document is not None:
+                self._documents.move_to_end(content_hash)
+                return document
+
+        document = ContractDocument(content, content_hash)
+        with self._lock:
+            self._documents[content_hash] = document
+            while len(self._documents) > self.max_size:
+                self._documents.popitem(last=False)
+        return document
+
+    def clear(self):
+        with self._lock:
+            self._documents.clear()
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+
+# Global document cache shared by the compliance and risk engines
+contract_document_cache = ContractDocumentCache()
+
+
+def get_contract_document(content: ContractContent) -> ContractDocument:
+    """Preprocessed document for the content, built once per content hash"""
+    return contract_document_cache.get(content)
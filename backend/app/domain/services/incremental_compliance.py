@@ -0,0 +1,346 @@
+"""
+Incremental compliance re-validation for edited contracts
+Each analysed revision records per-clause term hits and every rule's
+outcome. On the next analysis only the clauses inside the edited region are
+re-parsed and rescanned, and only rules whose terms occur in changed
+clauses (or stopped occurring) are re-evaluated; the rest reuse their
+previous outcome.
+"""
+
+import bisect
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from app.domain.entities.company import Company
+from app.domain.services.assessment_cache import assessment_key, company_fingerprint
+from app.domain.services.contract_document import (
+    ContractContent,
+    ContractDocument,
+    get_contract_document,
+    parse_clauses,
+)
+from app.domain.services.rule_bundle import RuleBundle
+from app.domain.services.safe_patterns import TimeBudget
+from app.domain.services.uk_compliance_engine import (
+    ComplianceAssessment,
+    ComplianceViolation,
+    UKComplianceRuleEngine,
+    uk_compliance_engine,
+)
+from app.domain.value_objects import ContractType, Money
+
+# Last analysed revision kept per contract
+REVISION_CACHE_SIZE = 256
+
+# Block size when comparing revisions for their common prefix and suffix
+COMPARE_CHUNK = 4096
+
+# A rule's dependency on the document: for each of its terms that occurs,
+# the hashes of the clauses it occurs in, in document order
+RuleSignature = Tuple[Tuple[str, Tuple[str, ...]], ...]
+
+
+@dataclass
+class ClauseHits:
+    """Clause boundaries of a revision with each clause's term hits"""
+
+    starts: List[int]
+    ends: List[int]
+    digests: List[str]
+    hits: List[FrozenSet[str]]
+
+
+@dataclass
+class AnalysedRevision:
+    """Rule outcomes for the last analysed revision of a contract"""
+
+    context: Tuple[str, ...]
+    content: str
+    clauses: ClauseHits
+    signatures: Dict[str, RuleSignature]
+    outcomes: Dict[str, Optional[ComplianceViolation]]
+
+
+@dataclass
+class IncrementalAssessment:
+    """Assessment plus what had to be recomputed to produce it"""
+
+    assessment: ComplianceAssessment
+    changed_segments: List[str] = field(default_factory=list)
+    reevaluated_rules: List[str] = field(default_factory=list)
+    is_incremental: bool = False  # False when there was no usable revision
+
+
+def _segment_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def common_prefix_length(a: str, b: str) -> int:
+    limit = min(len(a), len(b))
+    index = 0
+    while index < limit:
+        block_end = min(index + COMPARE_CHUNK, limit)
+        if a[index:block_end] != b[index:block_end]:
+            while a[index] == b[index]:
+                index += 1
+            return index
+        index = block_end
+    return limit
+
+
+def common_suffix_length(a: str, b: str, limit: int) -> int:
+    """Length of the common suffix, at most limit characters"""
+    len_a, len_b = len(a), len(b)
+    index = 0
+    while index < limit:
+        block_end = min(index + COMPARE_CHUNK, limit)
+        block_a = a[len_a - block_end : len_a - index]
+        if block_a != b[len_b - block_end : len_b - index]:
+            while a[len_a - 1 - index] == b[len_b - 1 - index]:
+                index += 1
+            return index
+        index = block_end
+    return limit
+
+
+class IncrementalComplianceValidator:
+    """
+    Clause-level incremental validation on top of the rule engine.
+
+    Term hits are computed per clause and unioned, so a term only counts if
+    it occurs within one clause; clause headings start new lines and rule
+    patterns don't span lines, so this matches a whole-document scan except
+    for whitespace-spanning patterns split exactly at a heading.
+    """
+
+    def __init__(
+        self, engine: UKComplianceRuleEngine, max_revisions: int = REVISION_CACHE_SIZE
+    ):
+        self.engine = engine
+        self.max_revisions = max_revisions
+        self._revisions: "OrderedDict[str, AnalysedRevision]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def validate(
+        self,
+        contract_key: str,
+        contract_content: ContractContent,
+        company: Company,
+        contract_type: ContractType,
+        contract_value: Optional[Money] = None,
+        time_budget_ms: Optional[float] = None,
+    ) -> IncrementalAssessment:
+        """
+        Validate a revision of a contract, reusing the outcomes of its last
+        analysed revision where the clauses a rule depends on are unchanged.
+        contract_key identifies the contract across revisions (e.g. its id).
+        """
+        start_time = datetime.now(timezone.utc)
+        engine = self.engine
+        budget = TimeBudget(
+            engine.time_budget_ms if time_budget_ms is None else time_budget_ms
+        )
+        document = get_contract_document(contract_content)
+
+        # One bundle for the whole assessment, even if rules reload meanwhile
+        engine.refresh_rules()
+        bundle = engine.bundle
+        context = (
+            company_fingerprint(company),
+            contract_type.value,
+            str(contract_value),
+            bundle.rule_set_version,
+        )
+
+        with self._lock:
+            previous = self._revisions.get(contract_key)
+        if previous is not None and previous.context != context:
+            previous = None
+
+        # Repeat views of an unchanged revision come from the assessment cache
+        cache_key = None
+        if engine.cache is not None:
+            cache_key = assessment_key(
+                "compliance",
+                document.content_hash,
+                company,
+                contract_type,
+                contract_value,
+                bundle.rule_set_version,
+            )
+            cached = engine.cache.get(cache_key)
+            if (
+                cached is not None
+                and previous is not None
+                and previous.content == document.content
+            ):
+                return IncrementalAssessment(assessment=cached, is_incremental=True)
+
+        clauses, changed_segments = self._clause_hits(
+            previous, document.content, bundle
+        )
+        hits = frozenset().union(*clauses.hits)
+
+        # Clauses each term occurs in, in document order
+        term_segments: Dict[str, List[str]] = {}
+        for digest, clause_hits in zip(clauses.digests, clauses.hits):
+            for key in clause_hits:
+                term_segments.setdefault(key, []).append(digest)
+
+        applicable_rules = engine.get_applicable_rules(
+            company, contract_type, bundle=bundle
+        )
+        signatures = {
+            rule.rule_id: self._signature(
+                bundle.rule_terms.get(rule.rule_id, ()), term_segments
+            )
+            for rule in applicable_rules
+        }
+
+        outcomes: Dict[str, Optional[ComplianceViolation]] = {}
+        stale_rules = []
+        for rule in applicable_rules:
+            if (
+                previous is not None
+                and rule.rule_id in previous.outcomes
+                and previous.signatures.get(rule.rule_id) == signatures[rule.rule_id]
+            ):
+                outcomes[rule.rule_id] = previous.outcomes[rule.rule_id]
+            else:
+                stale_rules.append(rule)
+
+        evaluated, skipped_rules, warnings = engine.evaluate_rules(
+            stale_rules,
+            document,
+            company,
+            contract_value,
+            budget,
+            lambda rule: hits,
+            bundle,
+        )
+        outcomes.update(evaluated)
+
+        assessment = engine.build_assessment(
+            applicable_rules,
+            outcomes,
+            skipped_rules,
+            warnings,
+            budget,
+            company,
+            contract_type,
+            start_time,
+            bundle,
+        )
+
+        if cache_key is not None and not assessment.is_partial:
+            engine.cache.put(cache_key, assessment)
+
+        # Skipped rules have no outcome, so they are re-evaluated next time
+        with self._lock:
+            self._revisions[contract_key] = AnalysedRevision(
+                context=context,
+                content=document.content,
+                clauses=clauses,
+                signatures=signatures,
+                outcomes=outcomes,
+            )
+            self._revisions.move_to_end(contract_key)
+            while len(self._revisions) > self.max_revisions:
+                self._revisions.popitem(last=False)
+
+        return IncrementalAssessment(
+            assessment=assessment,
+            changed_segments=changed_segments,
+            reevaluated_rules=list(evaluated),
+            is_incremental=previous is not None,
+        )
+
+    def forget(self, contract_key: str):
+        """Drop the stored revision, e.g. when a contract is deleted"""
+        with self._lock:
+            self._revisions.pop(contract_key, None)
+
+    def clear(self):
+        with self._lock:
+            self._revisions.clear()
+
+    def _clause_hits(
+        self, previous: Optional[AnalysedRevision], content: str, bundle: RuleBundle
+    ) -> Tuple[ClauseHits, List[str]]:
+        """
+        Clause boundaries and term hits for new content, plus the labels of
+        clauses that changed. Clauses outside the edited region are carried
+        over from the previous revision (shifted), so only the region is
+        re-parsed and rescanned.
+        """
+        if previous is None:
+            head, tail, region_start, region_end, delta = 0, 0, 0, len(content), 0
+            old = ClauseHits([], [], [], [])
+        else:
+            old = previous.clauses
+            before, after = previous.content, content
+            prefix = common_prefix_length(before, after)
+            suffix = common_suffix_length(
+                before, after, min(len(before), len(after)) - prefix
+            )
+            delta = len(after) - len(before)
+
+            # Keep clauses that end before the line holding the first edit,
+            # and those starting after the last edit's line break; their
+            # heading lines (and the character before them) are unchanged
+            edit_line_start = before.rfind("\n", 0, prefix) + 1
+            head = bisect.bisect_left(old.ends, edit_line_start)
+            tail = max(bisect.bisect_right(old.starts, len(before) - suffix), head)
+            region_start = old.ends[head - 1] if head else 0
+            region_end = (
+                old.starts[tail] + delta if tail < len(old.starts) else len(after)
+            )
+
+        region = parse_clauses(content, region_start, region_end)
+        replaced = set(old.digests[head:tail])
+        digests, hits, changed_segments = [], [], []
+        for segment in region:
+            text = content[segment.start : segment.end]
+            digest = _segment_hash(text)
+            digests.append(digest)
+            # Clauses are scanned outside the shared document cache
+            hits.append(
+                self.engine.scan_content(
+                    ContractDocument(text, digest), bundle=bundle
+                )
+            )
+            if digest not in replaced:
+                changed_segments.append(segment.label)
+
+        return (
+            ClauseHits(
+                starts=old.starts[:head]
+                + [segment.start for segment in region]
+                + [start + delta for start in old.starts[tail:]],
+                ends=old.ends[:head]
+                + [segment.end for segment in region]
+                + [end + delta for end in old.ends[tail:]],
+                digests=old.digests[:head] + digests + old.digests[tail:],
+                hits=old.hits[:head] + hits + old.hits[tail:],
+            ),
+            changed_segments,
+        )
+
+    def _signature(
+        self, rule_terms: FrozenSet[str], term_segments: Dict[str, List[str]]
+    ) -> RuleSignature:
+        return tuple(
+            (key, tuple(term_segments[key]))
+            for key in sorted(rule_terms)
+            if key in term_segments
+        )
+
+
+# Global validator for the compliance engine singleton
+incremental_compliance_validator = IncrementalComplianceValidator(
+    uk_compliance_engine
+)
@@ -0,0 +1,482 @@
+"""
+Compiled compliance rule bundles
+Rule definitions and clause patterns live in a versioned data file
+(data/uk_compliance_rules.json). A bundle is the compiled form of one
+version: validated rules, the term matcher, each rule's term keys and
+bitmask indexes of rules by framework, industry, company size and
+contract type. Bundles are memoised per source digest, so every
+engine in a process shares one, and can be cached on disk between restarts
+"""
+
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import pickle
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field, fields
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from app.domain.entities.company import CompanySize, IndustryType
+from app.domain.entities.template import ComplianceFramework, LegalJurisdiction
+from app.domain.exceptions import DomainValidationError
+from app.domain.services.compliance_matcher import (
+    TermMatcher,
+    build_term_list,
+    clause_key,
+    compile_term,
+    keyword_key,
+    rule_key,
+)
+from app.domain.services.safe_patterns import SafePattern
+from app.domain.value_objects import ContractType
+
+logger = logging.getLogger(__name__)
+
+# Rule definitions shipped with the application
+DEFAULT_RULES_PATH = os.path.join(
+    os.path.dirname(__file__), "data", "uk_compliance_rules.json"
+)
+
+# Bump when the RuleBundle layout changes, so stale disk caches are ignored
+BUNDLE_FORMAT = "2"
+
+# Compiled bundles kept in memory, keyed by source digest
+MEMOISED_BUNDLES = 4
+
+# Rule restrictions indexed as bitmasks: rule field -> value enum
+RULE_RESTRICTIONS = {
+    "applicable_industries": IndustryType,
+    "applicable_company_sizes": CompanySize,
+    "applicable_contract_types": ContractType,
+}
+
+
+class UKRegulationType(str, Enum):
+    """Types of UK regulations"""
+
+    STATUTORY = "statutory"  # Acts of Parliament
+    REGULATORY = "regulatory"  # Regulatory instruments
+    COMMON_LAW = "common_law"  # Case law
+    EU_RETAINED = "eu_retained"  # Retained EU law
+    GUIDANCE = "guidance"  # Government guidance
+    INDUSTRY_STANDARD = "industry_standard"  # Industry codes
+
+
+@dataclass
+class ComplianceRule:
+    """Individual compliance rule"""
+
+    rule_id: str
+    title: str
+    description: str
+    regulation_type: UKRegulationType
+    applicable_frameworks: List[ComplianceFramework]
+    applicable_industries: List[IndustryType] = field(default_factory=list)
+    applicable_company_sizes: List[CompanySize] = field(default_factory=list)
+    applicable_contract_types: List[ContractType] = field(default_factory=list)
+    jurisdiction: LegalJurisdiction = LegalJurisdiction.UK_WIDE
+
+    # Rule implementation
+    pattern: Optional[str] = None  # Regex pattern to match
+    required_clauses: List[str] = field(default_factory=list)
+    prohibited_clauses: List[str] = field(default_factory=list)
+    validation_function: Optional[str] = None  # Custom validation function name
+
+    # Metadata
+    legal_reference: Optional[str] = None
+    guidance_url: Optional[str] = None
+    last_updated: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    is_active: bool = True
+
+
+# Enum-valued rule fields as they appear in the data file
+RULE_ENUM_FIELDS = {
+    "regulation_type": UKRegulationType,
+    "jurisdiction": LegalJurisdiction,
+}
+RULE_ENUM_LIST_FIELDS = {
+    "applicable_frameworks": ComplianceFramework,
+    "applicable_industries": IndustryType,
+    "applicable_company_sizes": CompanySize,
+    "applicable_contract_types": ContractType,
+}
+REQUIRED_RULE_FIELDS = {
+    f.name
+    for f in fields(ComplianceRule)
+    if f.default is dataclasses.MISSING and f.default_factory is dataclasses.MISSING
+}
+
+
+@dataclass
+class RuleBundle:
+    """A compiled, immutable rule-set version; engines swap whole bundles"""
+
+    version: str  # Label from the data file
+    rule_set_version: str  # Keys cached assessments
+    rules: Dict[str, ComplianceRule]
+    clause_patterns: Dict[str, str]
+    matcher: TermMatcher
+    rule_terms: Dict[str, FrozenSet[str]]
+    clause_matchers: Dict[str, SafePattern]
+    framework_rules: Dict[ComplianceFramework, FrozenSet[str]]  # Enum order
+    compiled_at: datetime
+    source_path: Optional[str] = None
+    source_stamp: Optional[Tuple[int, int]] = None  # (mtime_ns, size)
+
+    # Bit i of a mask stands for rule_order[i]. Each restriction index maps
+    # a value to the rules that allow it; None maps to unrestricted rules.
+    rule_order: Tuple[ComplianceRule, ...] = ()
+    active_mask: int = 0
+    framework_masks: Dict[ComplianceFramework, int] = field(default_factory=dict)
+    restriction_masks: Dict[str, Dict[Any, int]] = field(default_factory=dict)
+
+    # Applicable rules per (industry, size, contract type, frameworks); the
+    # key space is bounded by the enums. Shared by copies of the bundle.
+    _applicable: Dict[Tuple, Tuple[ComplianceRule, ...]] = field(
+        default_factory=dict, repr=False, compare=False
+    )
+
+    def applicable_rules(
+        self,
+        industry: Optional[IndustryType],
+        company_size: Optional[CompanySize],
+        contract_type: ContractType,
+        frameworks: Optional[List[ComplianceFramework]] = None,
+    ) -> List[ComplianceRule]:
+        """Active rules for a company profile and contract type, in order"""
+        key = (
+            industry,
+            company_size,
+            contract_type,
+            frozenset(frameworks) if frameworks else None,
+        )
+        rules = self._applicable.get(key)
+        if rules is None:
+            mask = self.active_mask
+            for name, value in zip(RULE_RESTRICTIONS, key):
+                masks = self.restriction_masks[name]
+                mask &= masks.get(value, masks[None])
+            if frameworks:
+                mask &= _union(self.framework_masks.get(f, 0) for f in frameworks)
+            rules = tuple(
+                rule for index, rule in enumerate(self.rule_order) if mask >> index & 1
+            )
+            self._applicable[key] = rules
+        return list(rules)
+
+    def changes_from(self, previous: "RuleBundle") -> Dict[str, List[str]]:
+        """Rule ids added, removed and changed since a previous bundle"""
+        return {
+            "added": sorted(set(self.rules) - set(previous.rules)),
+            "removed": sorted(set(previous.rules) - set(self.rules)),
+            "changed": sorted(
+                rule_id
+                for rule_id in set(self.rules) & set(previous.rules)
+                if _definition(self.rules[rule_id])
+                != _definition(previous.rules[rule_id])
+            ),
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "rule_set_version": self.rule_set_version,
+            "rule_count": len(self.rules),
+            "active_rule_count": sum(r.is_active for r in self.rules.values()),
+            "source_path": self.source_path,
+            "compiled_at": self.compiled_at,
+        }
+
+
+def _union(masks) -> int:
+    result = 0
+    for mask in masks:
+        result |= mask
+    return result
+
+
+def _definition(rule: ComplianceRule) -> List[Tuple[str, Any]]:
+    return [
+        (f.name, getattr(rule, f.name))
+        for f in fields(rule)
+        if f.name != "last_updated"
+    ]
+
+
+def _enum_value(enum_type, value, rule_id: str, field_name: str):
+    try:
+        return enum_type(value)
+    except ValueError:
+        raise DomainValidationError(
+            f"Rule {rule_id}: invalid {field_name} {value!r}", field_name, value
+        )
+
+
+def _check_pattern(pattern: Any, where: str):
+    if not isinstance(pattern, str) or not pattern:
+        raise DomainValidationError(f"{where}: pattern must be a non-empty string")
+    try:
+        compile_term(pattern)
+    except re.error as e:
+        raise DomainValidationError(
+            f"{where}: invalid pattern: {e}", "pattern", pattern
+        )
+
+
+def parse_rule_definitions(
+    data: Dict[str, Any], validators: Optional[FrozenSet[str]] = None
+) -> Tuple[str, List[ComplianceRule], Dict[str, str]]:
+    """
+    Validate rule-set data and build its rules.
+    Returns (version, rules, clause_patterns); raises DomainValidationError
+    on the first problem, so a bad file never replaces a working bundle.
+    validators: custom validation functions the engine implements.
+    """
+    if not isinstance(data, dict):
+        raise DomainValidationError("Rule set must be a JSON object")
+    version = data.get("version")
+    if not isinstance(version, str) or not version:
+        raise DomainValidationError("Rule set needs a version string", "version")
+
+    clause_patterns = data.get("clause_patterns", {})
+    if not isinstance(clause_patterns, dict):
+        raise DomainValidationError("clause_patterns must be an object")
+    for identifier, pattern in clause_patterns.items():
+        _check_pattern(pattern, f"Clause pattern {identifier}")
+
+    definitions = data.get("rules")
+    if not isinstance(definitions, list) or not definitions:
+        raise DomainValidationError("Rule set needs a non-empty rules list", "rules")
+
+    known_fields = {f.name for f in fields(ComplianceRule)} - {"last_updated"}
+    rules: List[ComplianceRule] = []
+    seen = set()
+    for definition in definitions:
+        if not isinstance(definition, dict):
+            raise DomainValidationError("Each rule must be an object")
+        rule_id = definition.get("rule_id")
+        missing = REQUIRED_RULE_FIELDS - set(definition)
+        if missing:
+            raise DomainValidationError(
+                f"Rule {rule_id}: missing {', '.join(sorted(missing))}"
+            )
+        unknown = set(definition) - known_fields
+        if unknown:
+            raise DomainValidationError(
+                f"Rule {rule_id}: unknown fields {', '.join(sorted(unknown))}"
+            )
+        if rule_id in seen:
+            raise DomainValidationError(f"Duplicate rule id {rule_id}", "rule_id")
+        seen.add(rule_id)
+
+        values = dict(definition)
+        for name, enum_type in RULE_ENUM_FIELDS.items():
+            if name in values:
+                values[name] = _enum_value(enum_type, values[name], rule_id, name)
+        for name, enum_type in RULE_ENUM_LIST_FIELDS.items():
+            if name in values:
+                values[name] = [
+                    _enum_value(enum_type, value, rule_id, name)
+                    for value in values[name]
+                ]
+        if values.get("pattern") is not None:
+            _check_pattern(values["pattern"], f"Rule {rule_id}")
+        function = values.get("validation_function")
+        if function and validators is not None and function not in validators:
+            raise DomainValidationError(
+                f"Rule {rule_id}: unknown validation_function {function!r}",
+                "validation_function",
+                function,
+            )
+        rules.append(ComplianceRule(**values))
+
+    return version, rules, dict(clause_patterns)
+
+
+def compile_rule_bundle(
+    version: str,
+    rules: List[ComplianceRule],
+    clause_patterns: Dict[str, str],
+    code_version: str,
+    validator_keywords: Dict[str, List[str]],
+    source_path: Optional[str] = None,
+    source_stamp: Optional[Tuple[int, int]] = None,
+) -> RuleBundle:
+    """
+    Compile rules into a bundle: one matcher for all rule, clause and
+    keyword terms, each rule's term keys and the framework index.
+    code_version is the engine's RULE_SET_VERSION.
+    """
+    rule_patterns = {}
+    literals = []
+    rule_terms: Dict[str, FrozenSet[str]] = {}
+    framework_masks: Dict[ComplianceFramework, int] = {}
+    restriction_masks = {
+        name: {value: 0 for value in [None, *values]}
+        for name, values in RULE_RESTRICTIONS.items()
+    }
+    active_mask = 0
+
+    for index, rule in enumerate(rules):
+        bit = 1 << index
+        if rule.is_active:
+            active_mask |= bit
+        for framework in rule.applicable_frameworks:
+            framework_masks[framework] = framework_masks.get(framework, 0) | bit
+        for name, masks in restriction_masks.items():
+            allowed = getattr(rule, name)
+            for value in masks:
+                if not allowed or value in allowed:
+                    masks[value] |= bit
+
+        keys = set()
+        if rule.pattern:
+            rule_patterns[rule.rule_id] = rule.pattern
+            keys.add(rule_key(rule.rule_id))
+        for clause in rule.required_clauses + rule.prohibited_clauses:
+            if clause in clause_patterns:
+                keys.add(clause_key(clause))
+            else:
+                literals.append(clause)
+                keys.add(keyword_key(clause))
+        for keyword in validator_keywords.get(rule.validation_function, []):
+            literals.append(keyword)
+            keys.add(keyword_key(keyword))
+        rule_terms[rule.rule_id] = frozenset(keys)
+
+    # Rule definitions and clause patterns are hashed into the version
+    digest = hashlib.sha256()
+    for rule in sorted(rules, key=lambda r: r.rule_id):
+        digest.update(repr(_definition(rule)).encode("utf-8"))
+    digest.update(repr(sorted(clause_patterns.items())).encode("utf-8"))
+
+    return RuleBundle(
+        version=version,
+        rule_set_version=f"{code_version}-{digest.hexdigest()[:12]}",
+        rules={rule.rule_id: rule for rule in rules},
+        clause_patterns=dict(clause_patterns),
+        matcher=TermMatcher(build_term_list(rule_patterns, clause_patterns), literals),
+        rule_terms=rule_terms,
+        clause_matchers={
+            identifier: compile_term(pattern)
+            for identifier, pattern in clause_patterns.items()
+        },
+        framework_rules={
+            framework: frozenset(
+                rule.rule_id
+                for index, rule in enumerate(rules)
+                if framework_masks[framework] >> index & 1
+            )
+            for framework in ComplianceFramework
+            if framework in framework_masks
+        },
+        compiled_at=datetime.now(timezone.utc),
+        source_path=source_path,
+        source_stamp=source_stamp,
+        rule_order=tuple(rules),
+        active_mask=active_mask,
+        framework_masks=framework_masks,
+        restriction_masks=restriction_masks,
+    )
+
+
+_bundles: "OrderedDict[str, RuleBundle]" = OrderedDict()
+_bundles_lock = threading.Lock()
+
+
+def source_stamp(path: str) -> Tuple[int, int]:
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def load_rule_bundle(
+    code_version: str,
+    validator_keywords: Dict[str, List[str]],
+    path: Optional[str] = None,
+    cache_dir: Optional[str] = None,
+) -> RuleBundle:
+    """
+    Load the bundle for a rule data file (default: the packaged one).
+    Compiled bundles are reused from memory, then from cache_dir if one is
+    given; only a new file version is compiled.
+    """
+    path = path or DEFAULT_RULES_PATH
+    with open(path, "rb") as source:
+        raw = source.read()
+    stamp = source_stamp(path)
+
+    key = hashlib.sha256(
+        repr((BUNDLE_FORMAT, code_version, sorted(validator_keywords.items()))).encode()
+        + raw
+    ).hexdigest()
+
+    with _bundles_lock:
+        bundle = _bundles.get(key)
+        if bundle is not None:
+            _bundles.move_to_end(key)
+    if bundle is None:
+        cache_path = (
+            os.path.join(cache_dir, f"uk-rules-{key[:24]}.pickle")
+            if cache_dir
+            else None
+        )
+        bundle = _read_cached_bundle(cache_path) if cache_path else None
+        if bundle is None:
+            try:
+                data = json.loads(raw)
+            except ValueError as e:
+                raise DomainValidationError(f"Rule file {path} is not valid JSON: {e}")
+            version, rules, clause_patterns = parse_rule_definitions(
+                data, frozenset(validator_keywords)
+            )
+            bundle = compile_rule_bundle(
+                version, rules, clause_patterns, code_version, validator_keywords
+            )
+            if cache_path:
+                _write_cached_bundle(cache_path, bundle)
+        with _bundles_lock:
+            _bundles[key] = bundle
+            while len(_bundles) > MEMOISED_BUNDLES:
+                _bundles.popitem(last=False)
+
+    # Shallow copy: compiled state is shared, the source is per load
+    return dataclasses.replace(bundle, source_path=path, source_stamp=stamp)
+
+
+def _read_cached_bundle(cache_path: str) -> Optional[RuleBundle]:
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        with open(cache_path, "rb") as cached:
+            bundle = pickle.load(cached)
+    except Exception as e:
+        # A stale or corrupt cache only costs a recompile
+        logger.warning(f"Ignoring unreadable rule bundle cache {cache_path}: {e}")
+        return None
+    return bundle if isinstance(bundle, RuleBundle) else None
+
+
+def _write_cached_bundle(cache_path: str, bundle: RuleBundle):
+    tmp_path = f"{cache_path}.tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(tmp_path, "wb") as cached:
+            pickle.dump(bundle, cached, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.warning(f"Could not cache rule bundle: {e}")
+
+
+def write_rule_definitions(data: Dict[str, Any], path: str):
+    """Atomically replace a rule data file (other processes reload from it)"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as target:
+        json.dump(data, target, indent=2, ensure_ascii=False)
+        target.write("\n")
+    os.replace(tmp_path, path)
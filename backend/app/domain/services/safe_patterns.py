@@ -0,0 +1,249 @@
+"""
+Linear-time pattern matching for compliance and risk rules
+Uses RE2 when it is installed. Otherwise rule patterns are rewritten so the
+backtracking re engine stays linear: ".*" chains are evaluated piece by
+piece within a line, and digit runs are only entered at their first digit.
+"""
+
+import re
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional
+
+try:
+    import re2
+
+    RE2_AVAILABLE = True
+    # Unsupported patterns fall back quietly instead of logging to stderr
+    RE2_OPTIONS = re2.Options()
+    RE2_OPTIONS.log_errors = False
+except ImportError:
+    re2 = None
+    RE2_AVAILABLE = False
+    RE2_OPTIONS = None
+
+INLINE_FLAGS = {"i": re.IGNORECASE, "m": re.MULTILINE, "s": re.DOTALL}
+LEADING_FLAGS_PATTERN = re.compile(r"^\(\?([ims]+)\)")
+# re accepts escaped non-ASCII literals (e.g. "\£"); RE2 does not
+NON_ASCII_ESCAPE_PATTERN = re.compile(r"\\(\\|[^\x00-\x7f])")
+
+# Rule sets are small; every compiled pattern is kept
+SAFE_PATTERN_CACHE_SIZE = 1024
+
+
+@dataclass(frozen=True)
+class SpanMatch:
+    """Match found by a chain of pieces; spans from the first piece to the last"""
+
+    text: str
+    span_start: int
+    span_end: int
+
+    def start(self) -> int:
+        return self.span_start
+
+    def end(self) -> int:
+        return self.span_end
+
+    def group(self) -> str:
+        return self.text[self.span_start : self.span_end]
+
+
+def _split_top_level(pattern: str, separator: str) -> Optional[List[str]]:
+    """
+    Split on a separator outside groups and character classes.
+    Returns None if the pattern can't be split safely.
+    """
+    parts, depth, start, index = [], 0, 0, 0
+    in_class = False
+    while index < len(pattern):
+        char = pattern[index]
+        if char == "\\":
+            index += 2
+            continue
+        if in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth < 0:
+                return None
+        elif depth == 0 and pattern.startswith(separator, index):
+            parts.append(pattern[start:index])
+            index += len(separator)
+            start = index
+            continue
+        index += 1
+    if depth != 0 or in_class:
+        return None
+    parts.append(pattern[start:])
+    return parts
+
+
+def _strip_outer_group(pattern: str) -> str:
+    """Remove one group wrapping the whole pattern: "(a|b)" -> "a|b" """
+    if pattern.startswith("(") and not pattern.startswith("(?"):
+        inner = pattern[1:-1]
+        if pattern.endswith(")") and _split_top_level(inner, "|") is not None:
+            return inner
+    return pattern
+
+
+def _guard_digit_run(piece: str) -> str:
+    """
+    Only start a leading \\d+ at the first digit of a run. Existence of a
+    match is unchanged (a match starting mid-run also matches from the run
+    start) but long digit runs are no longer retried from every digit.
+    """
+    if piece.startswith("\\d"):
+        return r"(?<!\d)" + piece
+    return piece
+
+
+class SafePattern:
+    """
+    A compiled pattern with a linear-time search.
+
+    `pattern` and `flags` describe the original regex so callers can reason
+    about it (e.g. extract required literals); `engine` records how it is
+    evaluated: "re2", "chain" (pieces of ".*" chains matched in sequence)
+    or "re".
+    """
+
+    def __init__(self, pattern: str, flags: int = 0):
+        self.pattern = pattern
+        self.flags = flags
+
+        body = pattern
+        leading = LEADING_FLAGS_PATTERN.match(body)
+        if leading:
+            for letter in leading.group(1):
+                self.flags |= INLINE_FLAGS[letter]
+            body = body[leading.end() :]
+
+        self._re2 = self._compile_re2(body) if RE2_AVAILABLE else None
+        if self._re2 is not None:
+            self.engine = "re2"
+            return
+
+        # Each alternation branch is a chain of pieces joined by ".*"
+        self._branches: List[List[re.Pattern]] = []
+        branches = _split_top_level(_strip_outer_group(body), "|")
+        chains = [_split_top_level(branch, ".*") for branch in branches or []]
+        can_chain = (
+            branches is not None
+            and not self.flags & re.DOTALL
+            and all(
+                pieces and all(piece and piece[0] not in "?+*{" for piece in pieces)
+                for pieces in chains
+            )
+        )
+
+        if can_chain and any(len(pieces) > 1 for pieces in chains):
+            self._branches = [
+                [re.compile(_guard_digit_run(piece), self.flags) for piece in pieces]
+                for pieces in chains
+            ]
+            self.engine = "chain"
+        else:
+            if branches is not None:
+                body = "|".join(_guard_digit_run(branch) for branch in branches)
+            self._regex = re.compile(body, self.flags)
+            self.engine = "re"
+
+    def _compile_re2(self, body: str):
+        prefix = "".join(
+            letter for letter, flag in INLINE_FLAGS.items() if self.flags & flag
+        )
+        body = NON_ASCII_ESCAPE_PATTERN.sub(
+            lambda m: m.group() if m.group(1) == "\\" else m.group(1), body
+        )
+        try:
+            return re2.compile(f"(?{prefix}){body}" if prefix else body, RE2_OPTIONS)
+        except re2.error:
+            return None
+
+    def search(self, text: str, pos: int = 0):
+        """Leftmost match at or after pos, or None"""
+        if self._re2 is not None:
+            return self._re2.search(text, pos)
+        if self.engine == "re":
+            return self._regex.search(text, pos)
+
+        best = None
+        for pieces in self._branches:
+            match = self._search_chain(pieces, text, pos)
+            if match is not None and (best is None or match.start() < best.start()):
+                best = match
+        return best
+
+    @staticmethod
+    def _search_chain(pieces: List[re.Pattern], text: str, pos: int):
+        """
+        Find the pieces in order with only non-newline text between them,
+        as "a.*b.*c" would. Pieces after the first are searched in a window
+        of the current and next line, and each line is left behind once its
+        earliest first-piece match fails, so the work is linear in the text.
+        """
+        length = len(text)
+        while pos <= length:
+            first = pieces[0].search(text, pos)
+            if first is None:
+                return None
+
+            end = first.end()
+            for piece in pieces[1:]:
+                line_end = text.find("\n", end)
+                if line_end == -1:
+                    line_end = length
+                window_end = text.find("\n", line_end + 1)
+                if window_end == -1:
+                    window_end = length
+                match = piece.search(text, end, window_end)
+                if match is None or match.start() > line_end:
+                    break
+                end = match.end()
+            else:
+                return SpanMatch(text, first.start(), end)
+
+            # Later matches of the first piece on this line end later, so
+            # they can't succeed either: continue from the next line
+            line_end = text.find("\n", first.end())
+            if line_end == -1:
+                return None
+            pos = line_end + 1
+        return None
+
+    def __repr__(self) -> str:
+        return f"SafePattern({self.pattern!r}, engine={self.engine!r})"
+
+
+@lru_cache(maxsize=SAFE_PATTERN_CACHE_SIZE)
+def compile_safe(pattern: str, flags: int = 0) -> SafePattern:
+    """Compiled linear-time pattern, shared across callers"""
+    return SafePattern(pattern, flags)
+
+
+class TimeBudget:
+    """Wall-clock budget for one assessment"""
+
+    def __init__(self, budget_ms: Optional[float]):
+        self.budget_ms = budget_ms
+        self._started = time.perf_counter()
+
+    @property
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._started) * 1000
+
+    @property
+    def expired(self) -> bool:
+        return self.budget_ms is not None and self.elapsed_ms >= self.budget_ms
+
+    def remaining_ms(self) -> Optional[float]:
+        if self.budget_ms is None:
+            return None
+        return max(self.budget_ms - self.elapsed_ms, 0.0)
@@ -5,14 +5,106 @@ Tailored specifically for UK SME market requirements
 """
 
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
 from datetime import datetime, timezone
+from decimal import Decimal
 from enum import Enum
-import re
+import logging
+import threading
+import time
 
 from app.domain.entities.company import Company, IndustryType, CompanySize, CompanyType
-from app.domain.entities.template import ComplianceFramework, LegalJurisdiction
+from app.domain.entities.template import ComplianceFramework
 from app.domain.value_objects import ContractType, Money
+from app.domain.exceptions import DomainValidationError
+from app.domain.services.compliance_matcher import (
+    TermMatcher,
+    clause_key,
+    keyword_key,
+    rule_key,
+)
+from app.domain.services.contract_document import (
+    ContractContent,
+    ContractDocument,
+    get_contract_document,
+)
+from app.domain.services.assessment_cache import (
+    AssessmentCache,
+    assessment_cache,
+    assessment_key,
+)
+from app.domain.services.rule_bundle import (
+    DEFAULT_RULES_PATH,
+    ComplianceRule,
+    RuleBundle,
+    UKRegulationType,
+    compile_rule_bundle,
+    load_rule_bundle,
+    parse_rule_definitions,
+    source_stamp,
+)
+from app.domain.services.safe_patterns import TimeBudget
+
+logger = logging.getLogger(__name__)
+
+# Bump when validation logic or keyword lists change; rule definitions and
+# clause patterns (in the rule data file) are hashed into the rule-set version
+RULE_SET_VERSION = "1"
+
+# Keyword lists used by the custom validators
+LAWFUL_BASES = [
+    "consent",
+    "contract",
+    "legal obligation",
+    "vital interests",
+    "public task",
+    "legitimate interests",
+]
+BROAD_EXCLUSIONS = [
+    "all liability",
+    "any liability",
+    "entire liability",
+    "total liability",
+    "liability whatsoever",
+]
+EXCLUSION_LIMITATIONS = ["subject to", "except for", "save for"]
+UNFAIR_TERM_INDICATORS = [
+    "irrevocably",
+    "without recourse",
+    "no refund",
+    "final sale",
+    "exclude all warranties",
+    "buyer beware",
+]
+DIRECTOR_AUTHORITY_TERMS = [
+    "duly authorized",
+    "acting within authority",
+    "board resolution",
+]
+FCA_TERMS = [
+    "fca authorized",
+    "financial conduct authority",
+    "regulated activity",
+]
+EU_LAW_REFERENCES = [
+    "eu directive",
+    "european directive",
+    "eu regulation",
+    "european regulation",
+    "brussels regulation",
+    "rome regulation",
+]
+
+# Keywords each custom validation function looks for
+VALIDATOR_KEYWORDS = {
+    "validate_lawful_basis": LAWFUL_BASES,
+    "validate_reasonableness": BROAD_EXCLUSIONS + EXCLUSION_LIMITATIONS,
+    "validate_consumer_fairness": UNFAIR_TERM_INDICATORS,
+    "validate_director_authority": DIRECTOR_AUTHORITY_TERMS,
+    "validate_fca_authorization": FCA_TERMS,
+    "validate_confidentiality_duration": ["confidential"],
+    "validate_eu_law_references": EU_LAW_REFERENCES + ["retained"],
+}
 
 
 class ComplianceLevel(str, Enum):
@@ -34,44 +126,6 @@ class RiskLevel(str, Enum):
     CRITICAL = "critical"
 
 
-class UKRegulationType(str, Enum):
-    """Types of UK regulations"""
-
-    STATUTORY = "statutory"  # Acts of Parliament
-    REGULATORY = "regulatory"  # Regulatory instruments
-    COMMON_LAW = "common_law"  # Case law
-    EU_RETAINED = "eu_retained"  # Retained EU law
-    GUIDANCE = "guidance"  # Government guidance
-    INDUSTRY_STANDARD = "industry_standard"  # Industry codes
-
-
-@dataclass
-class ComplianceRule:
-    """Individual compliance rule"""
-
-    rule_id: str
-    title: str
-    description: str
-    regulation_type: UKRegulationType
-    applicable_frameworks: List[ComplianceFramework]
-    applicable_industries: List[IndustryType] = field(default_factory=list)
-    applicable_company_sizes: List[CompanySize] = field(default_factory=list)
-    applicable_contract_types: List[ContractType] = field(default_factory=list)
-    jurisdiction: LegalJurisdiction = LegalJurisdiction.UK_WIDE
-
-    # Rule implementation
-    pattern: Optional[str] = None  # Regex pattern to match
-    required_clauses: List[str] = field(default_factory=list)
-    prohibited_clauses: List[str] = field(default_factory=list)
-    validation_function: Optional[str] = None  # Custom validation function name
-
-    # Metadata
-    legal_reference: Optional[str] = None
-    guidance_url: Optional[str] = None
-    last_updated: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
-    is_active: bool = True
-
-
 @dataclass
 class ComplianceViolation:
     """Compliance rule violation"""
@@ -103,6 +157,10 @@ class ComplianceAssessment:
     # Framework-specific scores
     framework_scores: Dict[str, float] = field(default_factory=dict)
 
+    # Set when the time budget ran out before every rule was evaluated
+    is_partial: bool = False
+    skipped_rules: List[str] = field(default_factory=list)
+
     def is_compliant(self) -> bool:
         """Check if overall compliant"""
         return self.overall_level in [
@@ -127,291 +185,355 @@ class UKComplianceRuleEngine:
     Contains all the UK legal compliance rules and validation logic
     """
 
-    def __init__(self):
-        self._rules: Dict[str, ComplianceRule] = {}
-        self._initialize_uk_rules()
-
-    def _initialize_uk_rules(self):
-        """Initialize UK-specific compliance rules"""
-
-        # GDPR and Data Protection Rules
-        self._add_rule(
-            ComplianceRule(
-                rule_id="GDPR_001",
-                title="Data Protection Clause Required",
-                description="Contracts processing personal data must include GDPR compliance clauses",
-                regulation_type=UKRegulationType.STATUTORY,
-                applicable_frameworks=[ComplianceFramework.GDPR],
-                pattern=r"(?i)(personal\s+data|data\s+protection|gdpr|data\s+controller|data\s+processor)",
-                required_clauses=["data_protection_clause"],
-                legal_reference="General Data Protection Regulation 2016/679, Data Protection Act 2018",
-                guidance_url="https://ico.org.uk/for-organisations/guide-to-data-protection/",
-            )
-        )
-
-        self._add_rule(
-            ComplianceRule(
-                rule_id="GDPR_002",
-                title="Lawful Basis for Processing",
-                description="Must specify lawful basis for processing personal data",
-                regulation_type=UKRegulationType.STATUTORY,
-                applicable_frameworks=[ComplianceFramework.GDPR],
-                validation_function="validate_lawful_basis",
-                legal_reference="GDPR Article 6",
-            )
-        )
-
-        # Unfair Contract Terms Act Rules
-        self._add_rule(
-            ComplianceRule(
-                rule_id="UCTA_001",
-                title="Liability Exclusion Limitations",
-                description="Cannot exclude liability for death or personal injury",
-                regulation_type=UKRegulationType.STATUTORY,
-                applicable_frameworks=[ComplianceFramework.COMMERCIAL_LAW],
-                prohibited_clauses=["death_injury_exclusion"],
-                legal_reference="Unfair Contract Terms Act 1977, s.2(1)",
-                applicable_contract_types=[
-                    ContractType.SERVICE_AGREEMENT,
-                    ContractType.SUPPLIER_AGREEMENT,
-                ],
-            )
+    def __init__(
+        self,
+        time_budget_ms: Optional[float] = None,
+        cache: Optional[AssessmentCache] = None,
+        bundle: Optional[RuleBundle] = None,
+        rules_reload_seconds: Optional[float] = None,
+        rules_path: Optional[str] = None,
+        bundle_cache_dir: Optional[str] = None,
+    ):
+        """
+        time_budget_ms: default wall-clock budget per assessment; rules not
+        reached in time are skipped and the assessment marked partial
+        cache: memoises complete assessments per content and rule-set version
+        bundle: compiled rules to start with (default: read from rules_path)
+        rules_reload_seconds: how often to check the rule file for changes;
+        None or 0 disables the check
+        rules_path: rule data file (default: the packaged rules)
+        bundle_cache_dir: where compiled bundles are cached between processes
+        """
+        self.time_budget_ms = time_budget_ms
+        self.cache = cache
+        self.rules_reload_seconds = rules_reload_seconds
+        self.bundle_cache_dir = bundle_cache_dir
+        self._bundle = bundle or load_rule_bundle(
+            RULE_SET_VERSION, VALIDATOR_KEYWORDS, rules_path, bundle_cache_dir
         )
+        self._reload_lock = threading.Lock()
+        self._next_refresh = time.monotonic() + (rules_reload_seconds or 0)
+        self._rule_updates: List[Dict[str, Any]] = []
+
+    @property
+    def bundle(self) -> RuleBundle:
+        """
+        The current compiled rule set. Reloads swap in a new bundle, so
+        callers that need a consistent view capture it once per assessment.
+        """
+        return self._bundle
+
+    @property
+    def rule_set_version(self) -> str:
+        """Version of the current rule set, used to key cached assessments"""
+        return self._bundle.rule_set_version
+
+    @property
+    def matcher(self) -> TermMatcher:
+        """Compiled matcher for the current rule set"""
+        return self._bundle.matcher
 
-        self._add_rule(
-            ComplianceRule(
-                rule_id="UCTA_002",
-                title="Reasonableness Test for Exclusions",
-                description="Liability exclusions must satisfy reasonableness test",
-                regulation_type=UKRegulationType.STATUTORY,
-                applicable_frameworks=[ComplianceFramework.COMMERCIAL_LAW],
-                validation_function="validate_reasonableness",
-                legal_reference="Unfair Contract Terms Act 1977, s.11",
+    def _add_rule(self, rule: ComplianceRule):
+        """Add a compliance rule to the engine"""
+        with self._reload_lock:
+            current = self._bundle
+            rules = dict(current.rules)
+            rules[rule.rule_id] = rule
+            self._swap(
+                compile_rule_bundle(
+                    current.version,
+                    list(rules.values()),
+                    current.clause_patterns,
+                    RULE_SET_VERSION,
+                    VALIDATOR_KEYWORDS,
+                )
             )
-        )
 
-        # Employment Law Rules
-        self._add_rule(
-            ComplianceRule(
-                rule_id="EMP_001",
-                title="Minimum Notice Period",
-                description="Employment contracts must specify minimum notice periods",
-                regulation_type=UKRegulationType.STATUTORY,
-                applicable_frameworks=[ComplianceFramework.EMPLOYMENT_LAW],
-                applicable_contract_types=[ContractType.EMPLOYMENT_CONTRACT],
-                required_clauses=["notice_period"],
-                legal_reference="Employment Rights Act 1996, s.86",
-            )
-        )
+    def reload_rules(self, definitions: Optional[Dict[str, Any]] = None) -> RuleBundle:
+        """
+        Compile and swap in a new rule set without a restart.
+        definitions: rule-set data in the rule file's format; by default the
+        rule file is read again. Invalid rules raise DomainValidationError and
+        leave the current bundle in place. Assessments already running finish
+        on the bundle they started with.
+        """
+        with self._reload_lock:
+            current = self._bundle
+            if definitions is not None:
+                version, rules, clause_patterns = parse_rule_definitions(
+                    definitions, frozenset(VALIDATOR_KEYWORDS)
+                )
+                bundle = compile_rule_bundle(
+                    version,
+                    rules,
+                    clause_patterns,
+                    RULE_SET_VERSION,
+                    VALIDATOR_KEYWORDS,
+                )
+            elif current.source_path:
+                bundle = load_rule_bundle(
+                    RULE_SET_VERSION,
+                    VALIDATOR_KEYWORDS,
+                    current.source_path,
+                    self.bundle_cache_dir,
+                )
+            else:
+                bundle = compile_rule_bundle(
+                    current.version,
+                    list(current.rules.values()),
+                    current.clause_patterns,
+                    RULE_SET_VERSION,
+                    VALIDATOR_KEYWORDS,
+                )
+            self._swap(bundle)
+            return bundle
 
-        self._add_rule(
-            ComplianceRule(
-                rule_id="EMP_002",
-                title="Holiday Entitlement",
-                description="Must specify statutory minimum holiday entitlement",
-                regulation_type=UKRegulationType.STATUTORY,
-                applicable_frameworks=[ComplianceFramework.EMPLOYMENT_LAW],
-                applicable_contract_types=[ContractType.EMPLOYMENT_CONTRACT],
-                pattern=r"(?i)(holiday|annual\s+leave|vacation)",
-                legal_reference="Working Time Regulations 1998",
-            )
+    def configure(
+        self,
+        rules_path: Optional[str] = None,
+        bundle_cache_dir: Optional[str] = None,
+        rules_reload_seconds: Optional[float] = None,
+    ):
+        """
+        Apply application settings to an engine built with defaults, as the
+        global instance is: switch to rules_path if it names another rule
+        file, and start watching it every rules_reload_seconds
+        """
+        with self._reload_lock:
+            self.bundle_cache_dir = bundle_cache_dir
+            path = rules_path or DEFAULT_RULES_PATH
+            if path != self._bundle.source_path:
+                self._swap(
+                    load_rule_bundle(
+                        RULE_SET_VERSION, VALIDATOR_KEYWORDS, path, bundle_cache_dir
+                    )
+                )
+        self.rules_reload_seconds = rules_reload_seconds
+        self._next_refresh = time.monotonic() + (rules_reload_seconds or 0)
+
+    def refresh_rules(self):
+        """
+        Reload the rule file if it changed since it was loaded. Checks at
+        most every rules_reload_seconds; a bad file is logged and ignored.
+        """
+        if not self.rules_reload_seconds:
+            return
+        now = time.monotonic()
+        if now < self._next_refresh:
+            return
+        self._next_refresh = now + self.rules_reload_seconds
+
+        path = self._bundle.source_path
+        if not path:
+            return
+        try:
+            if source_stamp(path) == self._bundle.source_stamp:
+                return
+            self.reload_rules()
+        except (OSError, DomainValidationError) as e:
+            logger.error(f"Keeping rule set {self.rule_set_version}: {e}")
+
+    def _swap(self, bundle: RuleBundle):
+        """Make a bundle current; a single reference swap, so it is atomic"""
+        previous = self._bundle
+        self._bundle = bundle
+        if bundle.rule_set_version == previous.rule_set_version:
+            return
+        update = {
+            "version": bundle.version,
+            "rule_set_version": bundle.rule_set_version,
+            "previous_rule_set_version": previous.rule_set_version,
+            "loaded_at": datetime.now(timezone.utc),
+        }
+        update.update(bundle.changes_from(previous))
+        self._rule_updates.append(update)
+        logger.info(
+            f"Compliance rules {previous.rule_set_version} -> "
+            f"{bundle.rule_set_version}: {bundle.changes_from(previous)}"
         )
 
-        # Consumer Rights Act Rules
-        self._add_rule(
-            ComplianceRule(
-                rule_id="CRA_001",
-                title="Consumer Rights Protection",
-                description="B2C contracts must not unfairly prejudice consumer rights",
-                regulation_type=UKRegulationType.STATUTORY,
-                applicable_frameworks=[ComplianceFramework.CONSUMER_RIGHTS],
-                validation_function="validate_consumer_fairness",
-                legal_reference="Consumer Rights Act 2015",
-            )
-        )
+    def scan_content(
+        self,
+        content: ContractContent,
+        rules: Optional[List[ComplianceRule]] = None,
+        bundle: Optional[RuleBundle] = None,
+    ) -> FrozenSet[str]:
+        """Scan the content once for the terms used by the given (or all) rules"""
+        bundle = bundle or self._bundle
+        if rules is None:
+            return bundle.matcher.scan(content)
+        keys = set()
+        for rule in rules:
+            keys |= bundle.rule_terms.get(rule.rule_id, frozenset())
+        return bundle.matcher.scan(content, keys)
 
-        # Company Law Rules
-        self._add_rule(
-            ComplianceRule(
-                rule_id="CO_001",
-                title="Director Authority Requirements",
-                description="Contracts binding companies must ensure director has authority",
-                regulation_type=UKRegulationType.STATUTORY,
-                applicable_frameworks=[ComplianceFramework.COMPANY_LAW],
-                applicable_company_sizes=[
-                    CompanySize.SMALL,
-                    CompanySize.MEDIUM,
-                    CompanySize.LARGE,
-                ],
-                validation_function="validate_director_authority",
-                legal_reference="Companies Act 2006",
-            )
+    def get_applicable_rules(
+        self,
+        company: Company,
+        contract_type: ContractType,
+        frameworks: List[ComplianceFramework] = None,
+        bundle: Optional[RuleBundle] = None,
+    ) -> List[ComplianceRule]:
+        """
+        Get rules applicable to specific company and contract.
+        Resolved from the bundle's rule indexes and memoised per company
+        profile; jurisdiction is assumed UK-wide for now.
+        """
+        return (bundle or self._bundle).applicable_rules(
+            company.industry, company.company_size, contract_type, frameworks
         )
 
-        # Competition Law Rules
-        self._add_rule(
-            ComplianceRule(
-                rule_id="COMP_001",
-                title="Anti-Competitive Clauses",
-                description="Prohibit clauses that restrict competition",
-                regulation_type=UKRegulationType.STATUTORY,
-                applicable_frameworks=[ComplianceFramework.COMPETITION_LAW],
-                prohibited_clauses=[
-                    "non_compete_excessive",
-                    "price_fixing",
-                    "market_sharing",
-                ],
-                legal_reference="Competition Act 1998",
-            )
+    def validate_contract(
+        self,
+        contract_content: ContractContent,
+        company: Company,
+        contract_type: ContractType,
+        contract_value: Optional[Money] = None,
+        time_budget_ms: Optional[float] = None,
+    ) -> ComplianceAssessment:
+        """
+        Validate contract against UK compliance rules.
+        time_budget_ms overrides the engine's default budget; when it runs
+        out the remaining rules are skipped and a partial assessment returned.
+        """
+        start_time = datetime.now(timezone.utc)
+        budget = TimeBudget(
+            self.time_budget_ms if time_budget_ms is None else time_budget_ms
         )
-
-        # Financial Services Rules
-        self._add_rule(
-            ComplianceRule(
-                rule_id="FIN_001",
-                title="FCA Authorization Requirements",
-                description="Financial services contracts require FCA authorization",
-                regulation_type=UKRegulationType.REGULATORY,
-                applicable_frameworks=[ComplianceFramework.FINANCIAL_SERVICES],
-                applicable_industries=[IndustryType.FINANCE],
-                validation_function="validate_fca_authorization",
-                legal_reference="Financial Services and Markets Act 2000",
+        document = get_contract_document(contract_content)
+
+        # One bundle for the whole assessment, even if rules reload meanwhile
+        self.refresh_rules()
+        bundle = self._bundle
+
+        cache_key = None
+        if self.cache is not None:
+            cache_key = assessment_key(
+                "compliance",
+                document.content_hash,
+                company,
+                contract_type,
+                contract_value,
+                bundle.rule_set_version,
             )
-        )
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
 
-        # Health & Safety Rules
-        self._add_rule(
-            ComplianceRule(
-                rule_id="HS_001",
-                title="Health & Safety Duties",
-                description="Employment contracts must address H&S duties",
-                regulation_type=UKRegulationType.STATUTORY,
-                applicable_frameworks=[ComplianceFramework.HEALTH_SAFETY],
-                applicable_contract_types=[ContractType.EMPLOYMENT_CONTRACT],
-                required_clauses=["health_safety_duties"],
-                legal_reference="Health and Safety at Work etc. Act 1974",
-            )
+        # Get applicable rules
+        applicable_rules = self.get_applicable_rules(
+            company, contract_type, bundle=bundle
         )
 
-        # IP and Confidentiality Rules
-        self._add_rule(
-            ComplianceRule(
-                rule_id="IP_001",
-                title="Confidentiality Duration Limits",
-                description="Confidentiality clauses should have reasonable time limits",
-                regulation_type=UKRegulationType.COMMON_LAW,
-                applicable_frameworks=[ComplianceFramework.COMMERCIAL_LAW],
-                validation_function="validate_confidentiality_duration",
-                legal_reference="Common law reasonableness principles",
-            )
+        # Validate against each rule; term scans are memoised on the document,
+        # so scanning rule by rule costs no more than one upfront scan
+        outcomes, skipped_rules, warnings = self.evaluate_rules(
+            applicable_rules,
+            document,
+            company,
+            contract_value,
+            budget,
+            lambda rule: self.scan_content(document, [rule], bundle),
+            bundle,
         )
 
-        # Brexit/Post-EU Rules
-        self._add_rule(
-            ComplianceRule(
-                rule_id="BREXIT_001",
-                title="Retained EU Law References",
-                description="Update references to retained EU law post-Brexit",
-                regulation_type=UKRegulationType.EU_RETAINED,
-                applicable_frameworks=[ComplianceFramework.COMMERCIAL_LAW],
-                validation_function="validate_eu_law_references",
-                legal_reference="European Union (Withdrawal) Act 2018",
-            )
+        assessment = self.build_assessment(
+            applicable_rules,
+            outcomes,
+            skipped_rules,
+            warnings,
+            budget,
+            company,
+            contract_type,
+            start_time,
+            bundle,
         )
 
-    def _add_rule(self, rule: ComplianceRule):
-        """Add a compliance rule to the engine"""
-        self._rules[rule.rule_id] = rule
+        # Partial results depend on timing, so only complete ones are kept
+        if cache_key is not None and not assessment.is_partial:
+            self.cache.put(cache_key, assessment)
+        return assessment
 
-    def get_applicable_rules(
+    def evaluate_rules(
         self,
+        rules: List[ComplianceRule],
+        document: ContractDocument,
         company: Company,
-        contract_type: ContractType,
-        frameworks: List[ComplianceFramework] = None,
-    ) -> List[ComplianceRule]:
-        """Get rules applicable to specific company and contract"""
-        applicable_rules = []
-
-        for rule in self._rules.values():
-            if not rule.is_active:
+        contract_value: Optional[Money],
+        budget: TimeBudget,
+        hits_for: Callable[[ComplianceRule], FrozenSet[str]],
+        bundle: Optional[RuleBundle] = None,
+    ) -> Tuple[Dict[str, Optional[ComplianceViolation]], List[str], List[str]]:
+        """
+        Evaluate rules in order until the budget runs out.
+        Returns each evaluated rule's outcome (a violation, or None if it
+        passed), the ids of skipped rules and warnings for rules that failed.
+        """
+        outcomes: Dict[str, Optional[ComplianceViolation]] = {}
+        skipped_rules: List[str] = []
+        warnings: List[str] = []
+        for rule in rules:
+            if budget.expired:
+                skipped_rules.append(rule.rule_id)
                 continue
+            try:
+                outcomes[rule.rule_id] = self._validate_rule(
+                    rule, document, company, contract_value, hits_for(rule), bundle
+                )
+            except Exception as e:
+                warnings.append(f"Could not validate rule {rule.rule_id}: {str(e)}")
+        return outcomes, skipped_rules, warnings
 
-            # Check framework applicability
-            if frameworks:
-                if not any(f in rule.applicable_frameworks for f in frameworks):
-                    continue
-
-            # Check industry applicability
-            if rule.applicable_industries:
-                if company.industry not in rule.applicable_industries:
-                    continue
-
-            # Check company size applicability
-            if rule.applicable_company_sizes:
-                if company.company_size not in rule.applicable_company_sizes:
-                    continue
-
-            # Check contract type applicability
-            if rule.applicable_contract_types:
-                if contract_type not in rule.applicable_contract_types:
-                    continue
-
-            # Check jurisdiction (assume UK-wide for now)
-            if rule.jurisdiction != LegalJurisdiction.UK_WIDE:
-                # Could add company location checking here
-                pass
-
-            applicable_rules.append(rule)
-
-        return applicable_rules
-
-    def validate_contract(
+    def build_assessment(
         self,
-        contract_content: str,
+        applicable_rules: List[ComplianceRule],
+        outcomes: Dict[str, Optional[ComplianceViolation]],
+        skipped_rules: List[str],
+        warnings: List[str],
+        budget: TimeBudget,
         company: Company,
         contract_type: ContractType,
-        contract_value: Optional[Money] = None,
+        start_time: datetime,
+        bundle: Optional[RuleBundle] = None,
     ) -> ComplianceAssessment:
-        """Validate contract against UK compliance rules"""
-        start_time = datetime.now(timezone.utc)
-
-        # Get applicable rules
-        applicable_rules = self.get_applicable_rules(company, contract_type)
-
+        """Score rule outcomes into an assessment"""
+        bundle = bundle or self._bundle
         violations: List[ComplianceViolation] = []
         passed_rules: List[str] = []
-        warnings: List[str] = []
-        recommendations: List[str] = []
         framework_scores: Dict[str, float] = {}
 
-        # Validate against each rule
         for rule in applicable_rules:
-            try:
-                violation = self._validate_rule(
-                    rule, contract_content, company, contract_value
-                )
-                if violation:
-                    violations.append(violation)
-                else:
-                    passed_rules.append(rule.rule_id)
-            except Exception as e:
-                warnings.append(f"Could not validate rule {rule.rule_id}: {str(e)}")
+            if rule.rule_id not in outcomes:
+                continue
+            violation = outcomes[rule.rule_id]
+            if violation:
+                violations.append(violation)
+            else:
+                passed_rules.append(rule.rule_id)
+
+        # Scores only cover the rules that were evaluated
+        if skipped_rules:
+            warnings.append(
+                f"Time budget of {budget.budget_ms:.0f}ms exceeded: "
+                f"{len(skipped_rules)} rules not evaluated"
+            )
+            skipped = set(skipped_rules)
+            evaluated_rules = [r for r in applicable_rules if r.rule_id not in skipped]
+        else:
+            evaluated_rules = applicable_rules
 
-        # Calculate framework-specific scores
-        for framework in ComplianceFramework:
-            framework_rules = [
-                r for r in applicable_rules if framework in r.applicable_frameworks
-            ]
+        # Calculate framework-specific scores from the framework index
+        evaluated_ids = {r.rule_id for r in evaluated_rules}
+        passed_ids = set(passed_rules)
+        for framework, rule_ids in bundle.framework_rules.items():
+            framework_rules = rule_ids & evaluated_ids
             if framework_rules:
-                framework_passed = len(
-                    [r for r in framework_rules if r.rule_id in passed_rules]
-                )
                 framework_scores[framework.value] = (
-                    framework_passed / len(framework_rules)
+                    len(framework_rules & passed_ids) / len(framework_rules)
                 ) * 100
 
         # Calculate overall compliance
-        overall_score = self._calculate_overall_score(violations, len(applicable_rules))
+        overall_score = self._calculate_overall_score(violations, len(evaluated_rules))
         overall_level = self._determine_compliance_level(overall_score, violations)
         risk_level = self._determine_risk_level(violations)
 
@@ -434,20 +556,27 @@ class UKComplianceRuleEngine:
             assessed_at=start_time,
             assessment_duration_ms=duration_ms,
             framework_scores=framework_scores,
+            is_partial=bool(skipped_rules),
+            skipped_rules=skipped_rules,
         )
 
     def _validate_rule(
         self,
         rule: ComplianceRule,
-        content: str,
+        content: ContractContent,
         company: Company,
         contract_value: Optional[Money],
+        hits: Optional[FrozenSet[str]] = None,
+        bundle: Optional[RuleBundle] = None,
     ) -> Optional[ComplianceViolation]:
         """Validate a single compliance rule"""
+        bundle = bundle or self._bundle
+        if hits is None:
+            hits = self.scan_content(content, bundle=bundle)
 
         # Pattern-based validation
         if rule.pattern:
-            if not re.search(rule.pattern, content, re.IGNORECASE | re.MULTILINE):
+            if rule_key(rule.rule_id) not in hits:
                 return ComplianceViolation(
                     rule_id=rule.rule_id,
                     rule_title=rule.title,
@@ -460,7 +589,9 @@ class UKComplianceRuleEngine:
         # Required clauses validation
         if rule.required_clauses:
             for required_clause in rule.required_clauses:
-                if not self._check_clause_present(content, required_clause):
+                if not self._check_clause_present(
+                    content, required_clause, hits, bundle
+                ):
                     return ComplianceViolation(
                         rule_id=rule.rule_id,
                         rule_title=rule.title,
@@ -474,12 +605,17 @@ class UKComplianceRuleEngine:
         # Prohibited clauses validation
         if rule.prohibited_clauses:
             for prohibited_clause in rule.prohibited_clauses:
-                if self._check_clause_present(content, prohibited_clause):
+                if self._check_clause_present(
+                    content, prohibited_clause, hits, bundle
+                ):
                     return ComplianceViolation(
                         rule_id=rule.rule_id,
                         rule_title=rule.title,
                         severity=RiskLevel.CRITICAL,
                         description=f"Prohibited clause found: {prohibited_clause}",
+                        location=self._clause_location(
+                            content, prohibited_clause, bundle
+                        ),
                         suggested_fix=f"Remove or modify {prohibited_clause} clause",
                         legal_reference=rule.legal_reference,
                     )
@@ -487,78 +623,101 @@ class UKComplianceRuleEngine:
         # Custom validation functions
         if rule.validation_function:
             return self._execute_custom_validation(
-                rule, content, company, contract_value
+                rule, content, company, contract_value, hits
             )
 
         return None
 
-    def _check_clause_present(self, content: str, clause_identifier: str) -> bool:
+    def _check_clause_present(
+        self,
+        content: ContractContent,
+        clause_identifier: str,
+        hits: Optional[FrozenSet[str]] = None,
+        bundle: Optional[RuleBundle] = None,
+    ) -> bool:
         """Check if a specific clause is present in content"""
-        # Map clause identifiers to detection patterns
-        clause_patterns = {
-            "data_protection_clause": r"(?i)(data\s+protection|gdpr|personal\s+data\s+processing)",
-            "notice_period": r"(?i)(notice\s+period|termination\s+notice|\d+\s*(days?|weeks?|months?)\s*notice)",
-            "health_safety_duties": r"(?i)(health\s+and\s+safety|h&s|hasawa|safety\s+duties)",
-            "death_injury_exclusion": r"(?i)(exclude.*liability.*death|exclude.*liability.*personal\s+injury)",
-            "non_compete_excessive": r"(?i)(non-compete|restraint.*trade|not.*compete.*\d+\s*years)",
-            "price_fixing": r"(?i)(fix.*price|price.*agreement|pricing.*arrangement)",
-            "market_sharing": r"(?i)(market.*sharing|divide.*market|allocate.*customers)",
-        }
-
-        pattern = clause_patterns.get(clause_identifier)
-        if pattern:
-            return bool(re.search(pattern, content, re.IGNORECASE | re.MULTILINE))
+        bundle = bundle or self._bundle
+        if clause_identifier in bundle.clause_patterns:
+            if hits is None:
+                hits = self.scan_content(content, bundle=bundle)
+            return clause_key(clause_identifier) in hits
 
         # Fallback to simple keyword search
-        return clause_identifier.lower() in content.lower()
+        if hits is not None and keyword_key(clause_identifier) in bundle.matcher.keys:
+            return keyword_key(clause_identifier) in hits
+        return get_contract_document(content).contains(clause_identifier)
+
+    def _clause_location(
+        self,
+        content: ContractContent,
+        clause_identifier: str,
+        bundle: Optional[RuleBundle] = None,
+    ) -> Optional[str]:
+        """Location of the first occurrence of a clause in the document"""
+        document = get_contract_document(content)
+        pattern = (bundle or self._bundle).clause_matchers.get(clause_identifier)
+        if pattern is not None:
+            match = document.search(pattern)
+            offset = match.start() if match else None
+        else:
+            offsets = document.positions(clause_identifier)
+            offset = offsets[0] if offsets else None
+        return document.location_of(offset) if offset is not None else None
+
+    def _has_any(
+        self,
+        content: ContractContent,
+        keywords: List[str],
+        hits: Optional[FrozenSet[str]],
+    ) -> bool:
+        """Check if any validator keyword occurs in the content"""
+        if hits is None:
+            hits = self.scan_content(content)
+        return any(keyword_key(keyword) in hits for keyword in keywords)
 
     def _execute_custom_validation(
         self,
         rule: ComplianceRule,
-        content: str,
+        content: ContractContent,
         company: Company,
         contract_value: Optional[Money],
+        hits: Optional[FrozenSet[str]] = None,
     ) -> Optional[ComplianceViolation]:
         """Execute custom validation functions"""
+        if hits is None:
+            hits = self.scan_content(content)
 
         if rule.validation_function == "validate_lawful_basis":
-            return self._validate_lawful_basis(rule, content)
+            return self._validate_lawful_basis(rule, content, hits)
 
         elif rule.validation_function == "validate_reasonableness":
-            return self._validate_reasonableness(rule, content, contract_value)
+            return self._validate_reasonableness(rule, content, contract_value, hits)
 
         elif rule.validation_function == "validate_consumer_fairness":
-            return self._validate_consumer_fairness(rule, content, company)
+            return self._validate_consumer_fairness(rule, content, company, hits)
 
         elif rule.validation_function == "validate_director_authority":
-            return self._validate_director_authority(rule, content, company)
+            return self._validate_director_authority(rule, content, company, hits)
 
         elif rule.validation_function == "validate_fca_authorization":
-            return self._validate_fca_authorization(rule, content, company)
+            return self._validate_fca_authorization(rule, content, company, hits)
 
         elif rule.validation_function == "validate_confidentiality_duration":
-            return self._validate_confidentiality_duration(rule, content)
+            return self._validate_confidentiality_duration(rule, content, hits)
 
         elif rule.validation_function == "validate_eu_law_references":
-            return self._validate_eu_law_references(rule, content)
+            return self._validate_eu_law_references(rule, content, hits)
 
         return None
 
     def _validate_lawful_basis(
-        self, rule: ComplianceRule, content: str
+        self,
+        rule: ComplianceRule,
+        content: ContractContent,
+        hits: Optional[FrozenSet[str]] = None,
     ) -> Optional[ComplianceViolation]:
         """Validate GDPR lawful basis specification"""
-        lawful_bases = [
-            "consent",
-            "contract",
-            "legal obligation",
-            "vital interests",
-            "public task",
-            "legitimate interests",
-        ]
-
-        content_lower = content.lower()
-        if any(basis in content_lower for basis in lawful_bases):
+        if self._has_any(content, LAWFUL_BASES, hits):
             return None
 
         return ComplianceViolation(
@@ -571,26 +730,21 @@ class UKComplianceRuleEngine:
         )
 
     def _validate_reasonableness(
-        self, rule: ComplianceRule, content: str, contract_value: Optional[Money]
+        self,
+        rule: ComplianceRule,
+        content: ContractContent,
+        contract_value: Optional[Money],
+        hits: Optional[FrozenSet[str]] = None,
     ) -> Optional[ComplianceViolation]:
         """Validate reasonableness of liability exclusions"""
-        # Look for broad exclusions
-        broad_exclusions = [
-            "all liability",
-            "any liability",
-            "entire liability",
-            "total liability",
-            "liability whatsoever",
-        ]
+        if hits is None:
+            hits = self.scan_content(content)
 
-        content_lower = content.lower()
-        for exclusion in broad_exclusions:
-            if exclusion in content_lower:
+        # Look for broad exclusions
+        for exclusion in BROAD_EXCLUSIONS:
+            if keyword_key(exclusion) in hits:
                 # Check if there are reasonable limitations
-                if not any(
-                    term in content_lower
-                    for term in ["subject to", "except for", "save for"]
-                ):
+                if not self._has_any(content, EXCLUSION_LIMITATIONS, hits):
                     return ComplianceViolation(
                         rule_id=rule.rule_id,
                         rule_title=rule.title,
@@ -603,22 +757,19 @@ class UKComplianceRuleEngine:
         return None
 
     def _validate_consumer_fairness(
-        self, rule: ComplianceRule, content: str, company: Company
+        self,
+        rule: ComplianceRule,
+        content: ContractContent,
+        company: Company,
+        hits: Optional[FrozenSet[str]] = None,
     ) -> Optional[ComplianceViolation]:
         """Validate consumer fairness (B2C contracts)"""
-        # Look for unfair terms indicators
-        unfair_indicators = [
-            "irrevocably",
-            "without recourse",
-            "no refund",
-            "final sale",
-            "exclude all warranties",
-            "buyer beware",
-        ]
+        if hits is None:
+            hits = self.scan_content(content)
 
-        content_lower = content.lower()
-        for indicator in unfair_indicators:
-            if indicator in content_lower:
+        # Look for unfair terms indicators
+        for indicator in UNFAIR_TERM_INDICATORS:
+            if keyword_key(indicator) in hits:
                 return ComplianceViolation(
                     rule_id=rule.rule_id,
                     rule_title=rule.title,
@@ -631,21 +782,18 @@ class UKComplianceRuleEngine:
         return None
 
     def _validate_director_authority(
-        self, rule: ComplianceRule, content: str, company: Company
+        self,
+        rule: ComplianceRule,
+        content: ContractContent,
+        company: Company,
+        hits: Optional[FrozenSet[str]] = None,
     ) -> Optional[ComplianceViolation]:
         """Validate director signing authority"""
         if company.company_type in [
             CompanyType.PRIVATE_LIMITED,
             CompanyType.PUBLIC_LIMITED,
         ]:
-            authority_terms = [
-                "duly authorized",
-                "acting within authority",
-                "board resolution",
-            ]
-
-            content_lower = content.lower()
-            if not any(term in content_lower for term in authority_terms):
+            if not self._has_any(content, DIRECTOR_AUTHORITY_TERMS, hits):
                 return ComplianceViolation(
                     rule_id=rule.rule_id,
                     rule_title=rule.title,
@@ -658,18 +806,15 @@ class UKComplianceRuleEngine:
         return None
 
     def _validate_fca_authorization(
-        self, rule: ComplianceRule, content: str, company: Company
+        self,
+        rule: ComplianceRule,
+        content: ContractContent,
+        company: Company,
+        hits: Optional[FrozenSet[str]] = None,
     ) -> Optional[ComplianceViolation]:
         """Validate FCA authorization for financial services"""
         if company.industry == IndustryType.FINANCE:
-            fca_terms = [
-                "fca authorized",
-                "financial conduct authority",
-                "regulated activity",
-            ]
-
-            content_lower = content.lower()
-            if not any(term in content_lower for term in fca_terms):
+            if not self._has_any(content, FCA_TERMS, hits):
                 return ComplianceViolation(
                     rule_id=rule.rule_id,
                     rule_title=rule.title,
@@ -682,15 +827,20 @@ class UKComplianceRuleEngine:
         return None
 
     def _validate_confidentiality_duration(
-        self, rule: ComplianceRule, content: str
+        self,
+        rule: ComplianceRule,
+        content: ContractContent,
+        hits: Optional[FrozenSet[str]] = None,
     ) -> Optional[ComplianceViolation]:
         """Validate confidentiality clause duration"""
+        # No confidentiality wording, nothing to measure
+        if not self._has_any(content, ["confidential"], hits):
+            return None
+
         # Look for excessive confidentiality periods
-        duration_pattern = r"(?i)confidential.*(\d+)\s*(years?)"
-        match = re.search(duration_pattern, content)
+        years = self._confidentiality_years(get_contract_document(content))
 
-        if match:
-            years = int(match.group(1))
+        if years is not None:
             if years > 10:  # Arbitrary threshold for "excessive"
                 return ComplianceViolation(
                     rule_id=rule.rule_id,
@@ -703,22 +853,34 @@ class UKComplianceRuleEngine:
 
         return None
 
+    def _confidentiality_years(self, document: ContractDocument) -> Optional[Decimal]:
+        """First period in years stated after "confidential" on the same line"""
+        text = document.text
+        searched_line_end = -1
+        for offset in document.positions("confidential"):
+            if offset < searched_line_end:
+                continue  # Line already searched from an earlier occurrence
+            line_end = text.find("\n", offset)
+            if line_end == -1:
+                line_end = len(text)
+            for duration in document.durations_in(offset, line_end):
+                if duration.unit == "year":
+                    return duration.value
+            searched_line_end = line_end
+        return None
+
     def _validate_eu_law_references(
-        self, rule: ComplianceRule, content: str
+        self,
+        rule: ComplianceRule,
+        content: ContractContent,
+        hits: Optional[FrozenSet[str]] = None,
     ) -> Optional[ComplianceViolation]:
         """Validate EU law references post-Brexit"""
-        eu_references = [
-            "eu directive",
-            "european directive",
-            "eu regulation",
-            "european regulation",
-            "brussels regulation",
-            "rome regulation",
-        ]
+        if hits is None:
+            hits = self.scan_content(content)
 
-        content_lower = content.lower()
-        for ref in eu_references:
-            if ref in content_lower and "retained" not in content_lower:
+        for ref in EU_LAW_REFERENCES:
+            if keyword_key(ref) in hits and keyword_key("retained") not in hits:
                 return ComplianceViolation(
                     rule_id=rule.rule_id,
                     rule_title=rule.title,
@@ -835,13 +997,15 @@ class UKComplianceRuleEngine:
         return recommendations
 
     def get_regulatory_updates(self, since_date: datetime) -> List[Dict[str, Any]]:
-        """Get regulatory updates since specified date (placeholder for future implementation)"""
-        # This would integrate with government APIs or legal databases
-        # For now, return empty list
-        return []
+        """Rule-set reloads since the specified date, oldest first"""
+        # Government API or legal database feeds would also be merged in here
+        return [u for u in self._rule_updates if u["loaded_at"] >= since_date]
 
     def suggest_clause_improvements(
-        self, content: str, company: Company, contract_type: ContractType
+        self,
+        content: ContractContent,
+        company: Company,
+        contract_type: ContractType,
     ) -> List[str]:
         """Suggest clause improvements for better compliance"""
         suggestions = []
@@ -854,15 +1018,15 @@ class UKComplianceRuleEngine:
                 suggestions.append(violation.suggested_fix)
 
         # Add general improvements
-        content_lower = content.lower()
+        document = get_contract_document(content)
 
-        if "force majeure" not in content_lower:
+        if not document.contains("force majeure"):
             suggestions.append("Consider adding a force majeure clause")
 
-        if "dispute resolution" not in content_lower:
+        if not document.contains("dispute resolution"):
             suggestions.append("Add dispute resolution and governing law clauses")
 
-        if company.is_vat_registered and "vat" not in content_lower:
+        if company.is_vat_registered and not document.contains("vat"):
             suggestions.append(
                 "Include VAT treatment clauses as company is VAT registered"
             )
@@ -870,5 +1034,6 @@ class UKComplianceRuleEngine:
         return suggestions
 
 
-# Singleton instance for global use
-uk_compliance_engine = UKComplianceRuleEngine()
+# Singleton instance for global use; the application applies its settings
+# with configure() at startup
+uk_compliance_engine = UKComplianceRuleEngine(cache=assessment_cache)
@@ -11,6 +11,8 @@ from sqlalchemy import (
     ForeignKey,
     JSON,
     Enum,
+    Index,
+    UniqueConstraint,
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -137,6 +139,13 @@ class AuditResourceType(str, enum.Enum):
     SETTING = "setting"
     INTEGRATION = "integration"
     REPORT = "report"
+    FILE = "file"
+
+
+class SpeculationStatus(str, enum.Enum):
+    PENDING = "pending"
+    ACCEPTED = "accepted"
+    DISCARDED = "discarded"
 
 
 class User(Base):
@@ -310,6 +319,10 @@ class Contract(Base):
     ai_generation_id = Column(String, ForeignKey("ai_generations.id"), nullable=True)
     ai_generation = relationship("AIGeneration", back_populates="contract")
 
+    is_archived = Column(Boolean, default=False, nullable=False)
+    archived_at = Column(DateTime(timezone=True), nullable=True)
+    archived_by = Column(String, ForeignKey("users.id"), nullable=True)
+
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -350,6 +363,15 @@ class AIGeneration(Base):
     token_usage = Column(JSON, nullable=True)
     confidence_score = Column(Float, nullable=True)
 
+    # Speculative generations are started when a draft is saved and only
+    # attached to the contract if its inputs are unchanged at generate time
+    speculation_status = Column(
+        Enum(SpeculationStatus), nullable=True, index=True
+    )
+    speculative_contract_id = Column(String, nullable=True, index=True)
+    input_hash = Column(String, nullable=True)
+    company_id = Column(String, ForeignKey("companies.id"), nullable=True, index=True)
+
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     contract = relationship("Contract", back_populates="ai_generation")
@@ -545,3 +567,150 @@ class TeamInvitation(Base):
 
     company = relationship("Company")
     inviter = relationship("User", foreign_keys=[invited_by])
+
+
+class BulkJob(Base):
+    __tablename__ = "bulk_jobs"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+
+    operation_type = Column(String, nullable=False)
+    # A BulkOperationStatus value
+    status = Column(String, nullable=False, default="pending", index=True)
+    parameters = Column(JSON, nullable=True)
+    # The job queue entry running it; finished entries are purged
+    background_job_id = Column(
+        String, ForeignKey("background_jobs.id", ondelete="SET NULL"), nullable=True
+    )
+
+    # Unset for audit exports by users outside any company
+    company_id = Column(String, ForeignKey("companies.id"), nullable=True, index=True)
+    user_id = Column(String, ForeignKey("users.id"), nullable=False)
+
+    total_items = Column(Integer, default=0, nullable=False)
+    processed_items = Column(Integer, default=0, nullable=False)
+    successful_items = Column(Integer, default=0, nullable=False)
+    failed_items = Column(Integer, default=0, nullable=False)
+    error_message = Column(Text, nullable=True)
+    # Exports: the file written, deleted when the job is purged
+    file_path = Column(String, nullable=True)
+    file_size_bytes = Column(Integer, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+    items = relationship(
+        "BulkJobItem", back_populates="job", cascade="all, delete-orphan"
+    )
+
+
+class BulkJobItem(Base):
+    __tablename__ = "bulk_job_items"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(
+        String, ForeignKey("bulk_jobs.id", ondelete="CASCADE"), nullable=False
+    )
+    # Order of the item in the request; items are paged by it
+    position = Column(Integer, nullable=False)
+
+    item_id = Column(String, nullable=False)
+    success = Column(Boolean, nullable=False)
+    error_message = Column(Text, nullable=True)
+    result = Column(JSON, nullable=True)
+
+    job = relationship("BulkJob", back_populates="items")
+
+    __table_args__ = (
+        Index("ix_bulk_job_items_job_id_position", "job_id", "position"),
+    )
+
+
+class BackgroundJob(Base):
+    __tablename__ = "background_jobs"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+
+    job_type = Column(String, nullable=False, index=True)
+    payload = Column(JSON, nullable=True)
+    company_id = Column(String, ForeignKey("companies.id"), nullable=True, index=True)
+    user_id = Column(String, ForeignKey("users.id"), nullable=True)
+
+    # Higher runs first; equal priorities run in run_after order
+    priority = Column(Integer, default=0, nullable=False)
+    # A JobStatus value
+    status = Column(String, nullable=False, default="queued")
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=3, nullable=False)
+    run_after = Column(DateTime(timezone=True), nullable=False)
+
+    # The worker holding a running job, until its lease expires
+    locked_by = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    cancel_requested = Column(Boolean, default=False, nullable=False)
+
+    progress = Column(Float, default=0.0, nullable=False)
+    progress_message = Column(String, nullable=True)
+    # Saved by the handler while running, so a retry can resume
+    checkpoint = Column(JSON, nullable=True)
+    result = Column(JSON, nullable=True)
+    error_message = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_background_jobs_claim", "status", "priority", "run_after"),
+    )
+
+
+class FileBlob(Base):
+    __tablename__ = "file_blobs"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+
+    # Content is stored once per company under its hash; files share it
+    company_id = Column(String, ForeignKey("companies.id"), nullable=False)
+    sha256 = Column(String(64), nullable=False)
+    size = Column(Integer, nullable=False)
+    storage_path = Column(String, nullable=False)
+    # Number of files pointing at this blob; it is removed at zero
+    ref_count = Column(Integer, default=1, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("company_id", "sha256", name="uq_file_blobs_company_sha256"),
+    )
+
+
+class StoredFile(Base):
+    __tablename__ = "files"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+
+    company_id = Column(String, ForeignKey("companies.id"), nullable=False)
+    contract_id = Column(String, ForeignKey("contracts.id"), nullable=True)
+    blob_id = Column(String, ForeignKey("file_blobs.id"), nullable=False, index=True)
+    uploaded_by = Column(String, ForeignKey("users.id"), nullable=True)
+
+    filename = Column(String, nullable=False)
+    original_filename = Column(String, nullable=False)
+    mime_type = Column(String, nullable=False)
+    description = Column(Text, nullable=True)
+    # Copied from the blob so listings need no join
+    file_size = Column(Integer, nullable=False)
+    sha256 = Column(String(64), nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    blob = relationship("FileBlob")
+
+    __table_args__ = (
+        # Listings are newest first, for a company or one of its contracts
+        Index("ix_files_company_created", "company_id", "created_at"),
+        Index("ix_files_company_contract", "company_id", "contract_id", "created_at"),
+    )
@@ -5,16 +5,27 @@ Supports UK legal requirements and business-specific customization
 """
 
 import asyncio
+import math
+import random
 import time
 from abc import ABC, abstractmethod
+from collections import deque
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Callable, Awaitable, TypeVar
 from enum import Enum
 import logging
 
-import openai
-from anthropic import AsyncAnthropic
+# Provider SDKs are optional - a provider is only available if its SDK is installed
+try:
+    import openai
+except ImportError:
+    openai = None
+
+try:
+    from anthropic import AsyncAnthropic
+except ImportError:
+    AsyncAnthropic = None
 
 from app.core.config import settings
 from app.domain.value_objects import ContractType, Money
@@ -29,6 +40,14 @@ class AIProvider(str, Enum):
     AZURE_OPENAI = "azure_openai"
 
 
+class CircuitState(str, Enum):
+    """Circuit breaker states for a provider"""
+
+    CLOSED = "closed"  # Healthy, requests flow normally
+    OPEN = "open"  # Failing, requests are short-circuited
+    HALF_OPEN = "half_open"  # Reset timeout elapsed, next request is a trial
+
+
 class ContractComplexity(str, Enum):
     """Contract complexity levels for AI generation"""
 
@@ -88,6 +107,132 @@ class AIServiceError(Exception):
         self.error_code = error_code
 
 
+def backoff_with_jitter(attempt: int, base: float = 1.0, cap: float = 8.0) -> float:
+    """Exponential backoff with full jitter, so retrying clients don't synchronise"""
+    return random.uniform(0, min(cap, base * (2**attempt)))
+
+
+class ProviderHealth:
+    """
+    Rolling health statistics and circuit breaker for a single AI provider.
+    Latency and error rate are tracked as exponentially weighted moving
+    averages; recent latencies are kept for percentile (hedging) decisions.
+    """
+
+    MIN_SAMPLES_FOR_PERCENTILE = 5
+
+    def __init__(
+        self,
+        provider: "AIProvider",
+        alpha: float = 0.2,
+        failure_threshold: int = 5,
+        reset_timeout_seconds: float = 30.0,
+        window_size: int = 100,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.provider = provider
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self._clock = clock
+
+        self.latency_ewma_ms: Optional[float] = None
+        self.error_rate_ewma: float = 0.0
+        self.consecutive_failures = 0
+        self.state = CircuitState.CLOSED
+        self.opened_at: Optional[float] = None
+        # When the single HALF_OPEN trial request was let through
+        self.trial_started_at: Optional[float] = None
+        self._latencies: deque = deque(maxlen=window_size)
+
+    def is_available(self) -> bool:
+        """Whether the circuit would let a request through now"""
+        if self.state == CircuitState.OPEN:
+            if self._clock() - self.opened_at < self.reset_timeout_seconds:
+                return False
+            self.state = CircuitState.HALF_OPEN
+        if self.state == CircuitState.HALF_OPEN:
+            return not self._trial_in_flight()
+        return True
+
+    def acquire(self) -> bool:
+        """
+        Claim a request. Always granted while CLOSED; while HALF_OPEN only one
+        trial request goes through, and the rest are refused until its
+        outcome is recorded
+        """
+        if not self.is_available():
+            return False
+        if self.state == CircuitState.HALF_OPEN:
+            self.trial_started_at = self._clock()
+        return True
+
+    def release(self):
+        """Give up the trial without an outcome, e.g. a cancelled hedge"""
+        self.trial_started_at = None
+
+    def _trial_in_flight(self) -> bool:
+        # A trial that never reports back must not hold the circuit forever
+        return (
+            self.trial_started_at is not None
+            and self._clock() - self.trial_started_at < self.reset_timeout_seconds
+        )
+
+    def record_success(self, latency_ms: float):
+        """Record a successful call and close the circuit"""
+        self._latencies.append(latency_ms)
+        if self.latency_ewma_ms is None:
+            self.latency_ewma_ms = latency_ms
+        else:
+            self.latency_ewma_ms = (
+                self.alpha * latency_ms + (1 - self.alpha) * self.latency_ewma_ms
+            )
+        self.error_rate_ewma = (1 - self.alpha) * self.error_rate_ewma
+        self.consecutive_failures = 0
+        self.state = CircuitState.CLOSED
+        self.opened_at = None
+        self.trial_started_at = None
+
+    def record_failure(self):
+        """Record a failed call, opening the circuit if the provider keeps failing"""
+        self.error_rate_ewma = self.alpha + (1 - self.alpha) * self.error_rate_ewma
+        self.consecutive_failures += 1
+        self.trial_started_at = None
+        if (
+            self.state == CircuitState.HALF_OPEN
+            or self.consecutive_failures >= self.failure_threshold
+        ):
+            self.state = CircuitState.OPEN
+            self.opened_at = self._clock()
+
+    def p95_latency_ms(self) -> Optional[float]:
+        """95th percentile of recent successful call latencies"""
+        if len(self._latencies) < self.MIN_SAMPLES_FOR_PERCENTILE:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[math.ceil(0.95 * len(ordered)) - 1]
+
+    def routing_cost(self, default_latency_ms: float) -> float:
+        """Expected time to a successful answer, counting retries caused by errors"""
+        latency = (
+            self.latency_ewma_ms
+            if self.latency_ewma_ms is not None
+            else default_latency_ms
+        )
+        return latency / max(1.0 - self.error_rate_ewma, 0.05)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current statistics for monitoring endpoints"""
+        return {
+            "state": self.state.value,
+            "latency_ewma_ms": self.latency_ewma_ms,
+            "p95_latency_ms": self.p95_latency_ms(),
+            "error_rate_ewma": round(self.error_rate_ewma, 4),
+            "consecutive_failures": self.consecutive_failures,
+            "samples": len(self._latencies),
+        }
+
+
 class BaseAIService(ABC):
     """Abstract base class for AI service implementations"""
 
@@ -124,6 +269,8 @@ class OpenAIContractService(BaseAIService):
 
         if not self.api_key:
             raise AIServiceError("OpenAI API key not configured")
+        if openai is None:
+            raise AIServiceError("OpenAI SDK not installed", "openai")
 
         openai.api_key = self.api_key
 
@@ -236,8 +383,7 @@ class OpenAIContractService(BaseAIService):
 
             except openai.error.RateLimitError:
                 if attempt < self.max_retries - 1:
-                    wait_time = (2**attempt) * 2  # Exponential backoff
-                    await asyncio.sleep(wait_time)
+                    await asyncio.sleep(backoff_with_jitter(attempt, base=2.0))
                     continue
                 raise AIServiceError(
                     "OpenAI rate limit exceeded", "openai", "rate_limit"
@@ -245,7 +391,7 @@ class OpenAIContractService(BaseAIService):
 
             except openai.error.OpenAIError as e:
                 if attempt < self.max_retries - 1:
-                    await asyncio.sleep(1)
+                    await asyncio.sleep(backoff_with_jitter(attempt))
                     continue
                 raise AIServiceError(f"OpenAI API error: {str(e)}", "openai")
 
@@ -450,6 +596,8 @@ class AnthropicContractService(BaseAIService):
 
         if not self.api_key:
             raise AIServiceError("Anthropic API key not configured")
+        if AsyncAnthropic is None:
+            raise AIServiceError("Anthropic SDK not installed", "anthropic")
 
         self.client = AsyncAnthropic(api_key=self.api_key)
 
@@ -538,8 +686,7 @@ class AnthropicContractService(BaseAIService):
 
             except Exception as e:
                 if attempt < self.max_retries - 1:
-                    wait_time = (2**attempt) * 2
-                    await asyncio.sleep(wait_time)
+                    await asyncio.sleep(backoff_with_jitter(attempt, base=2.0))
                     continue
                 raise AIServiceError(f"Anthropic API error: {str(e)}", "anthropic")
 
@@ -602,19 +749,42 @@ class AnthropicContractService(BaseAIService):
         )
 
 
+T = TypeVar("T")
+
+# Hedge delay used until a provider has enough samples for a p95 estimate
+DEFAULT_HEDGE_DELAY_MS = 5000.0
+
+
 class AIContractService:
     """
-    Main AI service that coordinates between different providers
-    Implements fallback and load balancing strategies
+    Main AI service that coordinates between different providers.
+    Providers are ranked by a rolling latency/error EWMA, each guarded by a
+    circuit breaker. Latency-sensitive calls can be hedged: if the best
+    provider hasn't answered by its p95 latency, the next one is fired too
+    and the first successful answer wins.
     """
 
-    def __init__(self, primary_provider: AIProvider = AIProvider.OPENAI):
+    def __init__(
+        self,
+        primary_provider: AIProvider = AIProvider.OPENAI,
+        services: Optional[Dict[AIProvider, BaseAIService]] = None,
+        default_hedge_delay_ms: float = DEFAULT_HEDGE_DELAY_MS,
+        failure_threshold: int = 5,
+        reset_timeout_seconds: float = 30.0,
+    ):
         self.primary_provider = primary_provider
         self.services: Dict[AIProvider, BaseAIService] = {}
+        self.default_hedge_delay_ms = default_hedge_delay_ms
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self._health: Dict[AIProvider, ProviderHealth] = {}
         self.logger = logging.getLogger(__name__)
 
-        # Initialize available services
-        self._initialize_services()
+        # Initialize available services (explicit services are used for testing)
+        if services is not None:
+            self.services.update(services)
+        else:
+            self._initialize_services()
 
     def _initialize_services(self):
         """Initialize AI service providers based on configuration"""
@@ -630,56 +800,172 @@ class AIContractService:
         except Exception as e:
             self.logger.warning(f"Failed to initialize Anthropic service: {e}")
 
-    async def generate_contract(
-        self, request: ContractGenerationRequest
-    ) -> AIGenerationResult:
-        """
-        Generate contract using primary provider with fallback
-        """
-        # Try primary provider first
-        if self.primary_provider in self.services:
+    def get_provider_health(self, provider: AIProvider) -> ProviderHealth:
+        """Get (creating on first use) the health tracker for a provider"""
+        if provider not in self._health:
+            self._health[provider] = ProviderHealth(
+                provider,
+                failure_threshold=self.failure_threshold,
+                reset_timeout_seconds=self.reset_timeout_seconds,
+            )
+        return self._health[provider]
+
+    def _ranked_providers(self) -> List[AIProvider]:
+        """Available providers ordered by expected time to a successful answer"""
+        candidates = [
+            provider
+            for provider in self.services
+            if self.get_provider_health(provider).is_available()
+        ]
+
+        # Unmeasured providers are assumed average, so the primary wins ties
+        measured = [
+            self.get_provider_health(p).latency_ewma_ms
+            for p in candidates
+            if self.get_provider_health(p).latency_ewma_ms is not None
+        ]
+        default_latency = (
+            sum(measured) / len(measured) if measured else self.default_hedge_delay_ms
+        )
+
+        return sorted(
+            candidates,
+            key=lambda p: (
+                self.get_provider_health(p).routing_cost(default_latency),
+                p != self.primary_provider,
+            ),
+        )
+
+    async def _invoke(
+        self,
+        provider: AIProvider,
+        operation: Callable[[BaseAIService], Awaitable[T]],
+    ) -> T:
+        """Call a single provider, recording latency and outcome"""
+        health = self.get_provider_health(provider)
+        if not health.acquire():
+            raise AIServiceError(
+                "Circuit half-open with a trial request in flight",
+                provider.value,
+                "circuit_open",
+            )
+        is_trial = health.state == CircuitState.HALF_OPEN
+        start_time = time.perf_counter()
+        try:
+            result = await operation(self.services[provider])
+        except asyncio.CancelledError:
+            if is_trial:
+                health.release()
+            raise
+        except Exception as e:
+            health.record_failure()
+            if isinstance(e, AIServiceError):
+                raise
+            raise AIServiceError(str(e), provider.value) from e
+
+        health.record_success((time.perf_counter() - start_time) * 1000)
+        return result
+
+    async def _route(
+        self,
+        operation: Callable[[BaseAIService], Awaitable[T]],
+        hedged: bool = False,
+    ) -> T:
+        """Run an operation on the best provider, falling back down the ranking"""
+        providers = self._ranked_providers()
+        if not providers:
+            raise AIServiceError("No AI providers available")
+
+        if hedged and len(providers) > 1:
             try:
-                return await self.services[self.primary_provider].generate_contract(
-                    request
-                )
+                return await self._hedged_call(providers[0], providers[1], operation)
             except AIServiceError as e:
-                self.logger.warning(
-                    f"Primary provider {self.primary_provider} failed: {e}"
-                )
+                self.logger.warning(f"Hedged request failed: {e}")
+                providers = providers[2:]
 
-        # Try fallback providers
-        for provider, service in self.services.items():
-            if provider != self.primary_provider:
-                try:
-                    self.logger.info(f"Falling back to {provider}")
-                    return await service.generate_contract(request)
-                except AIServiceError as e:
-                    self.logger.warning(f"Fallback provider {provider} failed: {e}")
-                    continue
+        for provider in providers:
+            try:
+                return await self._invoke(provider, operation)
+            except AIServiceError as e:
+                self.logger.warning(f"Provider {provider.value} failed: {e}")
 
         raise AIServiceError("All AI providers failed")
 
+    async def _hedged_call(
+        self,
+        first: AIProvider,
+        second: AIProvider,
+        operation: Callable[[BaseAIService], Awaitable[T]],
+    ) -> T:
+        """
+        Fire the first provider; if it hasn't answered within its p95 latency
+        (or has already failed), fire the second. First success wins and the
+        other request is cancelled.
+        """
+        hedge_delay_ms = (
+            self.get_provider_health(first).p95_latency_ms()
+            or self.default_hedge_delay_ms
+        )
+
+        tasks = [asyncio.create_task(self._invoke(first, operation))]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_delay_ms / 1000)
+            if done and tasks[0].exception() is None:
+                return tasks[0].result()
+
+            self.logger.info(
+                f"Hedging request to {second.value} after "
+                f"{'failure' if done else f'{hedge_delay_ms:.0f}ms'} from {first.value}"
+            )
+            tasks.append(asyncio.create_task(self._invoke(second, operation)))
+
+            pending = {task for task in tasks if not task.done()}
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+
+            raise AIServiceError(
+                f"Hedged providers {first.value} and {second.value} both failed"
+            )
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def generate_contract(
+        self, request: ContractGenerationRequest, hedged: bool = False
+    ) -> AIGenerationResult:
+        """
+        Generate contract using the best available provider with fallback
+        """
+        return await self._route(
+            lambda service: service.generate_contract(request), hedged=hedged
+        )
+
     async def analyze_contract_compliance(
-        self, contract_content: str
+        self, contract_content: str, hedged: bool = False
     ) -> Dict[str, Any]:
-        """Analyze contract compliance using available provider"""
-        for provider, service in self.services.items():
-            try:
-                return await service.analyze_contract_compliance(contract_content)
-            except AIServiceError:
-                continue
-
-        raise AIServiceError("Contract compliance analysis failed")
+        """Analyze contract compliance using the best available provider"""
+        try:
+            return await self._route(
+                lambda service: service.analyze_contract_compliance(contract_content),
+                hedged=hedged,
+            )
+        except AIServiceError:
+            raise AIServiceError("Contract compliance analysis failed")
 
     async def suggest_improvements(self, contract_content: str) -> List[str]:
-        """Suggest improvements using available provider"""
-        for provider, service in self.services.items():
-            try:
-                return await service.suggest_improvements(contract_content)
-            except AIServiceError:
-                continue
-
-        return []  # Return empty list if all providers fail
+        """Suggest improvements using the best available provider"""
+        try:
+            return await self._route(
+                lambda service: service.suggest_improvements(contract_content)
+            )
+        except AIServiceError:
+            return []  # Return empty list if all providers fail
 
     def get_available_providers(self) -> List[AIProvider]:
         """Get list of available AI providers"""
@@ -688,3 +974,10 @@ class AIContractService:
     def is_provider_available(self, provider: AIProvider) -> bool:
         """Check if specific provider is available"""
         return provider in self.services
+
+    def get_routing_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-provider routing statistics and circuit state"""
+        return {
+            provider.value: self.get_provider_health(provider).snapshot()
+            for provider in self.services
+        }
@@ -16,7 +16,12 @@ from contextlib import asynccontextmanager
 from app.core.config import settings
 from app.core.database import create_tables
 from app.core.template_seeder import async_seed_templates
+from app.domain.services.assessment_cache import assessment_cache
+from app.domain.services.uk_compliance_engine import uk_compliance_engine
+from app.services.document_render_service import document_render_service
+from app.services.job_queue_service import job_queue_service
 from app.api.v1.api import api_router
+from app.middleware.upload_limit import UploadSizeLimitMiddleware
 from fastapi.security import HTTPBearer
 
 # Configure logging
@@ -26,6 +31,17 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# The domain engine and its cache are built with defaults; apply settings
+assessment_cache.configure(
+    max_size=settings.ASSESSMENT_CACHE_SIZE,
+    persist_path=settings.ASSESSMENT_CACHE_PATH,
+)
+uk_compliance_engine.configure(
+    rules_path=settings.COMPLIANCE_RULES_PATH,
+    bundle_cache_dir=settings.RULE_BUNDLE_CACHE_DIR,
+    rules_reload_seconds=settings.COMPLIANCE_RULES_RELOAD_SECONDS,
+)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -45,6 +61,11 @@ async def lifespan(app: FastAPI):
         logger.error(f"❌ Template seeding failed: {e}")
         # Don't fail startup if template seeding fails
 
+    # In production jobs run in scripts/run_job_worker.py processes instead
+    if settings.JOB_WORKER_IN_PROCESS:
+        job_queue_service.start_worker()
+        logger.info("✅ In-process job worker started")
+
     logger.info("✅ Pactoria MVP Backend started successfully")
 
     yield
@@ -52,6 +73,13 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Shutting down Pactoria MVP Backend...")
 
+    # Jobs still running go back to the queue for the next worker
+    await job_queue_service.stop_worker()
+
+    # Keep memoised assessments across restarts (no-op unless configured)
+    assessment_cache.save()
+    document_render_service.shutdown()
+
 
 # Create FastAPI application with comprehensive OpenAPI configuration
 app = FastAPI(
@@ -226,6 +254,9 @@ app.openapi = custom_openapi
 # Security middleware
 app.add_middleware(TrustedHostMiddleware, allowed_hosts=["*"])
 
+# Upload size middleware, inside CORS so its 413s carry CORS headers
+app.add_middleware(UploadSizeLimitMiddleware)
+
 # CORS middleware with detailed configuration
 # Allow-all CORS in development or when explicitly enabled
 if settings.CORS_ALLOW_ALL or settings.ENVIRONMENT == "development":
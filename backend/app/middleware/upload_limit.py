@@ -0,0 +1,58 @@
+"""
+Upload Size Limit Middleware
+Caps the request body of file uploads as it arrives, before Starlette's form
+parser spools it to disk
+"""
+
+from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..core.config import settings
+
+# Allowance for the other form fields and multipart framing
+FORM_OVERHEAD_BYTES = 64 * 1024
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Refuse uploads that declare more than the size limit without reading
+    them, and stop reading uploads without a length once they pass it
+    """
+
+    def __init__(self, app: ASGIApp, path_suffix: str = "/files/upload"):
+        self.app = app
+        self.path_suffix = path_suffix
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or not scope["path"].endswith(self.path_suffix)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        limit = settings.MAX_FILE_SIZE_MB * 1024 * 1024 + FORM_OVERHEAD_BYTES
+        detail = f"File too large. Maximum size is {settings.MAX_FILE_SIZE_MB}MB"
+
+        declared = dict(scope["headers"]).get(b"content-length", b"")
+        if declared.isdigit() and int(declared) > limit:
+            response = JSONResponse(status_code=413, content={"detail": detail})
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Raised into the body parser; FastAPI passes HTTPExceptions
+                    # through to the app's handlers instead of answering 400
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
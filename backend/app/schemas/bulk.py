@@ -31,7 +31,7 @@ class BulkOperationStatus(str, Enum):
 class BulkContractOperation(BaseModel):
     """Bulk operation request for contracts"""
     operation_type: BulkOperationType
-    contract_ids: List[str] = Field(..., min_length=1, max_length=100)
+    contract_ids: List[str] = Field(..., min_length=1, max_length=50000)
     update_data: Optional[Dict[str, Any]] = None
 
     @field_validator('update_data')
@@ -67,9 +67,40 @@ class BulkOperationResponse(BaseModel):
     processing_time_seconds: Optional[float] = None
 
 
+class BulkJobResponse(BaseModel):
+    """Status and progress of a bulk job"""
+    job_id: str
+    operation_type: str
+    status: BulkOperationStatus
+    total_items: int
+    processed_items: int
+    successful_items: int
+    failed_items: int
+    progress_percentage: float
+    error_message: Optional[str] = None
+    created_at: Optional[str] = None
+    started_at: Optional[str] = None
+    completed_at: Optional[str] = None
+    expires_at: str
+    items_url: str
+    events_url: str
+    # Cancel the operation through /jobs/{background_job_id}/cancel
+    background_job_id: Optional[str] = None
+
+
+class BulkJobItemsResponse(BaseModel):
+    """A page of a bulk job's item results"""
+    job_id: str
+    items: List[BulkOperationItem]
+    offset: int
+    limit: int
+    total: int
+
+
 class BulkExportRequest(BaseModel):
     """Request for bulk export operations"""
-    export_format: str = Field(default="csv", pattern="^(csv|xlsx|json)$")
+    # csv: one table; json/pdf/docx: one file per contract (all in a ZIP)
+    export_format: str = Field(default="csv", pattern="^(csv|json|pdf|docx)$")
     filters: Optional[Dict[str, Any]] = None
     include_fields: Optional[List[str]] = None
     exclude_fields: Optional[List[str]] = None
@@ -84,6 +115,8 @@ class BulkExportResponse(BaseModel):
     expires_at: str
     file_size_bytes: Optional[int] = None
     record_count: int
+    status: Optional[BulkOperationStatus] = None
+    processed_count: int = 0
 
 
 class BulkImportRequest(BaseModel):
@@ -103,7 +136,9 @@ class BulkImportResponse(BaseModel):
     total_records: int
     imported_records: int
     failed_records: int
+    # The first rejected rows; error_report_url has all of them
     validation_errors: List[Dict[str, Any]]
+    error_report_url: Optional[str] = None
     processing_time_seconds: Optional[float] = None
 
 
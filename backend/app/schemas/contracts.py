@@ -185,6 +185,8 @@ class ComplianceScoreResponse(BaseModel):
     recommendations: List[str]
     analysis_date: datetime
     analysis_version: Optional[str]
+    # Rule engine score; the AI-enriched score follows over the WebSocket
+    is_provisional: bool = False
 
     class Config:
         from_attributes = True
@@ -212,6 +214,16 @@ class ContractAnalysisRequest(BaseModel):
     force_reanalysis: bool = False
 
 
+class PortfolioRescanRequest(BaseModel):
+    """Rescan a company's contracts with the current compliance rules"""
+
+    company_id: Optional[str] = None  # Defaults to the user's company
+    all_companies: bool = False  # System admins only
+    resume_after: Optional[str] = Field(
+        None, description="last_contract_id of an interrupted rescan"
+    )
+
+
 class TemplateResponse(BaseModel):
     """Template response"""
 
@@ -0,0 +1,45 @@
+"""
+Background job schema definitions for Pactoria MVP
+"""
+
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+
+
+class JobStatus(str, Enum):
+    """Lifecycle of a background job"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class BackgroundJobResponse(BaseModel):
+    """Status and progress of a background job"""
+    job_id: str
+    job_type: str
+    status: JobStatus
+    priority: int
+    attempts: int
+    max_attempts: int
+    progress: float
+    progress_message: Optional[str] = None
+    cancel_requested: bool = False
+    result: Optional[Dict[str, Any]] = None
+    error_message: Optional[str] = None
+    run_after: Optional[str] = None
+    created_at: Optional[str] = None
+    started_at: Optional[str] = None
+    completed_at: Optional[str] = None
+    events_url: str
+
+
+class BackgroundJobListResponse(BaseModel):
+    """A page of a company's background jobs, newest first"""
+    jobs: List[BackgroundJobResponse]
+    offset: int
+    limit: int
+    total: int
@@ -151,3 +151,31 @@ class ThreatIntelligenceResponse(BaseModel):
     recent_attacks: List[Dict[str, Any]]
     threat_level: str  # "low", "medium", "high", "critical"
     last_updated: datetime
+
+
+class ComplianceRuleSetResponse(BaseModel):
+    """Compliance rule set currently loaded"""
+
+    version: str
+    rule_set_version: str
+    rule_count: int
+    active_rule_count: int
+    source_path: Optional[str] = None
+    compiled_at: datetime
+
+
+class ComplianceRulesReloadRequest(BaseModel):
+    """Compliance rules reload request"""
+
+    # Rule-set data in the rule file's format; omit to re-read the rule file
+    definitions: Optional[Dict[str, Any]] = None
+
+
+class ComplianceRulesReloadResponse(ComplianceRuleSetResponse):
+    """Compliance rules reload result"""
+
+    previous_rule_set_version: str
+    added: List[str]
+    removed: List[str]
+    changed: List[str]
+    persisted: bool  # Written to the rule file, so every worker picks it up
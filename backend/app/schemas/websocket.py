@@ -37,6 +37,7 @@ class MessageType(str, Enum):
     # Real-time updates
     LIVE_UPDATE = "live_update"
     BULK_OPERATION = "bulk_operation"
+    COMPLIANCE_ANALYSIS = "compliance_analysis"
 
 
 class WebSocketMessage(BaseModel):
@@ -308,6 +309,23 @@ class BulkOperationMessage(WebSocketMessage):
     )
 
 
+class ComplianceAnalysisMessage(WebSocketMessage):
+    """AI-enriched compliance score following a provisional rule-engine score"""
+
+    type: MessageType = MessageType.COMPLIANCE_ANALYSIS
+    contract_id: str = Field(..., description="Analysed contract ID")
+    status: str = Field(..., description="Analysis status (COMPLETED, FAILED)")
+    provisional_score_id: str = Field(
+        ..., description="Rule-engine score returned by the analyze request"
+    )
+    compliance_score: Optional[Dict[str, Any]] = Field(
+        None, description="AI-enriched compliance score, once completed"
+    )
+    error_message: Optional[str] = Field(
+        None, description="Why the AI analysis failed; the provisional score stands"
+    )
+
+
 class BatchMessage(WebSocketMessage):
     """Batch of multiple messages"""
 
@@ -335,6 +353,7 @@ AnyWebSocketMessage = Union[
     UserTypingMessage,
     LiveUpdateMessage,
     BulkOperationMessage,
+    ComplianceAnalysisMessage,
     BatchMessage,
 ]
 
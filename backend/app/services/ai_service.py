@@ -4,17 +4,108 @@ Integrates with Groq API for contract generation and analysis
 Uses OpenAI GPT-OSS-120B model for high-quality legal content
 """
 
+import asyncio
+import re
 import time
 import json
 import logging
+from functools import lru_cache
 from typing import Dict, List, Optional, Any
 from groq import Groq
 from pydantic import BaseModel
 
 from app.core.config import settings
 
+# tiktoken gives exact token counts; fall back to a character estimate without it
+try:
+    import tiktoken
+
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Average characters per token for English legal text, used when tiktoken is absent
+CHARS_PER_TOKEN_ESTIMATE = 4
+
+# Clause boundaries: blank lines, or a new line starting a numbered clause
+# ("1.", "4.2", "12)") or a heading ("Clause 7", "SCHEDULE 2", "Article IV")
+CLAUSE_BOUNDARY_PATTERN = re.compile(
+    r"\n[ \t]*\n\s*"
+    r"|\n(?=[ \t]*(?:\d+(?:\.\d+)*[.)]?[ \t]+\S"
+    r"|(?:clause|section|article|schedule|appendix|annex)[ \t]+[\dIVXLC]+\b))",
+    re.IGNORECASE,
+)
+SENTENCE_BOUNDARY_PATTERN = re.compile(r"(?<=[.;:])\s+")
+
+
+@lru_cache(maxsize=1)
+def get_token_encoder():
+    """Load the tiktoken encoder once per process (None if unavailable)"""
+    if not TIKTOKEN_AVAILABLE:
+        return None
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning(f"Failed to load tiktoken encoder, using estimates: {e}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens in text using the cached encoder"""
+    encoder = get_token_encoder()
+    if encoder is None:
+        return len(text) // CHARS_PER_TOKEN_ESTIMATE + 1
+    return len(encoder.encode(text, disallowed_special=()))
+
+
+def split_contract_into_chunks(content: str, max_tokens: int) -> List[str]:
+    """
+    Split contract content into chunks of at most max_tokens tokens.
+    Chunks are cut on clause boundaries; a clause larger than the budget
+    is split on sentence boundaries, and as a last resort by length.
+    """
+    if count_tokens(content) <= max_tokens:
+        return [content]
+
+    pieces: List[tuple] = []
+    for clause in CLAUSE_BOUNDARY_PATTERN.split(content):
+        clause = clause.strip()
+        if not clause:
+            continue
+        clause_tokens = count_tokens(clause)
+        if clause_tokens <= max_tokens:
+            pieces.append((clause, clause_tokens))
+            continue
+        for sentence in SENTENCE_BOUNDARY_PATTERN.split(clause):
+            sentence_tokens = count_tokens(sentence)
+            if sentence_tokens <= max_tokens:
+                pieces.append((sentence, sentence_tokens))
+                continue
+            window = max_tokens * CHARS_PER_TOKEN_ESTIMATE // 2
+            for start in range(0, len(sentence), window):
+                part = sentence[start : start + window]
+                pieces.append((part, count_tokens(part)))
+
+    separator = "\n\n"
+    separator_tokens = count_tokens(separator)
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for piece, piece_tokens in pieces:
+        if current and current_tokens + separator_tokens + piece_tokens > max_tokens:
+            chunks.append(separator.join(current))
+            current, current_tokens = [], 0
+        if current:
+            current_tokens += separator_tokens
+        current.append(piece)
+        current_tokens += piece_tokens
+    if current:
+        chunks.append(separator.join(current))
+
+    return chunks
+
 
 class AIGenerationRequest(BaseModel):
     """AI generation request model"""
@@ -82,8 +173,16 @@ class GroqAIService:
     """Groq AI service client"""
 
     def __init__(self):
-        self.client = Groq(api_key=settings.GROQ_API_KEY)
-        self.model = settings.GROQ_MODEL
+        if settings.AI_PROVIDER == "simulated":
+            from app.services.simulated_ai_client import SimulatedAIClient
+
+            self.client = SimulatedAIClient.from_settings(
+                settings, token_counter=count_tokens
+            )
+            self.model = f"simulated/{settings.GROQ_MODEL}"
+        else:
+            self.client = Groq(api_key=settings.GROQ_API_KEY)
+            self.model = settings.GROQ_MODEL
         logger.info(f"Initialized Groq AI service with model: {self.model}")
 
     async def generate_content(
@@ -109,8 +208,9 @@ class GroqAIService:
                 )
                 messages.insert(1, {"role": "system", "content": context_message})
 
-            # Make API call
-            response = self.client.chat.completions.create(
+            # Make API call off the event loop so concurrent requests overlap
+            response = await asyncio.to_thread(
+                self.client.chat.completions.create,
                 model=self.model,
                 messages=messages,
                 max_tokens=request.max_tokens,
@@ -182,9 +282,45 @@ class GroqAIService:
     async def analyze_compliance(
         self, request: ComplianceAnalysisRequest
     ) -> ComplianceAnalysisResponse:
-        """Analyze contract for legal compliance"""
+        """
+        Analyze contract for legal compliance.
+        Contracts over the token budget are split on clause boundaries,
+        the chunks analysed in parallel and the findings merged.
+        """
+        chunks = split_contract_into_chunks(
+            request.contract_content, settings.AI_CHUNK_MAX_TOKENS
+        )
+        if len(chunks) == 1:
+            return await self._analyze_compliance_chunk(request)
+
+        logger.info(f"Analyzing compliance in {len(chunks)} chunks")
+        semaphore = asyncio.Semaphore(settings.AI_MAX_PARALLEL_CHUNKS)
+
+        async def analyze_chunk(index: int, chunk: str) -> ComplianceAnalysisResponse:
+            chunk_request = ComplianceAnalysisRequest(
+                contract_content=chunk,
+                contract_type=request.contract_type,
+                jurisdiction=request.jurisdiction,
+            )
+            async with semaphore:
+                return await self._analyze_compliance_chunk(
+                    chunk_request, part=(index + 1, len(chunks))
+                )
+
+        partial_results = await asyncio.gather(
+            *(analyze_chunk(index, chunk) for index, chunk in enumerate(chunks))
+        )
+
+        return self._merge_compliance_responses(
+            list(partial_results), [count_tokens(chunk) for chunk in chunks]
+        )
+
+    async def _analyze_compliance_chunk(
+        self, request: ComplianceAnalysisRequest, part: Optional[tuple] = None
+    ) -> ComplianceAnalysisResponse:
+        """Analyze a single prompt-sized piece of contract content"""
 
-        prompt = self._build_compliance_prompt(request)
+        prompt = self._build_compliance_prompt(request, part)
 
         ai_request = AIGenerationRequest(
             prompt=prompt,
@@ -256,12 +392,21 @@ Generate a complete, professional contract that can be used as-is for business p
 
         return prompt.strip()
 
-    def _build_compliance_prompt(self, request: ComplianceAnalysisRequest) -> str:
+    def _build_compliance_prompt(
+        self, request: ComplianceAnalysisRequest, part: Optional[tuple] = None
+    ) -> str:
         """Build prompt for compliance analysis"""
 
+        scope = ""
+        if part:
+            scope = f"""
+NOTE: This is part {part[0]} of {part[1]} of a longer contract. Assess only the
+clauses shown; do not report clauses as missing because they are not in this part.
+"""
+
         prompt = f"""
 Analyze the following UK {request.contract_type} contract for legal compliance and provide a detailed assessment:
-
+{scope}
 CONTRACT CONTENT:
 {request.contract_content}
 
@@ -358,6 +503,45 @@ After the JSON, provide a detailed analysis explaining your assessment.
             analysis_raw=content,
         )
 
+    def _merge_compliance_responses(
+        self, responses: List[ComplianceAnalysisResponse], weights: List[int]
+    ) -> ComplianceAnalysisResponse:
+        """Reduce per-chunk analyses into a single contract-level analysis"""
+        total_weight = sum(weights) or 1
+
+        def weighted(field_name: str) -> float:
+            total = sum(
+                getattr(response, field_name) * weight
+                for response, weight in zip(responses, weights)
+            )
+            return round(total / total_weight, 3)
+
+        # Findings are de-duplicated but keep the order they appear in the contract
+        risk_factors = list(
+            dict.fromkeys(f for response in responses for f in response.risk_factors)
+        )
+        recommendations = list(
+            dict.fromkeys(r for response in responses for r in response.recommendations)
+        )
+
+        analysis_raw = "\n\n".join(
+            f"--- Part {index} of {len(responses)} ---\n{response.analysis_raw}"
+            for index, response in enumerate(responses, start=1)
+        )
+
+        return ComplianceAnalysisResponse(
+            overall_score=weighted("overall_score"),
+            gdpr_compliance=weighted("gdpr_compliance"),
+            employment_law_compliance=weighted("employment_law_compliance"),
+            consumer_rights_compliance=weighted("consumer_rights_compliance"),
+            commercial_terms_compliance=weighted("commercial_terms_compliance"),
+            # A contract is as risky as its riskiest part
+            risk_score=max(response.risk_score for response in responses),
+            risk_factors=risk_factors,
+            recommendations=recommendations,
+            analysis_raw=analysis_raw,
+        )
+
     async def health_check(self) -> Dict[str, Any]:
         """Check AI service health"""
         try:
@@ -0,0 +1,433 @@
+"""
+Audit log exports for Pactoria MVP
+Audit entries are read from the database a chunk at a time and written to
+disk as CSV, JSON, JSONL or Parquet, optionally compressed on the fly, by a
+job worker. The finished file is served with HTTP Range support for resumed
+downloads
+"""
+
+import csv
+import gzip
+import io
+import json
+import logging
+from contextlib import ExitStack
+from datetime import datetime
+from enum import Enum
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from sqlalchemy import func, or_, tuple_
+from sqlalchemy.orm import Query, Session
+
+from app.core.config import settings
+from app.infrastructure.database.models import (
+    AuditAction,
+    AuditLog,
+    AuditResourceType,
+    AuditRiskLevel,
+    BulkJob,
+    User,
+)
+from app.schemas.bulk import BulkOperationStatus
+from app.services.file_export_service import (
+    FileExportService,
+    ProgressCallback,
+    plain_value,
+)
+from app.services.job_queue_service import JobContext, job_queue_service
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    import zstandard
+
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+AUDIT_EXPORT_JOB = "audit_export"
+
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "JSON": ("json", "application/json"),
+    "JSONL": ("jsonl", "application/x-ndjson"),
+    "PARQUET": ("parquet", "application/vnd.apache.parquet"),
+}
+
+COMPRESSIONS = {
+    "gzip": ("gz", "application/gzip"),
+    "zstd": ("zst", "application/zstd"),
+}
+
+AUDIT_COLUMNS = [
+    "id",
+    "timestamp",
+    "user_id",
+    "user_name",
+    "user_role",
+    "action",
+    "resource_type",
+    "resource_id",
+    "resource_name",
+    "contract_id",
+    "details",
+    "ip_address",
+    "user_agent",
+    "location",
+    "risk_level",
+    "compliance_flag",
+]
+METADATA_COLUMNS = ["old_values", "new_values", "additional_metadata"]
+
+
+class AuditExportError(Exception):
+    """Export request that can't be served"""
+
+
+def audit_entries_query(
+    db: Session,
+    filters: Optional[Dict[str, Any]] = None,
+    company_id: Optional[str] = None,
+    all_companies: bool = False,
+) -> Query:
+    """
+    Audit entries matching an export's filters (AuditEntryFilter fields, as
+    plain JSON), limited to the entries of company_id's users unless
+    all_companies is set
+    """
+    query = db.query(AuditLog)
+    if not all_companies:
+        query = query.join(User, AuditLog.user_id == User.id).filter(
+            User.company_id == company_id
+        )
+    filters = filters or {}
+
+    if filters.get("user_id"):
+        query = query.filter(AuditLog.user_id == filters["user_id"])
+
+    for name, column, enum_class in (
+        ("action", AuditLog.action, AuditAction),
+        ("resource_type", AuditLog.resource_type, AuditResourceType),
+        ("risk_level", AuditLog.risk_level, AuditRiskLevel),
+    ):
+        if filters.get(name):
+            try:
+                query = query.filter(column == enum_class(filters[name].lower()))
+            except ValueError:
+                pass
+
+    if filters.get("compliance_flag") is not None:
+        query = query.filter(AuditLog.compliance_flag == filters["compliance_flag"])
+
+    if filters.get("date_from"):
+        query = query.filter(
+            AuditLog.timestamp >= datetime.fromisoformat(filters["date_from"])
+        )
+
+    if filters.get("date_to"):
+        query = query.filter(
+            AuditLog.timestamp <= datetime.fromisoformat(filters["date_to"])
+        )
+
+    if filters.get("search"):
+        search_term = f"%{filters['search'].lower()}%"
+        query = query.filter(
+            or_(
+                func.lower(AuditLog.user_name).like(search_term),
+                func.lower(AuditLog.resource_name).like(search_term),
+                func.lower(AuditLog.details).like(search_term),
+            )
+        )
+    return query
+
+
+def export_columns(job: BulkJob) -> List[str]:
+    if job.parameters["include_metadata"]:
+        return AUDIT_COLUMNS + METADATA_COLUMNS
+    return AUDIT_COLUMNS
+
+
+def export_media_type(job: BulkJob) -> str:
+    compression = job.parameters["compression"]
+    if compression:
+        return COMPRESSIONS[compression][1]
+    return EXPORT_FORMATS[job.parameters["export_format"]][1]
+
+
+def audit_export_data(job: BulkJob) -> Dict[str, Any]:
+    """An audit export's status, as the audit API reports it"""
+    if job.status == BulkOperationStatus.COMPLETED.value:
+        progress = 100.0
+    elif job.total_items:
+        progress = round(100 * job.processed_items / job.total_items, 1)
+    else:
+        progress = 0.0
+    return {
+        "export_id": job.id,
+        "format": job.parameters["export_format"],
+        "compression": job.parameters["compression"],
+        "status": job.status,
+        "total_records": job.total_items,
+        "processed_records": job.processed_items,
+        "progress_percent": progress,
+        "file_size_bytes": job.file_size_bytes,
+        "download_url": f"/api/v1/audit/exports/{job.id}/download",
+        "expires_at": job.expires_at,
+        "completed_at": job.completed_at,
+        "include_metadata": job.parameters["include_metadata"],
+        "error_message": job.error_message,
+    }
+
+
+class _CsvWriter:
+    def __init__(self, stream, columns: List[str]):
+        self._text = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+        self._writer = csv.writer(self._text)
+        self._writer.writerow(columns)
+
+    def write(self, rows: Sequence):
+        self._writer.writerows(
+            [
+                json.dumps(value) if isinstance(value, (dict, list)) else value
+                for value in map(plain_value, row)
+            ]
+            for row in rows
+        )
+
+    def close(self):
+        self._text.flush()
+        self._text.detach()
+
+
+class _JsonLinesWriter:
+    def __init__(self, stream, columns: List[str]):
+        self._text = io.TextIOWrapper(stream, encoding="utf-8", newline="\n")
+        self._columns = columns
+
+    def _encode(self, row) -> str:
+        return json.dumps(dict(zip(self._columns, map(plain_value, row))))
+
+    def write(self, rows: Sequence):
+        self._text.writelines(f"{self._encode(row)}\n" for row in rows)
+
+    def close(self):
+        self._text.flush()
+        self._text.detach()
+
+
+class _JsonArrayWriter(_JsonLinesWriter):
+    """A single JSON array, written one element at a time"""
+
+    def __init__(self, stream, columns: List[str]):
+        super().__init__(stream, columns)
+        self._separator = "[\n"
+
+    def write(self, rows: Sequence):
+        for row in rows:
+            self._text.write(self._separator + self._encode(row))
+            self._separator = ",\n"
+
+    def close(self):
+        self._text.write("[]\n" if self._separator == "[\n" else "\n]\n")
+        super().close()
+
+
+class _ParquetWriter:
+    """One row group per chunk; Parquet compresses its own pages"""
+
+    def __init__(self, stream, columns: List[str], compression: Optional[str]):
+        types = {
+            "timestamp": pa.timestamp("us", tz="UTC"),
+            "compliance_flag": pa.bool_(),
+        }
+        self._schema = pa.schema(
+            [(name, types.get(name, pa.string())) for name in columns]
+        )
+        self._columns = columns
+        self._writer = pq.ParquetWriter(
+            stream, self._schema, compression=compression or "snappy"
+        )
+
+    def write(self, rows: Sequence):
+        data = {name: [] for name in self._columns}
+        for row in rows:
+            for name, value in zip(self._columns, row):
+                if isinstance(value, Enum):
+                    value = value.value
+                elif isinstance(value, (dict, list)):
+                    value = json.dumps(value)
+                data[name].append(value)
+        self._writer.write_table(pa.table(data, schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+
+class AuditExportService(FileExportService):
+    """
+    Writes audit exports on job workers and keeps them downloadable until
+    they expire. Memory use depends on the chunk size, not on the number of
+    audit entries exported.
+    """
+
+    export_type = AUDIT_EXPORT_JOB
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        export_dir: Optional[str] = None,
+        chunk_size: Optional[int] = None,
+        **kwargs,
+    ):
+        super().__init__(session_factory, export_dir, **kwargs)
+        self._chunk_size = chunk_size
+
+    @property
+    def default_export_dir(self) -> str:
+        return settings.AUDIT_EXPORT_DIR
+
+    @property
+    def ttl_hours(self) -> float:
+        return settings.AUDIT_EXPORT_TTL_HOURS
+
+    @property
+    def chunk_size(self) -> int:
+        return self._chunk_size or settings.AUDIT_EXPORT_CHUNK_SIZE
+
+    def file_name(self, job: BulkJob) -> str:
+        export_format = job.parameters["export_format"]
+        compression = job.parameters["compression"]
+        extension = EXPORT_FORMATS[export_format][0]
+        # Parquet compresses inside the file instead of around it
+        if compression and export_format != "PARQUET":
+            extension += f".{COMPRESSIONS[compression][0]}"
+        return f"audit_export_{job.id[:8]}.{extension}"
+
+    @staticmethod
+    def validate(export_format: str, compression: Optional[str]):
+        """Raise AuditExportError for a format or compression not on offer"""
+        if export_format not in EXPORT_FORMATS:
+            raise AuditExportError(
+                f"Unsupported export format '{export_format}'; "
+                f"use one of {', '.join(EXPORT_FORMATS)}"
+            )
+        if export_format == "PARQUET" and not PYARROW_AVAILABLE:
+            raise AuditExportError("Parquet exports require pyarrow")
+        if compression and compression not in COMPRESSIONS:
+            raise AuditExportError(
+                f"Unsupported compression '{compression}'; "
+                f"use one of {', '.join(COMPRESSIONS)}"
+            )
+        if compression == "zstd" and not ZSTD_AVAILABLE:
+            raise AuditExportError("zstd compression requires zstandard")
+
+    def start(
+        self,
+        db: Session,
+        user: User,
+        filters: Optional[Dict[str, Any]] = None,
+        all_companies: bool = False,
+        export_format: str = "JSON",
+        compression: Optional[str] = None,
+        include_metadata: bool = True,
+    ) -> BulkJob:
+        """
+        Record an export of the audit entries matching filters (see
+        audit_entries_query) by user's company, and queue the writing of it
+        """
+        export_format = export_format.upper()
+        compression = compression.lower() if compression else None
+        self.validate(export_format, compression)
+        return self.create(
+            db,
+            user,
+            total_items=audit_entries_query(
+                db, filters, user.company_id, all_companies
+            ).count(),
+            parameters={
+                "filters": filters,
+                "all_companies": all_companies,
+                "export_format": export_format,
+                "compression": compression,
+                "include_metadata": include_metadata,
+            },
+        )
+
+    def _open_writer(self, stack: ExitStack, job: BulkJob, path: str):
+        export_format = job.parameters["export_format"]
+        compression = job.parameters["compression"]
+        columns = export_columns(job)
+        raw = stack.enter_context(open(path, "wb"))
+        if export_format == "PARQUET":
+            return _ParquetWriter(raw, columns, compression)
+        if compression == "gzip":
+            stream = stack.enter_context(gzip.GzipFile(fileobj=raw, mode="wb"))
+        elif compression == "zstd":
+            stream = stack.enter_context(
+                zstandard.ZstdCompressor().stream_writer(raw, closefd=False)
+            )
+        else:
+            stream = raw
+        if export_format == "CSV":
+            return _CsvWriter(stream, columns)
+        if export_format == "JSONL":
+            return _JsonLinesWriter(stream, columns)
+        return _JsonArrayWriter(stream, columns)
+
+    def _chunks(self, db: Session, job: BulkJob) -> Iterator[Sequence]:
+        # Keyset paged in export order, each chunk read in full; plain rows,
+        # no ORM objects
+        query = audit_entries_query(
+            db,
+            job.parameters["filters"],
+            job.company_id,
+            job.parameters["all_companies"],
+        ).with_entities(*(getattr(AuditLog, c) for c in export_columns(job)))
+        last = None
+        while True:
+            page = query
+            if last is not None:
+                page = page.filter(
+                    tuple_(AuditLog.timestamp, AuditLog.id)
+                    > tuple_(last.timestamp, last.id)
+                )
+            rows = (
+                page.order_by(AuditLog.timestamp, AuditLog.id)
+                .limit(self.chunk_size)
+                .all()
+            )
+            if not rows:
+                return
+            yield rows
+            last = rows[-1]
+
+    def write_file(
+        self, db: Session, job: BulkJob, path: str, report: ProgressCallback
+    ):
+        """Write the file of an export"""
+        with ExitStack() as stack:
+            writer = self._open_writer(stack, job, path)
+            processed = 0
+            for rows in self._chunks(db, job):
+                writer.write(rows)
+                processed += len(rows)
+                report(processed)
+            writer.close()
+
+
+# Global audit export service instance
+audit_export_service = AuditExportService()
+
+
+@job_queue_service.handler(AUDIT_EXPORT_JOB)
+async def run_audit_export_job(context: JobContext) -> Dict[str, Any]:
+    """Job handler writing an audit export's file"""
+    return await audit_export_service.run(context)
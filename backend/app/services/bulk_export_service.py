@@ -0,0 +1,258 @@
+"""
+Bulk contract exports for Pactoria MVP
+Matching contracts are read from the database a batch at a time, rendered
+(PDF/DOCX in the document render worker pool) and appended to a ZIP archive
+on disk by a job worker. The archive is written append-only, so it can be
+downloaded while it is still being built, and the finished file is served
+with HTTP Range support for resumed downloads
+"""
+
+import csv
+import io
+import json
+import logging
+import zipfile
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Query, Session
+
+from app.core.config import settings
+from app.infrastructure.database.models import BulkJob, Contract, User
+from app.schemas.bulk import (
+    BulkExportRequest,
+    BulkExportResponse,
+    BulkOperationStatus,
+)
+from app.services.document_render_service import (
+    DocumentRenderService,
+    document_render_service,
+    export_filename,
+    render_payload,
+)
+from app.services.file_export_service import (
+    FileExportService,
+    ProgressCallback,
+    plain_value,
+)
+from app.services.job_queue_service import JobContext, job_queue_service
+
+logger = logging.getLogger(__name__)
+
+CONTRACT_EXPORT_JOB = "contract_export"
+
+# PDF and DOCX are compressed already; deflating them again only costs CPU
+STORED_FORMATS = ("pdf", "docx")
+
+
+class _AppendOnlyFile:
+    """
+    File wrapper without seek or tell. zipfile then writes data descriptors
+    after each member instead of patching its header, so bytes already on
+    disk never change and a reader can follow the archive as it grows.
+    """
+
+    def __init__(self, raw):
+        self._raw = raw
+
+    def write(self, data) -> int:
+        return self._raw.write(data)
+
+    def flush(self):
+        self._raw.flush()
+
+
+def export_fields(export_request: BulkExportRequest) -> List[str]:
+    """Contract columns included in an export, in column order"""
+    columns = [attr.key for attr in inspect(Contract).column_attrs]
+    if export_request.include_fields:
+        columns = [c for c in columns if c in export_request.include_fields]
+    if export_request.exclude_fields:
+        columns = [c for c in columns if c not in export_request.exclude_fields]
+    return columns
+
+
+def contract_record(contract: Contract, fields: List[str]) -> Dict[str, Any]:
+    return {name: plain_value(getattr(contract, name)) for name in fields}
+
+
+def archive_filename(job: BulkJob) -> str:
+    """The name an export's archive is downloaded as"""
+    return f"contracts_export_{job.id[:8]}.zip"
+
+
+def bulk_export_response(job: BulkJob, message: str) -> BulkExportResponse:
+    return BulkExportResponse(
+        success=job.status != BulkOperationStatus.FAILED.value,
+        message=job.error_message or message,
+        export_id=job.id,
+        download_url=f"/api/v1/bulk/exports/{job.id}/download",
+        expires_at=job.expires_at.isoformat() if job.expires_at else "",
+        file_size_bytes=job.file_size_bytes,
+        record_count=job.total_items,
+        status=job.status,
+        processed_count=job.processed_items,
+    )
+
+
+class BulkExportService(FileExportService):
+    """
+    Builds contract export archives on job workers and keeps them
+    downloadable until they expire. Memory use depends on the batch size,
+    not on the number of contracts exported.
+    """
+
+    export_type = CONTRACT_EXPORT_JOB
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        export_dir: Optional[str] = None,
+        render_service: Optional[DocumentRenderService] = None,
+        batch_size: Optional[int] = None,
+        **kwargs,
+    ):
+        super().__init__(session_factory, export_dir, **kwargs)
+        self._render_service = render_service
+        self._batch_size = batch_size
+
+    @property
+    def default_export_dir(self) -> str:
+        return settings.BULK_EXPORT_DIR
+
+    @property
+    def ttl_hours(self) -> float:
+        return settings.BULK_EXPORT_TTL_HOURS
+
+    @property
+    def render_service(self) -> DocumentRenderService:
+        return self._render_service or document_render_service
+
+    @property
+    def batch_size(self) -> int:
+        return self._batch_size or settings.BULK_EXPORT_BATCH_SIZE
+
+    def file_name(self, job: BulkJob) -> str:
+        return f"{job.id}.zip"
+
+    def _contracts_query(
+        self, db: Session, company_id: str, filters: Optional[Dict[str, Any]]
+    ) -> Query:
+        query = db.query(Contract).filter(Contract.company_id == company_id)
+        columns = inspect(Contract).columns
+        for name, value in (filters or {}).items():
+            if name not in columns:
+                continue
+            # Stored filters are plain JSON; enum columns want their members
+            enum_class = getattr(columns[name].type, "enum_class", None)
+            if enum_class is not None and value is not None:
+                value = enum_class(value)
+            query = query.filter(columns[name] == value)
+        return query
+
+    def start(
+        self, db: Session, export_request: BulkExportRequest, user: User
+    ) -> BulkJob:
+        """Record an export and queue the building of its archive"""
+        return self.create(
+            db,
+            user,
+            total_items=self._contracts_query(
+                db, user.company_id, export_request.filters
+            ).count(),
+            parameters={
+                "export_format": export_request.export_format,
+                "filters": export_request.model_dump(mode="json")["filters"],
+                "fields": export_fields(export_request),
+            },
+        )
+
+    def _batches(self, db: Session, job: BulkJob) -> Iterator[List[Contract]]:
+        # Keyset paged, each page read in full: the session's identity map
+        # holds contracts weakly, so written batches are freed as it goes
+        query = self._contracts_query(
+            db, job.company_id, job.parameters["filters"]
+        ).order_by(Contract.id)
+        last_id = None
+        while True:
+            page = query if last_id is None else query.filter(Contract.id > last_id)
+            batch = page.limit(self.batch_size).all()
+            if not batch:
+                return
+            yield batch
+            last_id = batch[-1].id
+
+    def write_file(
+        self, db: Session, job: BulkJob, path: str, report: ProgressCallback
+    ):
+        """Write the archive of an export"""
+        with open(path, "wb") as raw:
+            with zipfile.ZipFile(
+                _AppendOnlyFile(raw), "w", compression=zipfile.ZIP_DEFLATED
+            ) as archive:
+                if job.parameters["export_format"] == "csv":
+                    self._write_table(archive, raw, db, job, report)
+                else:
+                    processed = 0
+                    for batch in self._batches(db, job):
+                        self._write_documents(archive, batch, job)
+                        raw.flush()
+                        processed += len(batch)
+                        report(processed)
+
+    def _write_documents(
+        self, archive: zipfile.ZipFile, batch: List[Contract], job: BulkJob
+    ):
+        fmt = job.parameters["export_format"]
+        if fmt == "json":
+            fields = job.parameters["fields"]
+            documents = (
+                json.dumps(contract_record(c, fields), indent=2).encode("utf-8")
+                for c in batch
+            )
+        else:
+            documents = self.render_service.render_batch(
+                fmt, [render_payload(c) for c in batch]
+            )
+        compression = (
+            zipfile.ZIP_STORED if fmt in STORED_FORMATS else zipfile.ZIP_DEFLATED
+        )
+        for contract, document in zip(batch, documents):
+            archive.writestr(
+                export_filename(contract.title, contract.id, fmt, id_length=None),
+                document,
+                compress_type=compression,
+            )
+
+    def _write_table(
+        self,
+        archive: zipfile.ZipFile,
+        raw,
+        db: Session,
+        job: BulkJob,
+        report: ProgressCallback,
+    ):
+        fields = job.parameters["fields"]
+        # Size unknown up front: allow the member to pass 4GB
+        with archive.open("contracts.csv", "w", force_zip64=True) as member:
+            text = io.TextIOWrapper(member, encoding="utf-8", newline="")
+            writer = csv.writer(text)
+            writer.writerow(fields)
+            processed = 0
+            for batch in self._batches(db, job):
+                writer.writerows(contract_record(c, fields).values() for c in batch)
+                text.flush()
+                raw.flush()
+                processed += len(batch)
+                report(processed)
+            text.detach()
+
+
+# Global bulk export service instance
+bulk_export_service = BulkExportService()
+
+
+@job_queue_service.handler(CONTRACT_EXPORT_JOB)
+async def run_contract_export_job(context: JobContext) -> Dict[str, Any]:
+    """Job handler building a contract export's archive"""
+    return await bulk_export_service.run(context)
@@ -0,0 +1,374 @@
+"""
+Bulk contract imports for Pactoria MVP
+Uploads are parsed incrementally (CSV rows, or the elements of a JSON array),
+mapped and validated in batches and inserted with one executemany per batch,
+committed batch by batch. Rows that fail are written to an error report on
+disk, so memory stays flat however large the upload
+"""
+
+import csv
+import io
+import json
+import logging
+import os
+import re
+from datetime import datetime
+from itertools import islice
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from uuid import uuid4
+
+from sqlalchemy import Boolean, DateTime, Float, Integer, insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.datetime_utils import get_current_utc
+from app.infrastructure.database.models import Contract, User
+from app.schemas.bulk import (
+    BulkImportRequest,
+    BulkImportResponse,
+    BulkOperationStatus,
+)
+
+try:
+    import ijson
+
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_FIELDS = ("title", "contract_type")
+# Set by the importer, never by the file
+PROTECTED_FIELDS = {"id", "company_id", "created_by", "created_at", "updated_at"}
+
+# Errors returned inline; the rest are only in the error report
+ERROR_SAMPLE_SIZE = 100
+READ_CHARS = 64 * 1024
+MAX_RECORD_CHARS = 16 * 1024 * 1024
+
+_WHITESPACE = re.compile(r"\s*")
+
+
+class ImportFileError(ValueError):
+    """Upload that can't be parsed at all"""
+
+
+def iter_csv_records(stream: IO[bytes]) -> Iterator[Dict[str, Any]]:
+    """Rows of a CSV byte stream as dicts, one at a time"""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        yield from csv.DictReader(text)
+    except csv.Error as e:
+        raise ImportFileError(f"Invalid CSV: {e}")
+    finally:
+        text.detach()
+
+
+def iter_json_records(stream: IO[bytes]) -> Iterator[Any]:
+    """Elements of a top-level JSON array, one at a time"""
+    if IJSON_AVAILABLE:
+        try:
+            yield from ijson.items(stream, "item", use_float=True)
+        except ijson.JSONError as e:
+            raise ImportFileError(f"Invalid JSON: {e}")
+        return
+
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig")
+    try:
+        yield from _iter_json_array(text)
+    finally:
+        text.detach()
+
+
+def _iter_json_array(text: IO[str]) -> Iterator[Any]:
+    # Decodes element by element from a sliding window of the text, so only
+    # the element being parsed (and one read) is held in memory
+    decoder = json.JSONDecoder()
+    buffer, position, eof = "", 0, False
+    expect = "["
+
+    while True:
+        position = _WHITESPACE.match(buffer, position).end()
+        if position == len(buffer) and eof:
+            raise ImportFileError("Invalid JSON: unexpected end of file")
+        char = buffer[position] if position < len(buffer) else ""
+
+        if char and expect == "[":
+            if char != "[":
+                raise ImportFileError("JSON imports must be an array of records")
+            position, expect = position + 1, "first"
+            continue
+        if char == "]" and expect in ("first", ","):
+            return
+        if char and expect == ",":
+            if char != ",":
+                raise ImportFileError(
+                    f"Invalid JSON: expected ',' or ']', got {char!r}"
+                )
+            position, expect = position + 1, "value"
+            continue
+
+        if char:
+            try:
+                value, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError as e:
+                # Incomplete, or just invalid: read on, but only so far
+                if eof or len(buffer) - position > MAX_RECORD_CHARS:
+                    raise ImportFileError(f"Invalid JSON: {e}")
+            else:
+                # A value running to the end of the window may continue in
+                # the next read (e.g. a number split across reads)
+                if end < len(buffer) or eof:
+                    yield value
+                    position, expect = end, ","
+                    continue
+
+        chunk = text.read(READ_CHARS)
+        buffer, position, eof = buffer[position:] + chunk, 0, not chunk
+
+
+RECORD_READERS = {"csv": iter_csv_records, "json": iter_json_records}
+
+
+def _convert(column, value):
+    """Convert a raw file value to what a contract column stores"""
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    column_type = column.type
+    enum_class = getattr(column_type, "enum_class", None)
+    if enum_class is not None:
+        try:
+            return enum_class(value)
+        except ValueError:
+            # Legacy systems often export enum names, e.g. SERVICE_AGREEMENT
+            return enum_class[str(value).strip().upper()]
+    if isinstance(column_type, Float):
+        return float(value)
+    if isinstance(column_type, Boolean):
+        if isinstance(value, bool):
+            return value
+        return str(value).strip().lower() in ("true", "1", "yes", "y")
+    if isinstance(column_type, Integer):
+        return int(value)
+    if isinstance(column_type, DateTime):
+        return value if isinstance(value, datetime) else datetime.fromisoformat(value)
+    return value
+
+
+def map_record(
+    record: Any, mapping: Dict[str, str], validate: bool = True
+) -> Tuple[Dict[str, Any], List[str]]:
+    """Contract column values for one record, and what's wrong with it"""
+    if not isinstance(record, dict):
+        return {}, ["Record must be an object"]
+
+    columns = Contract.__table__.columns
+    values: Dict[str, Any] = {}
+    errors: List[str] = []
+    for contract_field, import_field in mapping.items():
+        if contract_field not in columns or contract_field in PROTECTED_FIELDS:
+            continue
+        if import_field not in record:
+            continue
+        try:
+            values[contract_field] = _convert(
+                columns[contract_field], record[import_field]
+            )
+        except (KeyError, TypeError, ValueError):
+            errors.append(
+                f"Invalid value for {contract_field}: {record[import_field]!r}"
+            )
+
+    if validate:
+        for field in REQUIRED_FIELDS:
+            if values.get(field) is None and not any(
+                error.startswith(f"Invalid value for {field}:") for error in errors
+            ):
+                errors.append(f"Missing required field: {field}")
+    return values, errors
+
+
+def _batches(items: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class _ErrorReport:
+    """Rejected rows as JSON lines; the file is only created when needed"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self.sample: List[Dict[str, Any]] = []
+        self._file = None
+
+    def add(self, row: int, record: Any, errors: List[str]):
+        entry = {"row": row, "record": record, "errors": errors}
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._file = open(self.path, "w", encoding="utf-8")
+        self._file.write(json.dumps(entry, default=str) + "\n")
+        if len(self.sample) < ERROR_SAMPLE_SIZE:
+            self.sample.append(entry)
+        self.count += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+def error_report_path(company_id: str, import_id: str) -> str:
+    # Kept per company so a report is only served to the importing company
+    return os.path.join(
+        settings.BULK_IMPORT_DIR, company_id, f"{import_id}.errors.jsonl"
+    )
+
+
+class BulkImportService:
+    """Streams uploaded contract files into the database in batches"""
+
+    def __init__(self, batch_size: Optional[int] = None):
+        self._batch_size = batch_size
+
+    @property
+    def batch_size(self) -> int:
+        return self._batch_size or settings.BULK_IMPORT_BATCH_SIZE
+
+    def import_contracts(
+        self,
+        db: Session,
+        import_request: BulkImportRequest,
+        source: IO[bytes],
+        user: User,
+    ) -> BulkImportResponse:
+        """Import contracts from a binary file object; blocking"""
+        import_id = str(uuid4())
+        started_at = get_current_utc()
+        reader = RECORD_READERS.get(import_request.file_format)
+        if reader is None:
+            return self._failed(
+                import_id,
+                f"Unsupported file format: {import_request.file_format}",
+            )
+
+        report = _ErrorReport(error_report_path(user.company_id, import_id))
+        total = imported = 0
+        try:
+            numbered = enumerate(reader(source), start=1)
+            for batch in _batches(numbered, self.batch_size):
+                total += len(batch)
+                rows = []
+                for row, record in batch:
+                    values, errors = map_record(
+                        record,
+                        import_request.mapping,
+                        validate=not import_request.skip_validation,
+                    )
+                    if errors:
+                        report.add(row, record, errors)
+                        continue
+                    values["company_id"] = user.company_id
+                    values["created_by"] = user.id
+                    rows.append((row, record, values))
+                imported += self._insert(db, rows, report)
+        except ImportFileError as e:
+            db.rollback()
+            return self._failed(
+                import_id, str(e), total, imported, report, started_at
+            )
+        finally:
+            report.close()
+
+        if report.count == 0:
+            status = BulkOperationStatus.COMPLETED
+        elif imported:
+            status = BulkOperationStatus.PARTIAL_SUCCESS
+        else:
+            status = BulkOperationStatus.FAILED
+        logger.info(
+            f"Import {import_id}: {imported} of {total} contracts imported, "
+            f"{report.count} rejected"
+        )
+        return BulkImportResponse(
+            success=status != BulkOperationStatus.FAILED,
+            message="Import completed",
+            import_id=import_id,
+            status=status,
+            total_records=total,
+            imported_records=imported,
+            failed_records=report.count,
+            validation_errors=report.sample,
+            error_report_url=self._report_url(import_id, report),
+            processing_time_seconds=(get_current_utc() - started_at).total_seconds(),
+        )
+
+    def _insert(
+        self,
+        db: Session,
+        rows: List[Tuple[int, Any, Dict[str, Any]]],
+        report: _ErrorReport,
+    ) -> int:
+        """Insert a batch with one executemany; on failure, row by row"""
+        if not rows:
+            return 0
+        try:
+            db.execute(insert(Contract), [values for _, _, values in rows])
+            db.commit()
+            return len(rows)
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.warning(f"Import batch rejected, retrying per row: {e}")
+
+        inserted = 0
+        for row, record, values in rows:
+            try:
+                db.execute(insert(Contract), [values])
+                db.commit()
+                inserted += 1
+            except SQLAlchemyError as e:
+                db.rollback()
+                report.add(row, record, [str(getattr(e, "orig", None) or e)])
+        return inserted
+
+    @staticmethod
+    def _report_url(import_id: str, report: _ErrorReport) -> Optional[str]:
+        if not report.count:
+            return None
+        return f"/api/v1/bulk/imports/{import_id}/errors"
+
+    def _failed(
+        self,
+        import_id: str,
+        message: str,
+        total: int = 0,
+        imported: int = 0,
+        report: Optional[_ErrorReport] = None,
+        started_at: Optional[datetime] = None,
+    ) -> BulkImportResponse:
+        return BulkImportResponse(
+            success=False,
+            message=f"Import failed: {message}",
+            import_id=import_id,
+            status=(
+                BulkOperationStatus.PARTIAL_SUCCESS
+                if imported
+                else BulkOperationStatus.FAILED
+            ),
+            total_records=total,
+            imported_records=imported,
+            failed_records=report.count if report else 0,
+            validation_errors=(report.sample if report else []) + [{"error": message}],
+            error_report_url=self._report_url(import_id, report) if report else None,
+            processing_time_seconds=(
+                (get_current_utc() - started_at).total_seconds()
+                if started_at
+                else None
+            ),
+        )
+
+
+# Global bulk import service instance
+bulk_import_service = BulkImportService()
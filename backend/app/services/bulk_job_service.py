@@ -0,0 +1,240 @@
+"""
+Durable bulk jobs for Pactoria MVP
+Bulk operations record their status, progress counters and per-item results
+in the database, so any request or worker process can poll or follow a job
+and clients don't have to hold a connection open while it runs
+"""
+
+import asyncio
+import logging
+import os
+from datetime import timedelta
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.core import database
+from app.core.config import settings
+from app.core.datetime_utils import get_current_utc
+from app.infrastructure.database.models import BulkJob, BulkJobItem, User
+from app.schemas.bulk import BulkJobResponse, BulkOperationItem, BulkOperationStatus
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATUSES = (
+    BulkOperationStatus.COMPLETED.value,
+    BulkOperationStatus.FAILED.value,
+    BulkOperationStatus.PARTIAL_SUCCESS.value,
+)
+
+FOLLOW_POLL_SECONDS = 0.5
+
+
+def partial_path(path: str) -> str:
+    """Where a job's file is written until it is complete"""
+    return f"{path}.part"
+
+
+def remove_job_file(path: Optional[str]):
+    """Delete a job's file, finished or not"""
+    if not path:
+        return
+    for candidate in (path, partial_path(path)):
+        if os.path.exists(candidate):
+            os.remove(candidate)
+
+
+def bulk_job_response(job: BulkJob) -> BulkJobResponse:
+    return BulkJobResponse(
+        job_id=job.id,
+        operation_type=job.operation_type,
+        status=job.status,
+        total_items=job.total_items,
+        processed_items=job.processed_items,
+        successful_items=job.successful_items,
+        failed_items=job.failed_items,
+        progress_percentage=(
+            round(100 * job.processed_items / job.total_items, 1)
+            if job.total_items
+            else 100.0
+        ),
+        error_message=job.error_message,
+        created_at=job.created_at.isoformat() if job.created_at else None,
+        started_at=job.started_at.isoformat() if job.started_at else None,
+        completed_at=job.completed_at.isoformat() if job.completed_at else None,
+        expires_at=job.expires_at.isoformat(),
+        items_url=f"/api/v1/bulk/jobs/{job.id}/items",
+        events_url=f"/api/v1/bulk/jobs/{job.id}/events",
+        background_job_id=job.background_job_id,
+    )
+
+
+class BulkJobService:
+    """
+    Stores bulk jobs: their status, counters and item results. Job workers
+    run them (see run_bulk_contract_operation_job), so following a job
+    opens sessions of its own.
+    """
+
+    def __init__(self, session_factory: Optional[Callable[[], Session]] = None):
+        self._session_factory = session_factory
+
+    def _new_session(self) -> Session:
+        return (self._session_factory or database.SessionLocal)()
+
+    def create(
+        self,
+        db: Session,
+        operation_type: str,
+        user: User,
+        total_items: int,
+        parameters: Optional[Dict[str, Any]] = None,
+        ttl_hours: Optional[float] = None,
+    ) -> BulkJob:
+        """Register a pending job; committed so other workers can see it"""
+        self.purge_expired(db)
+        job = BulkJob(
+            operation_type=operation_type,
+            status=BulkOperationStatus.PENDING.value,
+            parameters=parameters,
+            company_id=user.company_id,
+            user_id=user.id,
+            total_items=total_items,
+            processed_items=0,
+            successful_items=0,
+            failed_items=0,
+            expires_at=get_current_utc()
+            + timedelta(hours=ttl_hours or settings.BULK_JOB_TTL_HOURS),
+        )
+        db.add(job)
+        db.commit()
+        return job
+
+    def mark_started(self, db: Session, job: BulkJob):
+        job.status = BulkOperationStatus.PROCESSING.value
+        job.started_at = get_current_utc()
+        db.commit()
+
+    def record_items(self, db: Session, job: BulkJob, items: List[BulkOperationItem]):
+        """Append item results and advance the counters; the caller commits"""
+        if not items:
+            return
+        db.execute(
+            insert(BulkJobItem),
+            [
+                {
+                    "job_id": job.id,
+                    "position": job.processed_items + offset,
+                    "item_id": item.item_id,
+                    "success": item.success,
+                    "error_message": item.error_message,
+                    "result": item.result,
+                }
+                for offset, item in enumerate(items)
+            ],
+        )
+        successful = sum(1 for item in items if item.success)
+        job.processed_items += len(items)
+        job.successful_items += successful
+        job.failed_items += len(items) - successful
+
+    def finish(
+        self,
+        db: Session,
+        job: BulkJob,
+        status: BulkOperationStatus,
+        error_message: Optional[str] = None,
+    ):
+        job.status = status.value
+        job.error_message = error_message
+        job.completed_at = get_current_utc()
+        db.commit()
+
+    def get_job(
+        self, db: Session, job_id: str, company_id: Optional[str] = None
+    ) -> Optional[BulkJob]:
+        job = db.get(BulkJob, job_id)
+        if job is None or (company_id and job.company_id != company_id):
+            return None
+        return job
+
+    def get_items(
+        self,
+        db: Session,
+        job_id: str,
+        offset: int = 0,
+        limit: int = 100,
+        failed_only: bool = False,
+    ) -> Tuple[List[BulkOperationItem], int]:
+        """A page of item results in request order, and the total to page"""
+        query = db.query(BulkJobItem).filter(BulkJobItem.job_id == job_id)
+        if failed_only:
+            query = query.filter(BulkJobItem.success.is_(False))
+        total = query.count()
+        rows = (
+            query.order_by(BulkJobItem.position).offset(offset).limit(limit).all()
+        )
+        items = [
+            BulkOperationItem(
+                item_id=row.item_id,
+                success=row.success,
+                error_message=row.error_message,
+                result=row.result,
+            )
+            for row in rows
+        ]
+        return items, total
+
+    def purge_expired(self, db: Session):
+        """
+        Delete finished jobs past their expiry, with their item results and
+        files
+        """
+        expired = (
+            select(BulkJob.id)
+            .where(BulkJob.expires_at < get_current_utc())
+            .where(BulkJob.status.in_(FINISHED_STATUSES))
+        )
+        for path in db.scalars(
+            expired.with_only_columns(BulkJob.file_path).where(
+                BulkJob.file_path.isnot(None)
+            )
+        ):
+            remove_job_file(path)
+        # Not left to ON DELETE CASCADE: SQLite doesn't enforce it by default
+        db.execute(delete(BulkJobItem).where(BulkJobItem.job_id.in_(expired)))
+        db.execute(delete(BulkJob).where(BulkJob.id.in_(expired)))
+        db.commit()
+
+    def _load_response(self, job_id: str) -> Optional[BulkJobResponse]:
+        # A fresh session per poll sees commits from other workers
+        with self._new_session() as db:
+            job = db.get(BulkJob, job_id)
+            return bulk_job_response(job) if job else None
+
+    async def follow(self, job_id: str) -> AsyncIterator[BulkJobResponse]:
+        """Yield a job's status whenever it changes, until it has finished"""
+        last = None
+        while True:
+            current = await asyncio.to_thread(self._load_response, job_id)
+            if current is None:
+                return
+            if current != last:
+                yield current
+                last = current
+            if current.status.value in FINISHED_STATUSES:
+                return
+            await asyncio.sleep(FOLLOW_POLL_SECONDS)
+
+
+# Global bulk job service instance
+bulk_job_service = BulkJobService()
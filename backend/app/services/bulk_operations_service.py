@@ -4,15 +4,31 @@ Handles bulk contract operations, imports, and exports
 """
 
 import asyncio
-from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
-from uuid import uuid4
+import io
+from datetime import datetime
+from typing import (
+    List, Dict, Any, Optional, Tuple, Callable, Awaitable, Union, BinaryIO
+)
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, delete, select, update
+from sqlalchemy.exc import SQLAlchemyError
 
+from app.core import database
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.datetime_utils import get_current_utc
-from app.infrastructure.database.models import Contract, User, Company
+from app.domain.services.incremental_compliance import (
+    incremental_compliance_validator,
+)
+from app.infrastructure.database.models import (
+    AuditLog,
+    BulkJob,
+    Company,
+    Contract,
+    Notification,
+    StoredFile,
+    User,
+)
 from app.schemas.bulk import (
     BulkOperationType,
     BulkOperationStatus,
@@ -24,98 +40,156 @@ from app.schemas.bulk import (
     BulkImportRequest,
     BulkImportResponse
 )
+from app.schemas.websocket import BulkOperationMessage
 from app.services.audit_service import log_audit_event
+from app.services.bulk_export_service import bulk_export_response, bulk_export_service
+from app.services.bulk_import_service import bulk_import_service
+from app.services.bulk_job_service import (
+    FINISHED_STATUSES,
+    BulkJobService,
+    bulk_job_response,
+    bulk_job_service,
+)
+from app.services.document_render_service import document_render_service
+from app.services.job_queue_service import (
+    JobCancelled,
+    JobContext,
+    JobQueueService,
+    job_queue_service,
+)
 from app.infrastructure.database.models import AuditAction, AuditResourceType
+from app.services.websocket_service import send_bulk_operation_update
 from fastapi import Depends
 import logging
 
 logger = logging.getLogger(__name__)
 
+BULK_CONTRACT_OPERATION_JOB = "bulk_contract_operation"
+
+# Columns a bulk UPDATE must not change
+PROTECTED_CONTRACT_FIELDS = {"id", "company_id", "created_by", "created_at"}
+
+# Nullable references cleared before a bulk DELETE removes their contract
+CONTRACT_REFERENCES = (
+    AuditLog.contract_id,
+    Notification.related_contract_id,
+    StoredFile.contract_id,
+)
+
 
 class BulkOperationsService:
     """Service for handling bulk operations on contracts and other entities"""
     
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: Session,
+        chunk_size: Optional[int] = None,
+        notify: Optional[Callable[..., Awaitable]] = None,
+        job_service: Optional[BulkJobService] = None,
+        job_queue: Optional[JobQueueService] = None,
+    ):
         self.db = db
-        self._operation_store: Dict[str, Dict] = {}  # In-memory store for demo
+        self.chunk_size = chunk_size or settings.BULK_OPERATION_CHUNK_SIZE
+        self._notify = notify or send_bulk_operation_update
+        self._job_service = job_service or bulk_job_service
+        self._job_queue = job_queue or job_queue_service
 
-    async def execute_bulk_contract_operation(
+    def start_bulk_contract_operation(
         self,
         operation: BulkContractOperation,
         user: User
+    ) -> BulkJob:
+        """
+        Register a bulk contract operation as a bulk job and queue it for a
+        job worker; poll or follow the bulk job for progress and item
+        results, and cancel it through its background job
+        """
+        job = self._job_service.create(
+            self.db,
+            operation.operation_type.value,
+            user,
+            total_items=len(set(operation.contract_ids)),
+            parameters={"update_data": operation.update_data},
+        )
+        background_job = self._job_queue.enqueue(
+            self.db,
+            BULK_CONTRACT_OPERATION_JOB,
+            payload={
+                "bulk_job_id": job.id,
+                "operation": operation.model_dump(mode="json"),
+            },
+            company_id=user.company_id,
+            user_id=user.id,
+        )
+        job.background_job_id = background_job.id
+        self.db.commit()
+        return job
+
+    async def execute_bulk_contract_operation(
+        self,
+        operation: BulkContractOperation,
+        user: User,
+        job: Optional[BulkJob] = None
     ) -> BulkOperationResponse:
-        """Execute bulk operation on contracts"""
-        operation_id = str(uuid4())
+        """
+        Execute bulk operation on contracts
+
+        Contracts are changed set-based: one UPDATE or DELETE statement and
+        one commit per chunk of ids, run in a worker thread. Progress and
+        item results are recorded on the operation's bulk job and published
+        after each chunk. A job that already has item results carries on
+        after them, so a retried job doesn't apply its chunks twice.
+        """
         started_at = get_current_utc()
+        # Duplicate ids would be counted twice but changed once
+        contract_ids = list(dict.fromkeys(operation.contract_ids))
+        if job is None:
+            job = await asyncio.to_thread(
+                self._job_service.create,
+                self.db,
+                operation.operation_type.value,
+                user,
+                total_items=len(contract_ids),
+                parameters={"update_data": operation.update_data},
+            )
+        operation_id = job.id
+        resume_from = job.processed_items
 
         logger.info(f"Starting bulk operation {operation_id} for user {user.id}")
+        if job.status == BulkOperationStatus.PENDING.value:
+            await asyncio.to_thread(self._job_service.mark_started, self.db, job)
 
-        # Store operation metadata
-        self._operation_store[operation_id] = {
-            "status": BulkOperationStatus.PROCESSING,
-            "started_at": started_at,
-            "user_id": user.id,
-            "operation": operation
-        }
+        results: List[BulkOperationItem] = []
+        successful_items = job.successful_items
+        failed_items = job.failed_items
 
         try:
-            results = []
-            successful_items = 0
-            failed_items = 0
-
-            # Get contracts with permission check
-            contracts = self.db.query(Contract).filter(
-                and_(
-                    Contract.id.in_(operation.contract_ids),
-                    Contract.company_id == user.company_id
+            values = self._contract_update_values(operation, user)
+
+            for offset in range(resume_from, len(contract_ids), self.chunk_size):
+                chunk = contract_ids[offset:offset + self.chunk_size]
+                chunk_results = await asyncio.to_thread(
+                    self._apply_contract_chunk,
+                    operation.operation_type,
+                    values,
+                    chunk,
+                    user,
+                    job,
+                )
+                results.extend(chunk_results)
+                successful = sum(1 for item in chunk_results if item.success)
+                successful_items += successful
+                failed_items += len(chunk_results) - successful
+
+                await self._publish_progress(
+                    operation_id,
+                    operation,
+                    user,
+                    "RUNNING",
+                    total=len(contract_ids),
+                    successful=successful_items,
+                    failed=failed_items,
                 )
-            ).all()
-
-            found_ids = {contract.id for contract in contracts}
-
-            # Process each contract
-            for contract_id in operation.contract_ids:
-                if contract_id not in found_ids:
-                    results.append(BulkOperationItem(
-                        item_id=contract_id,
-                        success=False,
-                        error_message="Contract not found or access denied"
-                    ))
-                    failed_items += 1
-                    continue
-
-                try:
-                    contract = next(c for c in contracts if c.id == contract_id)
-                    success = await self._process_single_contract_operation(
-                        contract, operation, user
-                    )
-
-                    if success:
-                        results.append(BulkOperationItem(
-                            item_id=contract_id,
-                            success=True,
-                            result={"operation": operation.operation_type.value}
-                        ))
-                        successful_items += 1
-                    else:
-                        results.append(BulkOperationItem(
-                            item_id=contract_id,
-                            success=False,
-                            error_message="Operation failed"
-                        ))
-                        failed_items += 1
-
-                except Exception as e:
-                    logger.error(f"Error processing contract {contract_id}: {e}")
-                    results.append(BulkOperationItem(
-                        item_id=contract_id,
-                        success=False,
-                        error_message=str(e)
-                    ))
-                    failed_items += 1
-
-            # Commit all changes
-            self.db.commit()
 
             completed_at = get_current_utc()
             processing_time = (completed_at - started_at).total_seconds()
@@ -128,21 +202,24 @@ class BulkOperationsService:
             else:
                 status = BulkOperationStatus.PARTIAL_SUCCESS
 
-            # Update operation store
-            self._operation_store[operation_id].update({
-                "status": status,
-                "completed_at": completed_at,
-                "results": results
-            })
-
-            # Log audit event
-            log_audit_event(
-                db=self.db,
-                action=AuditAction.CREATE,
-                resource_type=AuditResourceType.CONTRACT,
-                user_id=user.id,
-                resource_id=operation_id,
-                details=f"Bulk {operation.operation_type.value}: {successful_items} successful, {failed_items} failed"
+            await asyncio.to_thread(
+                self._finish_contract_operation,
+                operation,
+                user,
+                job,
+                status,
+                successful_items,
+                failed_items,
+            )
+
+            await self._publish_progress(
+                operation_id,
+                operation,
+                user,
+                "FAILED" if status == BulkOperationStatus.FAILED else "COMPLETED",
+                total=len(contract_ids),
+                successful=successful_items,
+                failed=failed_items,
             )
 
             return BulkOperationResponse(
@@ -151,7 +228,7 @@ class BulkOperationsService:
                 operation_id=operation_id,
                 operation_type=operation.operation_type,
                 status=status,
-                total_items=len(operation.contract_ids),
+                total_items=len(contract_ids),
                 successful_items=successful_items,
                 failed_items=failed_items,
                 items=results,
@@ -164,120 +241,303 @@ class BulkOperationsService:
             logger.error(f"Bulk operation {operation_id} failed: {e}")
             self.db.rollback()
 
-            # Update operation store
-            self._operation_store[operation_id].update({
-                "status": BulkOperationStatus.FAILED,
-                "completed_at": get_current_utc(),
-                "error": str(e)
-            })
+            # Chunks committed before the failure stay applied
+            unprocessed = [
+                BulkOperationItem(
+                    item_id=contract_id,
+                    success=False,
+                    error_message=str(e)
+                )
+                for contract_id in contract_ids[resume_from + len(results):]
+            ]
+            status = (
+                BulkOperationStatus.PARTIAL_SUCCESS
+                if successful_items
+                else BulkOperationStatus.FAILED
+            )
+            await asyncio.to_thread(
+                self._record_failure, job, unprocessed, status, str(e)
+            )
+
+            await self._publish_progress(
+                operation_id,
+                operation,
+                user,
+                "FAILED",
+                total=len(contract_ids),
+                successful=successful_items,
+                failed=len(contract_ids) - successful_items,
+                error_message=str(e),
+            )
 
             return BulkOperationResponse(
                 success=False,
                 message=f"Bulk operation failed: {str(e)}",
                 operation_id=operation_id,
                 operation_type=operation.operation_type,
-                status=BulkOperationStatus.FAILED,
-                total_items=len(operation.contract_ids),
-                successful_items=0,
-                failed_items=len(operation.contract_ids),
-                items=[
-                    BulkOperationItem(
-                        item_id=contract_id,
-                        success=False,
-                        error_message=str(e)
-                    )
-                    for contract_id in operation.contract_ids
-                ],
+                status=status,
+                total_items=len(contract_ids),
+                successful_items=successful_items,
+                failed_items=len(contract_ids) - successful_items,
+                items=results + unprocessed,
                 started_at=started_at.isoformat()
             )
 
-    async def _process_single_contract_operation(
+    def _apply_contract_chunk(
+        self,
+        operation_type: BulkOperationType,
+        values: Dict[str, Any],
+        chunk: List[str],
+        user: User,
+        job: BulkJob,
+    ) -> List[BulkOperationItem]:
+        """Apply an operation to one chunk and record its item results"""
+        changed, errors = self._execute_contract_chunk(
+            operation_type, values, chunk, user
+        )
+        chunk_results = []
+        for contract_id in chunk:
+            if contract_id in changed:
+                chunk_results.append(BulkOperationItem(
+                    item_id=contract_id,
+                    success=True,
+                    result={"operation": operation_type.value}
+                ))
+            else:
+                chunk_results.append(BulkOperationItem(
+                    item_id=contract_id,
+                    success=False,
+                    error_message=errors.get(
+                        contract_id, "Contract not found or access denied"
+                    )
+                ))
+        self._job_service.record_items(self.db, job, chunk_results)
+        self.db.commit()
+        if operation_type == BulkOperationType.DELETE:
+            for contract_id in changed:
+                incremental_compliance_validator.forget(contract_id)
+                document_render_service.forget(contract_id)
+        return chunk_results
+
+    def _finish_contract_operation(
         self,
-        contract: Contract,
         operation: BulkContractOperation,
-        user: User
-    ) -> bool:
-        """Process single contract operation"""
+        user: User,
+        job: BulkJob,
+        status: BulkOperationStatus,
+        successful_items: int,
+        failed_items: int,
+    ):
+        self._job_service.finish(self.db, job, status)
+
+        # Log audit event
+        log_audit_event(
+            db=self.db,
+            action=AuditAction.CREATE,
+            resource_type=AuditResourceType.CONTRACT,
+            user_id=user.id,
+            resource_id=job.id,
+            details=f"Bulk {operation.operation_type.value}: {successful_items} successful, {failed_items} failed"
+        )
+
+    def _record_failure(
+        self,
+        job: BulkJob,
+        unprocessed: List[BulkOperationItem],
+        status: BulkOperationStatus,
+        error_message: str,
+    ):
+        self._job_service.record_items(self.db, job, unprocessed)
+        self._job_service.finish(self.db, job, status, error_message)
+
+    def _contract_update_values(
+        self, operation: BulkContractOperation, user: User
+    ) -> Dict[str, Any]:
+        """Column values an operation sets; empty for DELETE"""
+        now = get_current_utc()
+        operation_type = operation.operation_type
+
+        if operation_type == BulkOperationType.DELETE:
+            return {}
+
+        if operation_type == BulkOperationType.ARCHIVE:
+            return {"is_archived": True, "archived_at": now, "archived_by": user.id}
+
+        if operation_type == BulkOperationType.RESTORE:
+            return {"is_archived": False, "archived_at": None, "archived_by": None}
+
+        if operation_type == BulkOperationType.UPDATE:
+            columns = Contract.__table__.columns
+            values = {}
+            for field, value in (operation.update_data or {}).items():
+                if field not in columns or field in PROTECTED_CONTRACT_FIELDS:
+                    continue
+                enum_class = getattr(columns[field].type, "enum_class", None)
+                if enum_class is not None and value is not None:
+                    # Reject bad values before any chunk is written
+                    value = enum_class(value)
+                values[field] = value
+            values["updated_at"] = now
+            return values
+
+        raise ValueError(
+            f"Unsupported bulk contract operation: {operation_type.value}"
+        )
+
+    def _contract_statement(
+        self,
+        operation_type: BulkOperationType,
+        values: Dict[str, Any],
+        contract_ids: List[str],
+        user: User,
+    ):
+        scope = and_(
+            Contract.id.in_(contract_ids),
+            Contract.company_id == user.company_id
+        )
+        if operation_type == BulkOperationType.DELETE:
+            return delete(Contract).where(scope)
+        return update(Contract).where(scope).values(**values)
+
+    def _detach_contract_references(self, statement):
+        """
+        Clear the nullable references to contracts a DELETE will remove, as
+        the ORM would when deleting them one at a time. Audit logs,
+        notifications and files outlive their contract.
+        """
+        doomed = select(Contract.id).where(statement.whereclause)
+        for column in CONTRACT_REFERENCES:
+            self.db.execute(
+                update(column.class_)
+                .where(column.in_(doomed))
+                .values({column: None})
+                .execution_options(synchronize_session=False)
+            )
+
+    def _execute_contract_statement(
+        self,
+        operation_type: BulkOperationType,
+        values: Dict[str, Any],
+        contract_ids: List[str],
+        user: User,
+    ) -> set:
+        """Run one statement over contract_ids; returns the ids it changed"""
+        statement = self._contract_statement(
+            operation_type, values, contract_ids, user
+        )
+        if operation_type == BulkOperationType.DELETE:
+            self._detach_contract_references(statement)
+        dialect = self.db.get_bind().dialect
+        supports_returning = (
+            dialect.delete_returning
+            if operation_type == BulkOperationType.DELETE
+            else dialect.update_returning
+        )
+        if supports_returning:
+            return set(self.db.execute(statement.returning(Contract.id)).scalars())
+
+        changed = set(
+            self.db.execute(
+                select(Contract.id).where(statement.whereclause)
+            ).scalars()
+        )
+        self.db.execute(statement)
+        return changed
+
+    def _execute_contract_chunk(
+        self,
+        operation_type: BulkOperationType,
+        values: Dict[str, Any],
+        chunk: List[str],
+        user: User,
+    ) -> Tuple[set, Dict[str, str]]:
+        """
+        Apply an operation to one chunk and commit it. If the chunk is
+        rejected (e.g. a contract still referenced elsewhere can't be
+        deleted), retry it one contract at a time so only the offending
+        contracts fail.
+        """
         try:
-            if operation.operation_type == BulkOperationType.DELETE:
-                self.db.delete(contract)
-                return True
-
-            elif operation.operation_type == BulkOperationType.ARCHIVE:
-                contract.is_archived = True
-                contract.archived_at = get_current_utc()
-                contract.archived_by = user.id
-                return True
-
-            elif operation.operation_type == BulkOperationType.RESTORE:
-                contract.is_archived = False
-                contract.archived_at = None
-                contract.archived_by = None
-                return True
-
-            elif operation.operation_type == BulkOperationType.UPDATE:
-                if operation.update_data:
-                    for field, value in operation.update_data.items():
-                        if hasattr(contract, field):
-                            setattr(contract, field, value)
-                    contract.updated_at = get_current_utc()
-                return True
-
-            return False
+            changed = self._execute_contract_statement(
+                operation_type, values, chunk, user
+            )
+            self.db.commit()
+            return changed, {}
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.warning(f"Bulk chunk rejected, retrying per contract: {e}")
 
+        changed, errors = set(), {}
+        for contract_id in chunk:
+            try:
+                changed |= self._execute_contract_statement(
+                    operation_type, values, [contract_id], user
+                )
+                self.db.commit()
+            except SQLAlchemyError as e:
+                self.db.rollback()
+                logger.error(f"Error processing contract {contract_id}: {e}")
+                errors[contract_id] = str(getattr(e, "orig", None) or e)
+        return changed, errors
+
+    async def _publish_progress(
+        self,
+        operation_id: str,
+        operation: BulkContractOperation,
+        user: User,
+        status: str,
+        total: int,
+        successful: int,
+        failed: int,
+        error_message: Optional[str] = None,
+    ):
+        processed = successful + failed
+        try:
+            await self._notify(
+                operation_id,
+                BulkOperationMessage(
+                    operation_id=operation_id,
+                    operation_type=operation.operation_type.value,
+                    status=status,
+                    progress_percentage=(
+                        round(100 * processed / total, 1) if total else 100.0
+                    ),
+                    processed_count=processed,
+                    total_count=total,
+                    success_count=successful,
+                    failed_count=failed,
+                    error_message=error_message,
+                ),
+                user.id,
+            )
         except Exception as e:
-            logger.error(f"Error processing single contract operation: {e}")
-            return False
+            # Progress is best effort; never fail the operation over it
+            logger.warning(f"Failed to publish bulk operation progress: {e}")
 
     def get_operation_status(self, operation_id: str) -> Optional[Dict[str, Any]]:
-        """Get status of bulk operation"""
-        return self._operation_store.get(operation_id)
+        """Get status of bulk operation, from whichever worker ran it"""
+        job = self._job_service.get_job(self.db, operation_id)
+        return bulk_job_response(job).model_dump() if job else None
 
     async def export_contracts(
         self,
         export_request: BulkExportRequest,
         user: User
     ) -> BulkExportResponse:
-        """Export contracts to specified format"""
-        export_id = str(uuid4())
-
+        """
+        Export contracts to specified format. The archive is built in the
+        background; its download_url can be fetched while it's being written.
+        """
         try:
-            # Query contracts with filters
-            query = self.db.query(Contract).filter(
-                Contract.company_id == user.company_id
-            )
-
-            if export_request.filters:
-                # Apply filters (simplified implementation)
-                for field, value in export_request.filters.items():
-                    if hasattr(Contract, field):
-                        query = query.filter(getattr(Contract, field) == value)
-
-            contracts = query.all()
-
-            # Generate download URL (in real implementation, create actual file)
-            download_url = f"/api/v1/bulk/downloads/{export_id}.{export_request.export_format}"
-
-            # Set expiration time
-            expires_at = get_current_utc() + timedelta(hours=24)
-
-            logger.info(f"Created export {export_id} with {len(contracts)} contracts")
-
-            return BulkExportResponse(
-                success=True,
-                message="Export created successfully",
-                export_id=export_id,
-                download_url=download_url,
-                expires_at=expires_at.isoformat(),
-                record_count=len(contracts)
-            )
+            job = bulk_export_service.start(self.db, export_request, user)
+            return bulk_export_response(job, "Export started")
 
         except Exception as e:
             logger.error(f"Export failed: {e}")
             return BulkExportResponse(
                 success=False,
                 message=f"Export failed: {str(e)}",
-                export_id=export_id,
+                export_id="",
                 download_url="",
                 expires_at="",
                 record_count=0
@@ -286,120 +546,84 @@ class BulkOperationsService:
     async def import_contracts(
         self,
         import_request: BulkImportRequest,
-        file_data: bytes,
+        file_data: Union[bytes, BinaryIO],
         user: User
     ) -> BulkImportResponse:
-        """Import contracts from file"""
-        import_id = str(uuid4())
-
-        try:
-            # Parse file data based on format
-            records = await self._parse_import_file(file_data, import_request.file_format)
-
-            # Validate records
-            validation_errors = []
-            if not import_request.skip_validation:
-                validation_errors = await self._validate_import_records(records, import_request.mapping)
-
-            # Import valid records
-            imported_count = 0
-            failed_count = 0
-
-            for record in records:
-                try:
-                    # Map fields and create contract
-                    contract_data = self._map_import_record(record, import_request.mapping)
-                    contract_data["company_id"] = user.company_id
-                    contract_data["created_by"] = user.id
-
-                    contract = Contract(**contract_data)
-                    self.db.add(contract)
-                    imported_count += 1
-
-                except Exception as e:
-                    logger.error(f"Failed to import record: {e}")
-                    failed_count += 1
-                    validation_errors.append({
-                        "record": record,
-                        "error": str(e)
-                    })
-
-            self.db.commit()
-
-            status = BulkOperationStatus.COMPLETED if failed_count == 0 else BulkOperationStatus.PARTIAL_SUCCESS
-
-            return BulkImportResponse(
-                success=True,
-                message="Import completed",
-                import_id=import_id,
-                status=status,
-                total_records=len(records),
-                imported_records=imported_count,
-                failed_records=failed_count,
-                validation_errors=validation_errors
-            )
-
-        except Exception as e:
-            logger.error(f"Import failed: {e}")
-            return BulkImportResponse(
-                success=False,
-                message=f"Import failed: {str(e)}",
-                import_id=import_id,
-                status=BulkOperationStatus.FAILED,
-                total_records=0,
-                imported_records=0,
-                failed_records=0,
-                validation_errors=[{"error": str(e)}]
-            )
-
-    async def _parse_import_file(self, file_data: bytes, file_format: str) -> List[Dict]:
-        """Parse import file based on format"""
-        # Simplified implementation - in production, use proper parsers
-        if file_format == "json":
-            import json
-            return json.loads(file_data.decode())
-        elif file_format == "csv":
-            import csv
-            import io
-            reader = csv.DictReader(io.StringIO(file_data.decode()))
-            return list(reader)
-        else:
-            raise ValueError(f"Unsupported file format: {file_format}")
-
-    async def _validate_import_records(self, records: List[Dict], mapping: Dict[str, str]) -> List[Dict]:
-        """Validate import records"""
-        errors = []
-        required_fields = ["title", "contract_type"]
-
-        for i, record in enumerate(records):
-            record_errors = []
-
-            # Check required fields
-            for field in required_fields:
-                mapped_field = mapping.get(field)
-                if not mapped_field or not record.get(mapped_field):
-                    record_errors.append(f"Missing required field: {field}")
-
-            if record_errors:
-                errors.append({
-                    "record_index": i,
-                    "record": record,
-                    "errors": record_errors
-                })
-
-        return errors
-
-    def _map_import_record(self, record: Dict, mapping: Dict[str, str]) -> Dict:
-        """Map import record fields to contract fields"""
-        mapped_record = {}
-
-        for contract_field, import_field in mapping.items():
-            if import_field in record:
-                mapped_record[contract_field] = record[import_field]
-
-        return mapped_record
+        """
+        Import contracts from file. A file object (e.g. an upload's spooled
+        file) is streamed rather than read into memory.
+        """
+        if isinstance(file_data, bytes):
+            file_data = io.BytesIO(file_data)
+        # Large imports take a while; keep the event loop serving meanwhile
+        return await asyncio.to_thread(
+            bulk_import_service.import_contracts,
+            self.db,
+            import_request,
+            file_data,
+            user,
+        )
 
 
 async def get_bulk_operations_service(db: Session = Depends(get_db)) -> BulkOperationsService:
     """Dependency to get bulk operations service"""
     return BulkOperationsService(db)
+
+
+@job_queue_service.handler(BULK_CONTRACT_OPERATION_JOB)
+async def run_bulk_contract_operation_job(context: JobContext) -> Dict[str, Any]:
+    """
+    A bulk contract operation as a background job. Its bulk job's recorded
+    items are the checkpoint: a retry, or a pickup after the worker died,
+    carries on after them. Cancelling the job stops it after the current
+    chunk.
+    """
+    operation = BulkContractOperation(**context.payload["operation"])
+    bulk_job_id = context.payload["bulk_job_id"]
+
+    async def notify(operation_id: str, message, user_id: str):
+        await send_bulk_operation_update(operation_id, message, user_id)
+        # Renews the lease; raises JobCancelled once the job is cancelled
+        await context.report_progress(
+            message.progress_percentage,
+            f"{message.processed_count} of {message.total_count} contracts",
+        )
+
+    db = database.SessionLocal()
+    try:
+        job, user = await asyncio.to_thread(
+            lambda: (db.get(BulkJob, bulk_job_id), db.get(User, context.user_id))
+        )
+        if job is None or user is None:
+            raise ValueError(f"Bulk job {bulk_job_id} no longer exists")
+        if job.status not in FINISHED_STATUSES:
+            try:
+                await BulkOperationsService(
+                    db, notify=notify
+                ).execute_bulk_contract_operation(operation, user, job=job)
+            except JobCancelled:
+                await asyncio.to_thread(_record_cancellation, db, job)
+                raise
+        return {
+            "bulk_job_id": job.id,
+            "status": job.status,
+            "successful_items": job.successful_items,
+            "failed_items": job.failed_items,
+        }
+    finally:
+        db.close()
+
+
+def _record_cancellation(db: Session, job: BulkJob):
+    db.rollback()
+    db.refresh(job)
+    if job.status in FINISHED_STATUSES:
+        return
+    bulk_job_service.finish(
+        db,
+        job,
+        BulkOperationStatus.PARTIAL_SUCCESS
+        if job.successful_items
+        else BulkOperationStatus.FAILED,
+        "Cancelled",
+    )
@@ -0,0 +1,264 @@
+"""
+Concurrent rule-engine and AI compliance analysis for Pactoria MVP
+The deterministic UK rule engine runs in a worker thread while the AI
+analysis is in flight. Its score is stored and returned straight away as
+provisional; the AI-enriched score follows over the WebSocket channel
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core import database
+from app.core.config import settings
+from app.domain.entities.company import Company as DomainCompany
+from app.domain.services.incremental_compliance import (
+    incremental_compliance_validator,
+)
+from app.domain.value_objects import ContractType as DomainContractType, Money
+from app.infrastructure.database.models import (
+    AuditAction,
+    AuditLog,
+    AuditResourceType,
+    ComplianceScore,
+    Contract,
+)
+from app.schemas.contracts import ComplianceScoreResponse
+from app.schemas.websocket import ComplianceAnalysisMessage
+from app.services import ai_service as ai_service_module
+from app.services.ai_service import ComplianceAnalysisRequest
+from app.services.portfolio_rescan_service import compliance_score_fields
+from app.services.websocket_service import send_compliance_analysis_update
+
+logger = logging.getLogger(__name__)
+
+# ComplianceScore.analysis_version by analysis method
+ANALYSIS_VERSIONS = {"ai": "1.0-ai", "uk_engine": "1.0-uk_engine"}
+
+SCORE_FIELDS = [
+    "overall_score",
+    "gdpr_compliance",
+    "employment_law_compliance",
+    "consumer_rights_compliance",
+    "commercial_terms_compliance",
+    "risk_score",
+    "risk_factors",
+    "recommendations",
+    "analysis_raw",
+]
+
+
+@dataclass
+class ComplianceAnalysisResult:
+    score: ComplianceScore
+    analysis_method: str  # "ai" or "uk_engine"
+    is_provisional: bool  # AI-enriched score still to follow
+
+
+class ComplianceAnalysisService:
+    """
+    Runs the rule engine and the AI compliance analysis side by side.
+
+    The rule engine usually finishes first: its score is stored and returned
+    as provisional, and a background task stores the AI score when it
+    arrives and pushes it to the requesting user. If the AI answers before
+    the rule engine, its score is returned directly; without an AI client
+    the rule-engine score is final.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        ai_client=None,
+        notify: Optional[
+            Callable[[ComplianceAnalysisMessage, str], Awaitable[Any]]
+        ] = None,
+    ):
+        self._session_factory = session_factory
+        self._ai_client = ai_client
+        self._notify = notify or send_compliance_analysis_update
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    @property
+    def ai_client(self):
+        return self._ai_client or ai_service_module.ai_service
+
+    def _new_session(self) -> Session:
+        return (self._session_factory or database.SessionLocal)()
+
+    def is_pending(self, contract_id: str) -> bool:
+        """Whether an AI analysis is still running for the contract"""
+        task = self._tasks.get(contract_id)
+        return task is not None and not task.done()
+
+    async def analyze(
+        self,
+        db: Session,
+        contract: Contract,
+        content: str,
+        company: DomainCompany,
+        contract_value: Optional[Money],
+        user_id: str,
+    ) -> ComplianceAnalysisResult:
+        """Analyse a contract, returning once the first score is stored"""
+        # A new analysis supersedes an AI analysis still running
+        self.cancel(contract.id)
+
+        ai_task = None
+        if self.ai_client is not None:
+            ai_task = asyncio.create_task(
+                self.ai_client.analyze_compliance(
+                    ComplianceAnalysisRequest(
+                        contract_content=content,
+                        contract_type=contract.contract_type.value,
+                        jurisdiction="UK",
+                    )
+                )
+            )
+
+        # After an edit only the changed clauses and the rules depending on
+        # them are re-validated; the thread keeps the event loop free
+        try:
+            assessment = await asyncio.to_thread(
+                incremental_compliance_validator.validate,
+                contract_key=contract.id,
+                contract_content=content,
+                company=company,
+                contract_type=DomainContractType(contract.contract_type.value),
+                contract_value=contract_value,
+                time_budget_ms=settings.COMPLIANCE_TIME_BUDGET_MS,
+            )
+        except Exception as e:
+            if ai_task is None:
+                raise
+            logger.warning(
+                f"Rule engine failed for contract {contract.id}: {e}; "
+                f"waiting for the AI analysis"
+            )
+            response = await ai_task
+            score = self._store(db, contract.id, user_id, _ai_fields(response), "ai")
+            return ComplianceAnalysisResult(score, "ai", False)
+
+        if ai_task is not None and ai_task.done():
+            try:
+                response = ai_task.result()
+            except Exception as e:
+                logger.warning(f"AI compliance analysis failed: {e}")
+                ai_task = None
+            else:
+                score = self._store(
+                    db, contract.id, user_id, _ai_fields(response), "ai"
+                )
+                return ComplianceAnalysisResult(score, "ai", False)
+
+        score = self._store(
+            db,
+            contract.id,
+            user_id,
+            compliance_score_fields(assessment.assessment),
+            "uk_engine",
+        )
+        if ai_task is None:
+            return ComplianceAnalysisResult(score, "uk_engine", False)
+
+        self._tasks[contract.id] = asyncio.create_task(
+            self._complete(contract.id, user_id, score.id, ai_task)
+        )
+        return ComplianceAnalysisResult(score, "uk_engine", True)
+
+    async def _complete(
+        self,
+        contract_id: str,
+        user_id: str,
+        provisional_score_id: str,
+        ai_task: asyncio.Task,
+    ):
+        """Store the AI score when it arrives and push it to the user"""
+        try:
+            response = await ai_task
+            db = self._new_session()
+            try:
+                score = self._store(
+                    db, contract_id, user_id, _ai_fields(response), "ai"
+                )
+                message = ComplianceAnalysisMessage(
+                    contract_id=contract_id,
+                    status="COMPLETED",
+                    provisional_score_id=provisional_score_id,
+                    compliance_score=ComplianceScoreResponse.model_validate(
+                        score
+                    ).model_dump(),
+                )
+            finally:
+                db.close()
+        except asyncio.CancelledError:
+            ai_task.cancel()
+            raise
+        except Exception as e:
+            logger.warning(
+                f"AI compliance analysis failed for contract {contract_id}: {e}"
+            )
+            message = ComplianceAnalysisMessage(
+                contract_id=contract_id,
+                status="FAILED",
+                provisional_score_id=provisional_score_id,
+                error_message=str(e),
+            )
+        finally:
+            if self._tasks.get(contract_id) is asyncio.current_task():
+                self._tasks.pop(contract_id, None)
+
+        try:
+            await self._notify(message, user_id)
+        except Exception as e:
+            logger.error(f"Could not send compliance analysis update: {e}")
+
+    def _store(
+        self,
+        db: Session,
+        contract_id: str,
+        user_id: str,
+        fields: Dict[str, Any],
+        analysis_method: str,
+    ) -> ComplianceScore:
+        """Store a compliance score with its audit log entry"""
+        score = ComplianceScore(
+            contract_id=contract_id,
+            analysis_version=ANALYSIS_VERSIONS[analysis_method],
+            **fields,
+        )
+        db.add(score)
+        db.add(
+            AuditLog(
+                action=AuditAction.EDIT,
+                resource_type=AuditResourceType.CONTRACT,
+                resource_id=contract_id,
+                user_id=user_id,
+                new_values={
+                    "overall_score": fields["overall_score"],
+                    "risk_score": fields["risk_score"],
+                    "analysis_method": analysis_method,
+                },
+                contract_id=contract_id,
+            )
+        )
+        db.commit()
+        db.refresh(score)
+        return score
+
+    def cancel(self, contract_id: str):
+        """Cancel an AI analysis still running for a contract"""
+        task = self._tasks.pop(contract_id, None)
+        if task and not task.done():
+            task.cancel()
+
+
+def _ai_fields(response) -> Dict[str, Any]:
+    return {name: getattr(response, name, None) for name in SCORE_FIELDS}
+
+
+# Global compliance analysis service instance
+compliance_analysis_service = ComplianceAnalysisService()
@@ -0,0 +1,391 @@
+"""
+Contract document rendering for Pactoria MVP
+PDF and Word exports are rendered off the event loop, in a pool of worker
+processes with pre-initialised styles, and kept in an on-disk cache
+addressed by (contract id, content hash, format, renderer version) so an
+unchanged contract is only rendered once
+"""
+
+import asyncio
+import hashlib
+import html
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from io import BytesIO
+from typing import Any, Dict, Iterator, List, Optional
+
+from app.core.config import settings
+from app.infrastructure.database.models import Contract
+
+# Import ReportLab dependencies for PDF generation
+try:
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+    from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
+
+    REPORTLAB_AVAILABLE = True
+except ImportError:
+    REPORTLAB_AVAILABLE = False
+
+# Import python-docx for DOCX generation
+try:
+    from docx import Document
+    from docx.shared import Inches
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+
+    PYTHON_DOCX_AVAILABLE = True
+except ImportError:
+    PYTHON_DOCX_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Bump when the rendered layout changes so cached documents are re-rendered
+RENDERER_VERSION = "1"
+
+# Superseded renders are kept this long so downloads already being served
+# from them can finish
+STALE_RENDER_SECONDS = 60 * 60
+
+MEDIA_TYPES = {
+    "pdf": "application/pdf",
+    "docx": (
+        "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+    ),
+}
+
+
+def export_filename(
+    title: Optional[str],
+    contract_id: str,
+    extension: str,
+    id_length: Optional[int] = 8,
+) -> str:
+    """File name of an exported contract"""
+    stem = "contract"
+    if title:
+        stem = title.replace(" ", "_").replace("/", "_").replace("\\", "_")
+    return f"{stem}_{contract_id[:id_length]}.{extension}"
+
+
+def render_payload(contract: Contract) -> Dict[str, Any]:
+    """Everything a rendered document depends on, in picklable form"""
+    return {
+        "title": contract.title,
+        "client_name": contract.client_name,
+        "supplier_name": contract.supplier_name,
+        "contract_value": contract.contract_value,
+        "currency": contract.currency or "GBP",
+        "start_date": (
+            contract.start_date.strftime("%d %B %Y") if contract.start_date else None
+        ),
+        "end_date": (
+            contract.end_date.strftime("%d %B %Y") if contract.end_date else None
+        ),
+        "content": contract.final_content or contract.generated_content or "",
+    }
+
+
+def content_hash(payload: Dict[str, Any]) -> str:
+    """Hash of a render payload; changes whenever the output would"""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+@lru_cache(maxsize=1)
+def _pdf_styles():
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle(
+        "CustomTitle",
+        parent=styles["Heading1"],
+        fontSize=18,
+        spaceAfter=30,
+        alignment=TA_CENTER,
+        fontName="Helvetica-Bold",
+    )
+    body_style = ParagraphStyle(
+        "CustomBody",
+        parent=styles["Normal"],
+        fontSize=11,
+        spaceAfter=12,
+        alignment=TA_JUSTIFY,
+        fontName="Helvetica",
+        leading=14,
+    )
+    return styles["Heading2"], title_style, body_style
+
+
+def render_pdf(payload: Dict[str, Any]) -> bytes:
+    """Render a contract payload as a PDF"""
+    heading_style, title_style, body_style = _pdf_styles()
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        rightMargin=1 * inch,
+        leftMargin=1 * inch,
+        topMargin=1 * inch,
+        bottomMargin=1 * inch,
+    )
+
+    # Title
+    story = [
+        Paragraph(html.escape(payload["title"] or "Contract"), title_style),
+        Spacer(1, 20),
+    ]
+
+    # Contract metadata
+    if payload["client_name"] or payload["supplier_name"]:
+        story.append(Paragraph("<b>Contract Details:</b>", heading_style))
+        for label, value in _details(payload):
+            story.append(
+                Paragraph(f"<b>{label}:</b> {html.escape(value)}", body_style)
+            )
+        story.append(Spacer(1, 20))
+
+    # Contract content
+    story.append(Paragraph("<b>Contract Terms:</b>", heading_style))
+    story.append(Spacer(1, 12))
+    for line in payload["content"].split("\n"):
+        clean_line = html.escape(line.strip())
+        if clean_line:
+            story.append(Paragraph(clean_line, body_style))
+        else:
+            story.append(Spacer(1, 6))
+
+    doc.build(story)
+    return buffer.getvalue()
+
+
+def render_docx(payload: Dict[str, Any]) -> bytes:
+    """Render a contract payload as a Word document"""
+    doc = Document()
+    for section in doc.sections:
+        section.top_margin = Inches(1)
+        section.bottom_margin = Inches(1)
+        section.left_margin = Inches(1)
+        section.right_margin = Inches(1)
+
+    # Title
+    title = doc.add_heading(payload["title"] or "Contract", level=0)
+    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    # Contract metadata
+    if payload["client_name"] or payload["supplier_name"] or payload["contract_value"]:
+        doc.add_heading("Contract Details", level=1)
+        for label, value in _details(payload):
+            p = doc.add_paragraph()
+            p.add_run(f"{label}: ").bold = True
+            p.add_run(value)
+
+    # Contract content
+    doc.add_heading("Contract Terms", level=1)
+    for line in payload["content"].split("\n"):
+        clean_line = line.strip()
+        if clean_line:
+            doc.add_paragraph(clean_line)
+
+    buffer = BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def _details(payload: Dict[str, Any]):
+    if payload["client_name"]:
+        yield "Client", payload["client_name"]
+    if payload["supplier_name"]:
+        yield "Supplier", payload["supplier_name"]
+    if payload["contract_value"]:
+        yield (
+            "Contract Value",
+            f"{payload['currency']} {payload['contract_value']:,.2f}",
+        )
+    if payload["start_date"]:
+        yield "Start Date", payload["start_date"]
+    if payload["end_date"]:
+        yield "End Date", payload["end_date"]
+
+
+RENDERERS = {"pdf": render_pdf, "docx": render_docx}
+
+
+def render_document(document_format: str, payload: Dict[str, Any]) -> bytes:
+    return RENDERERS[document_format](payload)
+
+
+def _init_worker():
+    # Build the stylesheet once per worker rather than once per document
+    if REPORTLAB_AVAILABLE:
+        _pdf_styles()
+
+
+class RenderCache:
+    """
+    Rendered documents on disk, one directory per contract. File names carry
+    the content hash and renderer version, so a cached file never changes
+    once written and an edited contract simply gets a new file.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def path(self, contract_id: str, digest: str, document_format: str) -> str:
+        return os.path.join(
+            self.directory,
+            contract_id,
+            f"{digest}-r{RENDERER_VERSION}.{document_format}",
+        )
+
+    def get(
+        self, contract_id: str, digest: str, document_format: str
+    ) -> Optional[str]:
+        path = self.path(contract_id, digest, document_format)
+        return path if os.path.exists(path) else None
+
+    def put(
+        self, contract_id: str, digest: str, document_format: str, data: bytes
+    ) -> str:
+        """Store a rendered document, dropping stale renders of the contract"""
+        path = self.path(contract_id, digest, document_format)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        self._drop_stale(directory, document_format, os.path.basename(path))
+        # Write then rename so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as target:
+            target.write(data)
+        os.replace(tmp_path, path)
+        return path
+
+    def _drop_stale(self, directory: str, document_format: str, keep: str):
+        cutoff = time.time() - STALE_RENDER_SECONDS
+        for name in os.listdir(directory):
+            if name == keep or not name.endswith(f".{document_format}"):
+                continue
+            old_path = os.path.join(directory, name)
+            try:
+                if os.path.getmtime(old_path) < cutoff:
+                    os.remove(old_path)
+            except OSError:
+                pass
+
+    def forget(self, contract_id: str):
+        shutil.rmtree(os.path.join(self.directory, contract_id), ignore_errors=True)
+
+
+class DocumentRenderService:
+    """
+    Renders contract exports in worker processes and serves repeats from
+    the render cache. Concurrent requests for the same document share one
+    render.
+    """
+
+    def __init__(self, workers: Optional[int] = None, cache_dir: Optional[str] = None):
+        self._workers = workers
+        self.cache = RenderCache(cache_dir or settings.RENDER_CACHE_DIR)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    @property
+    def worker_count(self) -> int:
+        workers = settings.RENDER_WORKERS if self._workers is None else self._workers
+        return workers or os.cpu_count() or 1
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.worker_count <= 1:
+            return None
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.worker_count,
+                    # Workers must not inherit the server's threads and locks
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+            return self._executor
+
+    async def render(self, contract: Contract, document_format: str) -> str:
+        """Path of the rendered document, rendering it if not cached"""
+        payload = render_payload(contract)
+        digest = content_hash(payload)
+        cached = self.cache.get(contract.id, digest, document_format)
+        if cached:
+            return cached
+
+        key = f"{contract.id}:{digest}:{document_format}"
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(
+                self._render(contract.id, digest, document_format, payload)
+            )
+            self._inflight[key] = task
+            task.add_done_callback(partial(self._render_done, key))
+        # A requester that disconnects stops waiting without cancelling the
+        # render others are waiting for
+        return await asyncio.shield(task)
+
+    def _render_done(self, key: str, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            # Waiters re-raise a failure; don't also report it as never retrieved
+            task.exception()
+
+    async def _render(
+        self,
+        contract_id: str,
+        digest: str,
+        document_format: str,
+        payload: Dict[str, Any],
+    ) -> str:
+        executor = self._get_executor()
+        if executor is not None:
+            data = await asyncio.get_running_loop().run_in_executor(
+                executor, render_document, document_format, payload
+            )
+        else:
+            data = await asyncio.to_thread(render_document, document_format, payload)
+        return await asyncio.to_thread(
+            self.cache.put, contract_id, digest, document_format, data
+        )
+
+    def render_batch(
+        self, document_format: str, payloads: List[Dict[str, Any]]
+    ) -> Iterator[bytes]:
+        """
+        Render a batch of payloads in the worker pool, bypassing the cache.
+        Blocking; documents are yielded in payload order.
+        """
+        executor = self._get_executor()
+        if executor is None:
+            return (render_document(document_format, p) for p in payloads)
+        chunksize = max(1, len(payloads) // (self.worker_count * 4))
+        return executor.map(
+            render_document,
+            [document_format] * len(payloads),
+            payloads,
+            chunksize=chunksize,
+        )
+
+    def forget(self, contract_id: str):
+        """Drop cached renders of a contract"""
+        self.cache.forget(contract_id)
+
+    def shutdown(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+# Global document render service instance
+document_render_service = DocumentRenderService()
@@ -0,0 +1,213 @@
+"""
+File downloads for Pactoria MVP
+Stored files are served without Python reading them: by the front-end
+server when an X-Accel-Redirect/X-Sendfile header is configured, otherwise
+with the ASGI server's zero-copy send where it offers one. Range requests,
+ETags and conditional GETs are honoured either way, and short-lived signed
+URLs let a client fetch a file without its bearer token
+"""
+
+import os
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Optional, Tuple
+from urllib.parse import quote, urlencode
+
+from starlette.datastructures import Headers
+from starlette.responses import (
+    FileResponse,
+    MalformedRangeHeader,
+    RangeNotSatisfiable,
+    Response,
+)
+from starlette.types import Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.datetime_utils import get_current_utc
+from app.core.security import create_download_signature
+
+PATHSEND = "http.response.pathsend"
+ZEROCOPYSEND = "http.response.zerocopysend"
+
+# Headers repeated on a 304, so caches can refresh what they hold
+NOT_MODIFIED_HEADERS = ("etag", "last-modified", "cache-control")
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # Weak comparison, as RFC 9110 asks for If-None-Match
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+class ConditionalFileResponse(FileResponse):
+    """
+    FileResponse that answers conditional GETs with 304 and hands the body
+    to the server when it supports the ASGI pathsend or zero-copy send
+    extensions, instead of reading the file in chunks in Python.
+    Pass the content hash as etag when there is one; it survives copies
+    and restores that would change the file's mtime.
+    """
+
+    def __init__(self, path: os.PathLike, etag: Optional[str] = None, **kwargs):
+        super().__init__(path, stat_result=os.stat(path), **kwargs)
+        if etag:
+            self.headers["etag"] = f'"{etag}"'
+        # Authenticated content: never shared, always revalidated
+        self.headers.setdefault("cache-control", "private, no-cache")
+
+    def _should_use_range(self, http_if_range: str, stat_result) -> bool:
+        return http_if_range in (self.headers["etag"], self.headers["last-modified"])
+
+    def is_not_modified(self, request_headers: Headers) -> bool:
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None:
+            return _etag_matches(if_none_match, self.headers["etag"])
+        if_modified_since = request_headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            modified = datetime.fromtimestamp(
+                int(self.stat_result.st_mtime), tz=timezone.utc
+            )
+            return since.tzinfo is not None and modified <= since
+        return False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        request_headers = Headers(scope=scope)
+        if scope["method"] in ("GET", "HEAD") and self.is_not_modified(
+            request_headers
+        ):
+            response = Response(
+                status_code=304,
+                headers={
+                    name: self.headers[name]
+                    for name in NOT_MODIFIED_HEADERS
+                    if name in self.headers
+                },
+            )
+            return await response(scope, receive, send)
+
+        extensions = scope.get("extensions") or {}
+        if scope["method"] == "GET" and "range" not in request_headers:
+            if PATHSEND in extensions:
+                await send(self._start_message(200))
+                await send({"type": PATHSEND, "path": str(self.path)})
+                return await self._after_body()
+            if ZEROCOPYSEND in extensions:
+                await send(self._start_message(200))
+                await self._zerocopy(send, 0, self.stat_result.st_size)
+                return await self._after_body()
+        elif scope["method"] == "GET" and ZEROCOPYSEND in extensions:
+            span = self._single_range(request_headers)
+            if span is not None:
+                start, end = span
+                self.headers["content-range"] = (
+                    f"bytes {start}-{end - 1}/{self.stat_result.st_size}"
+                )
+                self.headers["content-length"] = str(end - start)
+                await send(self._start_message(206))
+                await self._zerocopy(send, start, end - start)
+                return await self._after_body()
+
+        # Everything else (HEAD, multipart ranges, bad ranges) as Starlette does
+        await super().__call__(scope, receive, send)
+
+    def _single_range(self, request_headers: Headers) -> Optional[Tuple[int, int]]:
+        if_range = request_headers.get("if-range")
+        if if_range is not None and not self._should_use_range(
+            if_range, self.stat_result
+        ):
+            return None
+        try:
+            ranges = self._parse_range_header(
+                request_headers["range"], self.stat_result.st_size
+            )
+        except (MalformedRangeHeader, RangeNotSatisfiable):
+            # Starlette's path answers these with 400 and 416
+            return None
+        return ranges[0] if len(ranges) == 1 else None
+
+    def _start_message(self, status_code: int) -> dict:
+        return {
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": self.raw_headers,
+        }
+
+    async def _zerocopy(self, send: Send, offset: int, count: int):
+        with open(self.path, "rb") as file:
+            await send(
+                {
+                    "type": ZEROCOPYSEND,
+                    "file": file,
+                    "offset": offset,
+                    "count": count,
+                }
+            )
+
+    async def _after_body(self):
+        if self.background is not None:
+            await self.background()
+
+
+def file_download_response(
+    path: Path,
+    root: Path,
+    filename: str,
+    media_type: str,
+    etag: Optional[str] = None,
+) -> Response:
+    """
+    Response for a stored file under root: an empty response naming the
+    file in FILE_ACCEL_REDIRECT_HEADER when that is set, so the front-end
+    server sends it, or a ConditionalFileResponse
+    """
+    header = settings.FILE_ACCEL_REDIRECT_HEADER
+    if not header:
+        return ConditionalFileResponse(
+            path, etag=etag, filename=filename, media_type=media_type
+        )
+
+    if header.lower() == "x-sendfile":
+        location = str(path.resolve())
+    else:
+        relative = path.resolve().relative_to(root.resolve()).as_posix()
+        location = settings.FILE_ACCEL_REDIRECT_PREFIX.rstrip("/") + "/" + quote(
+            relative
+        )
+    headers = {
+        header: location,
+        "content-disposition": f"attachment; filename*=utf-8''{quote(filename)}",
+        "cache-control": "private, no-cache",
+    }
+    if etag:
+        headers["etag"] = f'"{etag}"'
+    return Response(headers=headers, media_type=media_type)
+
+
+def signed_download_url(
+    file_id: str, issued_by: str, ttl_seconds: Optional[int] = None
+) -> Tuple[str, datetime]:
+    """
+    A URL downloading file_id without authentication until it expires;
+    downloads through it are audited as the issuing user's
+    """
+    ttl = ttl_seconds or settings.FILE_SIGNED_URL_TTL_SECONDS
+    expires = int(get_current_utc().timestamp()) + ttl
+    query = urlencode(
+        {
+            "issued_by": issued_by,
+            "expires": expires,
+            "signature": create_download_signature(file_id, issued_by, expires),
+        }
+    )
+    url = f"/api/v1/files/signed/{file_id}?{query}"
+    return url, datetime.fromtimestamp(expires, tz=timezone.utc)
@@ -0,0 +1,252 @@
+"""
+Background file exports for Pactoria MVP
+An export is a bulk job: its row holds the status, progress, the path of the
+file being written and when it expires, so any API process can report on or
+serve an export, and the file is deleted when its row is purged. Job workers
+write the files, so the export directory must be shared with them
+"""
+
+import asyncio
+import logging
+import os
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.core import database
+from app.infrastructure.database.models import BulkJob, User
+from app.schemas.bulk import BulkOperationStatus
+from app.services.bulk_job_service import (
+    FINISHED_STATUSES,
+    BulkJobService,
+    bulk_job_service,
+    partial_path,
+    remove_job_file,
+)
+from app.services.job_queue_service import (
+    JobCancelled,
+    JobContext,
+    JobQueueService,
+    job_queue_service,
+)
+
+logger = logging.getLogger(__name__)
+
+FOLLOW_CHUNK_BYTES = 64 * 1024
+FOLLOW_POLL_SECONDS = 0.2
+
+# Called with the number of records written so far
+ProgressCallback = Callable[[int], None]
+
+
+def plain_value(value):
+    """A column value as it is written to an export"""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+class FileExportService(ABC):
+    """
+    Base for exports written to a file by a job worker. Subclasses set
+    export_type (the bulk job operation type and the job queue job type),
+    name the file and write it; this class records, runs, follows and
+    cleans up after the export.
+    """
+
+    export_type = ""
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        export_dir: Optional[str] = None,
+        job_service: Optional[BulkJobService] = None,
+        job_queue: Optional[JobQueueService] = None,
+    ):
+        self._session_factory = session_factory
+        self._export_dir = export_dir
+        self._job_service = job_service or bulk_job_service
+        self._job_queue = job_queue or job_queue_service
+
+    @property
+    def export_dir(self) -> str:
+        return self._export_dir or self.default_export_dir
+
+    @property
+    @abstractmethod
+    def default_export_dir(self) -> str:
+        pass
+
+    @property
+    @abstractmethod
+    def ttl_hours(self) -> float:
+        pass
+
+    def _new_session(self) -> Session:
+        return (self._session_factory or database.SessionLocal)()
+
+    @abstractmethod
+    def file_name(self, job: BulkJob) -> str:
+        pass
+
+    @abstractmethod
+    def write_file(
+        self, db: Session, job: BulkJob, path: str, report: ProgressCallback
+    ):
+        """
+        Write the export to path; blocking. Call report() between pages
+        only: on SQLite a half-read query result would block its write.
+        """
+        pass
+
+    def create(
+        self,
+        db: Session,
+        user: User,
+        total_items: int,
+        parameters: Dict[str, Any],
+    ) -> BulkJob:
+        """Record an export and queue it for a job worker"""
+        job = self._job_service.create(
+            db,
+            self.export_type,
+            user,
+            total_items=total_items,
+            parameters=parameters,
+            ttl_hours=self.ttl_hours,
+        )
+        job.file_path = os.path.join(self.export_dir, self.file_name(job))
+        background_job = self._job_queue.enqueue(
+            db,
+            self.export_type,
+            payload={"bulk_job_id": job.id},
+            company_id=user.company_id,
+            user_id=user.id,
+        )
+        job.background_job_id = background_job.id
+        db.commit()
+        logger.info(f"Created {self.export_type} {job.id} of {total_items} records")
+        return job
+
+    def get_job(self, db: Session, export_id: str) -> Optional[BulkJob]:
+        job = db.get(BulkJob, export_id)
+        if job is None or job.operation_type != self.export_type:
+            return None
+        return job
+
+    def _load(self, export_id: str) -> Optional[BulkJob]:
+        # A fresh session per poll sees commits from job workers
+        with self._new_session() as db:
+            return self.get_job(db, export_id)
+
+    async def run(self, context: JobContext) -> Dict[str, Any]:
+        """Write an export's file; the body of its job handler"""
+        return await asyncio.to_thread(self._run, context)
+
+    def _run(self, context: JobContext) -> Dict[str, Any]:
+        export_id = context.payload["bulk_job_id"]
+        with self._new_session() as db:
+            job = self.get_job(db, export_id)
+            if job is None:
+                raise ValueError(f"Export {export_id} no longer exists")
+            if job.status not in FINISHED_STATUSES:
+                self._write(db, job, context)
+            return {
+                "export_id": job.id,
+                "status": job.status,
+                "file_size_bytes": job.file_size_bytes,
+            }
+
+    def _write(self, db: Session, job: BulkJob, context: JobContext):
+        # A retried export starts its file over
+        job.processed_items = 0
+        self._job_service.mark_started(db, job)
+        os.makedirs(os.path.dirname(job.file_path), exist_ok=True)
+
+        def report(processed: int):
+            with self._new_session() as progress_db:
+                progress_db.execute(
+                    update(BulkJob)
+                    .where(BulkJob.id == job.id)
+                    .values(processed_items=processed)
+                )
+                progress_db.commit()
+            # Renews the lease; raises JobCancelled once the job is cancelled
+            context.update_progress(
+                100 * processed / job.total_items if job.total_items else 100.0,
+                f"{processed} of {job.total_items} records written",
+            )
+
+        try:
+            self.write_file(db, job, partial_path(job.file_path), report)
+            os.replace(partial_path(job.file_path), job.file_path)
+        except (Exception, JobCancelled) as e:
+            db.rollback()
+            remove_job_file(job.file_path)
+            if isinstance(e, JobCancelled):
+                self._job_service.finish(
+                    db, job, BulkOperationStatus.FAILED, "Export cancelled"
+                )
+                raise
+            logger.error(f"Export {job.id} failed: {e}")
+            self._job_service.finish(
+                db, job, BulkOperationStatus.FAILED, f"Export failed: {str(e)}"
+            )
+            return
+        db.refresh(job)
+        job.file_size_bytes = os.path.getsize(job.file_path)
+        self._job_service.finish(db, job, BulkOperationStatus.COMPLETED)
+        logger.info(
+            f"Export {job.id} written: {job.processed_items} records, "
+            f"{job.file_size_bytes} bytes"
+        )
+
+    async def follow(self, export_id: str) -> AsyncIterator[bytes]:
+        """Stream an export file that is still being written, until it's done"""
+        job = await asyncio.to_thread(self._load, export_id)
+        while (
+            job is not None
+            and job.status not in FINISHED_STATUSES
+            and not os.path.exists(partial_path(job.file_path))
+        ):
+            await asyncio.sleep(FOLLOW_POLL_SECONDS)
+            job = await asyncio.to_thread(self._load, export_id)
+        if job is None:
+            raise RuntimeError(f"Export {export_id} no longer exists")
+        try:
+            source = open(partial_path(job.file_path), "rb")
+        except FileNotFoundError:
+            # Finished in the meantime
+            job = await asyncio.to_thread(self._load, export_id)
+            if job is None or job.status != BulkOperationStatus.COMPLETED.value:
+                raise RuntimeError(job.error_message if job else "Export purged")
+            source = open(job.file_path, "rb")
+        with source:
+            finished = False
+            while True:
+                data = await asyncio.to_thread(source.read, FOLLOW_CHUNK_BYTES)
+                if data:
+                    yield data
+                    continue
+                if finished:
+                    return
+                job = await asyncio.to_thread(self._load, export_id)
+                if job is None or job.status == BulkOperationStatus.FAILED.value:
+                    # Abort the transfer rather than end it with a truncated
+                    # file that looks complete
+                    raise RuntimeError(job.error_message if job else "Export purged")
+                if job.status == BulkOperationStatus.COMPLETED.value:
+                    # Read what was written since the last read, then stop
+                    finished = True
+                else:
+                    await asyncio.sleep(FOLLOW_POLL_SECONDS)
+
+    def purge_expired(self, db: Session):
+        """Delete exports past their expiry, with their files"""
+        self._job_service.purge_expired(db)
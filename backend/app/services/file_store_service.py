@@ -0,0 +1,187 @@
+"""
+Content-addressed file store for Pactoria MVP
+File metadata lives in the files table; the bytes live once per company in
+a blob named by their SHA-256, so identical uploads share storage. Blobs
+are reference counted and removed from disk with the last file using them
+"""
+
+import logging
+import os
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload
+
+from app.core.config import settings
+from app.infrastructure.database.models import FileBlob, StoredFile
+from app.services.file_upload_service import StoredUpload
+
+logger = logging.getLogger(__name__)
+
+
+class FileStoreService:
+    """Store, find and delete uploaded files, deduplicated per company"""
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root or settings.UPLOAD_DIR)
+
+    def blob_key(self, company_id: str, sha256: str) -> str:
+        # Fanned out by hash prefix to keep directories small
+        return f"{company_id}/blobs/{sha256[:2]}/{sha256}"
+
+    def path(self, record: StoredFile) -> Path:
+        """Where a file's content is on disk"""
+        return self.root / record.blob.storage_path
+
+    def store(
+        self,
+        db: Session,
+        upload: StoredUpload,
+        company_id: str,
+        filename: str,
+        original_filename: str,
+        mime_type: str,
+        uploaded_by: Optional[str] = None,
+        contract_id: Optional[str] = None,
+        description: Optional[str] = None,
+    ) -> StoredFile:
+        """
+        Record an upload as a file of company_id. Its content becomes a new
+        blob, or another reference to the company's blob with the same hash,
+        in which case the uploaded copy is discarded.
+        """
+        blob, created = self._reference_blob(db, upload, company_id)
+        record = StoredFile(
+            company_id=company_id,
+            contract_id=contract_id,
+            blob_id=blob.id,
+            uploaded_by=uploaded_by,
+            filename=filename,
+            original_filename=original_filename,
+            mime_type=mime_type,
+            description=description,
+            file_size=upload.size,
+            sha256=upload.sha256,
+        )
+        db.add(record)
+        try:
+            db.commit()
+        except Exception:
+            db.rollback()
+            if created:
+                self._unlink(self.root / blob.storage_path)
+            raise
+        db.refresh(record)
+        return record
+
+    def _reference_blob(
+        self, db: Session, upload: StoredUpload, company_id: str
+    ) -> Tuple[FileBlob, bool]:
+        matches_content = (FileBlob.company_id == company_id) & (
+            FileBlob.sha256 == upload.sha256
+        )
+        referenced = db.execute(
+            update(FileBlob)
+            .where(matches_content)
+            .values(ref_count=FileBlob.ref_count + 1)
+        ).rowcount
+        if referenced:
+            blob = db.query(FileBlob).filter(matches_content).one()
+            path = self.root / blob.storage_path
+            if path.exists():
+                upload.discard()
+            else:
+                # Content lost from disk; the upload restores it
+                logger.warning(f"Restoring missing blob {blob.id} from an upload")
+                path.parent.mkdir(parents=True, exist_ok=True)
+                upload.promote(path)
+            return blob, False
+
+        key = self.blob_key(company_id, upload.sha256)
+        blob = FileBlob(
+            company_id=company_id,
+            sha256=upload.sha256,
+            size=upload.size,
+            storage_path=key,
+            ref_count=1,
+        )
+        db.add(blob)
+        try:
+            db.flush()
+        except IntegrityError:
+            # The same content was stored concurrently; reference that one
+            db.rollback()
+            return self._reference_blob(db, upload, company_id)
+
+        path = self.root / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        upload.promote(path)
+        return blob, True
+
+    def get(
+        self, db: Session, file_id: str, company_id: Optional[str] = None
+    ) -> Optional[StoredFile]:
+        """A file by ID, limited to company_id when given"""
+        query = (
+            db.query(StoredFile)
+            .options(joinedload(StoredFile.blob))
+            .filter(StoredFile.id == file_id)
+        )
+        if company_id is not None:
+            query = query.filter(StoredFile.company_id == company_id)
+        return query.first()
+
+    def list(
+        self,
+        db: Session,
+        company_id: str,
+        contract_id: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 20,
+    ) -> Tuple[List[StoredFile], int]:
+        """A page of a company's files, newest first, and their total"""
+        query = db.query(StoredFile).filter(StoredFile.company_id == company_id)
+        if contract_id:
+            query = query.filter(StoredFile.contract_id == contract_id)
+
+        total = query.count()
+        files = (
+            query.order_by(StoredFile.created_at.desc(), StoredFile.id.desc())
+            .offset(offset)
+            .limit(limit)
+            .all()
+        )
+        return files, total
+
+    def delete(self, db: Session, record: StoredFile):
+        """Delete a file, and its blob if no other file uses it"""
+        blob_id = record.blob_id
+        path = self.path(record)
+        db.delete(record)
+        db.flush()
+
+        db.execute(
+            update(FileBlob)
+            .where(FileBlob.id == blob_id)
+            .values(ref_count=FileBlob.ref_count - 1)
+        )
+        orphaned = db.execute(
+            delete(FileBlob).where(FileBlob.id == blob_id, FileBlob.ref_count <= 0)
+        ).rowcount
+        if orphaned:
+            # Removed while the blob row is still locked, so an upload of the
+            # same content waits and then stores a fresh blob
+            self._unlink(path)
+        db.commit()
+
+    def _unlink(self, path: Path):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+# Global file store instance
+file_store_service = FileStoreService()
@@ -0,0 +1,105 @@
+"""
+Streamed file uploads for Pactoria MVP
+Uploads are copied to a temporary file next to their final location a chunk
+at a time and hashed on the way, so memory per upload stays constant however
+large the file. Starlette has already spooled the form by then; the request
+body itself is capped by UploadSizeLimitMiddleware while it arrives.
+Content sniffing only looks at the first few KB
+"""
+
+import asyncio
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Optional
+
+from fastapi import UploadFile
+
+from app.core.config import settings
+
+try:
+    import magic
+
+    HAS_MAGIC = True
+except ImportError:
+    HAS_MAGIC = False
+
+# Bytes kept from the start of an upload for MIME type detection
+SNIFF_BYTES = 8 * 1024
+
+
+class UploadTooLargeError(ValueError):
+    """Upload that passed the size limit while streaming"""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(f"Upload exceeds {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+@dataclass
+class StoredUpload:
+    """An upload written to a temporary file, not yet in its final place"""
+
+    path: Path
+    size: int
+    sha256: str
+    # The first SNIFF_BYTES of the upload
+    head: bytes
+
+    def promote(self, destination: Path) -> Path:
+        """Move the upload to its final path (atomic on the same volume)"""
+        os.replace(self.path, destination)
+        self.path = destination
+        return destination
+
+    def discard(self):
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def _write_chunk(target: IO[bytes], digest, chunk: bytes):
+    # Both release the GIL for large buffers; run off the event loop
+    digest.update(chunk)
+    target.write(chunk)
+
+
+async def stream_upload(
+    source: UploadFile,
+    directory: Path,
+    max_bytes: int,
+    chunk_size: Optional[int] = None,
+) -> StoredUpload:
+    """
+    Copy an upload into a temporary file in directory, computing its
+    SHA-256 on the way. Raises UploadTooLargeError, leaving nothing behind,
+    as soon as more than max_bytes have been read.
+    """
+    chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE_KB * 1024
+    directory.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".part")
+    digest = hashlib.sha256()
+    size, head = 0, b""
+    try:
+        with os.fdopen(fd, "wb") as target:
+            while chunk := await source.read(chunk_size):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(max_bytes)
+                if len(head) < SNIFF_BYTES:
+                    head += chunk[: SNIFF_BYTES - len(head)]
+                await asyncio.to_thread(_write_chunk, target, digest, chunk)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return StoredUpload(Path(temp_path), size, digest.hexdigest(), head)
+
+
+def sniff_mime_type(head: bytes, fallback: Optional[str] = None) -> str:
+    """MIME type from the first bytes of a file, or fallback without libmagic"""
+    if HAS_MAGIC:
+        return magic.from_buffer(head, mime=True)
+    return fallback or "application/octet-stream"
@@ -0,0 +1,683 @@
+"""
+Background job queue for Pactoria MVP
+Work that must not run inside a request is enqueued as a job row and picked
+up by workers: in the API process during development, or in separate
+scripts/run_job_worker.py processes in production. Workers claim jobs in
+priority order with row locking (FOR UPDATE SKIP LOCKED on PostgreSQL, a
+conditional update of the lease on SQLite), at most JOB_TENANT_CONCURRENCY
+at a time per company. Failed jobs are retried with exponential backoff,
+and a job whose worker died is picked up again once its lease expires
+"""
+
+import asyncio
+import importlib
+import logging
+import os
+import random
+import socket
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+from uuid import uuid4
+
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.orm import Session, aliased
+
+from app.core import database
+from app.core.config import settings
+from app.core.datetime_utils import get_current_utc
+from app.infrastructure.database.models import BackgroundJob
+from app.schemas.jobs import BackgroundJobResponse, JobStatus
+from app.schemas.websocket import NotificationMessage
+from app.services.websocket_service import send_user_notification
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATUSES = (
+    JobStatus.COMPLETED.value,
+    JobStatus.FAILED.value,
+    JobStatus.CANCELLED.value,
+)
+
+# Modules whose import registers job handlers; loaded by every worker
+JOB_HANDLER_MODULES = (
+    "app.services.portfolio_rescan_service",
+    "app.services.bulk_operations_service",
+    "app.services.bulk_export_service",
+    "app.services.audit_export_service",
+)
+
+# Queued jobs a worker considers per claim
+CLAIM_CANDIDATES = 20
+FOLLOW_POLL_SECONDS = 0.5
+
+
+class JobCancelled(BaseException):
+    """
+    Raised into a handler when its job was cancelled. Like
+    asyncio.CancelledError it is not an Exception, so handlers' own error
+    handling doesn't swallow it.
+    """
+
+
+def background_job_response(job: BackgroundJob) -> BackgroundJobResponse:
+    def isoformat(value: Optional[datetime]) -> Optional[str]:
+        return value.isoformat() if value else None
+
+    return BackgroundJobResponse(
+        job_id=job.id,
+        job_type=job.job_type,
+        status=job.status,
+        priority=job.priority,
+        attempts=job.attempts,
+        max_attempts=job.max_attempts,
+        progress=job.progress,
+        progress_message=job.progress_message,
+        cancel_requested=job.cancel_requested,
+        result=job.result,
+        error_message=job.error_message,
+        run_after=isoformat(job.run_after),
+        created_at=isoformat(job.created_at),
+        started_at=isoformat(job.started_at),
+        completed_at=isoformat(job.completed_at),
+        events_url=f"/api/v1/jobs/{job.id}/events",
+    )
+
+
+def retry_delay(attempts: int) -> float:
+    """Seconds before retrying a job that has failed `attempts` times"""
+    delay = min(
+        settings.JOB_RETRY_BASE_SECONDS * 2 ** (attempts - 1),
+        settings.JOB_RETRY_MAX_SECONDS,
+    )
+    # Jitter, so jobs that failed together don't all retry together
+    return delay * random.uniform(1.0, 1.1)
+
+
+@dataclass
+class JobContext:
+    """What a handler gets for the job it runs"""
+
+    job_id: str
+    job_type: str
+    payload: Dict[str, Any]
+    company_id: Optional[str]
+    user_id: Optional[str]
+    attempt: int
+    max_attempts: int
+    # What the handler saved on an earlier attempt, if anything
+    checkpoint: Optional[Dict[str, Any]]
+    _service: "JobQueueService" = field(repr=False)
+    _worker_id: str = field(repr=False)
+    _loop: asyncio.AbstractEventLoop = field(repr=False)
+
+    def update_progress(
+        self,
+        progress: float,
+        message: Optional[str] = None,
+        checkpoint: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Record progress (0-100) and optionally a checkpoint to resume from.
+        Blocking, so handlers running in a thread can call it directly.
+        Raises JobCancelled once the job has been cancelled: cancellation
+        is cooperative and happens at the next progress update.
+        """
+        if checkpoint is not None:
+            self.checkpoint = checkpoint
+        response = self._service._save_progress(
+            self.job_id, self._worker_id, progress, message, checkpoint
+        )
+        if response is None or response.cancel_requested:
+            raise JobCancelled(self.job_id)
+        asyncio.run_coroutine_threadsafe(
+            self._service._publish(response, self.user_id), self._loop
+        )
+
+    async def report_progress(
+        self,
+        progress: float,
+        message: Optional[str] = None,
+        checkpoint: Optional[Dict[str, Any]] = None,
+    ):
+        """update_progress for async handlers"""
+        await asyncio.to_thread(self.update_progress, progress, message, checkpoint)
+
+
+JobHandler = Callable[[JobContext], Awaitable[Optional[Dict[str, Any]]]]
+
+
+async def send_job_update(response: BackgroundJobResponse, user_id: str):
+    """Send a job's progress to the user who started it"""
+    await send_user_notification(
+        NotificationMessage(
+            title=response.job_type,
+            message=response.progress_message or response.status.value,
+            notification_type="background_job",
+            target_user_id=user_id,
+            data=response.model_dump(mode="json"),
+        )
+    )
+
+
+class JobQueueService:
+    """
+    Enqueues background jobs and runs them. Handlers are registered per
+    job type and are async callables taking a JobContext; whatever dict
+    they return is stored as the job's result. Each database step opens
+    a session of its own, as workers outlive any request.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        notify: Optional[
+            Callable[[BackgroundJobResponse, str], Awaitable[Any]]
+        ] = None,
+    ):
+        self._session_factory = session_factory
+        self._notify = notify or send_job_update
+        self._handlers: Dict[str, JobHandler] = {}
+        self._worker: Optional[asyncio.Task] = None
+        self._stop: Optional[asyncio.Event] = None
+
+    def _new_session(self) -> Session:
+        return (self._session_factory or database.SessionLocal)()
+
+    def register(self, job_type: str, handler: JobHandler):
+        self._handlers[job_type] = handler
+
+    def handler(self, job_type: str) -> Callable[[JobHandler], JobHandler]:
+        """Decorator registering a job handler"""
+
+        def decorator(handler: JobHandler) -> JobHandler:
+            self.register(job_type, handler)
+            return handler
+
+        return decorator
+
+    def enqueue(
+        self,
+        db: Session,
+        job_type: str,
+        payload: Optional[Dict[str, Any]] = None,
+        company_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        priority: int = 0,
+        max_attempts: Optional[int] = None,
+        delay_seconds: float = 0,
+    ) -> BackgroundJob:
+        """Queue a job; committed so that any worker can claim it"""
+        self.purge_finished(db)
+        job = BackgroundJob(
+            job_type=job_type,
+            payload=payload or {},
+            company_id=company_id,
+            user_id=user_id,
+            priority=priority,
+            status=JobStatus.QUEUED.value,
+            attempts=0,
+            max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+            run_after=get_current_utc() + timedelta(seconds=delay_seconds),
+            cancel_requested=False,
+            progress=0.0,
+        )
+        db.add(job)
+        db.commit()
+        return job
+
+    def get_job(
+        self, db: Session, job_id: str, company_id: Optional[str] = None
+    ) -> Optional[BackgroundJob]:
+        job = db.get(BackgroundJob, job_id)
+        if job is None or (company_id and job.company_id != company_id):
+            return None
+        return job
+
+    def list_jobs(
+        self,
+        db: Session,
+        company_id: str,
+        job_status: Optional[JobStatus] = None,
+        offset: int = 0,
+        limit: int = 50,
+    ) -> Tuple[List[BackgroundJob], int]:
+        """A page of a company's jobs, newest first, and the total to page"""
+        query = db.query(BackgroundJob).filter(BackgroundJob.company_id == company_id)
+        if job_status:
+            query = query.filter(BackgroundJob.status == job_status.value)
+        total = query.count()
+        jobs = (
+            query.order_by(BackgroundJob.created_at.desc(), BackgroundJob.id)
+            .offset(offset)
+            .limit(limit)
+            .all()
+        )
+        return jobs, total
+
+    def cancel(self, db: Session, job: BackgroundJob) -> BackgroundJob:
+        """
+        Cancel a job: a queued job at once, a running one when its handler
+        next reports progress
+        """
+        if job.status == JobStatus.QUEUED.value:
+            job.status = JobStatus.CANCELLED.value
+            job.completed_at = get_current_utc()
+        elif job.status == JobStatus.RUNNING.value:
+            job.cancel_requested = True
+        db.commit()
+        return job
+
+    def purge_finished(self, db: Session):
+        """Delete jobs that finished more than JOB_RETENTION_HOURS ago"""
+        cutoff = get_current_utc() - timedelta(hours=settings.JOB_RETENTION_HOURS)
+        db.execute(
+            delete(BackgroundJob)
+            .where(BackgroundJob.status.in_(FINISHED_STATUSES))
+            .where(BackgroundJob.completed_at < cutoff)
+        )
+        db.commit()
+
+    # Claiming
+
+    def _claimable(self, now: datetime):
+        """Queued jobs this worker can run, best first"""
+        running = aliased(BackgroundJob)
+        running_for_company = (
+            select(func.count())
+            .select_from(running)
+            .where(running.company_id == BackgroundJob.company_id)
+            .where(running.status == JobStatus.RUNNING.value)
+            .scalar_subquery()
+        )
+        return (
+            select(BackgroundJob)
+            .where(BackgroundJob.status == JobStatus.QUEUED.value)
+            .where(BackgroundJob.run_after <= now)
+            .where(BackgroundJob.job_type.in_(list(self._handlers)))
+            .where(
+                or_(
+                    BackgroundJob.company_id.is_(None),
+                    running_for_company < settings.JOB_TENANT_CONCURRENCY,
+                )
+            )
+            .order_by(
+                BackgroundJob.priority.desc(),
+                BackgroundJob.run_after,
+                BackgroundJob.created_at,
+            )
+        )
+
+    def _lease_values(self, worker_id: str, now: datetime) -> Dict[str, Any]:
+        return {
+            "status": JobStatus.RUNNING.value,
+            "locked_by": worker_id,
+            "lease_expires_at": now + timedelta(seconds=settings.JOB_LEASE_SECONDS),
+            "attempts": BackgroundJob.attempts + 1,
+        }
+
+    def claim(self, db: Session, worker_id: str) -> Optional[BackgroundJob]:
+        """Take the next runnable job for worker_id and lease it, if any"""
+        if not self._handlers:
+            return None
+        now = get_current_utc()
+        self.recover_expired(db, now)
+        if db.get_bind().dialect.name == "postgresql":
+            return self._claim_skip_locked(db, worker_id, now)
+
+        # No row locks (SQLite): a conditional update wins the job, and the
+        # company's running count is checked in the same statement, since
+        # SQLite runs one write at a time
+        candidates = self._claimable(now).with_only_columns(BackgroundJob.id)
+        job_ids = list(db.scalars(candidates.limit(CLAIM_CANDIDATES)))
+        for job_id in job_ids:
+            claimed = db.execute(
+                update(BackgroundJob)
+                .where(BackgroundJob.id == job_id)
+                .where(BackgroundJob.id.in_(candidates))
+                .values(**self._lease_values(worker_id, now))
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            db.commit()
+            if claimed:
+                return db.get(BackgroundJob, job_id)
+        db.commit()
+        return None
+
+    def _claim_skip_locked(
+        self, db: Session, worker_id: str, now: datetime
+    ) -> Optional[BackgroundJob]:
+        candidates = db.scalars(
+            self._claimable(now)
+            .limit(CLAIM_CANDIDATES)
+            .with_for_update(skip_locked=True, of=BackgroundJob)
+        ).all()
+        for job in candidates:
+            if job.company_id is not None:
+                # Workers claiming for the same company take turns, so two
+                # can't both see room under the company's limit
+                db.execute(
+                    select(func.pg_advisory_xact_lock(func.hashtext(job.company_id)))
+                )
+                running = db.scalar(
+                    select(func.count())
+                    .select_from(BackgroundJob)
+                    .where(BackgroundJob.company_id == job.company_id)
+                    .where(BackgroundJob.status == JobStatus.RUNNING.value)
+                )
+                if running >= settings.JOB_TENANT_CONCURRENCY:
+                    continue
+            db.execute(
+                update(BackgroundJob)
+                .where(BackgroundJob.id == job.id)
+                .values(**self._lease_values(worker_id, now))
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            db.refresh(job)
+            return job
+        db.commit()
+        return None
+
+    def recover_expired(self, db: Session, now: Optional[datetime] = None):
+        """Requeue (or fail, if out of attempts) jobs whose worker died"""
+        now = now or get_current_utc()
+        expired = (
+            update(BackgroundJob)
+            .where(BackgroundJob.status == JobStatus.RUNNING.value)
+            .where(BackgroundJob.lease_expires_at < now)
+            .execution_options(synchronize_session=False)
+        )
+        db.execute(
+            expired.where(BackgroundJob.attempts < BackgroundJob.max_attempts).values(
+                status=JobStatus.QUEUED.value,
+                locked_by=None,
+                lease_expires_at=None,
+                run_after=now,
+            )
+        )
+        db.execute(
+            expired.where(BackgroundJob.attempts >= BackgroundJob.max_attempts).values(
+                status=JobStatus.FAILED.value,
+                locked_by=None,
+                lease_expires_at=None,
+                error_message="Worker stopped responding",
+                completed_at=now,
+            )
+        )
+        db.commit()
+
+    # Running
+
+    def _held(self, job_id: str, worker_id: str):
+        """Update of a job, applied only while worker_id still holds it"""
+        return (
+            update(BackgroundJob)
+            .where(BackgroundJob.id == job_id)
+            .where(BackgroundJob.locked_by == worker_id)
+            .where(BackgroundJob.status == JobStatus.RUNNING.value)
+            .execution_options(synchronize_session=False)
+        )
+
+    def _write(
+        self, job_id: str, worker_id: str, values: Dict[str, Any]
+    ) -> Optional[BackgroundJobResponse]:
+        """Apply values to a held job; None if the worker lost its lease"""
+        with self._new_session() as db:
+            updated = db.execute(self._held(job_id, worker_id).values(**values))
+            db.commit()
+            if not updated.rowcount:
+                return None
+            return background_job_response(db.get(BackgroundJob, job_id))
+
+    def _save_progress(
+        self,
+        job_id: str,
+        worker_id: str,
+        progress: float,
+        message: Optional[str],
+        checkpoint: Optional[Dict[str, Any]],
+    ) -> Optional[BackgroundJobResponse]:
+        values = {
+            "progress": max(0.0, min(float(progress), 100.0)),
+            "progress_message": message,
+            "lease_expires_at": get_current_utc()
+            + timedelta(seconds=settings.JOB_LEASE_SECONDS),
+        }
+        if checkpoint is not None:
+            values["checkpoint"] = checkpoint
+        return self._write(job_id, worker_id, values)
+
+    def _start(
+        self, job_id: str, worker_id: str, loop: asyncio.AbstractEventLoop
+    ) -> Optional[JobContext]:
+        with self._new_session() as db:
+            job = db.get(BackgroundJob, job_id)
+            if job is None or job.locked_by != worker_id:
+                return None
+            if job.started_at is None:
+                job.started_at = get_current_utc()
+                db.commit()
+            return JobContext(
+                job_id=job.id,
+                job_type=job.job_type,
+                payload=dict(job.payload or {}),
+                company_id=job.company_id,
+                user_id=job.user_id,
+                attempt=job.attempts,
+                max_attempts=job.max_attempts,
+                checkpoint=job.checkpoint,
+                _service=self,
+                _worker_id=worker_id,
+                _loop=loop,
+            )
+
+    def _heartbeat(self, worker_id: str):
+        """Extend the leases of every job worker_id is running"""
+        with self._new_session() as db:
+            db.execute(
+                update(BackgroundJob)
+                .where(BackgroundJob.locked_by == worker_id)
+                .where(BackgroundJob.status == JobStatus.RUNNING.value)
+                .values(
+                    lease_expires_at=get_current_utc()
+                    + timedelta(seconds=settings.JOB_LEASE_SECONDS)
+                )
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+
+    def _claim_next(self, worker_id: str) -> Optional[str]:
+        with self._new_session() as db:
+            job = self.claim(db, worker_id)
+            return job.id if job else None
+
+    async def _publish(self, response: BackgroundJobResponse, user_id: Optional[str]):
+        # Progress events are best effort; they only reach clients connected
+        # to this process. The job row (and /jobs/{id}/events) is the record.
+        if not user_id:
+            return
+        try:
+            await self._notify(response, user_id)
+        except Exception as e:
+            logger.warning(f"Job update for {response.job_id} not sent: {e}")
+
+    async def execute(self, job_id: str, worker_id: str):
+        """Run a claimed job's handler and record how it ended"""
+        context = await asyncio.to_thread(
+            self._start, job_id, worker_id, asyncio.get_running_loop()
+        )
+        if context is None:
+            return
+        released = {
+            "status": JobStatus.QUEUED.value,
+            "locked_by": None,
+            "lease_expires_at": None,
+        }
+        try:
+            result = await self._handlers[context.job_type](context)
+        except JobCancelled:
+            logger.info(f"Job {job_id} cancelled")
+            values = {
+                "status": JobStatus.CANCELLED.value,
+                "completed_at": get_current_utc(),
+            }
+        except asyncio.CancelledError:
+            # The worker is shutting down; the attempt doesn't count
+            await asyncio.to_thread(
+                self._write,
+                job_id,
+                worker_id,
+                {**released, "attempts": BackgroundJob.attempts - 1},
+            )
+            raise
+        except Exception as e:
+            logger.error(
+                f"Job {job_id} ({context.job_type}) failed on attempt "
+                f"{context.attempt}: {e}"
+            )
+            if context.attempt < context.max_attempts:
+                values = {
+                    **released,
+                    "error_message": str(e),
+                    "run_after": get_current_utc()
+                    + timedelta(seconds=retry_delay(context.attempt)),
+                }
+            else:
+                values = {
+                    "status": JobStatus.FAILED.value,
+                    "error_message": str(e),
+                    "completed_at": get_current_utc(),
+                }
+        else:
+            values = {
+                "status": JobStatus.COMPLETED.value,
+                "progress": 100.0,
+                "result": result,
+                "error_message": None,
+                "completed_at": get_current_utc(),
+            }
+        if values["status"] != JobStatus.QUEUED.value:
+            values.update(locked_by=None, lease_expires_at=None)
+
+        # Once the handler is done its outcome is recorded and announced even
+        # if the worker shuts down meanwhile
+        finish = asyncio.ensure_future(
+            self._finish(job_id, worker_id, values, context.user_id)
+        )
+        try:
+            await asyncio.shield(finish)
+        except asyncio.CancelledError:
+            await finish
+            raise
+
+    async def _finish(
+        self,
+        job_id: str,
+        worker_id: str,
+        values: Dict[str, Any],
+        user_id: Optional[str],
+    ):
+        response = await asyncio.to_thread(self._write, job_id, worker_id, values)
+        if response is None:
+            logger.warning(f"Job {job_id} was taken over by another worker")
+        else:
+            await self._publish(response, user_id)
+
+    async def run_worker(
+        self,
+        stop: asyncio.Event,
+        worker_id: Optional[str] = None,
+        concurrency: Optional[int] = None,
+    ):
+        """
+        Claim and run jobs until stop is set. Jobs still running then are
+        cancelled and put back in the queue for another worker.
+        """
+        load_job_handlers()
+        worker_id = worker_id or (
+            f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        )
+        concurrency = concurrency or settings.JOB_WORKER_CONCURRENCY
+        running: Dict[str, asyncio.Task] = {}
+        last_heartbeat = time.monotonic()
+        logger.info(f"Job worker {worker_id} started ({concurrency} slots)")
+        try:
+            while not stop.is_set():
+                for job_id in [j for j, task in running.items() if task.done()]:
+                    running.pop(job_id)
+                if running and (
+                    time.monotonic() - last_heartbeat
+                    >= settings.JOB_LEASE_SECONDS / 3
+                ):
+                    await asyncio.to_thread(self._heartbeat, worker_id)
+                    last_heartbeat = time.monotonic()
+
+                job_id = None
+                if len(running) < concurrency:
+                    try:
+                        job_id = await asyncio.to_thread(self._claim_next, worker_id)
+                    except Exception as e:
+                        logger.error(f"Job worker {worker_id} could not claim: {e}")
+                if job_id:
+                    running[job_id] = asyncio.create_task(
+                        self.execute(job_id, worker_id)
+                    )
+                    continue
+                try:
+                    await asyncio.wait_for(stop.wait(), settings.JOB_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for task in running.values():
+                task.cancel()
+            await asyncio.gather(*running.values(), return_exceptions=True)
+            logger.info(f"Job worker {worker_id} stopped")
+
+    def start_worker(self):
+        """Run a worker in this process, alongside the API"""
+        if self._worker is None or self._worker.done():
+            self._stop = asyncio.Event()
+            self._worker = asyncio.create_task(self.run_worker(self._stop))
+
+    async def stop_worker(self):
+        if self._worker is not None:
+            self._stop.set()
+            await self._worker
+            self._worker = None
+
+    async def follow(self, job_id: str) -> AsyncIterator[BackgroundJobResponse]:
+        """Yield a job's status whenever it changes, until it has finished"""
+        last = None
+        while True:
+            # A fresh session per poll sees commits from worker processes
+            with self._new_session() as db:
+                job = db.get(BackgroundJob, job_id)
+                current = background_job_response(job) if job else None
+            if current is None:
+                return
+            if current != last:
+                yield current
+                last = current
+            if current.status.value in FINISHED_STATUSES:
+                return
+            await asyncio.sleep(FOLLOW_POLL_SECONDS)
+
+
+def load_job_handlers():
+    for module in JOB_HANDLER_MODULES:
+        importlib.import_module(module)
+
+
+# Global job queue service instance
+job_queue_service = JobQueueService()
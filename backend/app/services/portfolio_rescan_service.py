@@ -0,0 +1,445 @@
+"""
+Portfolio compliance rescans for Pactoria MVP
+Re-scores every contract of a company (or of all companies) with the current
+rule set after compliance rules change. Contracts are streamed from the
+database, scored in a pool of worker processes that each hold a
+pre-initialised rule engine, and written back as new compliance scores in
+batches. Rescans started from the API run as background jobs
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from uuid import uuid4
+
+from sqlalchemy.orm import Session
+
+from app.core import database
+from app.core.config import settings
+from app.core.datetime_utils import get_current_utc
+from app.domain.entities.company import (
+    BusinessAddress,
+    Company as DomainCompany,
+    CompanyId,
+    CompanySize,
+    CompanyType,
+    IndustryType,
+)
+from app.domain.services.rule_bundle import RuleBundle
+from app.domain.services.uk_compliance_engine import (
+    ComplianceAssessment,
+    UKComplianceRuleEngine,
+)
+from app.domain.value_objects import ContractType, Email, Money
+from app.infrastructure.database.models import Company, ComplianceScore, Contract
+from app.services.job_queue_service import JobContext, job_queue_service
+
+logger = logging.getLogger(__name__)
+
+# Risk level to the 1-10 risk score stored on compliance scores
+RISK_SCORES = {"low": 2, "medium": 5, "high": 8, "critical": 10}
+
+PORTFOLIO_RESCAN_JOB = "portfolio_rescan"
+
+# Company profile fields the rule engine reads:
+# (company_id, name, company_type, industry, company_size, is_vat_registered)
+CompanyProfile = Tuple[str, str, str, str, str, bool]
+
+# A contract to score:
+# (contract_id, content, contract_type, contract_value, currency, profile)
+ContractPayload = Tuple[str, str, str, Optional[float], str, CompanyProfile]
+
+# Outcome for one contract: (contract_id, score fields, error)
+ScoreResult = Tuple[str, Optional[Dict[str, Any]], Optional[str]]
+
+
+def compliance_score_fields(assessment: ComplianceAssessment) -> Dict[str, Any]:
+    """ComplianceScore column values for a rule engine assessment"""
+    scores = assessment.framework_scores
+    analysis_raw = f"UK Compliance Engine Analysis: {assessment.overall_level.value}"
+    if assessment.is_partial:
+        analysis_raw += (
+            f" (partial: {len(assessment.skipped_rules)} rules "
+            f"skipped after time budget)"
+        )
+    return {
+        "overall_score": float(assessment.overall_score),
+        "gdpr_compliance": float(scores.get("gdpr", 75.0)),
+        "employment_law_compliance": float(scores.get("employment_law", 75.0)),
+        "consumer_rights_compliance": float(scores.get("consumer_rights", 75.0)),
+        "commercial_terms_compliance": float(scores.get("commercial_law", 75.0)),
+        "risk_score": RISK_SCORES.get(assessment.risk_level.value.lower(), 5),
+        "risk_factors": [v.description for v in assessment.violations[:5]],
+        "recommendations": assessment.recommendations,
+        "analysis_raw": analysis_raw,
+    }
+
+
+@lru_cache(maxsize=1024)
+def _domain_company(profile: CompanyProfile) -> DomainCompany:
+    company_id, name, company_type, industry, company_size, is_vat_registered = (
+        profile
+    )
+    # Address and contact details are not read by the rule engine
+    return DomainCompany.from_persistence(
+        company_id=CompanyId(company_id),
+        name=name,
+        company_type=CompanyType(company_type),
+        industry=IndustryType(industry),
+        address=BusinessAddress(
+            line1="Business Address", city="London", postcode="SW1A 1AA"
+        ),
+        primary_contact_email=Email("rescan@pactoria.local"),
+        created_by_user_id="portfolio-rescan",
+        company_size=CompanySize(company_size),
+        is_vat_registered=is_vat_registered,
+    )
+
+
+def rescan_analysis_version(rule_set_version: str) -> str:
+    """analysis_version of compliance scores written by a rescan"""
+    return f"1.0-rescan-{rule_set_version}"
+
+
+# Rule engine of a worker process, built once by _init_worker
+_worker_engine: Optional[UKComplianceRuleEngine] = None
+
+
+def _init_worker(time_budget_ms: Optional[float], bundle: RuleBundle):
+    global _worker_engine
+    _worker_engine = UKComplianceRuleEngine(
+        time_budget_ms=time_budget_ms, bundle=bundle
+    )
+
+
+def score_contract(
+    payload: ContractPayload, engine: Optional[UKComplianceRuleEngine] = None
+) -> ScoreResult:
+    """Score one contract; failures are returned so the batch carries on"""
+    contract_id, content, contract_type, contract_value, currency, profile = payload
+    engine = engine or _worker_engine
+    try:
+        assessment = engine.validate_contract(
+            content,
+            _domain_company(profile),
+            ContractType(contract_type),
+            (
+                Money(Decimal(str(contract_value)), currency or "GBP")
+                if contract_value
+                else None
+            ),
+        )
+        return contract_id, compliance_score_fields(assessment), None
+    except Exception as e:
+        return contract_id, None, f"{type(e).__name__}: {e}"
+
+
+def _batches(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+@dataclass
+class RescanProgress:
+    """State of a portfolio rescan; last_contract_id is the resume cursor"""
+
+    job_id: str
+    company_id: Optional[str]  # None rescans every company
+    rule_set_version: str
+    status: str = "pending"  # pending, running, completed or failed
+    total: int = 0
+    processed: int = 0
+    failed: int = 0
+    resume_after: Optional[str] = None
+    last_contract_id: Optional[str] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+    failed_contract_ids: List[str] = field(default_factory=list)
+
+    @property
+    def contracts_per_second(self) -> Optional[float]:
+        if not self.started_at:
+            return None
+        elapsed = (self.finished_at or get_current_utc()) - self.started_at
+        seconds = elapsed.total_seconds()
+        return round(self.processed / seconds, 1) if seconds > 0 else None
+
+
+class PortfolioRescanService:
+    """
+    Re-scores contracts in bulk with the current compliance rules.
+
+    Contracts are read in id order a page at a time, so memory stays
+    bounded and a rescan can resume after the last committed batch
+    (RescanProgress.last_contract_id). While the workers score one batch
+    the previous batch's results are written back, one transaction per
+    batch. Scores are stored with an analysis_version naming the rule-set
+    version they were computed with.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        workers: Optional[int] = None,
+        batch_size: Optional[int] = None,
+    ):
+        self._session_factory = session_factory
+        self.workers = workers
+        self.batch_size = batch_size or settings.RESCAN_BATCH_SIZE
+        self.engine = UKComplianceRuleEngine(
+            time_budget_ms=settings.COMPLIANCE_TIME_BUDGET_MS,
+            rules_reload_seconds=settings.COMPLIANCE_RULES_RELOAD_SECONDS,
+            rules_path=settings.COMPLIANCE_RULES_PATH,
+            bundle_cache_dir=settings.RULE_BUNDLE_CACHE_DIR,
+        )
+
+    @property
+    def worker_count(self) -> int:
+        workers = self.workers if self.workers is not None else settings.RESCAN_WORKERS
+        return workers or os.cpu_count() or 1
+
+    @property
+    def analysis_version(self) -> str:
+        return rescan_analysis_version(self.engine.rule_set_version)
+
+    def _new_session(self) -> Session:
+        return (self._session_factory or database.SessionLocal)()
+
+    def _contracts_query(
+        self, db: Session, company_id: Optional[str], resume_after: Optional[str]
+    ):
+        query = (
+            db.query(
+                Contract.id,
+                Contract.final_content,
+                Contract.generated_content,
+                Contract.contract_type,
+                Contract.contract_value,
+                Contract.currency,
+                Company.id,
+                Company.name,
+                Company.company_type,
+                Company.industry,
+                Company.company_size,
+                Company.is_vat_registered,
+            )
+            .join(Company, Contract.company_id == Company.id)
+            .filter(
+                (Contract.final_content.isnot(None))
+                | (Contract.generated_content.isnot(None))
+            )
+        )
+        if company_id:
+            query = query.filter(Contract.company_id == company_id)
+        if resume_after:
+            query = query.filter(Contract.id > resume_after)
+        return query
+
+    def iter_contracts(
+        self,
+        db: Session,
+        company_id: Optional[str] = None,
+        resume_after: Optional[str] = None,
+    ) -> Iterator[ContractPayload]:
+        """
+        Stream contracts to score in id order, a page of batch_size at a
+        time. Pages are keyset-paginated and read to the end before being
+        yielded: a half-read cursor (as with yield_per) holds SQLite's
+        shared lock, and the batch write-backs could not commit past it.
+        """
+        cursor = resume_after
+        while True:
+            rows = (
+                self._contracts_query(db, company_id, cursor)
+                .order_by(Contract.id)
+                .limit(self.batch_size)
+                .all()
+            )
+            if not rows:
+                return
+            for row in rows:
+                (contract_id, final_content, generated_content, contract_type) = row[
+                    :4
+                ]
+                if not (final_content or generated_content):
+                    continue
+                profile = (
+                    row[6],
+                    row[7],
+                    row[8].value,
+                    row[9].value,
+                    (row[10] or CompanySize.SMALL).value,
+                    bool(row[11]),
+                )
+                yield (
+                    contract_id,
+                    final_content or generated_content,
+                    contract_type.value,
+                    row[4],
+                    row[5],
+                    profile,
+                )
+            cursor = rows[-1][0]
+
+    def rescan(
+        self,
+        company_id: Optional[str] = None,
+        resume_after: Optional[str] = None,
+        progress_callback: Optional[Callable[[RescanProgress], None]] = None,
+        job: Optional[RescanProgress] = None,
+    ) -> RescanProgress:
+        """
+        Run a rescan to completion in the calling thread.
+        Pass the last_contract_id of an interrupted rescan as resume_after
+        to continue it.
+        """
+        job = job or self._new_job(company_id, resume_after)
+        # The whole job is scored with one rule set, even if rules reload;
+        # workers get the compiled bundle rather than reading the rule file
+        bundle = self.engine.bundle
+        engine = UKComplianceRuleEngine(
+            time_budget_ms=self.engine.time_budget_ms, bundle=bundle
+        )
+        job.rule_set_version = bundle.rule_set_version
+        job.status = "running"
+        job.started_at = get_current_utc()
+        read_db, write_db = self._new_session(), self._new_session()
+        try:
+            job.total = self._contracts_query(read_db, company_id, resume_after).count()
+            payloads = self.iter_contracts(read_db, company_id, resume_after)
+            workers = self.worker_count
+            executor = (
+                ProcessPoolExecutor(
+                    max_workers=workers,
+                    # Workers must not inherit the server's threads and locks
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(engine.time_budget_ms, bundle),
+                )
+                if workers > 1
+                else None
+            )
+            try:
+                # Write back each batch while the next one is being scored
+                pending = None
+                for batch in _batches(payloads, self.batch_size):
+                    if executor is not None:
+                        chunksize = max(1, len(batch) // (workers * 4))
+                        results = executor.map(
+                            score_contract, batch, chunksize=chunksize
+                        )
+                    else:
+                        results = (score_contract(p, engine) for p in batch)
+                    if pending is not None:
+                        self._write_batch(write_db, pending, job, progress_callback)
+                    pending = results
+                if pending is not None:
+                    self._write_batch(write_db, pending, job, progress_callback)
+            finally:
+                if executor is not None:
+                    executor.shutdown(cancel_futures=True)
+            job.status = "completed"
+        except Exception as e:
+            write_db.rollback()
+            logger.error(f"Portfolio rescan {job.job_id} failed: {e}")
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.finished_at = get_current_utc()
+            read_db.close()
+            write_db.close()
+        if progress_callback:
+            progress_callback(job)
+        return job
+
+    def _write_batch(
+        self,
+        db: Session,
+        results: Iterable[ScoreResult],
+        job: RescanProgress,
+        progress_callback: Optional[Callable[[RescanProgress], None]],
+    ):
+        rows, last_contract_id, count = [], None, 0
+        for contract_id, fields, error in results:
+            count += 1
+            last_contract_id = contract_id
+            if fields is None:
+                logger.warning(f"Rescan of contract {contract_id} failed: {error}")
+                job.failed += 1
+                job.failed_contract_ids.append(contract_id)
+                continue
+            rows.append(
+                {
+                    "contract_id": contract_id,
+                    "analysis_version": rescan_analysis_version(job.rule_set_version),
+                    **fields,
+                }
+            )
+        db.bulk_insert_mappings(ComplianceScore, rows)
+        db.commit()
+
+        job.processed += count
+        job.last_contract_id = last_contract_id
+        if progress_callback:
+            progress_callback(job)
+
+    def _new_job(
+        self, company_id: Optional[str], resume_after: Optional[str]
+    ) -> RescanProgress:
+        self.engine.refresh_rules()
+        job = RescanProgress(
+            job_id=str(uuid4()),
+            company_id=company_id,
+            rule_set_version=self.engine.rule_set_version,
+            resume_after=resume_after,
+        )
+        return job
+
+# Global service instance
+portfolio_rescan_service = PortfolioRescanService()
+
+
+@job_queue_service.handler(PORTFOLIO_RESCAN_JOB)
+async def run_portfolio_rescan_job(context: JobContext) -> Dict[str, Any]:
+    """
+    A rescan as a background job. Each committed batch is checkpointed, so
+    a retry after a failure, or after the worker died, carries on from the
+    last batch rather than starting over.
+    """
+    company_id = context.payload.get("company_id")
+    resume_after = (context.checkpoint or {}).get(
+        "last_contract_id"
+    ) or context.payload.get("resume_after")
+
+    def report(job: RescanProgress):
+        if job.status != "running":
+            return
+        context.update_progress(
+            100 * job.processed / job.total if job.total else 100.0,
+            f"{job.processed} of {job.total} contracts rescored",
+            checkpoint={"last_contract_id": job.last_contract_id},
+        )
+
+    job = await asyncio.to_thread(
+        portfolio_rescan_service.rescan, company_id, resume_after, report
+    )
+    if job.status == "failed":
+        raise RuntimeError(job.error)
+    return {
+        "rule_set_version": job.rule_set_version,
+        "processed": job.processed,
+        "failed": job.failed,
+        "failed_contract_ids": job.failed_contract_ids[:100],
+        "last_contract_id": job.last_contract_id,
+        "contracts_per_second": job.contracts_per_second,
+    }
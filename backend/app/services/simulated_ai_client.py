@@ -0,0 +1,269 @@
+"""
+Simulated AI client for offline load testing
+Drop-in replacement for the Groq client (``client.chat.completions.create``)
+returning template-based contracts and compliance analyses with configurable
+latency, token counts and error rates
+"""
+
+import hashlib
+import json
+import math
+import random
+import re
+import time
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional
+
+SIMULATED_ERROR_TYPES = ["rate_limit", "timeout", "server_error"]
+
+CONTRACT_CLAUSES = [
+    (
+        "Definitions and Interpretation",
+        "In this Agreement the following terms shall have the meanings set out "
+        "below. References to clauses are to the clauses of this Agreement and "
+        "headings shall not affect its interpretation.",
+    ),
+    (
+        "Services",
+        "The Supplier shall provide the Services to the Client with reasonable "
+        "skill and care, in accordance with good industry practice and all "
+        "applicable laws and regulations of England and Wales.",
+    ),
+    (
+        "Payment Terms",
+        "The Client shall pay each valid invoice within thirty (30) days of "
+        "receipt. Interest on late payment shall accrue in accordance with the "
+        "Late Payment of Commercial Debts (Interest) Act 1998.",
+    ),
+    (
+        "Data Protection",
+        "Each party shall comply with the UK GDPR and the Data Protection Act "
+        "2018. Where the Supplier processes personal data on behalf of the "
+        "Client it shall do so only on documented instructions.",
+    ),
+    (
+        "Confidentiality",
+        "Each party shall keep confidential all information disclosed by the "
+        "other party and shall not use it except for the purposes of this "
+        "Agreement.",
+    ),
+    (
+        "Intellectual Property",
+        "All intellectual property rights in the deliverables shall vest in the "
+        "Client upon payment in full. Each party retains ownership of its "
+        "pre-existing intellectual property.",
+    ),
+    (
+        "Limitation of Liability",
+        "Nothing in this Agreement limits liability for death or personal injury "
+        "caused by negligence, or for fraud. Subject to that, each party's total "
+        "liability shall not exceed the fees paid in the preceding twelve months.",
+    ),
+    (
+        "Termination",
+        "Either party may terminate this Agreement on thirty (30) days' written "
+        "notice, or immediately if the other party commits a material breach "
+        "which is not remedied within fourteen (14) days.",
+    ),
+    (
+        "Force Majeure",
+        "Neither party shall be liable for delay or failure to perform caused by "
+        "events beyond its reasonable control.",
+    ),
+    (
+        "Governing Law and Jurisdiction",
+        "This Agreement is governed by the law of England and Wales and the "
+        "parties submit to the exclusive jurisdiction of the courts of England "
+        "and Wales.",
+    ),
+]
+
+SIMULATED_RISK_FACTORS = [
+    "Liability cap may be low relative to contract value",
+    "Data processing instructions are not itemised",
+    "Termination notice period favours one party",
+    "Intellectual property assignment depends on payment",
+]
+
+SIMULATED_RECOMMENDATIONS = [
+    "Add a data processing schedule listing categories of personal data",
+    "Clarify service levels and remedies for missed targets",
+    "Confirm insurance requirements for both parties",
+    "Review the liability cap against the contract value",
+]
+
+
+class SimulatedAIError(Exception):
+    """Error injected by the simulated provider"""
+
+    def __init__(self, error_type: str):
+        super().__init__(f"Simulated provider error: {error_type}")
+        self.error_type = error_type
+
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+class _SimulatedCompletions:
+    def __init__(self, client: "SimulatedAIClient"):
+        self._client = client
+
+    def create(self, **kwargs):
+        return self._client.complete(**kwargs)
+
+
+class SimulatedAIClient:
+    """
+    Deterministic stand-in for a chat completion API.
+
+    Each request is driven by a random generator seeded from the configured
+    seed and the request messages, so the same prompt always produces the
+    same text, latency and success/failure. Latency is log-normal around
+    ``latency_ms`` plus ``ms_per_output_token`` per generated token, which
+    gives the long tail real providers show.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 800.0,
+        latency_sigma: float = 0.3,
+        ms_per_output_token: float = 0.0,
+        output_tokens: int = 1200,
+        error_rate: float = 0.0,
+        seed: int = 0,
+        token_counter: Optional[Callable[[str], int]] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.ms_per_output_token = ms_per_output_token
+        self.output_tokens = output_tokens
+        self.error_rate = error_rate
+        self.seed = seed
+        self.count_tokens = token_counter or _estimate_tokens
+        self._sleep = sleep
+        self.chat = SimpleNamespace(completions=_SimulatedCompletions(self))
+
+    @classmethod
+    def from_settings(cls, settings, **kwargs) -> "SimulatedAIClient":
+        """Build a client from the AI_SIMULATED_* settings"""
+        return cls(
+            latency_ms=settings.AI_SIMULATED_LATENCY_MS,
+            latency_sigma=settings.AI_SIMULATED_LATENCY_SIGMA,
+            ms_per_output_token=settings.AI_SIMULATED_MS_PER_OUTPUT_TOKEN,
+            output_tokens=settings.AI_SIMULATED_OUTPUT_TOKENS,
+            error_rate=settings.AI_SIMULATED_ERROR_RATE,
+            seed=settings.AI_SIMULATED_SEED,
+            **kwargs,
+        )
+
+    def _rng_for(self, messages: List[Dict[str, str]]) -> random.Random:
+        digest = hashlib.sha256(
+            json.dumps([self.seed, messages], sort_keys=True).encode()
+        ).digest()
+        return random.Random(int.from_bytes(digest[:8], "big"))
+
+    def complete(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        **kwargs,
+    ):
+        """Return a completion shaped like the Groq/OpenAI response object"""
+        rng = self._rng_for(messages)
+        prompt = "\n".join(message["content"] for message in messages)
+
+        if rng.random() < self.error_rate:
+            error_type = rng.choice(SIMULATED_ERROR_TYPES)
+            if error_type == "timeout":
+                self._sleep(self._sample_latency_ms(rng, max_tokens) / 1000)
+            raise SimulatedAIError(error_type)
+
+        target_tokens = max(
+            1, min(max_tokens, int(self.output_tokens * rng.uniform(0.75, 1.25)))
+        )
+        if "ANALYSIS REQUIREMENTS" in prompt:
+            content = self._compliance_analysis(rng, target_tokens)
+        else:
+            content = self._contract(prompt, rng, target_tokens)
+
+        completion_tokens = self.count_tokens(content)
+        self._sleep(self._sample_latency_ms(rng, completion_tokens) / 1000)
+
+        prompt_tokens = self.count_tokens(prompt)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                total_tokens=prompt_tokens + completion_tokens,
+            ),
+            model=model,
+        )
+
+    def _sample_latency_ms(self, rng: random.Random, output_tokens: int) -> float:
+        base = self.latency_ms * math.exp(self.latency_sigma * rng.gauss(0, 1))
+        return base + self.ms_per_output_token * output_tokens
+
+    def _contract(self, prompt: str, rng: random.Random, target_tokens: int) -> str:
+        def field(label: str, default: str) -> str:
+            match = re.search(rf"{label}:\s*(.+)", prompt)
+            value = match.group(1).strip() if match else ""
+            return value if value and value != "Not specified" else default
+
+        contract_type = field("CONTRACT TYPE", "service_agreement")
+        client = field("- Client", "the Client")
+        supplier = field("- Supplier", "the Supplier")
+
+        title = contract_type.replace("_", " ").upper()
+        sections = [
+            f"{title}\n\nThis Agreement is made between {client} and {supplier}.\n\n"
+            "WHEREAS the parties wish to record the terms on which they will "
+            "do business, the parties hereby agree as follows:"
+        ]
+        used_tokens = self.count_tokens(sections[0])
+        clause_number = 1
+        # Definitions first and governing law last, as in a real contract
+        middle = list(CONTRACT_CLAUSES[1:-1])
+        rng.shuffle(middle)
+        order = [CONTRACT_CLAUSES[0], *middle, CONTRACT_CLAUSES[-1]]
+
+        # Repeat clauses (renumbered) until the target length is reached
+        while True:
+            heading, body = order[(clause_number - 1) % len(order)]
+            section = f"{clause_number}. {heading.upper()}\n{clause_number}.1 {body}"
+            section_tokens = self.count_tokens(section)
+            if clause_number > 1 and used_tokens + section_tokens > target_tokens:
+                break
+            used_tokens += section_tokens
+            sections.append(section)
+            clause_number += 1
+
+        return "\n\n".join(sections)
+
+    def _compliance_analysis(self, rng: random.Random, target_tokens: int) -> str:
+        def score() -> float:
+            return round(rng.uniform(0.82, 0.99), 2)
+
+        analysis = {
+            "overall_score": score(),
+            "gdpr_compliance": score(),
+            "employment_law_compliance": score(),
+            "consumer_rights_compliance": score(),
+            "commercial_terms_compliance": score(),
+            "risk_score": rng.randint(1, 6),
+            "risk_factors": rng.sample(SIMULATED_RISK_FACTORS, 2),
+            "recommendations": rng.sample(SIMULATED_RECOMMENDATIONS, 2),
+        }
+        summary = json.dumps(analysis, indent=2)
+        narrative = (
+            "The contract is broadly compliant with UK law. The points above "
+            "should be reviewed before signature."
+        )
+        content = f"{summary}\n\n{narrative}"
+        while self.count_tokens(content) < target_tokens:
+            content += f"\n\n{narrative}"
+        return content
@@ -0,0 +1,272 @@
+"""
+Speculative AI contract generation for Pactoria MVP
+Starts generation in the background as soon as a draft with enough input is
+saved, so the follow-up "generate" request can return the stored result
+"""
+
+import asyncio
+import hashlib
+import logging
+from typing import Callable, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core import database
+from app.core.config import settings
+from app.core.datetime_utils import get_current_utc
+from app.infrastructure.database.models import (
+    AIGeneration,
+    Contract,
+    SpeculationStatus,
+)
+from app.services import ai_service as ai_service_module
+from app.services.ai_service import ContractGenerationRequest, count_tokens
+
+logger = logging.getLogger(__name__)
+
+# Tokens reserved per speculation on top of the user input: prompt template
+# plus the max_tokens used for contract generation
+SPECULATIVE_TOKEN_OVERHEAD = 3500
+
+
+def build_generation_request(contract: Contract) -> ContractGenerationRequest:
+    """AI generation request for a contract's current inputs"""
+    return ContractGenerationRequest(
+        plain_english_input=contract.plain_english_input,
+        contract_type=contract.contract_type.value,
+        client_name=contract.client_name,
+        supplier_name=contract.supplier_name,
+        contract_value=contract.contract_value,
+        currency=contract.currency,
+        start_date=contract.start_date.isoformat() if contract.start_date else None,
+        end_date=contract.end_date.isoformat() if contract.end_date else None,
+    )
+
+
+def compute_input_hash(request: ContractGenerationRequest) -> str:
+    """Stable hash of everything that affects the generated content"""
+    return hashlib.sha256(request.model_dump_json().encode()).hexdigest()
+
+
+class SpeculativeGenerationService:
+    """
+    Runs contract generation ahead of the user's request.
+
+    Results are stored as PENDING AIGeneration rows tagged with the hash of
+    the inputs they were generated from. A later generate request claims the
+    row if the hash still matches; otherwise it is marked DISCARDED. Every
+    speculative generation counts against the company's daily token budget,
+    and in-flight work is reserved up front so concurrent drafts can't
+    overshoot it.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        ai_client=None,
+    ):
+        self._session_factory = session_factory
+        self._ai_client = ai_client
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._task_hashes: Dict[str, str] = {}
+        self._reserved_tokens: Dict[str, int] = {}
+
+    @property
+    def ai_client(self):
+        return self._ai_client or ai_service_module.ai_service
+
+    @property
+    def enabled(self) -> bool:
+        return settings.AI_SPECULATIVE_GENERATION and self.ai_client is not None
+
+    def _new_session(self) -> Session:
+        return (self._session_factory or database.SessionLocal)()
+
+    def tokens_used_today(self, db: Session, company_id: str) -> int:
+        """Tokens spent on speculative generations by a company today (UTC)"""
+        start_of_day = get_current_utc().replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        rows = (
+            db.query(AIGeneration.token_usage)
+            .filter(
+                AIGeneration.company_id == company_id,
+                AIGeneration.speculation_status.isnot(None),
+                AIGeneration.created_at >= start_of_day,
+            )
+            .all()
+        )
+        return sum((usage or {}).get("total_tokens", 0) for (usage,) in rows)
+
+    def has_budget(self, db: Session, company_id: str, estimated_tokens: int) -> bool:
+        """Check the company's daily speculation budget, including in-flight work"""
+        committed = self.tokens_used_today(db, company_id)
+        reserved = self._reserved_tokens.get(company_id, 0)
+        return (
+            committed + reserved + estimated_tokens
+            <= settings.AI_SPECULATIVE_DAILY_TOKEN_BUDGET
+        )
+
+    def schedule(self, db: Session, contract: Contract) -> bool:
+        """
+        Start speculative generation for a draft if it is eligible.
+        Returns True if generation is running or already stored for the
+        contract's current inputs.
+        """
+        if not self.enabled or contract.ai_generation_id:
+            return False
+
+        plain_english_input = (contract.plain_english_input or "").strip()
+        if len(plain_english_input) < settings.AI_SPECULATIVE_MIN_INPUT_CHARS:
+            return False
+
+        request = build_generation_request(contract)
+        input_hash = compute_input_hash(request)
+
+        task = self._tasks.get(contract.id)
+        if task and not task.done() and self._task_hashes.get(contract.id) == input_hash:
+            return True
+
+        already_stored = (
+            db.query(AIGeneration.id)
+            .filter(
+                AIGeneration.speculative_contract_id == contract.id,
+                AIGeneration.speculation_status == SpeculationStatus.PENDING,
+                AIGeneration.input_hash == input_hash,
+            )
+            .first()
+        )
+        if already_stored:
+            return True
+
+        # Inputs changed: the in-flight generation is stale
+        self.cancel(contract.id)
+
+        estimated_tokens = count_tokens(plain_english_input) + SPECULATIVE_TOKEN_OVERHEAD
+        if not self.has_budget(db, contract.company_id, estimated_tokens):
+            logger.info(
+                f"Speculative generation skipped for contract {contract.id}: "
+                f"company {contract.company_id} is over its daily token budget"
+            )
+            return False
+
+        self._reserved_tokens[contract.company_id] = (
+            self._reserved_tokens.get(contract.company_id, 0) + estimated_tokens
+        )
+        self._tasks[contract.id] = asyncio.create_task(
+            self._run(
+                contract.id, contract.company_id, request, input_hash, estimated_tokens
+            )
+        )
+        self._task_hashes[contract.id] = input_hash
+        return True
+
+    async def _run(
+        self,
+        contract_id: str,
+        company_id: str,
+        request: ContractGenerationRequest,
+        input_hash: str,
+        estimated_tokens: int,
+    ):
+        """Generate and store the result as a pending AIGeneration"""
+        try:
+            response = await self.ai_client.generate_contract(request)
+
+            db = self._new_session()
+            try:
+                contract = db.query(Contract).filter(Contract.id == contract_id).first()
+                # Record stale results too, so they still count against the budget
+                is_current = (
+                    contract is not None
+                    and not contract.ai_generation_id
+                    and compute_input_hash(build_generation_request(contract))
+                    == input_hash
+                )
+                db.add(
+                    AIGeneration(
+                        model_name=response.model_name,
+                        model_version=response.model_version,
+                        input_prompt=f"Contract generation for {request.contract_type}: {request.plain_english_input}",
+                        generated_content=response.content,
+                        processing_time_ms=response.processing_time_ms,
+                        token_usage=response.token_usage,
+                        confidence_score=response.confidence_score,
+                        speculation_status=(
+                            SpeculationStatus.PENDING
+                            if is_current
+                            else SpeculationStatus.DISCARDED
+                        ),
+                        speculative_contract_id=contract_id,
+                        input_hash=input_hash,
+                        company_id=company_id,
+                    )
+                )
+                db.commit()
+            finally:
+                db.close()
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Speculative generation failed for contract {contract_id}: {e}")
+        finally:
+            remaining = self._reserved_tokens.get(company_id, 0) - estimated_tokens
+            if remaining > 0:
+                self._reserved_tokens[company_id] = remaining
+            else:
+                self._reserved_tokens.pop(company_id, None)
+            if self._tasks.get(contract_id) is asyncio.current_task():
+                self._tasks.pop(contract_id, None)
+                self._task_hashes.pop(contract_id, None)
+
+    async def claim(self, db: Session, contract: Contract) -> Optional[AIGeneration]:
+        """
+        Return the speculative generation for the contract's current inputs,
+        marking it accepted. Stale pending generations are discarded.
+        """
+        if not settings.AI_SPECULATIVE_GENERATION:
+            return None
+
+        input_hash = compute_input_hash(build_generation_request(contract))
+
+        # Generation already in flight for these inputs: wait for it rather
+        # than starting a duplicate
+        task = self._tasks.get(contract.id)
+        if task and self._task_hashes.get(contract.id) == input_hash:
+            try:
+                await asyncio.shield(task)
+            except asyncio.CancelledError:
+                pass
+
+        pending = (
+            db.query(AIGeneration)
+            .filter(
+                AIGeneration.speculative_contract_id == contract.id,
+                AIGeneration.speculation_status == SpeculationStatus.PENDING,
+            )
+            .all()
+        )
+
+        claimed = None
+        for generation in pending:
+            if claimed is None and generation.input_hash == input_hash:
+                generation.speculation_status = SpeculationStatus.ACCEPTED
+                claimed = generation
+            else:
+                generation.speculation_status = SpeculationStatus.DISCARDED
+
+        if pending:
+            db.flush()
+        return claimed
+
+    def cancel(self, contract_id: str):
+        """Cancel in-flight speculative generation for a contract"""
+        task = self._tasks.pop(contract_id, None)
+        self._task_hashes.pop(contract_id, None)
+        if task and not task.done():
+            task.cancel()
+
+
+# Global speculative generation service instance
+speculative_generation_service = SpeculativeGenerationService()
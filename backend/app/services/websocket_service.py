@@ -26,6 +26,7 @@ from app.schemas.websocket import (
     UserJoinedMessage,
     UserLeftMessage,
     BulkOperationMessage,
+    ComplianceAnalysisMessage,
 )
 
 logger = logging.getLogger(__name__)
@@ -529,6 +530,16 @@ async def send_bulk_operation_update(
     return await websocket_manager.send_to_user(user_id, message.dict())
 
 
+async def send_compliance_analysis_update(
+    message: ComplianceAnalysisMessage, user_id: str
+):
+    """Send the AI-enriched compliance analysis of a contract to a user"""
+    # JSON mode: the score carries datetimes the socket can't encode
+    return await websocket_manager.send_to_user(
+        user_id, message.model_dump(mode="json")
+    )
+
+
 async def batch_send_notifications(
     user_id: str, notifications: List[NotificationMessage]
 ):
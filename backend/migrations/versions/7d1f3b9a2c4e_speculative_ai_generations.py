@@ -0,0 +1,41 @@
+"""Speculative AI generations
+
+Revision ID: 7d1f3b9a2c4e
+Revises: 25c82965692c
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '7d1f3b9a2c4e'
+down_revision: Union[str, None] = '25c82965692c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('ai_generations') as batch_op:
+        batch_op.add_column(sa.Column('speculation_status', sa.Enum('PENDING', 'ACCEPTED', 'DISCARDED', name='speculationstatus'), nullable=True))
+        batch_op.add_column(sa.Column('speculative_contract_id', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('input_hash', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('company_id', sa.String(), nullable=True))
+        batch_op.create_index('ix_ai_generations_speculation_status', ['speculation_status'])
+        batch_op.create_index('ix_ai_generations_speculative_contract_id', ['speculative_contract_id'])
+        batch_op.create_index('ix_ai_generations_company_id', ['company_id'])
+        batch_op.create_foreign_key('fk_ai_generations_company_id_companies', 'companies', ['company_id'], ['id'])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('ai_generations') as batch_op:
+        batch_op.drop_constraint('fk_ai_generations_company_id_companies', type_='foreignkey')
+        batch_op.drop_index('ix_ai_generations_company_id')
+        batch_op.drop_index('ix_ai_generations_speculative_contract_id')
+        batch_op.drop_index('ix_ai_generations_speculation_status')
+        batch_op.drop_column('company_id')
+        batch_op.drop_column('input_hash')
+        batch_op.drop_column('speculative_contract_id')
+        batch_op.drop_column('speculation_status')
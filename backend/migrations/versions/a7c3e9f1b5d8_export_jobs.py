@@ -0,0 +1,33 @@
+"""Exports recorded as bulk jobs
+
+Revision ID: a7c3e9f1b5d8
+Revises: f6d4b8a2c3e5
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3e9f1b5d8'
+down_revision: Union[str, None] = 'f6d4b8a2c3e5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('bulk_jobs') as batch_op:
+        batch_op.add_column(sa.Column('file_path', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('file_size_bytes', sa.Integer(), nullable=True))
+        batch_op.alter_column('company_id', existing_type=sa.String(), nullable=True)
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM bulk_job_items WHERE job_id IN (SELECT id FROM bulk_jobs WHERE company_id IS NULL)")
+    op.execute("DELETE FROM bulk_jobs WHERE company_id IS NULL")
+    with op.batch_alter_table('bulk_jobs') as batch_op:
+        batch_op.alter_column('company_id', existing_type=sa.String(), nullable=False)
+        batch_op.drop_column('file_size_bytes')
+        batch_op.drop_column('file_path')
@@ -0,0 +1,33 @@
+"""Contract archiving
+
+Revision ID: b4e8d2f6a1c3
+Revises: 7d1f3b9a2c4e
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4e8d2f6a1c3'
+down_revision: Union[str, None] = '7d1f3b9a2c4e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('contracts') as batch_op:
+        batch_op.add_column(sa.Column('is_archived', sa.Boolean(), server_default=sa.false(), nullable=False))
+        batch_op.add_column(sa.Column('archived_at', sa.DateTime(timezone=True), nullable=True))
+        batch_op.add_column(sa.Column('archived_by', sa.String(), nullable=True))
+        batch_op.create_foreign_key('fk_contracts_archived_by_users', 'users', ['archived_by'], ['id'])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('contracts') as batch_op:
+        batch_op.drop_constraint('fk_contracts_archived_by_users', type_='foreignkey')
+        batch_op.drop_column('archived_by')
+        batch_op.drop_column('archived_at')
+        batch_op.drop_column('is_archived')
@@ -0,0 +1,66 @@
+"""Bulk jobs
+
+Revision ID: c5f1a7e3d9b2
+Revises: b4e8d2f6a1c3
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5f1a7e3d9b2'
+down_revision: Union[str, None] = 'b4e8d2f6a1c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'bulk_jobs',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('operation_type', sa.String(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('parameters', sa.JSON(), nullable=True),
+        sa.Column('company_id', sa.String(), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('total_items', sa.Integer(), nullable=False),
+        sa.Column('processed_items', sa.Integer(), nullable=False),
+        sa.Column('successful_items', sa.Integer(), nullable=False),
+        sa.Column('failed_items', sa.Integer(), nullable=False),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['company_id'], ['companies.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_bulk_jobs_status', 'bulk_jobs', ['status'])
+    op.create_index('ix_bulk_jobs_company_id', 'bulk_jobs', ['company_id'])
+    op.create_index('ix_bulk_jobs_expires_at', 'bulk_jobs', ['expires_at'])
+    op.create_table(
+        'bulk_job_items',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('job_id', sa.String(), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('item_id', sa.String(), nullable=False),
+        sa.Column('success', sa.Boolean(), nullable=False),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.ForeignKeyConstraint(['job_id'], ['bulk_jobs.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_bulk_job_items_job_id_position', 'bulk_job_items', ['job_id', 'position'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_bulk_job_items_job_id_position', table_name='bulk_job_items')
+    op.drop_table('bulk_job_items')
+    op.drop_index('ix_bulk_jobs_expires_at', table_name='bulk_jobs')
+    op.drop_index('ix_bulk_jobs_company_id', table_name='bulk_jobs')
+    op.drop_index('ix_bulk_jobs_status', table_name='bulk_jobs')
+    op.drop_table('bulk_jobs')
@@ -0,0 +1,69 @@
+"""File store
+
+Revision ID: e3b7f9c1a5d2
+Revises: d8a2c6e4f1b7
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b7f9c1a5d2'
+down_revision: Union[str, None] = 'd8a2c6e4f1b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.execute("ALTER TYPE auditresourcetype ADD VALUE IF NOT EXISTS 'FILE'")
+
+    op.create_table(
+        'file_blobs',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('company_id', sa.String(), nullable=False),
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('storage_path', sa.String(), nullable=False),
+        sa.Column('ref_count', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['company_id'], ['companies.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('company_id', 'sha256', name='uq_file_blobs_company_sha256'),
+    )
+    op.create_table(
+        'files',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('company_id', sa.String(), nullable=False),
+        sa.Column('contract_id', sa.String(), nullable=True),
+        sa.Column('blob_id', sa.String(), nullable=False),
+        sa.Column('uploaded_by', sa.String(), nullable=True),
+        sa.Column('filename', sa.String(), nullable=False),
+        sa.Column('original_filename', sa.String(), nullable=False),
+        sa.Column('mime_type', sa.String(), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('file_size', sa.Integer(), nullable=False),
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['blob_id'], ['file_blobs.id']),
+        sa.ForeignKeyConstraint(['company_id'], ['companies.id']),
+        sa.ForeignKeyConstraint(['contract_id'], ['contracts.id']),
+        sa.ForeignKeyConstraint(['uploaded_by'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_files_blob_id', 'files', ['blob_id'])
+    op.create_index('ix_files_company_created', 'files', ['company_id', 'created_at'])
+    op.create_index('ix_files_company_contract', 'files', ['company_id', 'contract_id', 'created_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_files_company_contract', table_name='files')
+    op.drop_index('ix_files_company_created', table_name='files')
+    op.drop_index('ix_files_blob_id', table_name='files')
+    op.drop_table('files')
+    op.drop_table('file_blobs')
+    # PostgreSQL cannot drop a value from an enum type; 'FILE' stays
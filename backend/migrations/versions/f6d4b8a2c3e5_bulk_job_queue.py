@@ -0,0 +1,29 @@
+"""Bulk jobs run by the job queue
+
+Revision ID: f6d4b8a2c3e5
+Revises: e3b7f9c1a5d2
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6d4b8a2c3e5'
+down_revision: Union[str, None] = 'e3b7f9c1a5d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('bulk_jobs') as batch_op:
+        batch_op.add_column(sa.Column('background_job_id', sa.String(), nullable=True))
+        batch_op.create_foreign_key('fk_bulk_jobs_background_job_id_background_jobs', 'background_jobs', ['background_job_id'], ['id'], ondelete='SET NULL')
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('bulk_jobs') as batch_op:
+        batch_op.drop_constraint('fk_bulk_jobs_background_job_id_background_jobs', type_='foreignkey')
+        batch_op.drop_column('background_job_id')
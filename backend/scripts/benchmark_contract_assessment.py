@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the combined compliance + risk assessment
+Measures AIRiskAssessmentService.assess_contract_risk (which runs the UK
+compliance engine first) on the standard contracts of the rule engine
+benchmark corpus: with empty caches, with the preprocessed ContractDocument
+cached, and with the assessment itself memoised.
+
+Usage: python scripts/benchmark_contract_assessment.py [--seed 1] [--repeat 20]
+       [--sizes 1KB,16KB,256KB,2MB]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+# Add the backend directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.domain.entities.company import Company  # noqa: E402
+from app.domain.services.ai_risk_assessment_service import (  # noqa: E402
+    ai_risk_assessment_service,
+)
+from app.domain.services.assessment_cache import assessment_cache  # noqa: E402
+from app.domain.services.contract_document import (  # noqa: E402
+    contract_document_cache,
+)
+from app.domain.value_objects import Money  # noqa: E402
+from scripts.benchmark_rule_engines import (  # noqa: E402
+    SIZES,
+    CorpusContract,
+    benchmark_company,
+    generate_corpus,
+    parse_sizes,
+)
+
+
+def measure(
+    contract: CorpusContract, company: Company, repeat: int, cached: str
+) -> float:
+    """cached: "none", "document" or "assessment" """
+    samples = []
+    for _ in range(repeat):
+        if cached == "none":
+            contract_document_cache.clear()
+        if cached != "assessment":
+            assessment_cache.clear()
+        start = time.perf_counter()
+        ai_risk_assessment_service.assess_contract_risk(
+            contract.content,
+            company,
+            contract.contract_type,
+            Money(25000, "GBP"),
+        )
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--sizes", type=parse_sizes, default=SIZES)
+    args = parser.parse_args()
+
+    company = benchmark_company()
+    results = {}
+    for contract in generate_corpus(args.seed, args.sizes):
+        if contract.mix != "standard":
+            continue
+        results[contract.size] = {
+            "chars": len(contract.content),
+            "uncached_ms": measure(contract, company, args.repeat, "none"),
+            "cached_document_ms": measure(contract, company, args.repeat, "document"),
+            "cached_assessment_ms": measure(
+                contract, company, args.repeat, "assessment"
+            ),
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
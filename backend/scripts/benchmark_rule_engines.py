@@ -0,0 +1,454 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the UK compliance engine and the risk assessment service
+Generates a seeded synthetic contract corpus (1 KB to 2 MB, several contract
+types and clause mixes), then times each compliance rule, each risk check
+and full assessments end to end, with every cache cold.
+
+Timings are compared against a JSON baseline, normalised by a pure-Python
+calibration loop so baselines recorded on another machine stay usable; the
+script exits 1 if any timing regressed by more than the tolerance.
+
+Usage: python scripts/benchmark_rule_engines.py [--seed 1] [--repeat 5]
+       [--sizes 1KB,16KB,256KB,2MB] [--baseline FILE] [--tolerance 0.25]
+       [--update-baseline]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+from uuid import uuid4
+
+# Add the backend directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.domain.entities.company import (  # noqa: E402
+    BusinessAddress,
+    Company,
+    CompanyId,
+    CompanyType,
+    IndustryType,
+)
+from app.domain.value_objects import ContractType, Email, Money  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "rule_engine_baseline.json")
+
+SIZES = {"1KB": 1024, "16KB": 16 * 1024, "256KB": 256 * 1024, "2MB": 2 * 1024**2}
+
+# Timings below this are dominated by timer and scheduling noise and not
+# compared; they are still recorded
+MIN_COMPARED_MS = 1.0
+
+# Clause templates by kind; {days}, {years}, {amount} and {party} are filled
+# from the corpus seed
+CLAUSES = {
+    "governing_law": [
+        "This Agreement shall be governed by and construed in accordance with "
+        "the laws of England and Wales.",
+        "The courts of England and Wales have exclusive jurisdiction.",
+    ],
+    "data_protection": [
+        "Each party shall comply with the GDPR and the Data Protection Act 2018 "
+        "when processing personal data as data controller.",
+        "The {party} processes personal data on the lawful basis of contract "
+        "and legitimate interests.",
+    ],
+    "payment": [
+        "Invoices are payable within {days} days of receipt.",
+        "The {party} shall pay the fees of £{amount} in advance.",
+    ],
+    "termination": [
+        "Either party may terminate this Agreement on {days} days notice.",
+        "The notice period for termination is {days} days.",
+    ],
+    "confidentiality": [
+        "Each party shall keep the other party's confidential information "
+        "secret for {years} years.",
+        "Confidential information may be disclosed to professional advisers.",
+    ],
+    "liability_cap": [
+        "Liability under this Agreement is limited to £{amount} in aggregate.",
+        "Nothing limits liability for fraud or fraudulent misrepresentation.",
+    ],
+    "dispute": [
+        "Any dispute shall first be referred to mediation before arbitration.",
+    ],
+    "liability_exclusion": [
+        "The {party} may exclude all liability for death or personal injury.",
+        "To the fullest extent permitted the {party} excludes liability for "
+        "any loss whatsoever.",
+    ],
+    "restrictive": [
+        "The {party} shall not compete with the business for {years} years.",
+        "The parties agree to fix prices under a pricing arrangement.",
+        "The parties will divide the market and allocate customers.",
+    ],
+    "penalty": [
+        "A penalty of £{amount} is payable for each day of delay.",
+        "The {party} shall indemnify against all losses without limit.",
+    ],
+    "eu_references": [
+        "Terms have the meaning given in the relevant EU directive.",
+        "References to European regulation include retained EU law.",
+    ],
+    "employment": [
+        "The employee is entitled to 28 days annual leave including holiday.",
+        "The employer shall meet its health and safety duties under HASAWA.",
+        "The employee reports to the director with authority of the board.",
+    ],
+    "boilerplate": [
+        "Headings are for convenience only and do not affect interpretation.",
+        "This Agreement may be executed in any number of counterparts.",
+        "No variation of this Agreement is effective unless made in writing.",
+        "A person who is not a party has no right to enforce any term.",
+        "Time is of the essence for the performance of these obligations.",
+    ],
+}
+
+# Clause mix: contract type and the weight of each clause kind
+MIXES = {
+    "standard": (
+        ContractType.SERVICE_AGREEMENT,
+        {
+            "governing_law": 1,
+            "data_protection": 2,
+            "payment": 2,
+            "termination": 2,
+            "confidentiality": 2,
+            "liability_cap": 2,
+            "dispute": 1,
+            "boilerplate": 4,
+        },
+    ),
+    "high_risk": (
+        ContractType.SUPPLIER_AGREEMENT,
+        {
+            "payment": 1,
+            "liability_exclusion": 3,
+            "restrictive": 3,
+            "penalty": 3,
+            "eu_references": 2,
+            "boilerplate": 2,
+        },
+    ),
+    "employment": (
+        ContractType.EMPLOYMENT_CONTRACT,
+        {
+            "employment": 4,
+            "termination": 2,
+            "confidentiality": 2,
+            "restrictive": 1,
+            "data_protection": 1,
+            "boilerplate": 3,
+        },
+    ),
+    "boilerplate": (
+        ContractType.NDA,
+        {"boilerplate": 12, "governing_law": 1, "confidentiality": 1},
+    ),
+}
+
+
+@dataclass
+class CorpusContract:
+    name: str
+    mix: str
+    size: str
+    contract_type: ContractType
+    content: str
+
+
+def synthetic_contract(rng: random.Random, mix: str, target_bytes: int) -> str:
+    """Numbered clauses drawn from a mix until the target size is reached"""
+    kinds, weights = zip(*MIXES[mix][1].items())
+    parts = [f"{mix.replace('_', ' ').upper()} AGREEMENT"]
+    size = len(parts[0])
+    number = 0
+    while size < target_bytes:
+        number += 1
+        kind = rng.choices(kinds, weights)[0]
+        text = rng.choice(CLAUSES[kind]).format(
+            days=rng.choice([7, 14, 30, 60, 90]),
+            years=rng.choice([1, 2, 3, 5, 10]),
+            amount=rng.choice([500, 10000, 250000, 5000000]),
+            party=rng.choice(["Supplier", "Customer", "Employee", "Consultant"]),
+        )
+        part = f"{number}. {kind.replace('_', ' ').upper()}\n{text}"
+        parts.append(part)
+        size += len(part) + 2
+    return "\n\n".join(parts)[:target_bytes]
+
+
+def generate_corpus(
+    seed: int, sizes: Optional[Dict[str, int]] = None
+) -> List[CorpusContract]:
+    """One contract per clause mix and size; the same seed gives the same corpus"""
+    rng = random.Random(seed)
+    corpus = []
+    for size, target_bytes in (sizes or SIZES).items():
+        for mix, (contract_type, _) in MIXES.items():
+            corpus.append(
+                CorpusContract(
+                    name=f"{mix}_{size}",
+                    mix=mix,
+                    size=size,
+                    contract_type=contract_type,
+                    content=synthetic_contract(rng, mix, target_bytes),
+                )
+            )
+    return corpus
+
+
+def benchmark_company() -> Company:
+    return Company(
+        company_id=CompanyId(str(uuid4())),
+        name="Benchmark Ltd",
+        company_type=CompanyType.PRIVATE_LIMITED,
+        industry=IndustryType.FINANCE,  # Every rule applies to some contract
+        address=BusinessAddress(
+            line1="1 High Street", city="London", postcode="SW1A 1AA"
+        ),
+        primary_contact_email=Email("benchmark@example.co.uk"),
+        created_by_user_id=str(uuid4()),
+    )
+
+
+def median_ms(
+    run: Callable[[Any], Any],
+    repeat: int,
+    setup: Callable[[], Any] = lambda: None,
+) -> float:
+    """Median wall time of run(setup()); setup runs outside the timer"""
+    samples = []
+    for _ in range(repeat):
+        state = setup()
+        start = time.perf_counter()
+        run(state)
+        samples.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(samples), 4)
+
+
+def calibration_ms(repeat: int) -> float:
+    """Fixed pure-Python workload used to normalise across machines"""
+    values = list(range(200000, 0, -1))
+    return median_ms(lambda _: sorted(str(v) for v in values), max(repeat, 5))
+
+
+def rule_benchmarks(engine, corpus, company, repeat) -> Dict[str, float]:
+    """Term scan plus validation of each rule, per contract size"""
+    from app.domain.services.contract_document import ContractDocument
+
+    metrics = {}
+    value = Money(25000, "GBP")
+    for contract in corpus:
+        if contract.mix != "standard":
+            continue
+        for rule in engine.bundle.rules.values():
+
+            def run(document, rule=rule):
+                hits = engine.scan_content(document, [rule])
+                engine._validate_rule(rule, document, company, value, hits)
+
+            metrics[f"rule.{rule.rule_id}.{contract.size}"] = median_ms(
+                run, repeat, lambda: ContractDocument(contract.content)
+            )
+    return metrics
+
+
+def risk_check_benchmarks(service, corpus, company, repeat) -> Dict[str, float]:
+    """Each _assess_* risk check, per contract size"""
+    from app.domain.services.contract_document import ContractDocument
+
+    value = Money(25000, "GBP")
+    metrics = {}
+    for contract in corpus:
+        if contract.mix != "high_risk":
+            continue
+        compliance = service.compliance_engine.validate_contract(
+            contract.content, company, contract.contract_type, value
+        )
+        contract_type = contract.contract_type
+        checks = {
+            "legal_compliance": lambda d: service._assess_legal_compliance_risks(
+                compliance, company
+            ),
+            "financial_exposure": lambda d: service._assess_financial_risks(
+                d, value, company
+            ),
+            "operational_impact": lambda d: service._assess_operational_risks(
+                d, contract_type, company
+            ),
+            "termination": lambda d: service._assess_termination_risks(
+                d, contract_type
+            ),
+            "reputational": lambda d: service._assess_reputational_risks(d, company),
+            "confidentiality": lambda d: service._assess_confidentiality_risks(
+                d, company
+            ),
+            "dispute_resolution": lambda d: service._assess_dispute_resolution_risks(
+                d, company
+            ),
+        }
+        for name, check in checks.items():
+            metrics[f"risk_check.{name}.{contract.size}"] = median_ms(
+                check, repeat, lambda: ContractDocument(contract.content)
+            )
+    return metrics
+
+
+def end_to_end_benchmarks(engine, service, corpus, company, repeat):
+    """Full assessments of every contract, plus corpus throughput"""
+    from app.domain.services.contract_document import contract_document_cache
+
+    value = Money(25000, "GBP")
+    metrics = {}
+    totals = {"compliance": 0.0, "risk": 0.0}
+    for contract in corpus:
+        runs = {
+            "compliance": lambda: engine.validate_contract(
+                contract.content, company, contract.contract_type, value
+            ),
+            "risk": lambda: service.assess_contract_risk(
+                contract.content, company, contract.contract_type, value
+            ),
+        }
+        for name, run in runs.items():
+            elapsed = median_ms(
+                lambda _: run(), repeat, contract_document_cache.clear
+            )
+            metrics[f"e2e.{name}.{contract.name}"] = elapsed
+            totals[name] += elapsed
+
+    corpus_mb = sum(len(c.content) for c in corpus) / 1024**2
+    throughput = {}
+    for name, total_ms in totals.items():
+        throughput[f"{name}_contracts_per_second"] = round(
+            len(corpus) / (total_ms / 1000), 2
+        )
+        throughput[f"{name}_mb_per_second"] = round(corpus_mb / (total_ms / 1000), 2)
+    return metrics, throughput
+
+
+def run_benchmarks(seed: int, repeat: int, sizes: Dict[str, int]) -> Dict:
+    from app.domain.services import safe_patterns
+    from app.domain.services.ai_risk_assessment_service import (
+        AIRiskAssessmentService,
+    )
+    from app.domain.services.uk_compliance_engine import UKComplianceRuleEngine
+
+    # No assessment caches: every timing is a cold assessment
+    engine = UKComplianceRuleEngine()
+    service = AIRiskAssessmentService()
+    service.compliance_engine = engine
+
+    corpus = generate_corpus(seed, sizes)
+    company = benchmark_company()
+    metrics = {}
+    metrics.update(rule_benchmarks(engine, corpus, company, repeat))
+    metrics.update(risk_check_benchmarks(service, corpus, company, repeat))
+    e2e_metrics, throughput = end_to_end_benchmarks(
+        engine, service, corpus, company, repeat
+    )
+    metrics.update(e2e_metrics)
+
+    return {
+        "metadata": {
+            "seed": seed,
+            "repeat": repeat,
+            "sizes": list(sizes),
+            "rule_set_version": engine.rule_set_version,
+            "re2_available": safe_patterns.RE2_AVAILABLE,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "calibration_ms": calibration_ms(repeat),
+        "metrics": metrics,
+        "throughput": throughput,
+    }
+
+
+def compare_to_baseline(
+    results: Dict, baseline: Dict, tolerance: float
+) -> List[Dict[str, float]]:
+    """
+    Timings slower than the baseline by more than the tolerance, after
+    scaling the baseline by the ratio of calibration times. Metrics missing
+    from either side, or fast enough to be noise, are not compared.
+    """
+    scale = results["calibration_ms"] / baseline["calibration_ms"]
+    regressions = []
+    for name, baseline_ms in baseline["metrics"].items():
+        current_ms = results["metrics"].get(name)
+        if current_ms is None or baseline_ms < MIN_COMPARED_MS:
+            continue
+        expected_ms = baseline_ms * scale
+        if current_ms > expected_ms * (1 + tolerance):
+            regressions.append(
+                {
+                    "metric": name,
+                    "baseline_ms": baseline_ms,
+                    "expected_ms": round(expected_ms, 4),
+                    "current_ms": current_ms,
+                    "slowdown": round(current_ms / expected_ms, 2),
+                }
+            )
+    return sorted(regressions, key=lambda r: r["slowdown"], reverse=True)
+
+
+def parse_sizes(value: str) -> Dict[str, int]:
+    sizes = {}
+    for size in value.split(","):
+        if size not in SIZES:
+            raise argparse.ArgumentTypeError(
+                f"unknown size {size}; choose from {', '.join(SIZES)}"
+            )
+        sizes[size] = SIZES[size]
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--sizes", type=parse_sizes, default=SIZES)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="write the results as the new baseline instead of comparing",
+    )
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.seed, args.repeat, args.sizes)
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as target:
+            json.dump(results, target, indent=2, sort_keys=True)
+            target.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        print(json.dumps(results["throughput"], indent=2))
+        return
+
+    regressions = []
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as source:
+            baseline = json.load(source)
+        if baseline["metadata"]["seed"] != args.seed:
+            print("Baseline was recorded with another seed; not comparing")
+        else:
+            regressions = compare_to_baseline(results, baseline, args.tolerance)
+    results["regressions"] = regressions
+    print(json.dumps(results, indent=2))
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
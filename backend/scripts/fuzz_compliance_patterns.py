@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Fuzz and benchmark harness for the compliance and risk rule patterns
+Times full assessments on pathological single-line and digit-run inputs
+that make backtracking ".*" chains polynomial, and fuzzes the linear-time
+pattern evaluation against Python's re on short random inputs.
+
+Usage: python scripts/fuzz_compliance_patterns.py [--size-kb 1024]
+       [--engine auto|fallback] [--fuzz 2000] [--seed 1]
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+from uuid import uuid4
+
+# Add the backend directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.domain.services import safe_patterns  # noqa: E402
+
+# Repeated units; none completes the chain its prefix starts
+PATHOLOGICAL_UNITS = {
+    "exclusion_without_death": "exclude liability ",
+    "fix_without_price": "fix the fee ",
+    "compete_without_years": "not to compete ",
+    "confidential_without_years": "confidential 1 day ",
+    "digit_run": "1",
+    "penalty_without_amount": "penalty £ ",
+}
+
+FUZZ_ALPHABET = [
+    "exclude", "liability", "death", "personal", "injury", "not", "compete",
+    "fix", "price", "3", "12", "years", "days", "notice", "confidential", " ",
+    " ", "\n", "£", "penalty", "market", "sharing",
+]  # fmt: skip
+
+
+def rule_patterns():
+    from app.domain.services.uk_compliance_engine import uk_compliance_engine
+
+    bundle = uk_compliance_engine.bundle
+    patterns = [rule.pattern for rule in bundle.rules.values()]
+    return [p for p in patterns if p] + list(bundle.clause_patterns.values())
+
+
+def benchmark_company():
+    from app.domain.entities.company import (
+        BusinessAddress,
+        Company,
+        CompanyId,
+        CompanyType,
+        IndustryType,
+    )
+    from app.domain.value_objects import Email
+
+    return Company(
+        company_id=CompanyId(str(uuid4())),
+        name="Fuzz Ltd",
+        company_type=CompanyType.PRIVATE_LIMITED,
+        industry=IndustryType.TECHNOLOGY,
+        address=BusinessAddress(
+            line1="1 High Street", city="London", postcode="SW1A 1AA"
+        ),
+        primary_contact_email=Email("fuzz@example.co.uk"),
+        created_by_user_id=str(uuid4()),
+    )
+
+
+def time_pathological_inputs(size_kb: int, time_budget_ms: float):
+    from app.domain.services.ai_risk_assessment_service import (
+        ai_risk_assessment_service,
+    )
+    from app.domain.services.contract_document import contract_document_cache
+    from app.domain.value_objects import ContractType
+
+    company = benchmark_company()
+    results = {}
+    for name, unit in PATHOLOGICAL_UNITS.items():
+        content = unit * (size_kb * 1024 // len(unit))
+        contract_document_cache.clear()
+        start = time.perf_counter()
+        assessment = ai_risk_assessment_service.assess_contract_risk(
+            content,
+            company,
+            ContractType.SERVICE_AGREEMENT,
+            time_budget_ms=time_budget_ms,
+        )
+        results[name] = {
+            "chars": len(content),
+            "assessment_ms": round((time.perf_counter() - start) * 1000, 2),
+            "is_partial": assessment.is_partial,
+        }
+    return results
+
+
+def fuzz_patterns(iterations: int, seed: int):
+    """Compare match start positions with Python's re on short inputs"""
+    rng = random.Random(seed)
+    patterns = rule_patterns()
+    mismatches = []
+    for _ in range(iterations):
+        pattern = rng.choice(patterns)
+        text = "".join(
+            rng.choice(FUZZ_ALPHABET) for _ in range(rng.randint(0, 40))
+        ).lower()
+        expected = re.search(pattern, text)
+        actual = safe_patterns.SafePattern(pattern).search(text)
+        expected_start = expected.start() if expected else None
+        actual_start = actual.start() if actual else None
+        if expected_start != actual_start:
+            mismatches.append({"pattern": pattern, "text": text, "re": expected_start})
+    return {"iterations": iterations, "mismatches": mismatches[:10]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size-kb", type=int, default=1024)
+    parser.add_argument(
+        "--engine",
+        choices=["auto", "fallback"],
+        default="auto",
+        help="fallback disables RE2 even when it is installed",
+    )
+    parser.add_argument("--fuzz", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--time-budget-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    # Must be set before any pattern is compiled
+    if args.engine == "fallback":
+        safe_patterns.RE2_AVAILABLE = False
+
+    engines = {}
+    for pattern in rule_patterns():
+        engine = safe_patterns.compile_safe(pattern).engine
+        engines[engine] = engines.get(engine, 0) + 1
+
+    results = {
+        "re2_available": safe_patterns.RE2_AVAILABLE,
+        "pattern_engines": engines,
+        "pathological": time_pathological_inputs(args.size_kb, args.time_budget_ms),
+        "fuzz": fuzz_patterns(args.fuzz, args.seed),
+    }
+    print(json.dumps(results, indent=2))
+    sys.exit(1 if results["fuzz"]["mismatches"] else 0)
+
+
+if __name__ == "__main__":
+    main()
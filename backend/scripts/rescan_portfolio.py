@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Re-score contracts with the current compliance rules
+Streams a company's contracts (or every company's) through a pool of rule
+engine worker processes and writes new compliance scores back in batches.
+Progress is checkpointed after every batch, so an interrupted run picks up
+where it stopped when started again with the same checkpoint file.
+
+Usage: python scripts/rescan_portfolio.py [--company-id ID] [--workers 8]
+       [--batch-size 500] [--checkpoint rescan.json]
+"""
+import argparse
+import json
+import os
+import sys
+
+# Add the backend directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.portfolio_rescan_service import (  # noqa: E402
+    PortfolioRescanService,
+)
+
+
+def load_checkpoint(path, company_id, rule_set_version):
+    """Resume cursor from a checkpoint of the same scope and rule set"""
+    if not path or not os.path.exists(path):
+        return None
+    with open(path) as checkpoint:
+        state = json.load(checkpoint)
+    if (
+        state.get("company_id") != company_id
+        or state.get("rule_set_version") != rule_set_version
+    ):
+        print("Checkpoint is for another scope or rule set; starting over")
+        return None
+    return state.get("last_contract_id")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--company-id", help="rescan one company (default: all)")
+    parser.add_argument("--workers", type=int, help="worker processes (0 = CPUs)")
+    parser.add_argument("--batch-size", type=int)
+    parser.add_argument("--checkpoint", default="rescan_checkpoint.json")
+    args = parser.parse_args()
+
+    service = PortfolioRescanService(workers=args.workers, batch_size=args.batch_size)
+    rule_set_version = service.engine.rule_set_version
+    resume_after = load_checkpoint(args.checkpoint, args.company_id, rule_set_version)
+
+    def report(job):
+        with open(args.checkpoint, "w") as checkpoint:
+            json.dump(
+                {
+                    "company_id": job.company_id,
+                    "rule_set_version": job.rule_set_version,
+                    "last_contract_id": job.last_contract_id or job.resume_after,
+                },
+                checkpoint,
+            )
+        print(
+            f"{job.status}: {job.processed}/{job.total} contracts, "
+            f"{job.failed} failed, {job.contracts_per_second or 0} per second",
+            flush=True,
+        )
+
+    scope = f"company {args.company_id}" if args.company_id else "all companies"
+    print(
+        f"Rescanning {scope} with rule set {rule_set_version} "
+        f"on {service.worker_count} workers"
+        + (f", resuming after {resume_after}" if resume_after else "")
+    )
+    job = service.rescan(
+        company_id=args.company_id,
+        resume_after=resume_after,
+        progress_callback=report,
+    )
+
+    if job.status == "completed":
+        os.remove(args.checkpoint)
+    else:
+        print(f"Rescan failed: {job.error}; run again to resume")
+    if job.failed_contract_ids:
+        print(f"Contracts that could not be scored: {job.failed_contract_ids}")
+    sys.exit(0 if job.status == "completed" else 1)
+
+
+if __name__ == "__main__":
+    main()
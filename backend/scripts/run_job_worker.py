@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Run background jobs outside the API process
+Claims queued jobs from the database and runs them until interrupted;
+start as many as needed, on as many hosts as needed. Set
+JOB_WORKER_IN_PROCESS=false on the API when running these.
+
+Usage: python scripts/run_job_worker.py [--concurrency 4] [--worker-id ID]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import sys
+
+# Add the backend directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.job_queue_service import job_queue_service  # noqa: E402
+
+
+async def run(args):
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        # Running jobs are put back in the queue for another worker
+        loop.add_signal_handler(signum, stop.set)
+    await job_queue_service.run_worker(
+        stop, worker_id=args.worker_id, concurrency=args.concurrency
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, help="jobs run at once")
+    parser.add_argument("--worker-id", help="name in job leases (default: host:pid)")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
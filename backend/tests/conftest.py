@@ -16,7 +16,7 @@ from app.services.ai_service import GroqAIService
 # Removed duplicate contract service import
 from app.core.config import settings
 from app.core.database import Base, create_tables
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 
 
@@ -235,6 +235,7 @@ def mock_settings():
         SECRET_KEY="test-secret-key",
         GROQ_API_KEY="test-groq-key",
         GROQ_MODEL="openai/gpt-oss-120b",
+        AI_PROVIDER="groq",
         JWT_ALGORITHM="HS256",
         JWT_EXPIRATION_HOURS=24,
         MAX_USERS_PER_ACCOUNT=5,
@@ -414,3 +415,132 @@ def db_session(test_database):
         yield db
     finally:
         db.close()
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """
+    Sessions on a file-backed database with every table. Services that open
+    sessions of their own or work in threads need a file: each connection
+    to an in-memory database gets an empty one.
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    # Enforce foreign keys like PostgreSQL does
+    event.listen(
+        engine,
+        "connect",
+        lambda connection, _: connection.execute("PRAGMA foreign_keys=ON"),
+    )
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def db(session_factory):
+    """A session on the session_factory database"""
+    session = session_factory()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def company_user(db):
+    """A user owning a company, committed to db"""
+    from app.infrastructure.database.models import Company, User
+    from app.domain.entities.company import CompanyType, IndustryType
+
+    user = User(
+        email="owner@example.co.uk", full_name="Owner", hashed_password="hashed"
+    )
+    db.add(user)
+    db.flush()
+    company = Company(
+        name="Example Consulting Ltd",
+        company_type=CompanyType.PRIVATE_LIMITED,
+        industry=IndustryType.TECHNOLOGY,
+        primary_contact_email=user.email,
+        address_line1="1 High Street",
+        city="London",
+        postcode="SW1A 1AA",
+        created_by_user_id=user.id,
+    )
+    db.add(company)
+    db.flush()
+    user.company_id = company.id
+    db.commit()
+    return user
+
+
+@pytest.fixture
+def run_worker_until_finished():
+    """Runs a job queue worker until a bulk job's background job has ended"""
+    from app.infrastructure.database.models import BackgroundJob
+
+    async def run(queue, db, job):
+        stop = asyncio.Event()
+        worker = asyncio.create_task(queue.run_worker(stop, worker_id="worker-1"))
+        try:
+            for _ in range(500):
+                db.expire_all()
+                if db.get(BackgroundJob, job.background_job_id).completed_at:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            stop.set()
+            await worker
+        db.expire_all()
+
+    return run
+
+
+@pytest.fixture
+def tenants(db):
+    """
+    Rows behind the fixed ids some tests use: user "user-1", companies
+    "company-a" and "company-b", and contracts "contract-1" and "contract-2"
+    of company-a
+    """
+    from app.infrastructure.database.models import (
+        Company,
+        Contract,
+        ContractType,
+        User,
+    )
+    from app.domain.entities.company import CompanyType, IndustryType
+
+    db.add(
+        User(
+            id="user-1",
+            email="tenant@example.co.uk",
+            full_name="Owner",
+            hashed_password="hashed",
+        )
+    )
+    db.flush()
+    for company_id in ("company-a", "company-b"):
+        db.add(
+            Company(
+                id=company_id,
+                name=f"Example {company_id} Ltd",
+                company_type=CompanyType.PRIVATE_LIMITED,
+                industry=IndustryType.TECHNOLOGY,
+                primary_contact_email="tenant@example.co.uk",
+                address_line1="1 High Street",
+                city="London",
+                postcode="SW1A 1AA",
+                created_by_user_id="user-1",
+            )
+        )
+    db.flush()
+    for contract_id in ("contract-1", "contract-2"):
+        db.add(
+            Contract(
+                id=contract_id,
+                title=f"Agreement {contract_id}",
+                contract_type=ContractType.SERVICE_AGREEMENT,
+                company_id="company-a",
+                created_by="user-1",
+            )
+        )
+    db.commit()
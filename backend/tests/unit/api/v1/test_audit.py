@@ -11,7 +11,9 @@ from app.main import app
 from app.core.auth import get_current_user
 from app.infrastructure.database.models import User, AuditLog, AuditAction, AuditResourceType, AuditRiskLevel, Company
 from app.domain.entities.company import CompanyType, IndustryType
-from app.core.database import SessionLocal
+from app.core.database import Base, SessionLocal, get_db
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
 
 client = TestClient(app)
 
@@ -40,6 +42,27 @@ def mock_auth(mock_user):
     app.dependency_overrides.clear()
 
 
+@pytest.fixture
+def export_db(mock_auth, tmp_path):
+    """Writable database for the endpoints: exports are recorded as jobs"""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'audit.db'}", connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    yield
+    engine.dispose()
+
+
 # Remove the complex fixture that wasn't working properly
 
 
@@ -194,7 +217,7 @@ class TestGetAuditStats:
 class TestExportAuditEntries:
     """Test POST /api/v1/audit/entries/export"""
 
-    def test_export_audit_entries_success(self, mock_auth):
+    def test_export_audit_entries_success(self, export_db):
         """Test successful audit entries export"""
         export_request = {"format": "JSON", "include_metadata": True}
 
@@ -218,7 +241,7 @@ class TestExportAuditEntries:
         for field in required_fields:
             assert field in export_data
 
-    def test_export_audit_entries_with_filters(self, mock_auth):
+    def test_export_audit_entries_with_filters(self, export_db):
         """Test export with filters"""
         export_request = {
             "filters": {
@@ -236,7 +259,7 @@ class TestExportAuditEntries:
         data = response.json()
         assert data["success"] is True
 
-    def test_export_audit_entries_invalid_format(self, mock_auth):
+    def test_export_audit_entries_invalid_format(self, export_db):
         """Test export with invalid format"""
         export_request = {"format": "INVALID", "include_metadata": True}
 
@@ -257,7 +280,7 @@ class TestExportAuditEntries:
 class TestAuditEndpointsIntegration:
     """Integration tests for audit endpoints"""
 
-    def test_audit_workflow(self, mock_auth):
+    def test_audit_workflow(self, export_db):
         """Test complete audit workflow"""
         # 1. Get audit stats
         stats_response = client.get("/api/v1/audit/stats")
@@ -357,7 +380,7 @@ class TestAuditValidation:
         response = client.get("/api/v1/audit/entries?size=1000")
         assert response.status_code == 422
 
-    def test_export_request_validation(self, mock_auth):
+    def test_export_request_validation(self, export_db):
         """Test validation of export request"""
         # Test empty request
         response = client.post("/api/v1/audit/entries/export", json={})
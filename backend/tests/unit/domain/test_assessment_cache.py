@@ -0,0 +1,204 @@
+"""
+Unit tests for memoised compliance and risk assessments
+"""
+
+import pytest
+from uuid import uuid4
+
+from app.domain.entities.company import (
+    BusinessAddress,
+    Company,
+    CompanyId,
+    CompanyType,
+    IndustryType,
+)
+from app.domain.entities.template import ComplianceFramework
+from app.domain.services import uk_compliance_engine as engine_module
+from app.domain.services.ai_risk_assessment_service import AIRiskAssessmentService
+from app.domain.services.assessment_cache import (
+    AssessmentCache,
+    AssessmentKey,
+    company_fingerprint,
+)
+from app.domain.services.uk_compliance_engine import (
+    ComplianceRule,
+    UKComplianceRuleEngine,
+    UKRegulationType,
+)
+from app.domain.value_objects import ContractType, Email
+
+CONTRACT = """
+1. DATA PROTECTION
+The parties shall comply with the GDPR on the lawful basis of contract.
+
+2. TERMINATION
+Either party may terminate on 30 days notice.
+"""
+
+
+def make_company(industry=IndustryType.TECHNOLOGY):
+    return Company(
+        company_id=CompanyId(str(uuid4())),
+        name="Test Company Ltd",
+        company_type=CompanyType.PRIVATE_LIMITED,
+        industry=industry,
+        address=BusinessAddress(
+            line1="123 Test Street", city="London", postcode="SW1A 1AA"
+        ),
+        primary_contact_email=Email("test@company.com"),
+        created_by_user_id=str(uuid4()),
+    )
+
+
+def make_key(content_hash="abc", version="1"):
+    return AssessmentKey("compliance", content_hash, "nda", "fp", version)
+
+
+@pytest.fixture
+def cache():
+    return AssessmentCache(max_size=8)
+
+
+@pytest.fixture
+def engine(cache):
+    return UKComplianceRuleEngine(cache=cache)
+
+
+class TestAssessmentCache:
+    """Test the bounded cache itself"""
+
+    def test_least_recently_used_entry_evicted(self):
+        """Only max_size entries are kept"""
+        cache = AssessmentCache(max_size=2)
+        cache.put(make_key("a"), "A")
+        cache.put(make_key("b"), "B")
+        cache.get(make_key("a"))
+        cache.put(make_key("c"), "C")
+
+        assert cache.get(make_key("b")) is None
+        assert cache.get(make_key("a")) == "A"
+        assert len(cache) == 2
+
+    def test_snapshot_persisted_and_reloaded(self, tmp_path):
+        """Entries survive a restart when a persist path is configured"""
+        path = str(tmp_path / "assessments.pickle")
+        cache = AssessmentCache(persist_path=path)
+        cache.put(make_key(), {"score": 97.5})
+        cache.save()
+
+        reloaded = AssessmentCache(persist_path=path)
+
+        assert reloaded.get(make_key()) == {"score": 97.5}
+        # Written through a temp file of its own, then renamed into place
+        assert [p.name for p in tmp_path.iterdir()] == ["assessments.pickle"]
+
+    def test_corrupt_snapshot_ignored(self, tmp_path):
+        """An unreadable snapshot starts an empty cache"""
+        path = tmp_path / "assessments.pickle"
+        path.write_bytes(b"not a pickle")
+
+        assert len(AssessmentCache(persist_path=str(path))) == 0
+
+    def test_fingerprint_tracks_company_profile(self):
+        """Profile fields the engines read change the fingerprint"""
+        tech, retail = make_company(), make_company(IndustryType.RETAIL)
+
+        assert company_fingerprint(tech) == company_fingerprint(make_company())
+        assert company_fingerprint(tech) != company_fingerprint(retail)
+
+
+class TestCachedAssessments:
+    """Test memoisation in the compliance engine and risk service"""
+
+    def test_repeat_assessment_served_from_cache(self, engine, cache):
+        """Unchanged content returns the memoised assessment"""
+        company = make_company()
+
+        first = engine.validate_contract(
+            CONTRACT, company, ContractType.SERVICE_AGREEMENT
+        )
+        second = engine.validate_contract(
+            CONTRACT, company, ContractType.SERVICE_AGREEMENT
+        )
+
+        assert second is first
+        assert cache.hits == 1
+
+    def test_changed_content_or_contract_type_misses(self, engine):
+        """Content and contract type are part of the key"""
+        company = make_company()
+        first = engine.validate_contract(
+            CONTRACT, company, ContractType.SERVICE_AGREEMENT
+        )
+
+        assert (
+            engine.validate_contract(
+                CONTRACT + "\nAmended.", company, ContractType.SERVICE_AGREEMENT
+            )
+            is not first
+        )
+        assert (
+            engine.validate_contract(CONTRACT, company, ContractType.NDA)
+            is not first
+        )
+
+    def test_rule_changes_invalidate_entries(self, engine, monkeypatch):
+        """Adding a rule or bumping RULE_SET_VERSION changes the version"""
+        company = make_company()
+        original_version = engine.rule_set_version
+        first = engine.validate_contract(
+            CONTRACT, company, ContractType.SERVICE_AGREEMENT
+        )
+
+        engine._add_rule(
+            ComplianceRule(
+                rule_id="TEST_001",
+                title="Anti-bribery clause",
+                description="Contract must reference the Bribery Act",
+                regulation_type=UKRegulationType.STATUTORY,
+                applicable_frameworks=[ComplianceFramework.GDPR],
+                pattern=r"(?i)bribery\s+act",
+            )
+        )
+        assert engine.rule_set_version != original_version
+        second = engine.validate_contract(
+            CONTRACT, company, ContractType.SERVICE_AGREEMENT
+        )
+        assert second is not first
+        assert "TEST_001" in {v.rule_id for v in second.violations}
+
+        monkeypatch.setattr(engine_module, "RULE_SET_VERSION", "test-bump")
+        engine.reload_rules()
+        assert engine.rule_set_version.startswith("test-bump-")
+
+    def test_rule_set_version_stable_across_instances(self):
+        """Versions match across restarts so persisted entries stay valid"""
+        assert (
+            UKComplianceRuleEngine().rule_set_version
+            == UKComplianceRuleEngine().rule_set_version
+        )
+
+    def test_partial_assessment_not_cached(self, engine, cache):
+        """Results cut short by the time budget are not memoised"""
+        engine.validate_contract(
+            CONTRACT,
+            make_company(),
+            ContractType.SERVICE_AGREEMENT,
+            time_budget_ms=0,
+        )
+
+        assert len(cache) == 0
+
+    def test_risk_assessment_cached(self, cache):
+        """Risk assessments are memoised alongside compliance results"""
+        service = AIRiskAssessmentService(cache=cache)
+        company = make_company()
+
+        first = service.assess_contract_risk(
+            CONTRACT, company, ContractType.SERVICE_AGREEMENT
+        )
+        second = service.assess_contract_risk(
+            CONTRACT, company, ContractType.SERVICE_AGREEMENT
+        )
+
+        assert second is first
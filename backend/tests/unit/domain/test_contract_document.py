@@ -0,0 +1,142 @@
+"""
+Unit tests for the preprocessed contract document shared by the engines
+"""
+
+from decimal import Decimal
+from uuid import uuid4
+
+from app.domain.entities.company import (
+    BusinessAddress,
+    Company,
+    CompanyId,
+    CompanyType,
+    IndustryType,
+)
+from app.domain.services.ai_risk_assessment_service import AIRiskAssessmentService
+from app.domain.services.contract_document import (
+    ContractDocument,
+    ContractDocumentCache,
+    required_literals,
+)
+from app.domain.services.safe_patterns import compile_safe
+from app.domain.value_objects import ContractType, Email
+
+CONTRACT = """SERVICES AGREEMENT between Acme Ltd and Client Ltd
+
+1. SERVICES
+The Supplier shall provide a dedicated team for 6 months.
+
+2. PAYMENT
+Fees of £12,500 are payable within 30 days.
+A final payment of 2,000 GBP is due on completion.
+
+3. LIABILITY
+The Supplier shall exclude all liability for death caused by negligence.
+"""
+
+
+class TestContractDocument:
+    """Test preprocessing features"""
+
+    def test_clauses_segmented_with_offsets(self):
+        """Numbered clauses are found and offsets map back to the content"""
+        document = ContractDocument(CONTRACT)
+
+        numbers = [clause.number for clause in document.clauses]
+        assert numbers == [None, "1", "2", "3"]
+        payment = document.clauses[2]
+        assert payment.heading == "PAYMENT"
+        assert CONTRACT[payment.start : payment.end].startswith("2. PAYMENT")
+
+        offset = document.positions("exclude all liability")[0]
+        assert document.location_of(offset) == "Clause 3: LIABILITY"
+
+    def test_durations_and_currencies_extracted(self):
+        """Durations and monetary amounts are extracted with positions"""
+        document = ContractDocument(CONTRACT)
+
+        assert [(d.value, d.unit) for d in document.durations] == [
+            (6, "month"),
+            (30, "day"),
+        ]
+        assert [(m.amount, m.currency) for m in document.currencies] == [
+            (Decimal("12500"), "GBP"),
+            (Decimal("2000"), "GBP"),
+        ]
+
+    def test_durations_in_span(self):
+        """Durations can be extracted from part of the text"""
+        document = ContractDocument(CONTRACT)
+        payment = document.text.index("2. payment")
+
+        durations = document.durations_in(payment, len(document.text))
+
+        assert [(d.value, d.unit) for d in durations] == [(30, "day")]
+
+    def test_tokens_and_bigrams(self):
+        """Whole-word phrases are answered from the token and bigram sets"""
+        document = ContractDocument(CONTRACT)
+
+        assert document.has_phrase("Dedicated Team")
+        assert document.has_phrase("payable")
+        assert not document.has_phrase("pay")
+
+    def test_search_is_memoised_and_prefiltered(self):
+        """Searches run once per pattern and skip patterns missing a literal"""
+        document = ContractDocument(CONTRACT)
+
+        first = document.search(r"dedicated.*team")
+        assert first is document.search(r"dedicated.*team")
+        assert document.search(r"indemnify.*all.*claims") is None
+        assert required_literals(r"penalty.*\£.*\d+") == ("penalty",)
+        assert required_literals(r"(a|b).*c") == ()
+
+
+class TestContractDocumentCache:
+    """Test the content-hash keyed document cache"""
+
+    def test_same_content_returns_same_document(self):
+        cache = ContractDocumentCache()
+
+        document = cache.get(CONTRACT)
+
+        assert cache.get(CONTRACT) is document
+        assert cache.get(document) is document
+
+    def test_least_recently_used_document_evicted(self):
+        cache = ContractDocumentCache(max_size=2)
+        first = cache.get("first")
+        cache.get("second")
+        cache.get("first")
+        cache.get("third")
+
+        assert len(cache) == 2
+        assert cache.get("first") is first
+
+
+class TestSharedDocumentAssessment:
+    """Test both engines consuming the same document"""
+
+    def test_risk_assessment_accepts_document(self):
+        """The risk service and compliance engine share one document"""
+        company = Company(
+            company_id=CompanyId(str(uuid4())),
+            name="Test Company Ltd",
+            company_type=CompanyType.PRIVATE_LIMITED,
+            industry=IndustryType.TECHNOLOGY,
+            address=BusinessAddress(
+                line1="123 Test Street", city="London", postcode="SW1A 1AA"
+            ),
+            primary_contact_email=Email("test@company.com"),
+            created_by_user_id=str(uuid4()),
+        )
+        document = ContractDocument(CONTRACT)
+
+        assessment = AIRiskAssessmentService().assess_contract_risk(
+            document, company, ContractType.SERVICE_AGREEMENT
+        )
+
+        factor_names = {f.factor_name for f in assessment.risk_factors}
+        assert "Unfavorable Payment Terms" in factor_names
+        assert "Resource Intensive Requirements" in factor_names
+        assert compile_safe(r"dedicated.*team") in document._searches
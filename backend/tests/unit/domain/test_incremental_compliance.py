@@ -0,0 +1,176 @@
+"""
+Unit tests for incremental compliance re-validation
+"""
+
+import pytest
+from uuid import uuid4
+
+from app.domain.entities.company import (
+    BusinessAddress,
+    Company,
+    CompanyId,
+    CompanyType,
+    IndustryType,
+)
+from app.domain.services.contract_document import ContractDocument, parse_clauses
+from app.domain.services.incremental_compliance import IncrementalComplianceValidator
+from app.domain.services.uk_compliance_engine import UKComplianceRuleEngine
+from app.domain.value_objects import ContractType, Email
+
+CONTRACT = """SERVICE AGREEMENT
+
+1. DATA PROTECTION
+The parties shall comply with the GDPR on the lawful basis of contract.
+
+2. PAYMENT
+Invoices are payable within 30 days.
+
+3. TERMINATION
+Either party may terminate on 30 days notice.
+"""
+
+
+def make_company(industry=IndustryType.TECHNOLOGY):
+    return Company(
+        company_id=CompanyId(str(uuid4())),
+        name="Test Company Ltd",
+        company_type=CompanyType.PRIVATE_LIMITED,
+        industry=industry,
+        address=BusinessAddress(
+            line1="123 Test Street", city="London", postcode="SW1A 1AA"
+        ),
+        primary_contact_email=Email("test@company.com"),
+        created_by_user_id=str(uuid4()),
+    )
+
+
+def summary(assessment):
+    return (
+        assessment.overall_score,
+        sorted((v.rule_id, v.location) for v in assessment.violations),
+        assessment.framework_scores,
+    )
+
+
+@pytest.fixture
+def engine():
+    return UKComplianceRuleEngine()
+
+
+@pytest.fixture
+def validator(engine):
+    return IncrementalComplianceValidator(engine)
+
+
+class TestIncrementalValidation:
+    """Test reuse of rule outcomes across revisions"""
+
+    def test_first_revision_is_full_validation(self, validator, engine):
+        company = make_company()
+
+        result = validator.validate(
+            "c1", CONTRACT, company, ContractType.SERVICE_AGREEMENT
+        )
+
+        assert not result.is_incremental
+        assert summary(result.assessment) == summary(
+            engine.validate_contract(CONTRACT, company, ContractType.SERVICE_AGREEMENT)
+        )
+
+    def test_unrelated_edit_reevaluates_no_rules(self, validator):
+        """Changing a clause without rule terms keeps every outcome"""
+        company = make_company()
+        validator.validate("c1", CONTRACT, company, ContractType.SERVICE_AGREEMENT)
+
+        edited = CONTRACT.replace("within 30 days", "within 14 days")
+        result = validator.validate(
+            "c1", edited, company, ContractType.SERVICE_AGREEMENT
+        )
+
+        assert result.is_incremental
+        assert result.changed_segments == ["Clause 2"]
+        assert result.reevaluated_rules == []
+
+    def test_added_clause_reevaluates_affected_rules(self, validator, engine):
+        """A prohibited clause added in one edit is reported where it occurs"""
+        company = make_company()
+        validator.validate("c1", CONTRACT, company, ContractType.SERVICE_AGREEMENT)
+
+        edited = CONTRACT.replace(
+            "3. TERMINATION",
+            "3. LIABILITY\nThe supplier may exclude liability for death.\n\n"
+            "4. TERMINATION",
+        )
+        result = validator.validate(
+            "c1", edited, company, ContractType.SERVICE_AGREEMENT
+        )
+
+        assert "UCTA_001" in result.reevaluated_rules
+        violation = next(
+            v for v in result.assessment.violations if v.rule_id == "UCTA_001"
+        )
+        assert violation.location == "Clause 3: LIABILITY"
+        assert summary(result.assessment) == summary(
+            engine.validate_contract(edited, company, ContractType.SERVICE_AGREEMENT)
+        )
+
+    @pytest.mark.parametrize(
+        "old, new",
+        [
+            ("2. PAYMENT", "2. FEES"),
+            ("\n\n3. TERMINATION", "\n3. TERMINATION"),
+            ("SERVICE AGREEMENT\n", ""),
+            ("30 days notice.\n", "30 days notice.\n\n4. NOTICES\nIn writing.\n"),
+        ],
+    )
+    def test_heading_edits_match_full_validation(self, validator, engine, old, new):
+        """Edits that move clause boundaries give the full-run result"""
+        company = make_company()
+        validator.validate("c1", CONTRACT, company, ContractType.SERVICE_AGREEMENT)
+
+        edited = CONTRACT.replace(old, new)
+        result = validator.validate(
+            "c1", edited, company, ContractType.SERVICE_AGREEMENT
+        )
+
+        assert summary(result.assessment) == summary(
+            engine.validate_contract(edited, company, ContractType.SERVICE_AGREEMENT)
+        )
+        assert validator._revisions["c1"].clauses.starts == [
+            segment.start for segment in ContractDocument(edited).clauses
+        ]
+
+    def test_context_change_forces_full_validation(self, validator):
+        """A different company profile or contract type reuses nothing"""
+        validator.validate(
+            "c1", CONTRACT, make_company(), ContractType.SERVICE_AGREEMENT
+        )
+
+        result = validator.validate(
+            "c1",
+            CONTRACT,
+            make_company(IndustryType.FINANCE),
+            ContractType.SERVICE_AGREEMENT,
+        )
+
+        assert not result.is_incremental
+
+    def test_forget_drops_revision(self, validator):
+        company = make_company()
+        validator.validate("c1", CONTRACT, company, ContractType.SERVICE_AGREEMENT)
+
+        validator.forget("c1")
+
+        assert not validator.validate(
+            "c1", CONTRACT, company, ContractType.SERVICE_AGREEMENT
+        ).is_incremental
+
+
+class TestParseClauses:
+    """Test clause parsing over a range of the content"""
+
+    def test_range_from_heading_matches_whole_parse(self):
+        start = CONTRACT.index("2. PAYMENT")
+        whole = [s for s in parse_clauses(CONTRACT) if s.start >= start]
+
+        assert parse_clauses(CONTRACT, start) == whole
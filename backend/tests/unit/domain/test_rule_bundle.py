@@ -0,0 +1,314 @@
+"""
+Unit tests for compiled compliance rule bundles and hot reload
+"""
+
+import json
+import os
+import shutil
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+
+from app.domain.entities.company import (
+    BusinessAddress,
+    Company,
+    CompanyId,
+    CompanySize,
+    CompanyType,
+    IndustryType,
+)
+from app.domain.entities.template import ComplianceFramework
+from app.domain.exceptions import DomainValidationError
+from app.domain.services import rule_bundle as bundle_module
+from app.domain.services.rule_bundle import (
+    DEFAULT_RULES_PATH,
+    load_rule_bundle,
+    parse_rule_definitions,
+)
+from app.domain.services.uk_compliance_engine import (
+    RULE_SET_VERSION,
+    VALIDATOR_KEYWORDS,
+    UKComplianceRuleEngine,
+)
+from app.domain.value_objects import ContractType, Email
+
+CONTRACT = """SERVICE AGREEMENT
+
+1. DATA PROTECTION
+The parties shall comply with the GDPR on the lawful basis of contract.
+
+2. ANTI-BRIBERY
+Each party shall comply with the Bribery Act 2010.
+"""
+
+BRIBERY_RULE = {
+    "rule_id": "BRIBERY_001",
+    "title": "Anti-bribery clause",
+    "description": "Contracts should reference the Bribery Act",
+    "regulation_type": "statutory",
+    "applicable_frameworks": ["commercial_law"],
+    "pattern": "(?i)bribery\\s+act",
+}
+
+
+def make_company():
+    return Company(
+        company_id=CompanyId(str(uuid4())),
+        name="Test Company Ltd",
+        company_type=CompanyType.PRIVATE_LIMITED,
+        industry=IndustryType.TECHNOLOGY,
+        address=BusinessAddress(
+            line1="123 Test Street", city="London", postcode="SW1A 1AA"
+        ),
+        primary_contact_email=Email("test@company.com"),
+        created_by_user_id=str(uuid4()),
+    )
+
+
+def rule_data(extra_rules=()):
+    with open(DEFAULT_RULES_PATH) as source:
+        data = json.load(source)
+    data["rules"].extend(extra_rules)
+    return data
+
+
+@pytest.fixture
+def rules_file(tmp_path):
+    path = tmp_path / "rules.json"
+    shutil.copy(DEFAULT_RULES_PATH, path)
+    return str(path)
+
+
+class TestRuleDefinitions:
+    """Test loading and validating the rule data file"""
+
+    def test_default_file_loads_all_rules(self):
+        bundle = load_rule_bundle(RULE_SET_VERSION, VALIDATOR_KEYWORDS)
+
+        assert len(bundle.rules) == 13
+        assert bundle.rule_set_version.startswith(f"{RULE_SET_VERSION}-")
+        assert "death_injury_exclusion" in bundle.clause_patterns
+        assert bundle.rules["FIN_001"].applicable_industries == [
+            IndustryType.FINANCE
+        ]
+        assert "GDPR_001" in {
+            rule_id for ids in bundle.framework_rules.values() for rule_id in ids
+        }
+
+    @pytest.mark.parametrize(
+        "change, message",
+        [
+            ({"regulation_type": "folklore"}, "invalid regulation_type"),
+            ({"pattern": "(unclosed"}, "invalid pattern"),
+            ({"validation_function": "validate_vibes"}, "unknown validation"),
+            ({"priority": 1}, "unknown fields"),
+        ],
+    )
+    def test_invalid_rule_rejected(self, change, message):
+        data = rule_data([dict(BRIBERY_RULE, **change)])
+
+        with pytest.raises(DomainValidationError, match=message):
+            parse_rule_definitions(data, frozenset(VALIDATOR_KEYWORDS))
+
+    def test_duplicate_rule_rejected(self):
+        with pytest.raises(DomainValidationError, match="Duplicate"):
+            parse_rule_definitions(rule_data([BRIBERY_RULE, BRIBERY_RULE]))
+
+
+class TestRuleIndexes:
+    """Test applicability and framework lookups through the bundle indexes"""
+
+    @pytest.fixture
+    def bundle(self):
+        return load_rule_bundle(RULE_SET_VERSION, VALIDATOR_KEYWORDS)
+
+    def test_restrictions_applied(self, bundle):
+        def rule_ids(industry, contract_type, frameworks=None):
+            return {
+                rule.rule_id
+                for rule in bundle.applicable_rules(
+                    industry, CompanySize.SMALL, contract_type, frameworks
+                )
+            }
+
+        finance = rule_ids(IndustryType.FINANCE, ContractType.SERVICE_AGREEMENT)
+        retail = rule_ids(IndustryType.RETAIL, ContractType.SERVICE_AGREEMENT)
+        employment = rule_ids(IndustryType.RETAIL, ContractType.EMPLOYMENT_CONTRACT)
+
+        assert finance - retail == {"FIN_001"}
+        assert {"EMP_001", "EMP_002", "HS_001"} <= employment - retail
+        assert "UCTA_001" in retail - employment
+        assert rule_ids(
+            IndustryType.RETAIL,
+            ContractType.SERVICE_AGREEMENT,
+            [ComplianceFramework.GDPR],
+        ) == {"GDPR_001", "GDPR_002"}
+
+    def test_unrestricted_rules_apply_to_unknown_size(self, bundle):
+        """CO_001 is limited to small and larger companies"""
+        rules = bundle.applicable_rules(
+            IndustryType.RETAIL, None, ContractType.SERVICE_AGREEMENT
+        )
+
+        rule_ids = [rule.rule_id for rule in rules]
+        assert "CO_001" not in rule_ids
+        assert rule_ids == [r for r in bundle.rules if r in set(rule_ids)]
+
+    def test_applicable_rules_memoised_per_profile(self, bundle):
+        args = (IndustryType.RETAIL, CompanySize.MICRO, ContractType.NDA)
+
+        first = bundle.applicable_rules(*args)
+        first.clear()  # Callers get their own list
+
+        assert bundle.applicable_rules(*args)
+        assert args + (None,) in bundle._applicable
+
+    def test_inactive_rules_excluded(self):
+        engine = UKComplianceRuleEngine()
+        engine.reload_rules(rule_data([dict(BRIBERY_RULE, is_active=False)]))
+
+        rules = engine.get_applicable_rules(
+            make_company(), ContractType.SERVICE_AGREEMENT
+        )
+
+        assert "BRIBERY_001" not in {rule.rule_id for rule in rules}
+        assert "BRIBERY_001" in engine.bundle.framework_rules[
+            ComplianceFramework.COMMERCIAL_LAW
+        ]
+
+
+class TestBundleCaching:
+    """Test that compiled bundles are shared and cached on disk"""
+
+    def test_engines_share_compiled_bundle(self):
+        first, second = UKComplianceRuleEngine(), UKComplianceRuleEngine()
+
+        assert first.matcher is second.matcher
+        assert first.rule_set_version == second.rule_set_version
+
+    def test_disk_cache_round_trip(self, rules_file, tmp_path, monkeypatch):
+        cache_dir = str(tmp_path / "cache")
+        monkeypatch.setattr(bundle_module, "_bundles", type(bundle_module._bundles)())
+        compiled = load_rule_bundle(
+            RULE_SET_VERSION, VALIDATOR_KEYWORDS, rules_file, cache_dir
+        )
+        assert len(os.listdir(cache_dir)) == 1
+
+        # A fresh process has nothing in memory and must not recompile
+        monkeypatch.setattr(bundle_module, "_bundles", type(bundle_module._bundles)())
+        monkeypatch.setattr(
+            bundle_module,
+            "compile_rule_bundle",
+            lambda *args, **kwargs: pytest.fail("bundle recompiled"),
+        )
+        cached = load_rule_bundle(
+            RULE_SET_VERSION, VALIDATOR_KEYWORDS, rules_file, cache_dir
+        )
+
+        assert cached.rule_set_version == compiled.rule_set_version
+        assert cached.matcher.scan(CONTRACT) == compiled.matcher.scan(CONTRACT)
+
+
+class TestHotReload:
+    """Test swapping rule sets in a running engine"""
+
+    def test_reload_swaps_bundle(self):
+        engine = UKComplianceRuleEngine()
+        company = make_company()
+        before = engine.validate_contract(
+            CONTRACT, company, ContractType.SERVICE_AGREEMENT
+        )
+
+        bundle = engine.reload_rules(rule_data([BRIBERY_RULE]))
+
+        assert engine.bundle is bundle
+        after = engine.validate_contract(
+            CONTRACT, company, ContractType.SERVICE_AGREEMENT
+        )
+        assert "BRIBERY_001" in after.passed_rules
+        assert "BRIBERY_001" not in before.passed_rules
+
+    def test_invalid_reload_keeps_current_bundle(self):
+        engine = UKComplianceRuleEngine()
+        current = engine.bundle
+
+        with pytest.raises(DomainValidationError):
+            engine.reload_rules(rule_data([dict(BRIBERY_RULE, pattern="(")]))
+
+        assert engine.bundle is current
+
+    def test_in_flight_assessment_finishes_on_old_bundle(self, monkeypatch):
+        """A reload mid-assessment doesn't mix rule sets in one result"""
+        engine = UKComplianceRuleEngine()
+        old_version = engine.rule_set_version
+        evaluate_rules = engine.evaluate_rules
+        seen = []
+
+        def reload_midway(rules, *args):
+            engine.reload_rules(rule_data([BRIBERY_RULE]))
+            seen.append(args[-1].rule_set_version)
+            return evaluate_rules(rules, *args)
+
+        monkeypatch.setattr(engine, "evaluate_rules", reload_midway)
+        assessment = engine.validate_contract(
+            CONTRACT, make_company(), ContractType.SERVICE_AGREEMENT
+        )
+
+        assert seen == [old_version]
+        assert "BRIBERY_001" not in assessment.passed_rules
+        assert engine.rule_set_version != old_version
+
+    def test_changed_rule_file_is_reloaded(self, rules_file):
+        engine = UKComplianceRuleEngine(
+            bundle=load_rule_bundle(RULE_SET_VERSION, VALIDATOR_KEYWORDS, rules_file),
+            rules_reload_seconds=0.001,
+        )
+        with open(rules_file, "w") as target:
+            json.dump(rule_data([BRIBERY_RULE]), target)
+        engine._next_refresh = 0
+
+        engine.refresh_rules()
+
+        assert "BRIBERY_001" in engine.bundle.rules
+        assert engine.bundle.source_path == rules_file
+
+    def test_broken_rule_file_keeps_current_bundle(self, rules_file):
+        engine = UKComplianceRuleEngine(
+            bundle=load_rule_bundle(RULE_SET_VERSION, VALIDATOR_KEYWORDS, rules_file),
+            rules_reload_seconds=0.001,
+        )
+        current = engine.bundle
+        with open(rules_file, "w") as target:
+            target.write("{not json")
+        engine._next_refresh = 0
+
+        engine.refresh_rules()
+
+        assert engine.bundle is current
+
+    def test_configure_switches_rule_file(self, rules_file):
+        with open(rules_file, "w") as target:
+            json.dump(rule_data([BRIBERY_RULE]), target)
+        engine = UKComplianceRuleEngine()
+        assert engine.bundle.source_path == DEFAULT_RULES_PATH
+
+        engine.configure(rules_path=rules_file, rules_reload_seconds=30)
+
+        assert "BRIBERY_001" in engine.bundle.rules
+        assert engine.bundle.source_path == rules_file
+        assert engine.rules_reload_seconds == 30
+
+    def test_reloads_reported_as_regulatory_updates(self):
+        engine = UKComplianceRuleEngine()
+        previous = engine.rule_set_version
+        since = datetime.now(timezone.utc) - timedelta(seconds=1)
+
+        engine.reload_rules(rule_data([BRIBERY_RULE]))
+        engine.reload_rules(rule_data([BRIBERY_RULE]))  # Same rules: no update
+
+        updates = engine.get_regulatory_updates(since)
+        assert len(updates) == 1
+        assert updates[0]["previous_rule_set_version"] == previous
+        assert updates[0]["added"] == ["BRIBERY_001"]
+        assert engine.get_regulatory_updates(datetime.now(timezone.utc)) == []
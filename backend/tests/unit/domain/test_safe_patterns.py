@@ -0,0 +1,91 @@
+"""
+Unit tests for linear-time rule pattern matching
+"""
+
+import random
+import re
+import time
+
+import pytest
+
+from app.domain.services import safe_patterns
+from app.domain.services.safe_patterns import SafePattern, TimeBudget
+
+RULE_LIKE_PATTERNS = [
+    r"(?i)(exclude.*liability.*death|exclude.*liability.*personal\s+injury)",
+    r"(?i)(non-compete|restraint.*trade|not.*compete.*\d+\s*years)",
+    r"(?i)(notice\s+period|\d+\s*(days?|weeks?|months?)\s*notice)",
+    r"penalty.*\£.*\d+",
+    r"fix.*price",
+]
+
+
+@pytest.fixture
+def without_re2(monkeypatch):
+    """Force the pure-Python fallback even when RE2 is installed"""
+    monkeypatch.setattr(safe_patterns, "RE2_AVAILABLE", False)
+
+
+class TestSafePattern:
+    """Test pattern evaluation in the fallback engines"""
+
+    def test_dot_star_chains_use_chain_engine(self, without_re2):
+        """Alternations of ".*" chains are evaluated piece by piece"""
+        assert SafePattern(RULE_LIKE_PATTERNS[0]).engine == "chain"
+        assert SafePattern(r"data\s+protection").engine == "re"
+
+    def test_leading_inline_flags_parsed(self, without_re2):
+        """Leading inline flags are applied and the pattern kept as given"""
+        pattern = SafePattern(r"(?i)fix.*price")
+
+        assert pattern.flags & re.IGNORECASE
+        assert pattern.pattern == r"(?i)fix.*price"
+        assert pattern.search("FIX the PRICE").start() == 0
+
+    def test_chain_does_not_cross_lines(self, without_re2):
+        """".*" pieces must be found on the same line, as with re"""
+        pattern = SafePattern("exclude.*liability.*death")
+
+        assert pattern.search("exclude all\nliability for death") is None
+        match = pattern.search("exclude\nwe exclude liability for death")
+        assert match.start() == 11
+
+    def test_matches_re_on_random_inputs(self, without_re2):
+        """Match positions agree with Python's re"""
+        rng = random.Random(7)
+        words = ["exclude", "liability", "death", "not", "compete", "3", "12",
+                 "years", "days", "notice", "penalty", "£", "fix", "price",
+                 " ", " ", "\n"]  # fmt: skip
+        for _ in range(500):
+            pattern = rng.choice(RULE_LIKE_PATTERNS)
+            text = "".join(rng.choice(words) for _ in range(rng.randint(0, 30)))
+            expected = re.search(pattern, text)
+            actual = SafePattern(pattern).search(text)
+            assert (actual and actual.start()) == (expected and expected.start())
+
+    @pytest.mark.parametrize("use_re2", [False, True])
+    def test_pathological_input_is_linear(self, monkeypatch, use_re2):
+        """Long lines that start but never complete a chain finish quickly"""
+        if use_re2 and not safe_patterns.RE2_AVAILABLE:
+            pytest.skip("google-re2 not installed")
+        monkeypatch.setattr(safe_patterns, "RE2_AVAILABLE", use_re2)
+        text = "exclude liability not to compete 1111 penalty £ " * 4000
+
+        start = time.perf_counter()
+        for pattern in RULE_LIKE_PATTERNS[:2]:
+            assert SafePattern(pattern).search(text) is None
+        assert (time.perf_counter() - start) < 1.0
+
+
+class TestTimeBudget:
+    """Test the assessment time budget"""
+
+    def test_zero_budget_expires_immediately(self):
+        assert TimeBudget(0).expired
+        assert TimeBudget(0).remaining_ms() == 0.0
+
+    def test_no_budget_never_expires(self):
+        budget = TimeBudget(None)
+
+        assert not budget.expired
+        assert budget.remaining_ms() is None
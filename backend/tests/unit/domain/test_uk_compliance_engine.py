@@ -0,0 +1,231 @@
+"""
+Unit tests for the UK compliance rule engine and its compiled term matcher
+"""
+
+import pytest
+from uuid import uuid4
+
+from app.domain.entities.company import (
+    BusinessAddress,
+    Company,
+    CompanyId,
+    CompanyType,
+    IndustryType,
+)
+from app.domain.entities.template import ComplianceFramework
+from app.domain.services.ai_risk_assessment_service import AIRiskAssessmentService
+from app.domain.services.compliance_matcher import (
+    TermMatcher,
+    clause_key,
+    keyword_key,
+    rule_key,
+)
+from app.domain.services.uk_compliance_engine import (
+    ComplianceRule,
+    RiskLevel,
+    UKComplianceRuleEngine,
+    UKRegulationType,
+)
+from app.domain.value_objects import ContractType, Email
+
+COMPLIANT_SERVICE_AGREEMENT = """
+1. DATA PROTECTION
+The parties shall comply with the GDPR. Personal data is processed on the
+lawful basis of contract performance.
+
+2. TERMINATION
+Either party may terminate on 30 days notice.
+
+3. HEALTH AND SAFETY
+The Supplier shall comply with all health and safety duties.
+
+4. AUTHORITY
+Each signatory is duly authorized to sign this agreement.
+"""
+
+
+@pytest.fixture
+def engine():
+    return UKComplianceRuleEngine()
+
+
+@pytest.fixture
+def company():
+    return Company(
+        company_id=CompanyId(str(uuid4())),
+        name="Test Company Ltd",
+        company_type=CompanyType.PRIVATE_LIMITED,
+        industry=IndustryType.TECHNOLOGY,
+        address=BusinessAddress(
+            line1="123 Test Street", city="London", postcode="SW1A 1AA"
+        ),
+        primary_contact_email=Email("test@company.com"),
+        created_by_user_id=str(uuid4()),
+    )
+
+
+class TestTermMatcher:
+    """Test the compiled term matcher"""
+
+    def test_scan_returns_pattern_and_literal_hits(self):
+        """Patterns and literal keywords are matched case-insensitively"""
+        matcher = TermMatcher(
+            [("rule:a", r"(?i)data\s+protection"), ("rule:b", r"holiday")],
+            literals=["Board Resolution"],
+        )
+
+        hits = matcher.scan("DATA  PROTECTION applies. Approved by BOARD RESOLUTION.")
+
+        assert hits == {"rule:a", keyword_key("board resolution")}
+
+    def test_key_with_several_patterns_hits_on_any(self):
+        """A key matches when any of its patterns occurs"""
+        matcher = TermMatcher([("clause:x", "gdpr"), ("clause:x", "privacy")])
+
+        assert matcher.scan("Privacy notice") == {"clause:x"}
+
+    def test_scan_limited_to_requested_keys(self):
+        """Only the requested keys are evaluated"""
+        matcher = TermMatcher([("rule:a", "notice"), ("rule:b", "payment")])
+
+        assert matcher.scan("notice of payment", keys=["rule:b"]) == {"rule:b"}
+
+    def test_uppercase_pattern_still_case_insensitive(self):
+        """Patterns with uppercase characters keep case-insensitive matching"""
+        matcher = TermMatcher([("rule:a", r"(?i)Data\s+Controller")])
+
+        assert matcher.scan("the data controller") == {"rule:a"}
+
+
+class TestUKComplianceRuleEngine:
+    """Test rule evaluation against the compiled matcher"""
+
+    def test_compliant_contract_passes_applicable_rules(self, engine, company):
+        """A contract covering the required clauses has no violations"""
+        assessment = engine.validate_contract(
+            COMPLIANT_SERVICE_AGREEMENT, company, ContractType.SERVICE_AGREEMENT
+        )
+
+        assert assessment.violations == []
+        assert "GDPR_001" in assessment.passed_rules
+        assert assessment.overall_score == 100.0
+
+    def test_missing_and_prohibited_clauses_are_reported(self, engine, company):
+        """Missing required clauses and prohibited clauses become violations"""
+        content = "The Supplier excludes all liability for death caused by negligence."
+
+        assessment = engine.validate_contract(
+            content, company, ContractType.SERVICE_AGREEMENT
+        )
+
+        violated = {v.rule_id for v in assessment.violations}
+        assert {"UCTA_001", "UCTA_002", "GDPR_001", "CO_001"} <= violated
+        assert assessment.risk_level == RiskLevel.CRITICAL
+
+    def test_scan_content_limited_to_rule_terms(self, engine):
+        """Only terms used by the given rules are scanned for"""
+        rules = [engine.bundle.rules["GDPR_001"]]
+
+        hits = engine.scan_content(COMPLIANT_SERVICE_AGREEMENT, rules)
+
+        assert hits == {rule_key("GDPR_001"), clause_key("data_protection_clause")}
+
+    def test_added_rule_recompiles_matcher(self, engine, company):
+        """Rules added after init are compiled into the matcher on next use"""
+        engine._add_rule(
+            ComplianceRule(
+                rule_id="TEST_001",
+                title="Anti-bribery clause",
+                description="Contract must reference the Bribery Act",
+                regulation_type=UKRegulationType.STATUTORY,
+                applicable_frameworks=[ComplianceFramework.GDPR],
+                pattern=r"(?i)bribery\s+act",
+                required_clauses=["anti-bribery"],
+            )
+        )
+
+        assessment = engine.validate_contract(
+            COMPLIANT_SERVICE_AGREEMENT + "\nThe parties comply with the Bribery Act.",
+            company,
+            ContractType.SERVICE_AGREEMENT,
+        )
+
+        violation = next(v for v in assessment.violations if v.rule_id == "TEST_001")
+        assert violation.description == "Required clause missing: anti-bribery"
+
+    def test_helpers_scan_when_no_hits_given(self, engine):
+        """Validation helpers still work when called without a hit set"""
+        assert engine._check_clause_present("Subject to GDPR", "data_protection_clause")
+        assert not engine._check_clause_present("Nothing here", "notice_period")
+        assert engine._check_clause_present("includes Custom Clause", "custom clause")
+
+    def test_long_confidentiality_period_flagged(self, engine, company):
+        """Multi-digit periods are read whole, not just their last digit"""
+        content = (
+            COMPLIANT_SERVICE_AGREEMENT
+            + "\n5. CONFIDENTIALITY\nConfidential information is protected for 15 years."
+        )
+
+        assessment = engine.validate_contract(
+            content, company, ContractType.SERVICE_AGREEMENT
+        )
+
+        violation = next(v for v in assessment.violations if v.rule_id == "IP_001")
+        assert "15 years" in violation.description
+
+
+class TestAssessmentTimeBudget:
+    """Test degradation to partial results when the time budget runs out"""
+
+    def test_exhausted_budget_skips_remaining_rules(self, engine, company):
+        """Rules not reached in time are skipped and reported"""
+        assessment = engine.validate_contract(
+            COMPLIANT_SERVICE_AGREEMENT,
+            company,
+            ContractType.SERVICE_AGREEMENT,
+            time_budget_ms=0,
+        )
+
+        applicable = engine.get_applicable_rules(
+            company, ContractType.SERVICE_AGREEMENT
+        )
+        assert assessment.is_partial
+        assert assessment.skipped_rules == [r.rule_id for r in applicable]
+        assert assessment.passed_rules == []
+        assert any("Time budget" in w for w in assessment.warnings)
+
+    def test_engine_default_budget_used(self, company):
+        """The engine-wide budget applies when no budget is passed"""
+        engine = UKComplianceRuleEngine(time_budget_ms=0)
+
+        assessment = engine.validate_contract(
+            COMPLIANT_SERVICE_AGREEMENT, company, ContractType.SERVICE_AGREEMENT
+        )
+
+        assert assessment.is_partial
+
+    def test_generous_budget_gives_complete_assessment(self, engine, company):
+        """Assessments within budget are not marked partial"""
+        assessment = engine.validate_contract(
+            COMPLIANT_SERVICE_AGREEMENT,
+            company,
+            ContractType.SERVICE_AGREEMENT,
+            time_budget_ms=60_000,
+        )
+
+        assert not assessment.is_partial
+        assert assessment.skipped_rules == []
+
+    def test_risk_assessment_partial_when_budget_exhausted(self, company):
+        """Risk checks share the budget with the compliance engine"""
+        service = AIRiskAssessmentService()
+
+        assessment = service.assess_contract_risk(
+            COMPLIANT_SERVICE_AGREEMENT,
+            company,
+            ContractType.SERVICE_AGREEMENT,
+            time_budget_ms=0,
+        )
+
+        assert assessment.is_partial
+        assert "dispute_resolution" in assessment.skipped_checks
@@ -0,0 +1,246 @@
+"""
+Unit tests for latency-aware AI provider routing
+Fake providers stand in for OpenAI/Anthropic so routing, circuit breaking
+and hedging can be exercised without network access
+"""
+
+import asyncio
+import time
+
+import pytest
+from unittest.mock import Mock
+
+from app.infrastructure.external_services.ai_service import (
+    AIContractService,
+    AIGenerationResult,
+    AIProvider,
+    AIServiceError,
+    BaseAIService,
+    CircuitState,
+    ProviderHealth,
+)
+
+
+class FakeProvider(BaseAIService):
+    """Provider with a fixed latency that can be told to fail"""
+
+    def __init__(self, name: str, latency: float = 0.0, fail: bool = False):
+        self.name = name
+        self.latency = latency
+        self.fail = fail
+        self.calls = 0
+        self.cancelled = False
+
+    async def generate_contract(self, request) -> AIGenerationResult:
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.latency)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.fail:
+            raise AIServiceError(f"{self.name} failed", self.name)
+        return AIGenerationResult(
+            generated_content=f"Contract from {self.name}",
+            confidence_score=0.9,
+            processing_time_ms=self.latency * 1000,
+            model_used=self.name,
+            model_version=None,
+            tokens_used={"input": 1, "output": 1},
+            warnings=[],
+            suggestions=[],
+            compliance_notes=[],
+            estimated_legal_review_needed=False,
+        )
+
+    async def analyze_contract_compliance(self, contract_content: str):
+        return {"provider": self.name}
+
+    async def suggest_improvements(self, contract_content: str):
+        if self.fail:
+            raise AIServiceError(f"{self.name} failed", self.name)
+        return [self.name]
+
+
+def make_service(openai: FakeProvider, anthropic: FakeProvider, **kwargs):
+    return AIContractService(
+        primary_provider=AIProvider.OPENAI,
+        services={AIProvider.OPENAI: openai, AIProvider.ANTHROPIC: anthropic},
+        **kwargs,
+    )
+
+
+class TestProviderHealth:
+    """Test rolling statistics and the circuit breaker"""
+
+    def test_ewma_latency_and_p95(self):
+        """Latency EWMA tracks samples and p95 needs a minimum sample count"""
+        health = ProviderHealth(AIProvider.OPENAI, alpha=0.5)
+        health.record_success(100)
+        health.record_success(200)
+        assert health.latency_ewma_ms == 150
+        assert health.p95_latency_ms() is None
+
+        for latency in range(10, 110, 10):
+            health.record_success(latency)
+        assert health.p95_latency_ms() == 200
+
+    def test_circuit_opens_and_half_opens_after_timeout(self):
+        """Repeated failures open the circuit until the reset timeout elapses"""
+        now = [0.0]
+        health = ProviderHealth(
+            AIProvider.OPENAI,
+            failure_threshold=2,
+            reset_timeout_seconds=10,
+            clock=lambda: now[0],
+        )
+        health.record_failure()
+        assert health.is_available()
+        health.record_failure()
+        assert health.state == CircuitState.OPEN
+        assert not health.is_available()
+
+        now[0] = 11.0
+        assert health.is_available()
+        assert health.state == CircuitState.HALF_OPEN
+
+        # A failed trial request re-opens immediately
+        health.record_failure()
+        assert health.state == CircuitState.OPEN
+
+    def test_half_open_lets_one_trial_through(self):
+        """Only one request probes a recovering provider at a time"""
+        now = [0.0]
+        health = ProviderHealth(
+            AIProvider.OPENAI,
+            failure_threshold=1,
+            reset_timeout_seconds=10,
+            clock=lambda: now[0],
+        )
+        health.record_failure()
+        now[0] = 11.0
+
+        assert health.acquire()
+        assert not health.acquire()
+        assert not health.is_available()
+
+        # A cancelled trial frees the slot; a successful one closes the circuit
+        health.release()
+        assert health.acquire()
+        health.record_success(100)
+        assert health.state == CircuitState.CLOSED
+        assert health.acquire() and health.acquire()
+
+    def test_unreported_trial_expires(self):
+        now = [0.0]
+        health = ProviderHealth(
+            AIProvider.OPENAI,
+            failure_threshold=1,
+            reset_timeout_seconds=10,
+            clock=lambda: now[0],
+        )
+        health.record_failure()
+        now[0] = 11.0
+        assert health.acquire()
+
+        now[0] = 22.0
+        assert health.acquire()
+
+    def test_routing_cost_penalises_errors(self):
+        """Error-prone providers cost more than equally fast reliable ones"""
+        reliable = ProviderHealth(AIProvider.OPENAI)
+        flaky = ProviderHealth(AIProvider.ANTHROPIC)
+        reliable.record_success(100)
+        flaky.record_success(100)
+        flaky.record_failure()
+        assert flaky.routing_cost(100) > reliable.routing_cost(100)
+
+
+class TestAIContractServiceRouting:
+    """Test provider ranking, fallback and hedging"""
+
+    @pytest.mark.asyncio
+    async def test_routes_to_faster_provider(self):
+        """Once measured, the lower-latency provider is preferred over the primary"""
+        openai = FakeProvider("openai")
+        anthropic = FakeProvider("anthropic")
+        service = make_service(openai, anthropic)
+
+        service.get_provider_health(AIProvider.OPENAI).record_success(900)
+        service.get_provider_health(AIProvider.ANTHROPIC).record_success(100)
+
+        result = await service.generate_contract(Mock())
+        assert result.model_used == "anthropic"
+        assert openai.calls == 0
+
+    @pytest.mark.asyncio
+    async def test_falls_back_and_opens_circuit(self):
+        """A failing primary falls back, and is skipped once its circuit opens"""
+        openai = FakeProvider("openai", fail=True)
+        anthropic = FakeProvider("anthropic")
+        service = make_service(openai, anthropic, failure_threshold=1)
+
+        result = await service.generate_contract(Mock())
+        assert result.model_used == "anthropic"
+        assert service.get_routing_stats()["openai"]["state"] == "open"
+
+        await service.generate_contract(Mock())
+        assert openai.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_burst_sends_one_trial_to_recovering_provider(self):
+        """While HALF_OPEN, concurrent requests go elsewhere during the trial"""
+        openai = FakeProvider("openai", latency=0.05)
+        anthropic = FakeProvider("anthropic")
+        service = make_service(openai, anthropic, failure_threshold=1)
+        # OpenAI is normally much faster, so it ranks first once it may retry
+        service.get_provider_health(AIProvider.ANTHROPIC).record_success(5000)
+        health = service.get_provider_health(AIProvider.OPENAI)
+        health.record_success(10)
+        health.record_failure()
+        health.opened_at -= service.reset_timeout_seconds
+
+        results = await asyncio.gather(
+            *(service.generate_contract(Mock()) for _ in range(5))
+        )
+
+        assert openai.calls == 1
+        assert sorted(r.model_used for r in results) == ["anthropic"] * 4 + ["openai"]
+        assert health.state == CircuitState.CLOSED
+
+    @pytest.mark.asyncio
+    async def test_all_providers_failing_raises(self):
+        """An error is raised when no provider can answer"""
+        service = make_service(
+            FakeProvider("openai", fail=True), FakeProvider("anthropic", fail=True)
+        )
+        with pytest.raises(AIServiceError):
+            await service.generate_contract(Mock())
+        assert await service.suggest_improvements("text") == []
+
+    @pytest.mark.asyncio
+    async def test_hedged_request_uses_backup_when_primary_slow(self):
+        """A slow primary is hedged after the delay and the loser is cancelled"""
+        openai = FakeProvider("openai", latency=1.0)
+        anthropic = FakeProvider("anthropic", latency=0.01)
+        service = make_service(openai, anthropic, default_hedge_delay_ms=20)
+
+        start = time.perf_counter()
+        result = await service.generate_contract(Mock(), hedged=True)
+        elapsed = time.perf_counter() - start
+
+        assert result.model_used == "anthropic"
+        assert elapsed < 0.5
+        await asyncio.sleep(0)
+        assert openai.cancelled
+
+    @pytest.mark.asyncio
+    async def test_hedged_request_skips_backup_when_primary_fast(self):
+        """No hedge is fired if the primary answers within its p95"""
+        openai = FakeProvider("openai", latency=0.0)
+        anthropic = FakeProvider("anthropic")
+        service = make_service(openai, anthropic, default_hedge_delay_ms=500)
+
+        result = await service.generate_contract(Mock(), hedged=True)
+        assert result.model_used == "openai"
+        assert anthropic.calls == 0
@@ -10,6 +10,8 @@ from app.services.ai_service import (
     ContractGenerationRequest,
     ComplianceAnalysisRequest,
     AIGenerationRequest,
+    count_tokens,
+    split_contract_into_chunks,
 )
 
 
@@ -382,3 +384,79 @@ class TestGroqAIService:
         assert result["risk_score"] == 5
         assert "Minor compliance gaps" in result["risk_factors"]
         assert "Add specific clauses" in result["recommendations"]
+
+    @pytest.mark.asyncio
+    async def test_analyze_compliance_long_contract_is_chunked(self, ai_service):
+        """Test long contracts are analysed per chunk and merged"""
+        responses = [
+            '{"overall_score": 0.9, "gdpr_compliance": 0.9, "employment_law_compliance": 0.9, '
+            '"consumer_rights_compliance": 0.9, "commercial_terms_compliance": 0.9, '
+            '"risk_score": 3, "risk_factors": ["Shared risk"], "recommendations": ["Add GDPR clause"]}',
+            '{"overall_score": 0.7, "gdpr_compliance": 0.7, "employment_law_compliance": 0.7, '
+            '"consumer_rights_compliance": 0.7, "commercial_terms_compliance": 0.7, '
+            '"risk_score": 7, "risk_factors": ["Shared risk", "Unlimited indemnity"], '
+            '"recommendations": ["Cap liability"]}',
+        ]
+
+        def create(**kwargs):
+            content = kwargs["messages"][-1]["content"]
+            mock_response = Mock()
+            mock_response.choices = [Mock()]
+            mock_response.choices[0].message.content = (
+                responses[0] if "part 1 of 2" in content else responses[1]
+            )
+            mock_response.usage = None
+            return mock_response
+
+        mock_client = Mock()
+        mock_client.chat.completions.create = Mock(side_effect=create)
+        ai_service.client = mock_client
+
+        clause = "The Supplier shall provide the Services with reasonable care. " * 40
+        content = f"1. Services\n{clause}\n\n2. Liability\n{clause}"
+        request = ComplianceAnalysisRequest(
+            contract_content=content, contract_type="service_agreement"
+        )
+
+        with patch("app.services.ai_service.settings") as settings:
+            settings.AI_CHUNK_MAX_TOKENS = count_tokens(content) // 2 + 10
+            settings.AI_MAX_PARALLEL_CHUNKS = 4
+            response = await ai_service.analyze_compliance(request)
+
+        assert mock_client.chat.completions.create.call_count == 2
+        assert response.overall_score == pytest.approx(0.8, abs=0.01)
+        assert response.risk_score == 7
+        assert response.risk_factors == ["Shared risk", "Unlimited indemnity"]
+        assert response.recommendations == ["Add GDPR clause", "Cap liability"]
+        assert "Part 2 of 2" in response.analysis_raw
+
+
+class TestContractChunking:
+    """Test cases for clause-aligned contract chunking"""
+
+    def test_short_contract_is_single_chunk(self):
+        content = "1. Term\nThis agreement lasts 12 months."
+        assert split_contract_into_chunks(content, 1000) == [content]
+
+    def test_chunks_respect_budget_and_clause_boundaries(self):
+        clauses = [
+            f"{number}. Clause {number}\n" + "The parties agree to act in good faith. " * 20
+            for number in range(1, 9)
+        ]
+        content = "\n".join(clauses)
+        budget = count_tokens(clauses[0]) * 3
+
+        chunks = split_contract_into_chunks(content, budget)
+
+        assert len(chunks) > 1
+        assert all(count_tokens(chunk) <= budget for chunk in chunks)
+        # Every chunk starts at a clause heading
+        assert all(chunk.split(".")[0].isdigit() for chunk in chunks)
+        assert sum(chunk.count("Clause") for chunk in chunks) == 8
+
+    def test_oversized_clause_is_split(self):
+        content = "1. Definitions\n" + "A defined term means something. " * 500
+        chunks = split_contract_into_chunks(content, 200)
+
+        assert len(chunks) > 1
+        assert all(count_tokens(chunk) <= 200 for chunk in chunks)
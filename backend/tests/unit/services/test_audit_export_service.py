@@ -0,0 +1,224 @@
+"""
+Unit tests for streamed audit log exports
+"""
+
+import csv
+import gzip
+import json
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.infrastructure.database.models import (
+    AuditAction,
+    AuditLog,
+    AuditResourceType,
+    AuditRiskLevel,
+    BulkJob,
+    User,
+)
+from app.schemas.bulk import BulkOperationStatus
+from app.services.audit_export_service import (
+    AUDIT_COLUMNS,
+    METADATA_COLUMNS,
+    AuditExportError,
+    AuditExportService,
+    audit_export_data,
+    export_media_type,
+)
+from app.services.bulk_job_service import BulkJobService, partial_path
+from app.services.job_queue_service import JobQueueService
+
+
+@pytest.fixture
+def user(db, company_user):
+    outsider = User(
+        email="other@example.com", full_name="Other", hashed_password="hashed"
+    )
+    db.add(outsider)
+    db.flush()
+    start = datetime(2026, 3, 1, 9, 0)
+    for i in range(7):
+        db.add(
+            AuditLog(
+                action=AuditAction.EDIT if i % 2 else AuditAction.CREATE,
+                resource_type=AuditResourceType.CONTRACT,
+                resource_id=f"contract-{i}",
+                resource_name=f"Agreement {i}",
+                user_id=company_user.id,
+                user_name="Owner",
+                details=f"Change {i}, with a comma",
+                risk_level=AuditRiskLevel.HIGH if i == 3 else AuditRiskLevel.LOW,
+                compliance_flag=i == 3,
+                new_values={"status": "active", "version": i},
+                timestamp=start + timedelta(minutes=i),
+            )
+        )
+    # Another company's entry, at the same time as one of the owner's
+    db.add(
+        AuditLog(
+            action=AuditAction.VIEW,
+            resource_type=AuditResourceType.CONTRACT,
+            resource_name="Elsewhere",
+            user_id=outsider.id,
+            timestamp=start + timedelta(minutes=2),
+        )
+    )
+    db.commit()
+    return company_user
+
+
+@pytest.fixture
+def queue(session_factory):
+    async def notify(*args):
+        pass
+
+    return JobQueueService(session_factory, notify=notify)
+
+
+@pytest.fixture
+def service(session_factory, queue, tmp_path):
+    service = AuditExportService(
+        session_factory,
+        export_dir=str(tmp_path / "exports"),
+        chunk_size=3,
+        job_service=BulkJobService(session_factory),
+        job_queue=queue,
+    )
+    queue.register(service.export_type, service.run)
+    return service
+
+
+@pytest.fixture
+def run_export(service, queue, db, run_worker_until_finished):
+    async def run(user, **options):
+        job = service.start(db, user, **options)
+        await run_worker_until_finished(queue, db, job)
+        return job
+
+    return run
+
+
+class TestAuditExportFormats:
+    """Test file contents for each format"""
+
+    @pytest.mark.asyncio
+    async def test_csv_export(self, run_export, user):
+        job = await run_export(user, export_format="csv")
+
+        assert job.status == BulkOperationStatus.COMPLETED.value
+        assert job.processed_items == job.total_items == 7
+        assert job.file_size_bytes == os.path.getsize(job.file_path)
+        with open(job.file_path, newline="") as exported:
+            rows = list(csv.DictReader(exported))
+        assert list(rows[0]) == AUDIT_COLUMNS + METADATA_COLUMNS
+        assert [row["resource_name"] for row in rows] == [
+            f"Agreement {i}" for i in range(7)
+        ]
+        assert rows[1]["action"] == "edit"
+        assert rows[1]["details"] == "Change 1, with a comma"
+        assert json.loads(rows[2]["new_values"]) == {"status": "active", "version": 2}
+
+    @pytest.mark.asyncio
+    async def test_json_export_is_one_array(self, run_export, user):
+        job = await run_export(
+            user, filters={"compliance_flag": True}, include_metadata=False
+        )
+
+        with open(job.file_path) as exported:
+            entries = json.load(exported)
+        assert len(entries) == job.total_items == 1
+        assert set(entries[0]) == set(AUDIT_COLUMNS)
+        assert entries[0]["risk_level"] == "high"
+
+    @pytest.mark.asyncio
+    async def test_enum_filters_match_any_case(self, run_export, user):
+        job = await run_export(
+            user,
+            filters={
+                "action": "Edit",
+                "resource_type": "CONTRACT",
+                "risk_level": "low",
+            },
+        )
+
+        with open(job.file_path) as exported:
+            entries = json.load(exported)
+        assert job.total_items == 2
+        assert [entry["resource_name"] for entry in entries] == [
+            "Agreement 1",
+            "Agreement 5",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_empty_json_export(self, run_export, user):
+        job = await run_export(user, filters={"user_id": "missing"})
+
+        with open(job.file_path) as exported:
+            assert json.load(exported) == []
+        assert audit_export_data(job)["progress_percent"] == 100.0
+
+    @pytest.mark.asyncio
+    async def test_gzipped_jsonl_export(self, run_export, user):
+        job = await run_export(user, export_format="JSONL", compression="gzip")
+
+        assert job.file_path.endswith(".jsonl.gz")
+        assert export_media_type(job) == "application/gzip"
+        with gzip.open(job.file_path, "rt") as exported:
+            entries = [json.loads(line) for line in exported]
+        assert [e["resource_id"] for e in entries] == [
+            f"contract-{i}" for i in range(7)
+        ]
+        assert entries[0]["new_values"] == {"status": "active", "version": 0}
+
+    @pytest.mark.asyncio
+    async def test_all_companies(self, run_export, user):
+        job = await run_export(user, export_format="JSONL", all_companies=True)
+
+        with open(job.file_path) as exported:
+            names = [json.loads(line)["resource_name"] for line in exported]
+        assert job.processed_items == 8
+        # In timestamp order across chunks, ties broken by id
+        assert sorted(names[2:4]) == ["Agreement 2", "Elsewhere"]
+
+
+class TestAuditExportJobs:
+    """Test validation, failures and expiry"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "options",
+        [{"export_format": "PDF"}, {"export_format": "CSV", "compression": "lz4"}],
+    )
+    async def test_unsupported_options_rejected(self, service, db, user, options):
+        with pytest.raises(AuditExportError):
+            service.start(db, user, **options)
+        assert db.query(BulkJob).count() == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_export_leaves_no_file(
+        self, service, run_export, user, monkeypatch
+    ):
+        def broken_writer(stack, job, path):
+            raise RuntimeError("disk full")
+
+        monkeypatch.setattr(service, "_open_writer", broken_writer)
+        job = await run_export(user)
+
+        assert job.status == BulkOperationStatus.FAILED.value
+        assert "disk full" in job.error_message
+        assert not os.path.exists(job.file_path)
+        assert not os.path.exists(partial_path(job.file_path))
+
+    @pytest.mark.asyncio
+    async def test_expired_exports_purged(self, service, run_export, db, user):
+        job = await run_export(user)
+        export_id, path = job.id, job.file_path
+        job.expires_at = job.completed_at - timedelta(seconds=1)
+        db.commit()
+
+        service.purge_expired(db)
+
+        assert service.get_job(db, export_id) is None
+        assert not os.path.exists(path)
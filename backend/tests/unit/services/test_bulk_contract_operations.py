@@ -0,0 +1,250 @@
+"""
+Unit tests for chunked, set-based bulk contract operations
+"""
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.domain.value_objects import ContractStatus
+from app.infrastructure.database.models import (
+    AuditAction,
+    AuditLog,
+    AuditResourceType,
+    Contract,
+    ContractType,
+    ContractVersion,
+    FileBlob,
+    Notification,
+    NotificationType,
+    StoredFile,
+)
+from app.schemas.bulk import (
+    BulkContractOperation,
+    BulkOperationStatus,
+    BulkOperationType,
+)
+from app.services import bulk_operations_service as bulk_module
+from app.services.bulk_operations_service import BulkOperationsService
+
+
+@pytest.fixture
+def owner(db, company_user):
+    contracts = [
+        Contract(
+            title=f"Example agreement {i}",
+            contract_type=ContractType.SERVICE_AGREEMENT,
+            company_id=company_user.company_id,
+            created_by=company_user.id,
+        )
+        for i in range(5)
+    ]
+    db.add_all(contracts)
+    db.commit()
+    return company_user, [contract.id for contract in contracts]
+
+
+@pytest.fixture
+def progress():
+    return []
+
+
+@pytest.fixture
+def service(db, progress):
+    async def notify(operation_id, message, user_id):
+        progress.append(message)
+
+    return BulkOperationsService(db, chunk_size=2, notify=notify)
+
+
+def contract(db, contract_id):
+    db.expire_all()
+    return db.get(Contract, contract_id)
+
+
+class TestSetBasedOperations:
+    """Test each operation type and its per-item results"""
+
+    @pytest.mark.asyncio
+    async def test_archive_in_chunks(self, service, db, owner, tenants, progress):
+        user, ids = owner
+        # Another company's contract
+        other_id = "contract-1"
+
+        response = await service.execute_bulk_contract_operation(
+            BulkContractOperation(
+                operation_type=BulkOperationType.ARCHIVE,
+                contract_ids=ids + [other_id],
+            ),
+            user,
+        )
+
+        assert response.status == BulkOperationStatus.PARTIAL_SUCCESS
+        assert response.successful_items == 5
+        assert [item.item_id for item in response.items] == ids + [other_id]
+        assert response.items[-1].error_message == (
+            "Contract not found or access denied"
+        )
+        assert all(contract(db, i).is_archived for i in ids)
+        assert contract(db, ids[0]).archived_by == user.id
+        assert not contract(db, other_id).is_archived
+
+        # Three chunks of two, then the final status
+        assert [m.processed_count for m in progress] == [2, 4, 6, 6]
+        assert [m.status for m in progress] == ["RUNNING"] * 3 + ["COMPLETED"]
+        assert progress[-1].failed_count == 1
+
+    @pytest.mark.asyncio
+    async def test_restore(self, service, db, owner):
+        user, ids = owner
+        for operation_type in (BulkOperationType.ARCHIVE, BulkOperationType.RESTORE):
+            await service.execute_bulk_contract_operation(
+                BulkContractOperation(operation_type=operation_type, contract_ids=ids),
+                user,
+            )
+
+        assert not any(contract(db, i).is_archived for i in ids)
+        assert contract(db, ids[0]).archived_at is None
+
+    @pytest.mark.asyncio
+    async def test_update_skips_protected_fields(self, service, db, owner):
+        user, ids = owner
+        response = await service.execute_bulk_contract_operation(
+            BulkContractOperation(
+                operation_type=BulkOperationType.UPDATE,
+                contract_ids=ids[:3],
+                update_data={"status": "active", "company_id": "other"},
+            ),
+            user,
+        )
+
+        assert response.status == BulkOperationStatus.COMPLETED
+        updated = contract(db, ids[0])
+        assert updated.status == ContractStatus.ACTIVE
+        assert updated.company_id == user.company_id
+        assert updated.updated_at is not None
+        assert contract(db, ids[3]).status == ContractStatus.DRAFT
+
+    @pytest.mark.asyncio
+    async def test_invalid_update_changes_nothing(self, service, db, owner):
+        user, ids = owner
+        response = await service.execute_bulk_contract_operation(
+            BulkContractOperation(
+                operation_type=BulkOperationType.UPDATE,
+                contract_ids=ids,
+                update_data={"status": "shredded"},
+            ),
+            user,
+        )
+
+        assert response.status == BulkOperationStatus.FAILED
+        assert response.failed_items == 5
+        assert all(contract(db, i).status == ContractStatus.DRAFT for i in ids)
+
+    @pytest.mark.asyncio
+    async def test_delete(self, service, db, owner):
+        user, ids = owner
+        response = await service.execute_bulk_contract_operation(
+            BulkContractOperation(
+                operation_type=BulkOperationType.DELETE,
+                contract_ids=ids[:4] + ids[:1],
+            ),
+            user,
+        )
+
+        assert response.total_items == response.successful_items == 4
+        assert db.query(Contract).count() == 1
+
+    @pytest.mark.asyncio
+    async def test_rejected_chunk_retried_per_contract(
+        self, service, db, owner, monkeypatch
+    ):
+        user, ids = owner
+        execute = service._execute_contract_statement
+
+        def referenced(operation_type, values, contract_ids, user):
+            if ids[1] in contract_ids:
+                raise IntegrityError("DELETE", {}, Exception("still referenced"))
+            return execute(operation_type, values, contract_ids, user)
+
+        monkeypatch.setattr(service, "_execute_contract_statement", referenced)
+        response = await service.execute_bulk_contract_operation(
+            BulkContractOperation(
+                operation_type=BulkOperationType.DELETE, contract_ids=ids
+            ),
+            user,
+        )
+
+        assert response.successful_items == 4
+        failed = [item for item in response.items if not item.success]
+        assert [item.item_id for item in failed] == [ids[1]]
+        assert "still referenced" in failed[0].error_message
+        assert contract(db, ids[1]) is not None
+
+    @pytest.mark.asyncio
+    async def test_delete_detaches_references(
+        self, service, db, owner, monkeypatch
+    ):
+        """Audit logs, notifications and files outlive a deleted contract"""
+        user, ids = owner
+        blob = FileBlob(
+            company_id=user.company_id, sha256="0" * 64, size=5, storage_path="b"
+        )
+        db.add(blob)
+        db.flush()
+        db.add_all([
+            AuditLog(
+                action=AuditAction.CREATE,
+                resource_type=AuditResourceType.CONTRACT,
+                resource_id=ids[0],
+                user_id=user.id,
+                contract_id=ids[0],
+            ),
+            Notification(
+                type=NotificationType.DEADLINE,
+                title="Renewal",
+                message="Renewal due",
+                user_id=user.id,
+                related_contract_id=ids[1],
+            ),
+            StoredFile(
+                company_id=user.company_id,
+                contract_id=ids[2],
+                blob_id=blob.id,
+                filename="a.pdf",
+                original_filename="a.pdf",
+                mime_type="application/pdf",
+                file_size=5,
+                sha256="0" * 64,
+            ),
+            # Versions can't outlive their contract, so this one stays
+            ContractVersion(
+                contract_id=ids[3],
+                version_number=1,
+                content="terms",
+                created_by=user.id,
+            ),
+        ])
+        db.commit()
+        forgotten = []
+        monkeypatch.setattr(
+            bulk_module.document_render_service, "forget", forgotten.append
+        )
+
+        response = await service.execute_bulk_contract_operation(
+            BulkContractOperation(
+                operation_type=BulkOperationType.DELETE, contract_ids=ids[:4]
+            ),
+            user,
+        )
+
+        assert response.successful_items == 3
+        assert [item.item_id for item in response.items if not item.success] == [
+            ids[3]
+        ]
+        db.expire_all()
+        audit_log = db.query(AuditLog).filter_by(resource_id=ids[0]).one()
+        assert audit_log.contract_id is None
+        assert db.query(Notification).one().related_contract_id is None
+        assert db.query(StoredFile).one().contract_id is None
+        assert contract(db, ids[3]) is not None
+        assert sorted(forgotten) == sorted(ids[:3])
@@ -0,0 +1,210 @@
+"""
+Unit tests for streamed bulk contract exports
+"""
+
+import asyncio
+import csv
+import io
+import json
+import os
+import zipfile
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.infrastructure.database.models import (
+    BackgroundJob,
+    BulkJob,
+    Contract,
+    ContractType,
+)
+from app.schemas.bulk import BulkExportRequest, BulkOperationStatus
+from app.schemas.jobs import JobStatus
+from app.services.bulk_export_service import BulkExportService, archive_filename
+from app.services.bulk_job_service import BulkJobService, partial_path
+from app.services.document_render_service import DocumentRenderService
+from app.services.job_queue_service import JobQueueService
+
+
+@pytest.fixture
+def user(db, company_user):
+    for i in range(5):
+        db.add(
+            Contract(
+                title=f"Agreement {i}",
+                contract_type=(
+                    ContractType.NDA if i % 2 else ContractType.SERVICE_AGREEMENT
+                ),
+                plain_english_input="Consulting services",
+                final_content=f"1. SERVICES\nServices for client {i}.",
+                client_name=f"Client {i}",
+                company_id=company_user.company_id,
+                created_by=company_user.id,
+            )
+        )
+    db.commit()
+    return company_user
+
+
+@pytest.fixture
+def queue(session_factory):
+    async def notify(*args):
+        pass
+
+    return JobQueueService(session_factory, notify=notify)
+
+
+@pytest.fixture
+def service(session_factory, queue, tmp_path):
+    service = BulkExportService(
+        session_factory,
+        export_dir=str(tmp_path / "exports"),
+        render_service=DocumentRenderService(
+            workers=1, cache_dir=str(tmp_path / "renders")
+        ),
+        batch_size=2,
+        job_service=BulkJobService(session_factory),
+        job_queue=queue,
+    )
+    queue.register(service.export_type, service.run)
+    return service
+
+
+def export(service, db, user, **request):
+    return service.start(db, BulkExportRequest(**request), user)
+
+
+@pytest.fixture
+def run_export(service, queue, db, run_worker_until_finished):
+    async def run(user, **request):
+        job = export(service, db, user, **request)
+        await run_worker_until_finished(queue, db, job)
+        return job
+
+    return run
+
+
+def read_archive(job):
+    with zipfile.ZipFile(job.file_path) as archive:
+        assert archive.testzip() is None
+        return {name: archive.read(name) for name in archive.namelist()}
+
+
+class TestBulkExportArchive:
+    """Test archive contents for each export format"""
+
+    @pytest.mark.asyncio
+    async def test_json_export_one_file_per_contract(self, run_export, db, user):
+        job = await run_export(
+            user,
+            export_format="json",
+            include_fields=["id", "title", "contract_type"],
+        )
+
+        assert job.status == BulkOperationStatus.COMPLETED.value
+        assert job.processed_items == job.total_items == 5
+        assert job.file_size_bytes == os.path.getsize(job.file_path)
+        assert db.get(BackgroundJob, job.background_job_id).status == (
+            JobStatus.COMPLETED.value
+        )
+        records = [json.loads(data) for data in read_archive(job).values()]
+        assert sorted(r["title"] for r in records) == [
+            f"Agreement {i}" for i in range(5)
+        ]
+        assert set(records[0]) == {"id", "title", "contract_type"}
+        assert {r["contract_type"] for r in records} == {
+            "nda",
+            "service_agreement",
+        }
+
+    @pytest.mark.asyncio
+    async def test_csv_export_single_table(self, run_export, user):
+        job = await run_export(
+            user,
+            export_format="csv",
+            filters={"contract_type": ContractType.NDA},
+            exclude_fields=["final_content", "generated_content"],
+        )
+
+        files = read_archive(job)
+        rows = list(csv.DictReader(io.StringIO(files["contracts.csv"].decode())))
+        assert job.total_items == job.processed_items == 2
+        assert sorted(row["title"] for row in rows) == ["Agreement 1", "Agreement 3"]
+        assert "final_content" not in rows[0]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "export_format, magic", [("pdf", b"%PDF"), ("docx", b"PK")]
+    )
+    async def test_documents_rendered(self, run_export, user, export_format, magic):
+        job = await run_export(user, export_format=export_format)
+
+        files = read_archive(job)
+        assert len(files) == 5
+        assert all(name.endswith(f".{export_format}") for name in files)
+        assert all(data.startswith(magic) for data in files.values())
+
+    @pytest.mark.asyncio
+    async def test_failed_export_leaves_no_file(self, service, run_export, user):
+        def broken_render(document_format, payloads):
+            raise RuntimeError("renderer crashed")
+
+        service._render_service = SimpleNamespace(render_batch=broken_render)
+        job = await run_export(user, export_format="pdf")
+
+        assert job.status == BulkOperationStatus.FAILED.value
+        assert "renderer crashed" in job.error_message
+        assert not os.path.exists(job.file_path)
+        assert not os.path.exists(partial_path(job.file_path))
+
+
+class TestBulkExportDownload:
+    """Test downloading an archive while it is being written"""
+
+    @pytest.mark.asyncio
+    async def test_follow_streams_whole_archive(
+        self, service, queue, session_factory, db, user, run_worker_until_finished
+    ):
+        job = export(service, db, user, export_format="json")
+        worker = asyncio.create_task(run_worker_until_finished(queue, db, job))
+        # Followed from another API process: all it shares is the database
+        other_process = BulkExportService(session_factory)
+
+        chunks = [chunk async for chunk in other_process.follow(job.id)]
+        await worker
+
+        assert job.status == BulkOperationStatus.COMPLETED.value
+        assert archive_filename(job) == f"contracts_export_{job.id[:8]}.zip"
+        with open(job.file_path, "rb") as archive:
+            assert b"".join(chunks) == archive.read()
+
+    @pytest.mark.asyncio
+    async def test_follow_aborts_failed_export(
+        self, service, queue, db, user, run_worker_until_finished
+    ):
+        def failing_render(document_format, payloads):
+            raise RuntimeError("renderer crashed")
+
+        service._render_service = SimpleNamespace(render_batch=failing_render)
+        job = export(service, db, user, export_format="pdf")
+        worker = asyncio.create_task(run_worker_until_finished(queue, db, job))
+
+        with pytest.raises(RuntimeError, match="renderer crashed"):
+            async for _ in service.follow(job.id):
+                pass
+        await worker
+
+    @pytest.mark.asyncio
+    async def test_expired_exports_purged(self, service, run_export, db, user):
+        job = await run_export(user, export_format="json")
+        export_id, path = job.id, job.file_path
+        assert os.path.exists(path)
+        job.expires_at = job.completed_at - timedelta(seconds=1)
+        db.commit()
+
+        service.purge_expired(db)
+
+        assert service.get_job(db, export_id) is None
+        assert db.query(BulkJob).count() == 0
+        assert not os.path.exists(path)
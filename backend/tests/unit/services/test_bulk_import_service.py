@@ -0,0 +1,161 @@
+"""
+Unit tests for streamed bulk contract imports
+"""
+
+import io
+import json
+
+import pytest
+
+from app.infrastructure.database.models import (
+    Contract,
+    ContractType,
+)
+from app.schemas.bulk import BulkImportRequest, BulkOperationStatus
+from app.services import bulk_import_service as import_module
+from app.services.bulk_import_service import (
+    BulkImportService,
+    ImportFileError,
+    iter_json_records,
+)
+
+MAPPING = {
+    "title": "Name",
+    "contract_type": "Type",
+    "client_name": "Client",
+    "contract_value": "Value",
+}
+
+
+@pytest.fixture(autouse=True)
+def import_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        import_module.settings, "BULK_IMPORT_DIR", str(tmp_path / "imports")
+    )
+
+
+@pytest.fixture
+def service():
+    return BulkImportService(batch_size=2)
+
+
+def run_import(service, db, user, file_format, data, **request):
+    return service.import_contracts(
+        db,
+        BulkImportRequest(file_format=file_format, mapping=MAPPING, **request),
+        io.BytesIO(data),
+        user,
+    )
+
+
+class TestJsonRecordStream:
+    """Test the incremental JSON array reader"""
+
+    @pytest.mark.parametrize("read_chars", [1, 3, 7, 64 * 1024])
+    def test_elements_split_across_reads(self, monkeypatch, read_chars):
+        monkeypatch.setattr(import_module, "IJSON_AVAILABLE", False)
+        monkeypatch.setattr(import_module, "READ_CHARS", read_chars)
+        records = [
+            {"Name": 'Agreement, "quoted" ]', "Value": 1250.5},
+            12345,
+            [],
+        ]
+        data = json.dumps(records, indent=2).encode("utf-8")
+
+        assert list(iter_json_records(io.BytesIO(data))) == records
+
+    def test_empty_array(self, monkeypatch):
+        monkeypatch.setattr(import_module, "IJSON_AVAILABLE", False)
+
+        assert list(iter_json_records(io.BytesIO(b" [ ] "))) == []
+
+    @pytest.mark.parametrize(
+        "data", [b'{"Name": "x"}', b'[{"Name": 1} {}]', b"[{"]
+    )
+    def test_invalid_json(self, monkeypatch, data):
+        monkeypatch.setattr(import_module, "IJSON_AVAILABLE", False)
+
+        with pytest.raises(ImportFileError):
+            list(iter_json_records(io.BytesIO(data)))
+
+
+class TestBulkImport:
+    """Test batched inserts and the error report"""
+
+    def test_csv_import(self, service, db, company_user):
+        data = (
+            "Name,Type,Client,Value\n"
+            "Consulting Agreement,service_agreement,Retail Ltd,1200.50\n"
+            "Mutual NDA,NDA,Retail Ltd,\n"
+            "Supply Deal,supplier_agreement,Wholesale Ltd,9000\n"
+        ).encode("utf-8-sig")
+
+        response = run_import(service, db, company_user, "csv", data)
+
+        assert response.status == BulkOperationStatus.COMPLETED
+        assert response.total_records == response.imported_records == 3
+        assert response.error_report_url is None
+        contracts = {c.title: c for c in db.query(Contract).all()}
+        assert contracts["Consulting Agreement"].contract_value == 1200.5
+        assert contracts["Mutual NDA"].contract_type == ContractType.NDA
+        assert contracts["Mutual NDA"].contract_value is None
+        assert {c.company_id for c in contracts.values()} == {company_user.company_id}
+
+    def test_rejected_rows_reported(self, service, db, company_user):
+        records = [
+            {"Name": "Good", "Type": "nda"},
+            {"Name": "", "Type": "nda"},
+            {"Name": "Bad type", "Type": "handshake"},
+            "not a record",
+            {"Name": "Bad value", "Type": "nda", "Value": "lots"},
+            {"Name": "Also good", "Type": "nda"},
+        ]
+        response = run_import(
+            service, db, company_user, "json", json.dumps(records).encode()
+        )
+
+        assert response.status == BulkOperationStatus.PARTIAL_SUCCESS
+        assert (response.imported_records, response.failed_records) == (2, 4)
+        assert db.query(Contract).count() == 2
+        assert response.error_report_url.endswith(
+            f"/imports/{response.import_id}/errors"
+        )
+        path = import_module.error_report_path(
+            company_user.company_id, response.import_id
+        )
+        with open(path) as report:
+            rejected = [json.loads(line) for line in report]
+        assert [entry["row"] for entry in rejected] == [2, 3, 4, 5]
+        assert rejected[0]["errors"] == ["Missing required field: title"]
+        assert rejected[1]["errors"] == [
+            "Invalid value for contract_type: 'handshake'"
+        ]
+        assert response.validation_errors == rejected
+
+    def test_rejected_batch_retried_per_row(self, service, db, company_user):
+        # Without validation a missing title only fails at the database
+        data = b"Name,Type\nFirst,nda\n,nda\nThird,nda\n"
+
+        response = run_import(
+            service, db, company_user, "csv", data, skip_validation=True
+        )
+
+        assert (response.imported_records, response.failed_records) == (2, 1)
+        assert response.validation_errors[0]["row"] == 2
+        assert "title" in response.validation_errors[0]["errors"][0].lower()
+
+    def test_unparseable_file_keeps_imported_batches(self, service, db, company_user):
+        data = b'[{"Name": "A", "Type": "nda"}, {"Name": "B", "Type": "nda"}, {'
+
+        response = run_import(service, db, company_user, "json", data)
+
+        assert not response.success
+        assert response.imported_records == 2
+        assert response.status == BulkOperationStatus.PARTIAL_SUCCESS
+        assert "Invalid JSON" in response.message
+
+    def test_unsupported_format(self, service, db, company_user):
+        response = run_import(service, db, company_user, "xlsx", b"")
+
+        assert response.status == BulkOperationStatus.FAILED
+        assert "Unsupported file format" in response.message
@@ -0,0 +1,237 @@
+"""
+Unit tests for durable bulk jobs
+"""
+
+from datetime import timedelta
+
+import pytest
+
+from app.core import database
+from app.core.datetime_utils import get_current_utc
+from app.infrastructure.database.models import (
+    BackgroundJob,
+    BulkJob,
+    BulkJobItem,
+    Contract,
+    ContractType,
+)
+from app.schemas.bulk import (
+    BulkContractOperation,
+    BulkOperationItem,
+    BulkOperationStatus,
+    BulkOperationType,
+)
+from app.schemas.jobs import JobStatus
+from app.services import bulk_job_service as bulk_job_module
+from app.services import bulk_operations_service as bulk_module
+from app.services.bulk_job_service import BulkJobService, bulk_job_response
+from app.services.bulk_operations_service import (
+    BULK_CONTRACT_OPERATION_JOB,
+    BulkOperationsService,
+)
+from app.services.job_queue_service import JobQueueService
+
+
+@pytest.fixture
+def owner(db, company_user):
+    contracts = [
+        Contract(
+            title=f"Agreement {i}",
+            contract_type=ContractType.NDA,
+            company_id=company_user.company_id,
+            created_by=company_user.id,
+        )
+        for i in range(5)
+    ]
+    db.add_all(contracts)
+    db.commit()
+    return company_user, [contract.id for contract in contracts]
+
+
+@pytest.fixture
+def job_service(session_factory):
+    return BulkJobService(session_factory)
+
+
+def operations_service(db, job_service):
+    async def notify(operation_id, message, user_id):
+        pass
+
+    return BulkOperationsService(
+        db, chunk_size=2, notify=notify, job_service=job_service
+    )
+
+
+def archive(ids):
+    return BulkContractOperation(
+        operation_type=BulkOperationType.ARCHIVE, contract_ids=ids
+    )
+
+
+class TestBulkJobRecording:
+    """Test what an operation leaves in the job tables"""
+
+    @pytest.mark.asyncio
+    async def test_operation_recorded_as_job(
+        self, db, session_factory, job_service, owner
+    ):
+        user, ids = owner
+        service = operations_service(db, job_service)
+        response = await service.execute_bulk_contract_operation(
+            archive(ids + ["missing"]), user
+        )
+
+        # Another request (a new session and service) finds the operation
+        other = session_factory()
+        status = operations_service(other, job_service).get_operation_status(
+            response.operation_id
+        )
+        other.close()
+        assert status["status"] == BulkOperationStatus.PARTIAL_SUCCESS
+        assert status["processed_items"] == status["total_items"] == 6
+        assert status["successful_items"] == 5
+        assert status["progress_percentage"] == 100.0
+
+        page, total = job_service.get_items(
+            db, response.operation_id, offset=4, limit=10
+        )
+        assert total == 6
+        assert [item.item_id for item in page] == ids[4:] + ["missing"]
+        failed, failed_total = job_service.get_items(
+            db, response.operation_id, failed_only=True
+        )
+        assert failed_total == 1
+        assert failed[0].error_message == "Contract not found or access denied"
+
+    def test_expired_jobs_purged(self, db, job_service, owner):
+        user, _ = owner
+        finished = job_service.create(db, "archive", user, total_items=1)
+        job_service.record_items(
+            db, finished, [BulkOperationItem(item_id="contract-1", success=True)]
+        )
+        job_service.finish(db, finished, BulkOperationStatus.COMPLETED)
+        running = job_service.create(db, "archive", user, total_items=1)
+        for job in (finished, running):
+            job.expires_at = get_current_utc() - timedelta(hours=1)
+        db.commit()
+        finished_id, running_id = finished.id, running.id
+
+        job_service.purge_expired(db)
+
+        assert db.get(BulkJob, finished_id) is None
+        assert db.query(BulkJobItem).count() == 0
+        # A job still running is kept until it has finished
+        assert db.get(BulkJob, running_id) is not None
+
+    @pytest.mark.asyncio
+    async def test_follow_until_finished(self, db, job_service, owner, monkeypatch):
+        monkeypatch.setattr(bulk_job_module, "FOLLOW_POLL_SECONDS", 0.01)
+        user, _ = owner
+        job = job_service.create(db, "archive", user, total_items=1)
+        updates = job_service.follow(job.id)
+
+        first = await updates.__anext__()
+        job_service.mark_started(db, job)
+        job_service.finish(db, job, BulkOperationStatus.COMPLETED)
+        rest = [update async for update in updates]
+
+        assert first.status == BulkOperationStatus.PENDING
+        assert rest[-1].status == BulkOperationStatus.COMPLETED
+
+
+class TestQueuedBulkJobs:
+    """Test running operations through the job queue"""
+
+    @pytest.fixture
+    def queue(self, session_factory, monkeypatch):
+        async def notify(*args):
+            pass
+
+        # The handler opens its own session, as a worker process would
+        monkeypatch.setattr(database, "SessionLocal", session_factory)
+        monkeypatch.setattr(bulk_module, "send_bulk_operation_update", notify)
+        monkeypatch.setattr(bulk_module.settings, "BULK_OPERATION_CHUNK_SIZE", 2)
+        queue = JobQueueService(session_factory, notify=notify)
+        queue.register(
+            BULK_CONTRACT_OPERATION_JOB, bulk_module.run_bulk_contract_operation_job
+        )
+        return queue
+
+    def start(self, db, job_service, queue, operation, user):
+        return BulkOperationsService(
+            db, job_service=job_service, job_queue=queue
+        ).start_bulk_contract_operation(operation, user)
+
+    @pytest.mark.asyncio
+    async def test_started_operation_queued_and_run(
+        self, db, job_service, queue, owner, run_worker_until_finished
+    ):
+        user, ids = owner
+        job = self.start(db, job_service, queue, archive(ids), user)
+        assert job.status == BulkOperationStatus.PENDING.value
+        assert bulk_job_response(job).background_job_id == job.background_job_id
+
+        await run_worker_until_finished(queue, db, job)
+
+        assert job.status == BulkOperationStatus.COMPLETED.value
+        assert job.successful_items == 5
+        assert all(db.get(Contract, i).is_archived for i in ids)
+        background_job = db.get(BackgroundJob, job.background_job_id)
+        assert background_job.status == JobStatus.COMPLETED.value
+        assert background_job.result["successful_items"] == 5
+
+    @pytest.mark.asyncio
+    async def test_retry_resumes_after_recorded_items(
+        self, db, job_service, queue, owner, run_worker_until_finished
+    ):
+        """A job picked up again doesn't redo the chunks it recorded"""
+        user, ids = owner
+        job = self.start(db, job_service, queue, archive(ids), user)
+        # A worker died after recording the first chunk
+        job_service.mark_started(db, job)
+        job_service.record_items(
+            db,
+            job,
+            [BulkOperationItem(item_id=i, success=True) for i in ids[:2]],
+        )
+        db.commit()
+
+        await run_worker_until_finished(queue, db, job)
+
+        assert job.status == BulkOperationStatus.COMPLETED.value
+        assert job.processed_items == 5
+        page, total = job_service.get_items(db, job.id)
+        assert total == 5
+        assert [item.item_id for item in page] == ids
+        assert not any(db.get(Contract, i).is_archived for i in ids[:2])
+        assert all(db.get(Contract, i).is_archived for i in ids[2:])
+
+    @pytest.mark.asyncio
+    async def test_cancel_stops_after_current_chunk(
+        self,
+        db,
+        session_factory,
+        job_service,
+        queue,
+        owner,
+        monkeypatch,
+        run_worker_until_finished,
+    ):
+        user, ids = owner
+        job = self.start(db, job_service, queue, archive(ids), user)
+
+        async def cancel_after_first_chunk(operation_id, message, user_id):
+            other = session_factory()
+            queue.cancel(other, queue.get_job(other, job.background_job_id))
+            other.close()
+
+        monkeypatch.setattr(
+            bulk_module, "send_bulk_operation_update", cancel_after_first_chunk
+        )
+        await run_worker_until_finished(queue, db, job)
+
+        assert job.status == BulkOperationStatus.PARTIAL_SUCCESS.value
+        assert job.error_message == "Cancelled"
+        assert job.processed_items == 2
+        background_job = db.get(BackgroundJob, job.background_job_id)
+        assert background_job.status == JobStatus.CANCELLED.value
@@ -0,0 +1,230 @@
+"""
+Unit tests for concurrent rule-engine and AI compliance analysis
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+import pytest
+
+from app.domain.entities.company import (
+    BusinessAddress,
+    Company as DomainCompany,
+    CompanyId,
+    CompanyType,
+    IndustryType,
+)
+from app.domain.services import incremental_compliance
+from app.domain.value_objects import Email
+from app.infrastructure.database.models import (
+    AuditLog,
+    ComplianceScore,
+    Contract,
+    ContractType,
+)
+from app.services.compliance_analysis_service import ComplianceAnalysisService
+
+CONTENT = """SERVICE AGREEMENT
+
+1. DATA PROTECTION
+The parties shall comply with the GDPR on the lawful basis of contract.
+
+2. PAYMENT
+Invoices are payable within 30 days.
+"""
+
+
+@pytest.fixture
+def contract(db, company_user):
+    contract = Contract(
+        title="Consulting Agreement",
+        contract_type=ContractType.SERVICE_AGREEMENT,
+        plain_english_input="Consulting services",
+        final_content=CONTENT,
+        company_id=company_user.company_id,
+        created_by=company_user.id,
+    )
+    db.add(contract)
+    db.commit()
+    return contract
+
+
+@pytest.fixture
+def domain_company():
+    return DomainCompany(
+        company_id=CompanyId(str(uuid4())),
+        name="Example Consulting Ltd",
+        company_type=CompanyType.PRIVATE_LIMITED,
+        industry=IndustryType.TECHNOLOGY,
+        address=BusinessAddress(
+            line1="1 High Street", city="London", postcode="SW1A 1AA"
+        ),
+        primary_contact_email=Email("owner@example.co.uk"),
+        created_by_user_id=str(uuid4()),
+    )
+
+
+def ai_response(overall_score=0.93):
+    return SimpleNamespace(
+        overall_score=overall_score,
+        gdpr_compliance=0.95,
+        employment_law_compliance=0.9,
+        consumer_rights_compliance=0.88,
+        commercial_terms_compliance=0.94,
+        risk_score=2,
+        risk_factors=["Minor ambiguity in termination clause"],
+        recommendations=["Clarify termination notice"],
+        analysis_raw="AI analysis",
+    )
+
+
+def slow_ai(release, response=None, error=None):
+    async def analyze_compliance(request):
+        await release.wait()
+        if error:
+            raise error
+        return response or ai_response()
+
+    return SimpleNamespace(analyze_compliance=analyze_compliance)
+
+
+def scores(db, contract):
+    db.expire_all()
+    return [
+        score.analysis_version
+        for score in db.query(ComplianceScore)
+        .filter(ComplianceScore.contract_id == contract.id)
+        .order_by(ComplianceScore.analysis_date)
+    ]
+
+
+async def analyze(service, db, contract, domain_company):
+    return await service.analyze(
+        db, contract, CONTENT, domain_company, None, contract.created_by
+    )
+
+
+class TestComplianceAnalysisService:
+    """Test provisional rule-engine scores and background AI completion"""
+
+    @pytest.mark.asyncio
+    async def test_rule_engine_score_final_without_ai(
+        self, session_factory, db, contract, domain_company, monkeypatch
+    ):
+        monkeypatch.setattr("app.services.ai_service.ai_service", None)
+        notify = AsyncMock()
+        service = ComplianceAnalysisService(session_factory, notify=notify)
+
+        result = await analyze(service, db, contract, domain_company)
+
+        assert result.analysis_method == "uk_engine"
+        assert not result.is_provisional
+        assert scores(db, contract) == ["1.0-uk_engine"]
+        assert not service.is_pending(contract.id)
+        notify.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_slow_ai_completes_in_background(
+        self, session_factory, db, contract, domain_company
+    ):
+        release = asyncio.Event()
+        notify = AsyncMock()
+        service = ComplianceAnalysisService(
+            session_factory, ai_client=slow_ai(release), notify=notify
+        )
+
+        result = await analyze(service, db, contract, domain_company)
+
+        assert result.is_provisional
+        assert result.score.analysis_version == "1.0-uk_engine"
+        assert service.is_pending(contract.id)
+
+        task = service._tasks[contract.id]
+        release.set()
+        await task
+
+        assert scores(db, contract) == ["1.0-uk_engine", "1.0-ai"]
+        message, user_id = notify.call_args[0]
+        assert user_id == contract.created_by
+        assert message.status == "COMPLETED"
+        assert message.provisional_score_id == result.score.id
+        assert message.compliance_score["overall_score"] == 0.93
+        assert not service.is_pending(contract.id)
+        methods = [
+            log.new_values["analysis_method"]
+            for log in db.query(AuditLog).filter(AuditLog.contract_id == contract.id)
+        ]
+        assert sorted(methods) == ["ai", "uk_engine"]
+
+    @pytest.mark.asyncio
+    async def test_ai_failure_keeps_provisional_score(
+        self, session_factory, db, contract, domain_company
+    ):
+        release = asyncio.Event()
+        notify = AsyncMock()
+        service = ComplianceAnalysisService(
+            session_factory,
+            ai_client=slow_ai(release, error=RuntimeError("AI unavailable")),
+            notify=notify,
+        )
+
+        result = await analyze(service, db, contract, domain_company)
+        task = service._tasks[contract.id]
+        release.set()
+        await task
+
+        assert scores(db, contract) == ["1.0-uk_engine"]
+        message = notify.call_args[0][0]
+        assert message.status == "FAILED"
+        assert message.provisional_score_id == result.score.id
+        assert "AI unavailable" in message.error_message
+
+    @pytest.mark.asyncio
+    async def test_ai_answering_first_is_final(
+        self, session_factory, db, contract, domain_company, monkeypatch
+    ):
+        validate = incremental_compliance.incremental_compliance_validator.validate
+
+        def slow_validate(*args, **kwargs):
+            time.sleep(0.05)
+            return validate(*args, **kwargs)
+
+        monkeypatch.setattr(
+            incremental_compliance.incremental_compliance_validator,
+            "validate",
+            slow_validate,
+        )
+        ai_client = SimpleNamespace(
+            analyze_compliance=AsyncMock(return_value=ai_response())
+        )
+        service = ComplianceAnalysisService(session_factory, ai_client=ai_client)
+
+        result = await analyze(service, db, contract, domain_company)
+
+        assert result.analysis_method == "ai"
+        assert not result.is_provisional
+        assert scores(db, contract) == ["1.0-ai"]
+
+    @pytest.mark.asyncio
+    async def test_reanalysis_cancels_pending_ai(
+        self, session_factory, db, contract, domain_company
+    ):
+        release = asyncio.Event()
+        notify = AsyncMock()
+        service = ComplianceAnalysisService(
+            session_factory, ai_client=slow_ai(release), notify=notify
+        )
+
+        await analyze(service, db, contract, domain_company)
+        superseded = service._tasks[contract.id]
+        await analyze(service, db, contract, domain_company)
+        await asyncio.sleep(0)
+
+        assert superseded.cancelled()
+        release.set()
+        await service._tasks[contract.id]
+        assert notify.call_count == 1
+        assert scores(db, contract) == ["1.0-uk_engine", "1.0-uk_engine", "1.0-ai"]
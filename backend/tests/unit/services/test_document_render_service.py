@@ -0,0 +1,170 @@
+"""
+Unit tests for off-loop contract rendering and the render cache
+"""
+
+import asyncio
+import os
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import document_render_service as render_module
+from app.services.document_render_service import (
+    DocumentRenderService,
+    content_hash,
+    render_payload,
+)
+
+
+def make_contract(**overrides):
+    fields = dict(
+        id="contract-1",
+        title="Consulting Agreement",
+        client_name="Retail Client Ltd",
+        supplier_name="Example Consulting Ltd",
+        contract_value=12500.0,
+        currency="GBP",
+        start_date=datetime(2026, 1, 1),
+        end_date=None,
+        final_content="1. SERVICES\nThe Supplier shall provide consulting services.",
+        generated_content=None,
+    )
+    fields.update(overrides)
+    return SimpleNamespace(**fields)
+
+
+@pytest.fixture
+def service(tmp_path):
+    # A single worker renders in a thread instead of a process pool
+    return DocumentRenderService(workers=1, cache_dir=str(tmp_path))
+
+
+@pytest.fixture
+def render_calls(monkeypatch):
+    calls = []
+    render_document = render_module.render_document
+
+    def counting_render(document_format, payload):
+        calls.append(document_format)
+        return render_document(document_format, payload)
+
+    monkeypatch.setattr(render_module, "render_document", counting_render)
+    return calls
+
+
+class TestRenderPayload:
+    """Test what the cache key depends on"""
+
+    def test_hash_follows_rendered_fields(self):
+        contract = make_contract()
+        digest = content_hash(render_payload(contract))
+
+        assert content_hash(render_payload(make_contract())) == digest
+        assert content_hash(render_payload(make_contract(title="Other"))) != digest
+        assert (
+            content_hash(render_payload(make_contract(final_content="Changed")))
+            != digest
+        )
+
+
+class TestDocumentRenderService:
+    """Test rendering and serving repeats from the cache"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "document_format, magic", [("pdf", b"%PDF"), ("docx", b"PK")]
+    )
+    async def test_renders_document(self, service, document_format, magic):
+        path = await service.render(make_contract(), document_format)
+
+        assert path.endswith(f".{document_format}")
+        with open(path, "rb") as rendered:
+            assert rendered.read(len(magic)) == magic
+
+    @pytest.mark.asyncio
+    async def test_renders_in_worker_processes(self, tmp_path):
+        service = DocumentRenderService(workers=2, cache_dir=str(tmp_path))
+        try:
+            path = await service.render(make_contract(), "pdf")
+        finally:
+            service.shutdown()
+
+        with open(path, "rb") as rendered:
+            assert rendered.read(4) == b"%PDF"
+
+    @pytest.mark.asyncio
+    async def test_unchanged_contract_served_from_cache(self, service, render_calls):
+        contract = make_contract()
+
+        first = await service.render(contract, "pdf")
+        second = await service.render(contract, "pdf")
+
+        assert first == second
+        assert render_calls == ["pdf"]
+
+        # A fresh service (e.g. after a restart) reuses the file on disk
+        restarted = DocumentRenderService(
+            workers=1, cache_dir=service.cache.directory
+        )
+        assert await restarted.render(contract, "pdf") == first
+        assert render_calls == ["pdf"]
+
+    @pytest.mark.asyncio
+    async def test_edit_replaces_cached_render(self, service, render_calls):
+        old = await service.render(make_contract(), "pdf")
+        docx = await service.render(make_contract(), "docx")
+
+        new = await service.render(make_contract(final_content="Amended"), "pdf")
+
+        assert new != old
+        # Kept for downloads that may still be reading it
+        assert os.path.exists(old)
+        assert render_calls == ["pdf", "docx", "pdf"]
+
+        stale = os.path.getmtime(old) - render_module.STALE_RENDER_SECONDS - 1
+        os.utime(old, (stale, stale))
+        await service.render(make_contract(final_content="Amended again"), "pdf")
+
+        assert not os.path.exists(old)
+        assert os.path.exists(new)
+        assert os.path.exists(docx)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_render(self, service, render_calls):
+        contract = make_contract()
+
+        paths = await asyncio.gather(
+            *(service.render(contract, "docx") for _ in range(3))
+        )
+
+        assert len(set(paths)) == 1
+        assert render_calls == ["docx"]
+
+    @pytest.mark.asyncio
+    async def test_disconnected_requester_does_not_cancel_render(
+        self, service, render_calls
+    ):
+        contract = make_contract()
+        first = asyncio.create_task(service.render(contract, "pdf"))
+        second = asyncio.create_task(service.render(contract, "pdf"))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        path = await second
+
+        assert first.cancelled()
+        with open(path, "rb") as rendered:
+            assert rendered.read(4) == b"%PDF"
+        assert render_calls == ["pdf"]
+
+    @pytest.mark.asyncio
+    async def test_forget_drops_cached_renders(self, service, render_calls):
+        contract = make_contract()
+        path = await service.render(contract, "pdf")
+
+        service.forget(contract.id)
+
+        assert not os.path.exists(path)
+        await service.render(contract, "pdf")
+        assert render_calls == ["pdf", "pdf"]
@@ -0,0 +1,213 @@
+"""
+Unit tests for file downloads
+"""
+
+from email.utils import formatdate
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from app.core.security import verify_download_signature
+from app.services import file_download_service as download_module
+from app.services.file_download_service import (
+    ConditionalFileResponse,
+    file_download_response,
+    signed_download_url,
+)
+
+CONTENT = b"0123456789" * 1000
+
+
+@pytest.fixture
+def stored(tmp_path):
+    path = tmp_path / "company" / "contract.pdf"
+    path.parent.mkdir()
+    path.write_bytes(CONTENT)
+    return path
+
+
+async def call(response, method="GET", headers=None, extensions=None):
+    """Run a response as ASGI and collect what it sends"""
+    scope = {
+        "type": "http",
+        "method": method,
+        "headers": [
+            (name.lower().encode(), value.encode())
+            for name, value in (headers or {}).items()
+        ],
+        "extensions": extensions or {},
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        messages.append(message)
+
+    await response(scope, receive, send)
+    start = messages[0]
+    return (
+        start["status"],
+        {k.decode(): v.decode() for k, v in start["headers"]},
+        messages[1:],
+    )
+
+
+def body(messages):
+    return b"".join(m.get("body", b"") for m in messages)
+
+
+def pdf_response(path, etag="abc123"):
+    return ConditionalFileResponse(
+        path, etag=etag, filename="contract.pdf", media_type="application/pdf"
+    )
+
+
+class TestConditionalFileResponse:
+    """Test validators, conditional GETs, ranges and zero-copy sends"""
+
+    @pytest.mark.asyncio
+    async def test_full_download(self, stored):
+        status, headers, messages = await call(pdf_response(stored))
+
+        assert status == 200
+        assert body(messages) == CONTENT
+        assert headers["etag"] == '"abc123"'
+        assert headers["accept-ranges"] == "bytes"
+        assert "last-modified" in headers
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "if_none_match", ['"abc123"', 'W/"abc123"', '"old", "abc123"', "*"]
+    )
+    async def test_matching_etag_not_modified(self, stored, if_none_match):
+        status, headers, messages = await call(
+            pdf_response(stored), headers={"If-None-Match": if_none_match}
+        )
+
+        assert status == 304
+        assert body(messages) == b""
+        assert headers["etag"] == '"abc123"'
+
+    @pytest.mark.asyncio
+    async def test_if_modified_since(self, stored):
+        mtime = stored.stat().st_mtime
+        status, _, _ = await call(
+            pdf_response(stored),
+            headers={"If-Modified-Since": formatdate(mtime + 1, usegmt=True)},
+        )
+        assert status == 304
+
+        status, _, _ = await call(
+            pdf_response(stored),
+            headers={"If-Modified-Since": formatdate(mtime - 60, usegmt=True)},
+        )
+        assert status == 200
+
+    @pytest.mark.asyncio
+    async def test_changed_etag_wins_over_date(self, stored):
+        mtime = stored.stat().st_mtime
+        status, _, _ = await call(
+            pdf_response(stored),
+            headers={
+                "If-None-Match": '"old"',
+                "If-Modified-Since": formatdate(mtime + 1, usegmt=True),
+            },
+        )
+        assert status == 200
+
+    @pytest.mark.asyncio
+    async def test_range(self, stored):
+        status, headers, messages = await call(
+            pdf_response(stored), headers={"Range": "bytes=10-19"}
+        )
+
+        assert status == 206
+        assert body(messages) == CONTENT[10:20]
+        assert headers["content-range"] == f"bytes 10-19/{len(CONTENT)}"
+
+    @pytest.mark.asyncio
+    async def test_stale_if_range_sends_whole_file(self, stored):
+        status, _, messages = await call(
+            pdf_response(stored),
+            headers={"Range": "bytes=10-19", "If-Range": '"old"'},
+        )
+
+        assert status == 200
+        assert body(messages) == CONTENT
+
+    @pytest.mark.asyncio
+    async def test_pathsend(self, stored):
+        status, _, messages = await call(
+            pdf_response(stored), extensions={"http.response.pathsend": {}}
+        )
+
+        assert status == 200
+        assert messages == [{"type": "http.response.pathsend", "path": str(stored)}]
+
+    @pytest.mark.asyncio
+    async def test_zerocopy_range(self, stored):
+        status, headers, messages = await call(
+            pdf_response(stored),
+            headers={"Range": "bytes=100-"},
+            extensions={"http.response.zerocopysend": {}},
+        )
+
+        assert status == 206
+        assert headers["content-length"] == str(len(CONTENT) - 100)
+        [message] = messages
+        assert message["type"] == "http.response.zerocopysend"
+        assert (message["offset"], message["count"]) == (100, len(CONTENT) - 100)
+
+
+class TestOffloadedDownloads:
+    """Test front-end server handoff and signed URLs"""
+
+    def test_accel_redirect(self, stored, monkeypatch):
+        monkeypatch.setattr(
+            download_module.settings, "FILE_ACCEL_REDIRECT_HEADER", "X-Accel-Redirect"
+        )
+        monkeypatch.setattr(
+            download_module.settings, "FILE_ACCEL_REDIRECT_PREFIX", "/internal/"
+        )
+
+        response = file_download_response(
+            stored, stored.parent.parent, "my contract.pdf", "application/pdf", "abc"
+        )
+
+        assert response.body == b""
+        assert response.headers["x-accel-redirect"] == "/internal/company/contract.pdf"
+        assert response.headers["etag"] == '"abc"'
+        assert "my%20contract.pdf" in response.headers["content-disposition"]
+
+    def test_signed_url(self):
+        url, expires_at = signed_download_url("file-1", "user-1", ttl_seconds=60)
+
+        parts = urlsplit(url)
+        query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        expires = int(query["expires"])
+        assert parts.path == "/api/v1/files/signed/file-1"
+        assert query["issued_by"] == "user-1"
+        assert expires == int(expires_at.timestamp())
+        assert verify_download_signature(
+            "file-1", "user-1", expires, query["signature"]
+        )
+        # Bound to the file, the issuer and the expiry it was issued with
+        assert not verify_download_signature(
+            "file-2", "user-1", expires, query["signature"]
+        )
+        assert not verify_download_signature(
+            "file-1", "user-2", expires, query["signature"]
+        )
+        assert not verify_download_signature(
+            "file-1", "user-1", expires + 3600, query["signature"]
+        )
+
+    def test_expired_signature_rejected(self):
+        url, _ = signed_download_url("file-1", "user-1", ttl_seconds=-1)
+        query = {k: v[0] for k, v in parse_qs(urlsplit(url).query).items()}
+
+        assert not verify_download_signature(
+            "file-1", "user-1", int(query["expires"]), query["signature"]
+        )
@@ -0,0 +1,123 @@
+"""
+Unit tests for the content-addressed file store
+"""
+
+import hashlib
+from datetime import timedelta
+
+import pytest
+
+from app.core.datetime_utils import get_current_utc
+from app.infrastructure.database.models import FileBlob, StoredFile
+from app.services.file_store_service import FileStoreService
+from app.services.file_upload_service import StoredUpload
+
+
+# Files belong to tenants' companies and contracts; foreign keys are enforced
+pytestmark = pytest.mark.usefixtures("tenants")
+
+
+@pytest.fixture
+def store(tmp_path):
+    return FileStoreService(tmp_path)
+
+
+def upload(store, company_id, data):
+    """An upload as stream_upload leaves it, in the company's directory"""
+    directory = store.root / company_id
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{len(list(directory.iterdir()))}.part"
+    path.write_bytes(data)
+    return StoredUpload(path, len(data), hashlib.sha256(data).hexdigest(), data)
+
+
+def save(store, db, company_id, data, name="contract.pdf", **kwargs):
+    return store.store(
+        db,
+        upload(store, company_id, data),
+        company_id=company_id,
+        filename=name,
+        original_filename=name,
+        mime_type="application/pdf",
+        **kwargs,
+    )
+
+
+class TestStoring:
+    """Test content addressing and deduplication"""
+
+    def test_identical_uploads_share_a_blob(self, store, db):
+        first = save(store, db, "company-a", b"terms", name="a.pdf")
+        second = save(store, db, "company-a", b"terms", name="b.pdf")
+
+        assert first.id != second.id
+        assert first.blob_id == second.blob_id
+        assert db.get(FileBlob, first.blob_id).ref_count == 2
+
+        digest = hashlib.sha256(b"terms").hexdigest()
+        path = store.path(second)
+        assert path == store.root / "company-a" / "blobs" / digest[:2] / digest
+        assert path.read_bytes() == b"terms"
+        # The second upload's temporary copy was dropped
+        assert list((store.root / "company-a").glob("*.part")) == []
+
+    def test_companies_do_not_share_blobs(self, store, db):
+        first = save(store, db, "company-a", b"terms")
+        second = save(store, db, "company-b", b"terms")
+
+        assert first.blob_id != second.blob_id
+        assert store.path(first) != store.path(second)
+
+    def test_missing_content_restored(self, store, db):
+        first = save(store, db, "company-a", b"terms")
+        store.path(first).unlink()
+
+        save(store, db, "company-a", b"terms")
+
+        assert store.path(first).read_bytes() == b"terms"
+
+
+class TestLookupAndDeletion:
+    """Test company scoping, listing and reference counting"""
+
+    def test_get_is_company_scoped(self, store, db):
+        record = save(store, db, "company-a", b"terms")
+
+        assert store.get(db, record.id, "company-a").id == record.id
+        assert store.get(db, record.id) is not None
+        assert store.get(db, record.id, "company-b") is None
+
+    def test_list_by_company_and_contract(self, store, db):
+        records = [
+            save(store, db, "company-a", b"one", contract_id="contract-1"),
+            save(store, db, "company-a", b"two", contract_id="contract-2"),
+            save(store, db, "company-a", b"three", contract_id="contract-1"),
+            save(store, db, "company-b", b"four", contract_id="contract-1"),
+        ]
+        # Spread the upload times so the order is deterministic
+        for age, record in enumerate(reversed(records)):
+            record.created_at = get_current_utc() - timedelta(minutes=age)
+        db.commit()
+
+        files, total = store.list(db, "company-a", limit=2)
+        assert total == 3
+        assert [f.id for f in files] == [records[2].id, records[1].id]
+
+        files, total = store.list(db, "company-a", contract_id="contract-1")
+        assert total == 2
+        assert [f.id for f in files] == [records[2].id, records[0].id]
+
+    def test_blob_removed_with_last_reference(self, store, db):
+        first = save(store, db, "company-a", b"terms")
+        second = save(store, db, "company-a", b"terms")
+        blob_id, path = first.blob_id, store.path(first)
+
+        store.delete(db, first)
+        db.expire_all()
+        assert db.get(FileBlob, blob_id).ref_count == 1
+        assert path.exists()
+
+        store.delete(db, second)
+        assert db.get(FileBlob, blob_id) is None
+        assert db.query(StoredFile).count() == 0
+        assert not path.exists()
@@ -0,0 +1,77 @@
+"""
+Unit tests for streamed file uploads
+"""
+
+import hashlib
+import io
+
+import pytest
+from fastapi import UploadFile
+
+from app.services import file_upload_service as upload_module
+from app.services.file_upload_service import (
+    SNIFF_BYTES,
+    UploadTooLargeError,
+    sniff_mime_type,
+    stream_upload,
+)
+
+
+class RecordingUpload(UploadFile):
+    """An upload that records how much was asked of it per read"""
+
+    def __init__(self, data: bytes):
+        super().__init__(io.BytesIO(data), filename="contract.pdf")
+        self.reads = []
+
+    async def read(self, size: int = -1) -> bytes:
+        self.reads.append(size)
+        return await super().read(size)
+
+
+class TestStreamUpload:
+    """Test chunked copies, hashing and the size limit"""
+
+    @pytest.mark.asyncio
+    async def test_streamed_in_chunks(self, tmp_path):
+        data = b"%PDF-1.7\n" + bytes(range(256)) * 400
+        source = RecordingUpload(data)
+
+        upload = await stream_upload(source, tmp_path, len(data), chunk_size=4096)
+
+        assert upload.path.read_bytes() == data
+        assert upload.path.parent == tmp_path
+        assert upload.size == len(data)
+        assert upload.sha256 == hashlib.sha256(data).hexdigest()
+        assert upload.head == data[:SNIFF_BYTES]
+        # Never the whole file in one read
+        assert set(source.reads) == {4096}
+
+    @pytest.mark.asyncio
+    async def test_oversized_upload_aborted(self, tmp_path):
+        source = RecordingUpload(b"x" * 10_000)
+
+        with pytest.raises(UploadTooLargeError):
+            await stream_upload(source, tmp_path, 5_000, chunk_size=1024)
+
+        # Stopped at the first chunk over the limit, and nothing left behind
+        assert len(source.reads) == 5
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_promote_and_discard(self, tmp_path):
+        upload = await stream_upload(RecordingUpload(b"terms"), tmp_path, 100)
+
+        final = upload.promote(tmp_path / "stored.txt")
+        assert final.read_bytes() == b"terms"
+        assert [p.name for p in tmp_path.iterdir()] == ["stored.txt"]
+
+        upload.discard()
+        upload.discard()
+        assert list(tmp_path.iterdir()) == []
+
+    def test_sniff_falls_back_without_libmagic(self, monkeypatch):
+        monkeypatch.setattr(upload_module, "HAS_MAGIC", False)
+
+        assert sniff_mime_type(b"%PDF", "application/pdf") == "application/pdf"
+        assert sniff_mime_type(b"%PDF") == "application/octet-stream"
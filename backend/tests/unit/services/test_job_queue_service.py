@@ -0,0 +1,259 @@
+"""
+Unit tests for the background job queue
+"""
+
+import asyncio
+import time
+from datetime import timedelta
+
+import pytest
+
+from app.core.datetime_utils import get_current_utc
+from app.infrastructure.database.models import BackgroundJob
+from app.schemas.jobs import JobStatus
+from app.services import job_queue_service as queue_module
+from app.services.job_queue_service import JobQueueService
+
+
+# Jobs name tenants' companies and user; foreign keys are enforced
+pytestmark = pytest.mark.usefixtures("tenants")
+
+
+@pytest.fixture
+def events():
+    return []
+
+
+@pytest.fixture
+def queue(session_factory, events, monkeypatch):
+    monkeypatch.setattr(queue_module, "JOB_HANDLER_MODULES", ())
+    monkeypatch.setattr(queue_module.settings, "JOB_POLL_SECONDS", 0.01)
+    monkeypatch.setattr(queue_module.settings, "JOB_TENANT_CONCURRENCY", 1)
+    monkeypatch.setattr(queue_module.settings, "JOB_RETRY_BASE_SECONDS", 10)
+
+    async def notify(response, user_id):
+        events.append(response)
+
+    service = JobQueueService(session_factory, notify=notify)
+
+    @service.handler("echo")
+    async def echo(context):
+        return {"echo": context.payload}
+
+    return service
+
+
+def reload(db, job):
+    db.expire_all()
+    return db.get(BackgroundJob, job.id)
+
+
+def announced(events):
+    """IDs of jobs whose final update has been sent"""
+    return {
+        event.job_id
+        for event in events
+        if event.status.value in queue_module.FINISHED_STATUSES
+    }
+
+
+async def run_until_finished(queue, db, jobs, concurrency=2, events=None):
+    stop = asyncio.Event()
+    worker = asyncio.create_task(
+        queue.run_worker(stop, worker_id="worker-1", concurrency=concurrency)
+    )
+    try:
+        for _ in range(500):
+            finished = all(
+                reload(db, job).status in queue_module.FINISHED_STATUSES
+                for job in jobs
+            )
+            # Wait for the final events too: they are sent after the write
+            if finished and (
+                events is None or announced(events) >= {job.id for job in jobs}
+            ):
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        stop.set()
+        await worker
+
+
+class TestClaiming:
+    """Test which job a worker gets"""
+
+    def test_highest_priority_first(self, queue, db):
+        low = queue.enqueue(db, "echo", priority=0)
+        high = queue.enqueue(db, "echo", priority=5)
+        queue.enqueue(db, "unregistered", priority=9)
+
+        first = queue.claim(db, "worker-1")
+        second = queue.claim(db, "worker-2")
+
+        assert (first.id, second.id) == (high.id, low.id)
+        assert first.status == JobStatus.RUNNING.value
+        assert first.locked_by == "worker-1" and first.attempts == 1
+        assert first.lease_expires_at is not None
+        # Nothing left this worker has a handler for
+        assert queue.claim(db, "worker-3") is None
+
+    def test_delayed_job_waits(self, queue, db):
+        queue.enqueue(db, "echo", delay_seconds=60)
+
+        assert queue.claim(db, "worker-1") is None
+
+    def test_company_concurrency_limit(self, queue, db):
+        first = queue.enqueue(db, "echo", company_id="company-a", priority=2)
+        second = queue.enqueue(db, "echo", company_id="company-a", priority=1)
+        other = queue.enqueue(db, "echo", company_id="company-b")
+
+        assert queue.claim(db, "worker-1").id == first.id
+        # company-a is at its limit, so its next job is skipped for now
+        assert queue.claim(db, "worker-2").id == other.id
+        assert queue.claim(db, "worker-3") is None
+
+        running = reload(db, first)
+        running.status = JobStatus.COMPLETED.value
+        db.commit()
+        assert queue.claim(db, "worker-3").id == second.id
+
+    def test_expired_lease_requeued(self, queue, db):
+        job = queue.enqueue(db, "echo", max_attempts=2)
+        claimed = queue.claim(db, "worker-1")
+        claimed.lease_expires_at = get_current_utc() - timedelta(seconds=1)
+        db.commit()
+
+        again = queue.claim(db, "worker-2")
+        assert again.id == job.id
+        assert (again.locked_by, again.attempts) == ("worker-2", 2)
+
+        again.lease_expires_at = get_current_utc() - timedelta(seconds=1)
+        db.commit()
+        queue.recover_expired(db)
+        failed = reload(db, job)
+        assert failed.status == JobStatus.FAILED.value
+        assert failed.error_message == "Worker stopped responding"
+
+
+class TestRunningJobs:
+    """Test handler outcomes, retries, cancellation and progress"""
+
+    @pytest.mark.asyncio
+    async def test_worker_runs_jobs(self, queue, db, events):
+        jobs = [
+            queue.enqueue(db, "echo", payload={"n": n}, user_id="user-1")
+            for n in range(3)
+        ]
+
+        await run_until_finished(queue, db, jobs, events=events)
+
+        for n, job in enumerate(jobs):
+            done = reload(db, job)
+            assert done.status == JobStatus.COMPLETED.value
+            assert done.result == {"echo": {"n": n}}
+            assert done.progress == 100.0 and done.locked_by is None
+        assert announced(events) == {job.id for job in jobs}
+
+    @pytest.mark.asyncio
+    async def test_outcome_announced_when_stopped_while_recording(
+        self, queue, db, events, monkeypatch
+    ):
+        write = queue._write
+        written = asyncio.Event()
+        loop = asyncio.get_running_loop()
+
+        def slow_write(*args):
+            response = write(*args)
+            loop.call_soon_threadsafe(written.set)
+            time.sleep(0.05)
+            return response
+
+        monkeypatch.setattr(queue, "_write", slow_write)
+        job = queue.enqueue(db, "echo", user_id="user-1")
+        task = asyncio.create_task(
+            queue.execute(queue.claim(db, "worker-1").id, "worker-1")
+        )
+        await written.wait()
+        task.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert reload(db, job).status == JobStatus.COMPLETED.value
+        assert announced(events) == {job.id}
+
+    @pytest.mark.asyncio
+    async def test_failure_retried_with_backoff(self, queue, db):
+        @queue.handler("flaky")
+        async def flaky(context):
+            raise RuntimeError(f"attempt {context.attempt} failed")
+
+        job = queue.enqueue(db, "flaky", max_attempts=2)
+        await queue.execute(queue.claim(db, "worker-1").id, "worker-1")
+
+        retry = reload(db, job)
+        assert retry.status == JobStatus.QUEUED.value
+        assert retry.error_message == "attempt 1 failed"
+        assert retry.locked_by is None
+        delay = (retry.run_after - get_current_utc().replace(tzinfo=None)).seconds
+        assert 8 <= delay <= 11
+
+        retry.run_after = get_current_utc()
+        db.commit()
+        await queue.execute(queue.claim(db, "worker-1").id, "worker-1")
+
+        failed = reload(db, job)
+        assert failed.status == JobStatus.FAILED.value
+        assert failed.error_message == "attempt 2 failed"
+        assert failed.attempts == 2 and failed.completed_at is not None
+
+    @pytest.mark.asyncio
+    async def test_progress_and_cancellation(self, queue, db, events):
+        seen = []
+
+        @queue.handler("long")
+        async def long(context):
+            seen.append(context.checkpoint)
+            await context.report_progress(25, "a quarter", checkpoint={"at": 25})
+            queue.cancel(db, reload(db, job))
+            await context.report_progress(50, "half")
+            raise AssertionError("not reached")
+
+        job = queue.enqueue(db, "long", user_id="user-1")
+        await queue.execute(queue.claim(db, "worker-1").id, "worker-1")
+        # Progress events are sent from the worker's event loop
+        await asyncio.sleep(0)
+
+        cancelled = reload(db, job)
+        assert cancelled.status == JobStatus.CANCELLED.value
+        assert cancelled.progress == 50.0
+        assert cancelled.checkpoint == {"at": 25}
+        assert seen == [None]
+        assert [e.progress_message for e in events][:1] == ["a quarter"]
+
+    def test_cancel_queued_job(self, queue, db):
+        job = queue.enqueue(db, "echo")
+
+        queue.cancel(db, job)
+
+        assert reload(db, job).status == JobStatus.CANCELLED.value
+        assert queue.claim(db, "worker-1") is None
+
+    @pytest.mark.asyncio
+    async def test_stopped_worker_requeues_running_job(self, queue, db):
+        started = asyncio.Event()
+
+        @queue.handler("slow")
+        async def slow(context):
+            started.set()
+            await asyncio.sleep(60)
+
+        job = queue.enqueue(db, "slow")
+        stop = asyncio.Event()
+        worker = asyncio.create_task(queue.run_worker(stop, worker_id="worker-1"))
+        await asyncio.wait_for(started.wait(), 5)
+        stop.set()
+        await worker
+
+        requeued = reload(db, job)
+        assert requeued.status == JobStatus.QUEUED.value
+        assert (requeued.attempts, requeued.locked_by) == (0, None)
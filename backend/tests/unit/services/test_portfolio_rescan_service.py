@@ -0,0 +1,162 @@
+"""
+Unit tests for portfolio compliance rescans
+"""
+
+import pytest
+
+from app.infrastructure.database.models import (
+    ComplianceScore,
+    Contract,
+    ContractType,
+)
+from app.services import portfolio_rescan_service as rescan_module
+from app.services.portfolio_rescan_service import PortfolioRescanService
+
+CONTRACT_CONTENT = """SERVICE AGREEMENT
+
+1. DATA PROTECTION
+The parties shall comply with the GDPR on the lawful basis of contract.
+
+2. LIABILITY
+The supplier may exclude liability for death.
+"""
+
+
+def add_contracts(db, company_id, user_id, contracts=3):
+    for index in range(contracts):
+        db.add(
+            Contract(
+                title=f"Agreement {index}",
+                contract_type=ContractType.SERVICE_AGREEMENT,
+                final_content=CONTRACT_CONTENT,
+                contract_value=10000.0,
+                company_id=company_id,
+                created_by=user_id,
+            )
+        )
+    # No content yet, so nothing to score
+    db.add(
+        Contract(
+            title="Draft",
+            contract_type=ContractType.NDA,
+            company_id=company_id,
+            created_by=user_id,
+        )
+    )
+    db.commit()
+
+
+@pytest.fixture
+def company(db, company_user):
+    add_contracts(db, company_user.company_id, company_user.id)
+    return company_user.company
+
+
+@pytest.fixture
+def service(session_factory):
+    return PortfolioRescanService(
+        session_factory=session_factory, workers=1, batch_size=2
+    )
+
+
+class TestPortfolioRescan:
+    """Test streaming, batched write-back, progress and resumption"""
+
+    def test_rescan_scores_company_contracts(self, service, db, company, tenants):
+        add_contracts(db, "company-b", "user-1")
+        updates = []
+
+        job = service.rescan(
+            company_id=company.id,
+            progress_callback=lambda job: updates.append(job.processed),
+        )
+
+        assert job.status == "completed"
+        assert (job.total, job.processed, job.failed) == (3, 3, 0)
+        assert updates == [2, 3, 3]
+        scores = db.query(ComplianceScore).all()
+        assert len(scores) == 3
+        assert {score.analysis_version for score in scores} == {
+            service.analysis_version
+        }
+        assert service.engine.rule_set_version in service.analysis_version
+        assert all(
+            score.contract.company_id == company.id and score.risk_factors
+            for score in scores
+        )
+
+    def test_resume_after_skips_committed_contracts(self, service, db, company):
+        contract_ids = sorted(
+            c.id for c in db.query(Contract).filter(Contract.final_content.isnot(None))
+        )
+
+        job = service.rescan(company_id=company.id, resume_after=contract_ids[0])
+
+        assert job.total == 2
+        assert {s.contract_id for s in db.query(ComplianceScore)} == set(
+            contract_ids[1:]
+        )
+
+    def test_failed_batch_leaves_resume_cursor(
+        self, service, db, company, monkeypatch
+    ):
+        """An error stops the rescan after the last committed batch"""
+        write_batch = service._write_batch
+        calls = []
+
+        def fail_second_batch(*args):
+            calls.append(1)
+            if len(calls) == 2:
+                raise RuntimeError("database went away")
+            write_batch(*args)
+
+        monkeypatch.setattr(service, "_write_batch", fail_second_batch)
+        job = service.rescan(company_id=company.id)
+
+        assert job.status == "failed"
+        assert job.processed == 2
+        assert job.last_contract_id is not None
+        monkeypatch.undo()
+
+        resumed = service.rescan(
+            company_id=company.id, resume_after=job.last_contract_id
+        )
+        assert resumed.status == "completed"
+        assert db.query(ComplianceScore).count() == 3
+
+    def test_unscorable_contract_recorded_as_failed(
+        self, service, db, company, monkeypatch
+    ):
+        """One bad contract doesn't stop the batch"""
+        score_contract = rescan_module.score_contract
+        bad_id = sorted(
+            c.id for c in db.query(Contract).filter(Contract.final_content.isnot(None))
+        )[0]
+
+        def flaky_score(payload, engine=None):
+            if payload[0] == bad_id:
+                payload = (payload[0], payload[1], "not-a-type") + payload[3:]
+            return score_contract(payload, engine)
+
+        monkeypatch.setattr(rescan_module, "score_contract", flaky_score)
+        job = service.rescan(company_id=company.id)
+
+        assert job.status == "completed"
+        assert job.failed_contract_ids == [bad_id]
+        assert db.query(ComplianceScore).count() == 2
+
+    def test_process_pool_matches_inline_scores(self, session_factory, db, company):
+        """Worker processes produce the same scores as the in-process engine"""
+        inline = PortfolioRescanService(session_factory, workers=1, batch_size=2)
+        pooled = PortfolioRescanService(session_factory, workers=2, batch_size=2)
+
+        inline.rescan(company_id=company.id)
+        pooled.rescan(company_id=company.id)
+
+        scores = {}
+        for score in db.query(ComplianceScore):
+            scores.setdefault(score.contract_id, []).append(
+                (score.overall_score, score.risk_score, score.risk_factors)
+            )
+        assert len(scores) == 3
+        assert all(first == second for first, second in scores.values())
@@ -0,0 +1,118 @@
+"""
+Unit tests for the simulated AI provider used for offline load testing
+"""
+
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from app.services.ai_service import (
+    GroqAIService,
+    ContractGenerationRequest,
+    ComplianceAnalysisRequest,
+)
+from app.services.simulated_ai_client import SimulatedAIClient, SimulatedAIError
+
+
+def create(client: SimulatedAIClient, prompt: str, max_tokens: int = 3000):
+    return client.chat.completions.create(
+        model="simulated",
+        messages=[{"role": "user", "content": prompt}],
+        max_tokens=max_tokens,
+        temperature=0.3,
+    )
+
+
+class TestSimulatedAIClient:
+    """Test the simulated chat completion client"""
+
+    def test_same_prompt_is_deterministic(self):
+        """The same seed and prompt give identical output and latency"""
+        sleeps = []
+        client = SimulatedAIClient(seed=7, sleep=sleeps.append)
+
+        first = create(client, "CONTRACT TYPE: nda\n- Client: Acme Ltd")
+        second = create(client, "CONTRACT TYPE: nda\n- Client: Acme Ltd")
+
+        assert first.choices[0].message.content == second.choices[0].message.content
+        assert sleeps[0] == sleeps[1]
+        assert "Acme Ltd" in first.choices[0].message.content
+
+    def test_token_counts_respect_max_tokens(self):
+        """Output length follows the configured tokens and is capped by max_tokens"""
+        client = SimulatedAIClient(output_tokens=2000, sleep=lambda _: None)
+
+        response = create(client, "CONTRACT TYPE: service_agreement", max_tokens=300)
+
+        usage = response.usage
+        assert usage.completion_tokens <= 300
+        assert usage.total_tokens == usage.prompt_tokens + usage.completion_tokens
+
+    def test_latency_scales_with_output_tokens(self):
+        """Per-token latency is added on top of the base latency"""
+        sleeps = []
+        client = SimulatedAIClient(
+            latency_ms=100, latency_sigma=0, ms_per_output_token=1, sleep=sleeps.append
+        )
+
+        response = create(client, "CONTRACT TYPE: nda")
+
+        assert sleeps[0] == pytest.approx(
+            (100 + response.usage.completion_tokens) / 1000
+        )
+
+    def test_error_rate_injects_failures(self):
+        """An error rate of 1 makes every request fail"""
+        client = SimulatedAIClient(error_rate=1.0, sleep=lambda _: None)
+
+        with pytest.raises(SimulatedAIError) as exc_info:
+            create(client, "CONTRACT TYPE: nda")
+        assert exc_info.value.error_type in ("rate_limit", "timeout", "server_error")
+
+
+class TestGroqAIServiceSimulated:
+    """Test the AI service end to end against the simulated provider"""
+
+    @pytest.fixture
+    def simulated_service(self, mock_settings):
+        settings = SimpleNamespace(
+            **{**vars(mock_settings), "AI_PROVIDER": "simulated"},
+            AI_SIMULATED_LATENCY_MS=0,
+            AI_SIMULATED_LATENCY_SIGMA=0,
+            AI_SIMULATED_MS_PER_OUTPUT_TOKEN=0,
+            AI_SIMULATED_OUTPUT_TOKENS=400,
+            AI_SIMULATED_ERROR_RATE=0,
+            AI_SIMULATED_SEED=0,
+            AI_CHUNK_MAX_TOKENS=6000,
+            AI_MAX_PARALLEL_CHUNKS=4,
+        )
+        with patch("app.services.ai_service.settings", settings):
+            yield GroqAIService()
+
+    @pytest.mark.asyncio
+    async def test_generate_contract(self, simulated_service):
+        """Contract generation works without an API key"""
+        response = await simulated_service.generate_contract(
+            ContractGenerationRequest(
+                plain_english_input="Consulting services for six months",
+                contract_type="service_agreement",
+                client_name="Acme Ltd",
+            )
+        )
+
+        assert simulated_service.model.startswith("simulated/")
+        assert "SERVICE AGREEMENT" in response.content
+        assert response.token_usage["completion_tokens"] > 0
+
+    @pytest.mark.asyncio
+    async def test_analyze_compliance_parses(self, simulated_service):
+        """Simulated compliance output parses into scores"""
+        response = await simulated_service.analyze_compliance(
+            ComplianceAnalysisRequest(
+                contract_content="1. SERVICES\nThe Supplier shall provide services.",
+                contract_type="service_agreement",
+            )
+        )
+
+        assert 0.8 <= response.overall_score <= 1.0
+        assert len(response.risk_factors) == 2
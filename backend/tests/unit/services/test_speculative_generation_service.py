@@ -0,0 +1,119 @@
+"""
+Unit tests for speculative AI contract generation
+"""
+
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from app.infrastructure.database.models import (
+    AIGeneration,
+    Contract,
+    ContractType,
+    SpeculationStatus,
+)
+from app.services.speculative_generation_service import SpeculativeGenerationService
+
+PLAIN_ENGLISH_INPUT = (
+    "Consulting services for a retail client covering business analysis, "
+    "monthly reporting and recommendations, paid monthly within 30 days."
+)
+
+
+@pytest.fixture
+def speculation_settings():
+    settings = SimpleNamespace(
+        AI_SPECULATIVE_GENERATION=True,
+        AI_SPECULATIVE_MIN_INPUT_CHARS=40,
+        AI_SPECULATIVE_DAILY_TOKEN_BUDGET=100000,
+    )
+    with patch("app.services.speculative_generation_service.settings", settings):
+        yield settings
+
+
+@pytest.fixture
+def contract(db, company_user):
+    contract = Contract(
+        title="Consulting Agreement",
+        contract_type=ContractType.SERVICE_AGREEMENT,
+        plain_english_input=PLAIN_ENGLISH_INPUT,
+        client_name="Retail Client Ltd",
+        company_id=company_user.company_id,
+        created_by=company_user.id,
+    )
+    db.add(contract)
+    db.commit()
+    return contract
+
+
+@pytest.fixture
+def ai_client():
+    client = SimpleNamespace()
+    client.generate_contract = AsyncMock(
+        return_value=SimpleNamespace(
+            content="SPECULATIVE_CONTRACT_CONTENT",
+            model_name="test-model",
+            model_version=None,
+            processing_time_ms=120.0,
+            token_usage={"total_tokens": 900},
+            confidence_score=0.9,
+        )
+    )
+    return client
+
+
+@pytest.fixture
+def service(session_factory, ai_client):
+    return SpeculativeGenerationService(
+        session_factory=session_factory, ai_client=ai_client
+    )
+
+
+class TestSpeculativeGenerationService:
+    """Test speculative generation scheduling, claiming and budgets"""
+
+    @pytest.mark.asyncio
+    async def test_claim_returns_generation_for_unchanged_inputs(
+        self, service, db, contract, ai_client, speculation_settings
+    ):
+        """A pending generation is claimed when the inputs haven't changed"""
+        assert service.schedule(db, contract)
+
+        generation = await service.claim(db, contract)
+
+        assert generation.generated_content == "SPECULATIVE_CONTRACT_CONTENT"
+        assert generation.speculation_status == SpeculationStatus.ACCEPTED
+        ai_client.generate_contract.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_changed_inputs_discard_generation(
+        self, service, db, contract, speculation_settings
+    ):
+        """A generation for stale inputs is discarded rather than returned"""
+        service.schedule(db, contract)
+        await service._tasks[contract.id]
+
+        contract.client_name = "Different Client Ltd"
+        db.commit()
+
+        assert await service.claim(db, contract) is None
+        statuses = [g.speculation_status for g in db.query(AIGeneration).all()]
+        assert statuses == [SpeculationStatus.DISCARDED]
+
+    @pytest.mark.asyncio
+    async def test_budget_prevents_speculation(
+        self, service, db, contract, ai_client, speculation_settings
+    ):
+        """Speculation stops once the company's daily token budget is spent"""
+        speculation_settings.AI_SPECULATIVE_DAILY_TOKEN_BUDGET = 1000
+
+        assert not service.schedule(db, contract)
+        ai_client.generate_contract.assert_not_called()
+
+    def test_short_input_is_not_speculated(
+        self, service, db, contract, speculation_settings
+    ):
+        """Drafts without enough input aren't worth generating early"""
+        contract.plain_english_input = "NDA"
+
+        assert not service.schedule(db, contract)
@@ -0,0 +1,61 @@
+"""
+Unit tests for the rule engine benchmark corpus and baseline comparison
+"""
+
+from scripts.benchmark_rule_engines import (
+    MIXES,
+    compare_to_baseline,
+    generate_corpus,
+)
+
+SIZES = {"1KB": 1024, "16KB": 16 * 1024}
+
+
+def results(calibration_ms, **metrics):
+    return {"calibration_ms": calibration_ms, "metrics": metrics}
+
+
+class TestCorpus:
+    """Test the seeded synthetic corpus"""
+
+    def test_same_seed_same_corpus(self):
+        first, second = generate_corpus(7, SIZES), generate_corpus(7, SIZES)
+
+        assert [c.content for c in first] == [c.content for c in second]
+        assert [c.content for c in generate_corpus(8, SIZES)] != [
+            c.content for c in first
+        ]
+
+    def test_one_contract_per_mix_and_size(self):
+        corpus = generate_corpus(1, SIZES)
+
+        assert len(corpus) == len(MIXES) * len(SIZES)
+        for contract in corpus:
+            assert len(contract.content) == SIZES[contract.size]
+            assert contract.contract_type == MIXES[contract.mix][0]
+
+
+class TestBaselineComparison:
+    """Test regression detection against a recorded baseline"""
+
+    def test_slowdown_beyond_tolerance_reported(self):
+        baseline = results(10.0, **{"e2e.a": 4.0, "e2e.b": 4.0})
+        current = results(10.0, **{"e2e.a": 4.8, "e2e.b": 5.2})
+
+        regressions = compare_to_baseline(current, baseline, tolerance=0.25)
+
+        assert [r["metric"] for r in regressions] == ["e2e.b"]
+        assert regressions[0]["slowdown"] == 1.3
+
+    def test_timings_scaled_by_calibration(self):
+        """A machine twice as slow overall is not a regression"""
+        baseline = results(10.0, **{"e2e.a": 4.0})
+        current = results(20.0, **{"e2e.a": 8.0})
+
+        assert compare_to_baseline(current, baseline, tolerance=0.25) == []
+
+    def test_noise_and_missing_metrics_ignored(self):
+        baseline = results(10.0, **{"rule.fast": 0.5, "rule.removed": 3.0})
+        current = results(10.0, **{"rule.fast": 5.0})
+
+        assert compare_to_baseline(current, baseline, tolerance=0.1) == []
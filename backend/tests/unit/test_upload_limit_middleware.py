@@ -0,0 +1,110 @@
+"""
+Unit tests for the upload size limit middleware
+"""
+
+import pytest
+from fastapi import FastAPI, File, UploadFile
+
+from app.middleware import upload_limit as upload_limit_module
+from app.middleware.upload_limit import UploadSizeLimitMiddleware
+
+BOUNDARY = "----limit"
+CHUNK = b"y" * (256 * 1024)
+
+
+def make_app():
+    app = FastAPI()
+    app.add_middleware(UploadSizeLimitMiddleware)
+
+    @app.post("/files/upload")
+    async def upload(file: UploadFile = File(...)):
+        return {"size": len(await file.read())}
+
+    return app
+
+
+def multipart_chunks(count):
+    yield (
+        f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"file\"; "
+        'filename="c.pdf"\r\nContent-Type: application/pdf\r\n\r\n'
+    ).encode()
+    for _ in range(count):
+        yield CHUNK
+    yield f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+async def post(app, chunks, headers=()):
+    """Send a chunked upload as ASGI, counting the body messages read"""
+    chunks = list(chunks)
+    read = 0
+    messages = []
+
+    async def receive():
+        nonlocal read
+        if read == len(chunks):
+            return {"type": "http.disconnect"}
+        read += 1
+        return {
+            "type": "http.request",
+            "body": chunks[read - 1],
+            "more_body": read < len(chunks),
+        }
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/files/upload",
+        "raw_path": b"/files/upload",
+        "root_path": "",
+        "query_string": b"",
+        "server": ("testserver", 80),
+        "client": ("testclient", 50000),
+        "headers": [
+            (b"content-type", f"multipart/form-data; boundary={BOUNDARY}".encode()),
+            *headers,
+        ],
+    }
+    await app(scope, receive, send)
+    return messages[0]["status"], read, len(chunks)
+
+
+@pytest.fixture
+def one_mb_limit(monkeypatch):
+    monkeypatch.setattr(upload_limit_module.settings, "MAX_FILE_SIZE_MB", 1)
+
+
+class TestUploadSizeLimit:
+    """Test that oversized uploads are refused before their body is spooled"""
+
+    @pytest.mark.asyncio
+    async def test_upload_within_limit_passes(self, one_mb_limit):
+        status, read, total = await post(make_app(), multipart_chunks(2))
+
+        assert status == 200
+        assert read == total
+
+    @pytest.mark.asyncio
+    async def test_declared_length_refused_unread(self, one_mb_limit):
+        status, read, _ = await post(
+            make_app(),
+            multipart_chunks(8),
+            headers=[(b"content-length", str(8 * len(CHUNK)).encode())],
+        )
+
+        assert status == 413
+        assert read == 0
+
+    @pytest.mark.asyncio
+    async def test_undeclared_length_cut_off_while_streaming(self, one_mb_limit):
+        status, read, total = await post(make_app(), multipart_chunks(40))
+
+        assert status == 413
+        # Reading stops at the first chunk past 1 MB plus the form allowance
+        assert read == 6
+        assert read < total
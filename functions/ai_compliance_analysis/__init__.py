@@ -5,19 +5,50 @@ Analyzes contracts for UK legal compliance
 import json
 import logging
 import os
-from typing import Dict, Any, List
+import sys
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, Any, List, Optional
 import azure.functions as func
 from groq import Groq
-import tiktoken
-import re
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
 
 
 # Initialize logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize Groq client
-groq_client = Groq(api_key=os.environ.get('GROQ_API_KEY'))
+# Reuse the backend's UK compliance rule engine so scores match the API.
+# The backend package is expected alongside the functions app, or at PACTORIA_BACKEND_PATH
+BACKEND_PATH = os.environ.get(
+    'PACTORIA_BACKEND_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'backend')
+)
+if os.path.isdir(BACKEND_PATH) and BACKEND_PATH not in sys.path:
+    sys.path.append(BACKEND_PATH)
+
+try:
+    from app.domain.services.uk_compliance_engine import uk_compliance_engine
+    from app.domain.entities.company import (
+        Company, CompanyId, BusinessAddress, CompanyType, IndustryType, CompanySize
+    )
+    from app.domain.value_objects import ContractType, Email
+    RULE_ENGINE_AVAILABLE = True
+except Exception as e:
+    # Missing backend tree or a failure while loading its rule file; scoring
+    # falls back to the keyword checklist rather than failing the function
+    logger.warning(f"Backend rule engine unavailable, using keyword checklist only: {e}")
+    RULE_ENGINE_AVAILABLE = False
+
+# Request limits (cost control)
+MAX_CONTRACT_LENGTH = 50000
+MAX_BATCH_SIZE = 50
 
 # UK Legal Compliance Requirements
 UK_COMPLIANCE_CHECKLIST = {
@@ -63,13 +94,94 @@ UK_COMPLIANCE_CHECKLIST = {
     }
 }
 
+# Keywords lowercased once at import; plain substring search measured faster
+# than a combined regex alternation for this keyword set
+CHECKLIST_MATCHERS = [
+    (category, details, tuple(keyword.lower() for keyword in details["keywords"]))
+    for category, details in UK_COMPLIANCE_CHECKLIST.items()
+]
+
+
+@lru_cache(maxsize=1)
+def get_groq_client() -> Groq:
+    """Groq client, created on first use and kept warm across invocations"""
+    return Groq(api_key=os.environ.get('GROQ_API_KEY'))
+
+
+@lru_cache(maxsize=1)
+def get_encoder():
+    """Token encoder, loaded once per worker (None if unavailable)"""
+    if not TIKTOKEN_AVAILABLE:
+        return None
+    try:
+        return tiktoken.encoding_for_model("gpt-3.5-turbo")
+    except Exception as e:
+        logger.warning(f"Token encoder unavailable, estimating tokens: {e}")
+        return None
+
+
 def count_tokens(text: str) -> int:
     """Count tokens for cost monitoring"""
-    try:
-        encoding = tiktoken.encoding_for_model("gpt-3.5-turbo")
-        return len(encoding.encode(text))
-    except Exception:
+    encoder = get_encoder()
+    if encoder is None:
         return len(text) // 4
+    return len(encoder.encode(text))
+
+
+@lru_cache(maxsize=1)
+def get_default_company():
+    """Company profile used for rule applicability (no tenant data in the function)"""
+    return Company(
+        company_id=CompanyId("azure-function"),
+        name="Default Company",
+        company_type=CompanyType.PRIVATE_LIMITED,
+        industry=IndustryType.TECHNOLOGY,
+        address=BusinessAddress(
+            line1="Business Address",
+            city="London",
+            postcode="SW1A 1AA"
+        ),
+        primary_contact_email=Email("compliance@pactoria.com"),
+        created_by_user_id="azure-function",
+        company_size=CompanySize.SMALL
+    )
+
+
+def run_rule_engine(contract_text: str, contract_type: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Assess the contract with the backend UK compliance rule engine"""
+    if not RULE_ENGINE_AVAILABLE:
+        return None
+
+    try:
+        domain_contract_type = ContractType(contract_type or ContractType.SERVICE_AGREEMENT.value)
+    except ValueError:
+        domain_contract_type = ContractType.SERVICE_AGREEMENT
+
+    assessment = uk_compliance_engine.validate_contract(
+        contract_content=contract_text,
+        company=get_default_company(),
+        contract_type=domain_contract_type
+    )
+
+    return {
+        "overall_score": round(assessment.overall_score, 1),
+        "overall_level": assessment.overall_level.value,
+        "risk_level": assessment.risk_level.value,
+        "framework_scores": assessment.framework_scores,
+        "violations": [
+            {
+                "rule_id": violation.rule_id,
+                "title": violation.rule_title,
+                "severity": violation.severity.value,
+                "description": violation.description,
+                "suggested_fix": violation.suggested_fix,
+                "legal_reference": violation.legal_reference
+            }
+            for violation in assessment.violations
+        ],
+        "passed_rules": list(assessment.passed_rules),
+        "recommendations": assessment.recommendations
+    }
 
 def analyze_compliance_with_groq(contract_text: str) -> Dict[str, Any]:
     """Analyze contract compliance using Groq API"""
@@ -122,7 +234,7 @@ Format your response as a structured analysis with specific recommendations.
         input_tokens = count_tokens(prompt + contract_text)
         logger.info(f"Compliance analysis input tokens: {input_tokens}")
         
-        response = groq_client.chat.completions.create(
+        response = get_groq_client().chat.completions.create(
             model="llama-3.1-70b-versatile",  # More capable model for legal analysis
             messages=[{
                 "role": "system",
@@ -161,13 +273,13 @@ def calculate_detailed_compliance_score(contract_text: str) -> Dict[str, Any]:
     max_possible_score = 0.0
     detailed_scores = {}
     
-    for category, details in UK_COMPLIANCE_CHECKLIST.items():
+    for category, details, keywords in CHECKLIST_MATCHERS:
         category_score = 0.0
         found_keywords = []
         
         # Check for keywords in this category
-        for keyword in details["keywords"]:
-            if keyword.lower() in contract_lower:
+        for keyword in keywords:
+            if keyword in contract_lower:
                 category_score = 1.0  # Found compliance indicator
                 found_keywords.append(keyword)
                 break
@@ -258,8 +370,124 @@ def generate_recommendations(compliance_scores: Dict[str, Any], issues: List[str
     
     return recommendations
 
+def analyze_contract(contract_text: str, contract_type: Optional[str] = None,
+                     include_ai_analysis: bool = False, ai_on_low_score: bool = True) -> Dict[str, Any]:
+    """Analyze a single contract; shared by single and batch requests"""
+    
+    # Perform detailed compliance analysis
+    compliance_scores = calculate_detailed_compliance_score(contract_text)
+    rule_engine = run_rule_engine(contract_text, contract_type)
+    
+    # The rule engine is authoritative when available, so scores match the API
+    if rule_engine:
+        overall_score = rule_engine["overall_score"]
+        compliance_level = get_compliance_level(overall_score)
+    else:
+        overall_score = compliance_scores["overall_score"]
+        compliance_level = compliance_scores["compliance_level"]
+    
+    # Extract key issues
+    key_issues = extract_key_issues(contract_text, compliance_scores)
+    
+    # Generate recommendations
+    recommendations = generate_recommendations(compliance_scores, key_issues)
+    if rule_engine:
+        key_issues.extend(
+            f"{violation['severity'].upper()}: {violation['description']}"
+            for violation in rule_engine["violations"]
+        )
+        recommendations = list(dict.fromkeys(recommendations + rule_engine["recommendations"]))
+    
+    # Get AI analysis (if requested and score is low)
+    ai_analysis = None
+    token_usage = None
+    
+    if include_ai_analysis or (ai_on_low_score and overall_score < 80):
+        try:
+            ai_result = analyze_compliance_with_groq(contract_text)
+            ai_analysis = ai_result["ai_analysis"]
+            token_usage = ai_result["token_usage"]
+        except Exception as e:
+            logger.warning(f"AI analysis failed: {str(e)}")
+            ai_analysis = "AI analysis unavailable"
+    
+    return {
+        "compliance_analysis": {
+            "overall_score": overall_score,
+            "compliance_level": compliance_level,
+            "scoring_method": "uk_rule_engine" if rule_engine else "keyword_checklist",
+            "checklist_score": compliance_scores["overall_score"],
+            "detailed_scores": compliance_scores["detailed_scores"],
+            "rule_engine": rule_engine,
+            "key_issues": key_issues,
+            "recommendations": recommendations
+        },
+        "ai_analysis": ai_analysis,
+        "token_usage": token_usage,
+        "analyzed_at": datetime.now(timezone.utc).isoformat(),
+        "contract_length": len(contract_text)
+    }
+
+def validate_contract_text(contract_text: Any) -> Optional[str]:
+    """Return an error message if the contract text is unusable"""
+    if not contract_text or not isinstance(contract_text, str):
+        return "contract_text field required"
+    if len(contract_text) > MAX_CONTRACT_LENGTH:  # Limit for cost control
+        return "Contract text too long (max 50,000 characters)"
+    return None
+
+def analyze_batch(req_body: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Score many contracts in one invocation. Each item is scored independently;
+    invalid items are reported inline rather than failing the batch. AI analysis
+    only runs when explicitly requested, to keep batch cost predictable.
+    """
+    start_time = time.perf_counter()
+    include_ai_analysis = req_body.get('include_ai_analysis', False)
+    results = []
+    
+    for index, item in enumerate(req_body["contracts"]):
+        item = item if isinstance(item, dict) else {}
+        item_id = item.get('id', index)
+        contract_text = item.get('contract_text')
+        
+        error = validate_contract_text(contract_text)
+        if error:
+            results.append({"id": item_id, "error": error})
+            continue
+        
+        try:
+            result = analyze_contract(
+                contract_text,
+                contract_type=item.get('contract_type'),
+                include_ai_analysis=include_ai_analysis,
+                ai_on_low_score=False
+            )
+            results.append({"id": item_id, **result})
+        except Exception as e:
+            logger.error(f"Batch item {item_id} failed: {str(e)}")
+            results.append({"id": item_id, "error": "Analysis failed"})
+    
+    return {
+        "results": results,
+        "batch_size": len(results),
+        "failed": sum(1 for result in results if "error" in result),
+        "processing_time_ms": round((time.perf_counter() - start_time) * 1000, 2)
+    }
+
+def error_response(message: str, status_code: int = 400) -> func.HttpResponse:
+    return func.HttpResponse(
+        json.dumps({"error": message}),
+        status_code=status_code,
+        headers={"Content-Type": "application/json"}
+    )
+
 def main(req: func.HttpRequest) -> func.HttpResponse:
-    """Main Azure Function handler"""
+    """
+    Main Azure Function handler.
+    Accepts either {"contract_text": ...} or a batch
+    {"contracts": [{"id", "contract_text", "contract_type"}, ...]}
+    """
     
     logger.info('AI Compliance Analysis function triggered')
     
@@ -267,68 +495,40 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
         # Parse request
         req_body = req.get_json()
         if not req_body:
-            return func.HttpResponse(
-                json.dumps({"error": "Request body required"}),
-                status_code=400,
-                headers={"Content-Type": "application/json"}
-            )
+            return error_response("Request body required")
         
-        contract_text = req_body.get('contract_text')
-        if not contract_text:
+        # Batch request
+        if 'contracts' in req_body:
+            contracts = req_body['contracts']
+            if not isinstance(contracts, list) or not contracts:
+                return error_response("contracts must be a non-empty list")
+            if len(contracts) > MAX_BATCH_SIZE:
+                return error_response(f"Batch too large (max {MAX_BATCH_SIZE} contracts)")
+            
+            logger.info(f"Analyzing batch of {len(contracts)} contracts")
+            result = analyze_batch(req_body)
+            logger.info(f"Batch analysis completed in {result['processing_time_ms']}ms")
+            
             return func.HttpResponse(
-                json.dumps({"error": "contract_text field required"}),
-                status_code=400,
+                json.dumps(result, indent=2),
+                status_code=200,
                 headers={"Content-Type": "application/json"}
             )
         
-        # Validate contract length
-        if len(contract_text) > 50000:  # Limit for cost control
-            return func.HttpResponse(
-                json.dumps({"error": "Contract text too long (max 50,000 characters)"}),
-                status_code=400,
-                headers={"Content-Type": "application/json"}
-            )
+        contract_text = req_body.get('contract_text')
+        error = validate_contract_text(contract_text)
+        if error:
+            return error_response(error)
         
         logger.info(f"Analyzing contract of {len(contract_text)} characters")
         
-        # Perform detailed compliance analysis
-        compliance_scores = calculate_detailed_compliance_score(contract_text)
-        
-        # Extract key issues
-        key_issues = extract_key_issues(contract_text, compliance_scores)
-        
-        # Generate recommendations
-        recommendations = generate_recommendations(compliance_scores, key_issues)
-        
-        # Get AI analysis (if requested and score is low)
-        ai_analysis = None
-        token_usage = None
-        
-        if req_body.get('include_ai_analysis', False) or compliance_scores["overall_score"] < 80:
-            try:
-                ai_result = analyze_compliance_with_groq(contract_text)
-                ai_analysis = ai_result["ai_analysis"]
-                token_usage = ai_result["token_usage"]
-            except Exception as e:
-                logger.warning(f"AI analysis failed: {str(e)}")
-                ai_analysis = "AI analysis unavailable"
-        
-        # Compile final result
-        result = {
-            "compliance_analysis": {
-                "overall_score": compliance_scores["overall_score"],
-                "compliance_level": compliance_scores["compliance_level"],
-                "detailed_scores": compliance_scores["detailed_scores"],
-                "key_issues": key_issues,
-                "recommendations": recommendations
-            },
-            "ai_analysis": ai_analysis,
-            "token_usage": token_usage,
-            "analyzed_at": func.utcnow().isoformat(),
-            "contract_length": len(contract_text)
-        }
+        result = analyze_contract(
+            contract_text,
+            contract_type=req_body.get('contract_type'),
+            include_ai_analysis=req_body.get('include_ai_analysis', False)
+        )
         
-        logger.info(f"Compliance analysis completed. Score: {compliance_scores['overall_score']}%")
+        logger.info(f"Compliance analysis completed. Score: {result['compliance_analysis']['overall_score']}%")
         
         return func.HttpResponse(
             json.dumps(result, indent=2),
@@ -338,8 +538,4 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
         
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}")
-        return func.HttpResponse(
-            json.dumps({"error": "Internal server error"}),
-            status_code=500,
-            headers={"Content-Type": "application/json"}
-        )
\ No newline at end of file
+        return error_response("Internal server error", status_code=500)
@@ -0,0 +1,120 @@
+"""
+Benchmark for the AI Compliance Analysis function
+Measures cold start (module import + first invocation) and warm per-contract
+cost for single and batch requests, on contracts from the backend rule engine
+benchmark corpus. AI analysis is disabled so only the local scoring path is
+measured.
+
+Usage: python benchmark_compliance.py [--contracts 50] [--repeat 5]
+       [--seed 1] [--size 16KB]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+FUNCTIONS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.environ.get(
+    "PACTORIA_BACKEND_PATH", os.path.join(FUNCTIONS_DIR, "..", "backend")
+)
+sys.path.insert(0, BACKEND_DIR)
+
+from scripts.benchmark_rule_engines import (  # noqa: E402
+    MIXES,
+    SIZES,
+    synthetic_contract,
+)
+
+# The contract is read before the clock starts, so generating it in the
+# parent keeps the corpus imports out of the cold start
+COLD_START_SNIPPET = """
+import json, sys, time
+contract = sys.stdin.read()
+start = time.perf_counter()
+import ai_compliance_analysis as fn
+imported = time.perf_counter()
+fn.analyze_contract(contract, ai_on_low_score=False)
+first_call = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "first_call_ms": (first_call - imported) * 1000,
+    "rule_engine": fn.RULE_ENGINE_AVAILABLE,
+}))
+"""
+
+
+def corpus_contracts(seed: int, size: str, count: int):
+    """count contracts of one corpus size, cycling through the clause mixes"""
+    rng = random.Random(seed)
+    mixes = list(MIXES)
+    return [
+        synthetic_contract(rng, mixes[i % len(mixes)], SIZES[size])
+        for i in range(count)
+    ]
+
+
+def measure_cold_start(contract: str, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", COLD_START_SNIPPET],
+            cwd=FUNCTIONS_DIR, input=contract, capture_output=True, text=True,
+            check=True
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        "import_ms": statistics.median(s["import_ms"] for s in samples),
+        "first_call_ms": statistics.median(s["first_call_ms"] for s in samples),
+        "rule_engine": samples[0]["rule_engine"],
+    }
+
+
+def measure_warm(contracts, repeat: int):
+    sys.path.insert(0, FUNCTIONS_DIR)
+    import ai_compliance_analysis as fn
+
+    contract_count = len(contracts)
+    fn.analyze_contract(contracts[0], ai_on_low_score=False)  # warm caches
+
+    single_ms, batch_ms = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in contracts:
+            fn.analyze_contract(text, ai_on_low_score=False)
+        single_ms.append((time.perf_counter() - start) * 1000 / contract_count)
+
+        start = time.perf_counter()
+        fn.analyze_batch({"contracts": [
+            {"id": i, "contract_text": text} for i, text in enumerate(contracts)
+        ]})
+        batch_ms.append((time.perf_counter() - start) * 1000 / contract_count)
+
+    return {
+        "contract_chars": len(contracts[0]),
+        "per_contract_ms_single": statistics.median(single_ms),
+        "per_contract_ms_batch": statistics.median(batch_ms),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--contracts", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--size", choices=list(SIZES), default="16KB")
+    args = parser.parse_args()
+
+    contracts = corpus_contracts(args.seed, args.size, args.contracts)
+    results = {
+        "cold_start": measure_cold_start(contracts[0], args.repeat),
+        "warm": measure_warm(contracts, args.repeat),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()